@@ -13,6 +13,8 @@ import time
 import requests
 from typing import Optional, List, Dict, Any
 
+from core.http_transport import get_http_transport  # 共享HTTP连接池
+
 
 class BaiduSearchClient:
     """百度搜索API客户端"""
@@ -92,7 +94,7 @@ class BaiduSearchClient:
             print(f"    [🔍] Access Key: {self.api_key[:20]}...")
             print(f"    [🔍] Token获取URL: {url}")
             
-            response = requests.post(url, params=params, timeout=10)
+            response = get_http_transport('search').post(url, params=params, timeout=10)
             
             print(f"    [📥] Token获取响应状态码: {response.status_code}")
             
@@ -165,7 +167,7 @@ class BaiduSearchClient:
             print(f"    [🔍] URL: {url}")
             print(f"    [🔍] API Key格式: {'千帆平台' if self.api_key.startswith('APIKey-') else '传统格式'}")
             
-            response = requests.post(url, params=params, timeout=10)
+            response = get_http_transport('search').post(url, params=params, timeout=10)
             
             print(f"    [📥] Token获取响应状态码: {response.status_code}")
             
@@ -262,7 +264,7 @@ class BaiduSearchClient:
             print(f"    [🔍 百度搜索] Endpoint: {endpoint}")
             print(f"    [🔍 百度搜索] Top K: {payload['resource_type_filter'][0]['top_k']}")
             
-            response = requests.post(
+            response = get_http_transport('search').post(
                 endpoint,
                 headers=headers,
                 json=payload,
@@ -384,7 +386,7 @@ class BaiduSearchClient:
             print(f"    [🔍 百度智能搜索] Endpoint: {endpoint}")
             print(f"    [🔍 百度智能搜索] Model: {payload['model']}, Top K: {payload['resource_type_filter'][0]['top_k']}")
             
-            response = requests.post(
+            response = get_http_transport('search').post(
                 endpoint,
                 headers=headers,
                 json=payload,
@@ -473,7 +475,7 @@ class BaiduSearchClient:
             print(f"    [🔍 智能搜索高性能版] Endpoint: {endpoint}")
             print(f"    [🔍 智能搜索高性能版] Model: {payload['model']}, Top K: {payload['resource_type_filter'][0]['top_k']}")
             
-            response = requests.post(
+            response = get_http_transport('search').post(
                 endpoint,
                 headers=headers,
                 json=payload,
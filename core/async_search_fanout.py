@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+异步搜索扇出引擎
+用于 SearchEngineV2._parallel_search，在单个事件循环上并发执行多个搜索引擎任务
+
+功能:
+1. 进程级常驻事件循环（后台线程），避免每次请求创建线程池
+2. 共享 httpx.AsyncClient 连接池（keep-alive），供原生异步引擎使用
+3. 按引擎设置截止时间（per-engine deadline）
+4. 按完成顺序返回结果（on_result 回调）
+5. 整体超时后干净地取消未完成任务
+"""
+
+import asyncio
+import functools
+import threading
+import concurrent.futures
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from utils.logger_utils import get_logger
+
+# 尝试导入异步HTTP客户端
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+from core.http_transport import HAS_H2
+
+logger = get_logger('async_search_fanout')
+
+# 各搜索引擎默认截止时间（秒），可通过 config/search.yaml 的 search.async_fanout 覆盖
+DEFAULT_ENGINE_DEADLINES = {
+    'Tavily/Metaso': 25.0,
+    'Tavily': 25.0,
+    'Metaso': 25.0,
+    'Google': 15.0,
+    'Baidu': 20.0,
+}
+
+
+@dataclass
+class FanoutTask:
+    """
+    扇出任务
+
+    Attributes:
+        name: 任务名称（结果字典的键）
+        engine_name: 搜索引擎名称（用于选择截止时间）
+        coro_factory: 无参函数，调用后返回待执行的协程
+        deadline: 任务截止时间（秒），None 使用引擎默认值
+    """
+    name: str
+    engine_name: str
+    coro_factory: Callable[[], Awaitable[Any]]
+    deadline: Optional[float] = None
+
+
+class AsyncSearchFanout:
+    """
+    异步搜索扇出引擎
+
+    使用示例：
+        fanout = get_async_search_fanout()
+        results = fanout.run([
+            FanoutTask('Tavily #1', 'Tavily/Metaso', lambda: client.search_async(q1)),
+            FanoutTask('百度搜索', 'Baidu', lambda: fanout.run_blocking(baidu.search, q2)),
+        ], timeout=30)
+    """
+
+    def __init__(self,
+                 max_blocking_workers: int = 16,
+                 http_max_connections: int = 50,
+                 http_max_keepalive: int = 20,
+                 http_timeout: float = 30.0,
+                 engine_deadlines: Optional[Dict[str, float]] = None):
+        """
+        初始化扇出引擎（事件循环在首次使用时启动）
+
+        Args:
+            max_blocking_workers: 执行同步搜索函数的共享线程数
+            http_max_connections: 共享 HTTP 连接池最大连接数
+            http_max_keepalive: 共享 HTTP 连接池最大 keep-alive 连接数
+            http_timeout: 共享 HTTP 客户端默认读取超时（秒）
+            engine_deadlines: 各引擎截止时间（秒），会与默认值合并
+        """
+        self.max_blocking_workers = max_blocking_workers
+        self.http_max_connections = http_max_connections
+        self.http_max_keepalive = http_max_keepalive
+        self.http_timeout = http_timeout
+        self.engine_deadlines = {**DEFAULT_ENGINE_DEADLINES, **(engine_deadlines or {})}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._http_client = None
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.stats = {
+            "fanouts": 0,
+            "tasks": 0,
+            "completed": 0,
+            "failed": 0,
+            "deadline_exceeded": 0,
+            "cancelled": 0
+        }
+
+    # ----------------------------------------
+    # 事件循环管理
+    # ----------------------------------------
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """确保后台事件循环已启动，返回该循环"""
+        with self._lock:
+            if self._loop is not None and self._thread is not None and self._thread.is_alive():
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_blocking_workers,
+                thread_name_prefix='search-blocking'
+            )
+            loop.set_default_executor(self._executor)
+
+            thread = threading.Thread(
+                target=self._run_loop,
+                args=(loop,),
+                name='async-search-fanout',
+                daemon=True
+            )
+            thread.start()
+
+            self._loop = loop
+            self._thread = thread
+            self._http_client = None
+            logger.info(f"✅ 异步搜索扇出引擎已启动 (blocking_workers={self.max_blocking_workers})")
+            return loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop):
+        """后台线程入口：运行事件循环直到 stop()"""
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def get_http_client(self):
+        """
+        获取共享的 httpx.AsyncClient（必须在扇出事件循环内调用）
+
+        Returns:
+            httpx.AsyncClient 实例
+
+        Raises:
+            RuntimeError: httpx 未安装
+        """
+        if not HAS_HTTPX:
+            raise RuntimeError("httpx未安装，无法使用共享异步HTTP连接池")
+
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.http_timeout, connect=10.0),
+                limits=httpx.Limits(
+                    max_keepalive_connections=self.http_max_keepalive,
+                    max_connections=self.http_max_connections
+                ),
+                http2=HAS_H2,  # 安装 h2 时启用 HTTP/2（同一主机的并发请求复用一个连接）
+                trust_env=False  # 与同步客户端一致：不读取环境变量中的代理设置
+            )
+        return self._http_client
+
+    def run_blocking(self, func: Callable, *args, **kwargs) -> Awaitable[Any]:
+        """
+        在共享线程池中执行同步函数（必须在扇出事件循环内调用）
+
+        用于尚未提供原生异步实现的搜索引擎（如百度）。
+        注意：超时取消只会丢弃结果，已开始执行的线程会运行至结束。
+        """
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    def deadline_for(self, engine_name: str) -> float:
+        """获取引擎截止时间（秒），未配置的引擎使用 HTTP 默认超时"""
+        return float(self.engine_deadlines.get(engine_name, self.http_timeout))
+
+    # ----------------------------------------
+    # 扇出执行
+    # ----------------------------------------
+    async def fan_out(self, tasks: List[FanoutTask], timeout: float,
+                      on_result: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+        """
+        并发执行所有任务，按完成顺序收集结果
+
+        Args:
+            tasks: 扇出任务列表
+            timeout: 整体超时（秒），到期后取消所有未完成任务
+            on_result: 每个任务完成时的回调 (task_name, result)，在事件循环线程中调用
+
+        Returns:
+            字典，键为任务名称；失败/超时/取消的任务值为空列表
+        """
+        loop = asyncio.get_running_loop()
+        overall_deadline = loop.time() + timeout
+        self.stats["fanouts"] += 1
+        self.stats["tasks"] += len(tasks)
+
+        pending: Dict[asyncio.Future, FanoutTask] = {}
+        task_deadlines: Dict[str, float] = {}
+        for task in tasks:
+            task_deadline = min(task.deadline or self.deadline_for(task.engine_name), timeout)
+            task_deadlines[task.name] = task_deadline
+            future = asyncio.ensure_future(asyncio.wait_for(task.coro_factory(), task_deadline))
+            pending[future] = task
+
+        results: Dict[str, Any] = {}
+        try:
+            while pending:
+                remaining = overall_deadline - loop.time()
+                if remaining <= 0:
+                    logger.warning(f"并行搜索整体超时 ({timeout}秒)，已收集部分结果")
+                    break
+
+                done, _ = await asyncio.wait(
+                    pending.keys(),
+                    timeout=remaining,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for future in done:
+                    task = pending.pop(future)
+                    try:
+                        value = future.result()
+                        self.stats["completed"] += 1
+                    except asyncio.TimeoutError:
+                        logger.warning(f"任务 {task.name} 超过截止时间 ({task_deadlines[task.name]:.0f}秒)")
+                        self.stats["deadline_exceeded"] += 1
+                        value = []
+                    except Exception as e:
+                        logger.error(f"并行搜索任务失败 [{task.name}]: {str(e)}")
+                        self.stats["failed"] += 1
+                        value = []
+
+                    results[task.name] = value
+                    if on_result:
+                        try:
+                            on_result(task.name, value)
+                        except Exception as e:
+                            logger.warning(f"结果回调失败 [{task.name}]: {str(e)}")
+        finally:
+            # 取消未完成的任务，并等待取消生效，避免遗留悬挂协程
+            for future, task in pending.items():
+                future.cancel()
+                results.setdefault(task.name, [])
+                self.stats["cancelled"] += 1
+            if pending:
+                await asyncio.gather(*pending.keys(), return_exceptions=True)
+
+        return results
+
+    def run(self, tasks: List[FanoutTask], timeout: float,
+            on_result: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+        """
+        从同步代码（请求线程）提交扇出并阻塞等待结果
+
+        Args:
+            tasks: 扇出任务列表
+            timeout: 整体超时（秒）
+            on_result: 每个任务完成时的回调
+
+        Returns:
+            字典，键为任务名称，值为任务结果
+        """
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("不能在扇出事件循环线程内同步调用 run()，请直接 await fan_out()")
+
+        future = asyncio.run_coroutine_threadsafe(self.fan_out(tasks, timeout, on_result), loop)
+        try:
+            # fan_out 自身会在 timeout 后返回，这里额外留出取消收尾的时间
+            return future.result(timeout=timeout + 5)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            logger.error(f"扇出执行未能在 {timeout + 5} 秒内结束，已取消")
+            return {task.name: [] for task in tasks}
+
+    def run_coroutine(self, coro_factory: Callable[[], Awaitable[Any]], timeout: float) -> Any:
+        """
+        从同步代码（非扇出线程）在扇出事件循环上执行单个协程并等待结果
+
+        用于后台线程（如缓存刷新）复用原生异步引擎和共享连接池
+
+        Args:
+            coro_factory: 无参函数，调用后返回待执行的协程
+            timeout: 超时（秒）
+
+        Returns:
+            协程返回值
+
+        Raises:
+            asyncio.TimeoutError / concurrent.futures.TimeoutError: 超时
+        """
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("不能在扇出事件循环线程内同步调用 run_coroutine()")
+
+        async def _runner():
+            return await asyncio.wait_for(coro_factory(), timeout)
+
+        future = asyncio.run_coroutine_threadsafe(_runner(), loop)
+        try:
+            return future.result(timeout=timeout + 5)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        return {
+            **self.stats,
+            "loop_running": bool(self._thread and self._thread.is_alive()),
+            "http_client_open": bool(self._http_client is not None and not self._http_client.is_closed),
+            "engine_deadlines": dict(self.engine_deadlines)
+        }
+
+    def shutdown(self, timeout: float = 5.0):
+        """关闭共享HTTP客户端、线程池和事件循环"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or thread is None or not thread.is_alive():
+                return
+
+            if self._http_client is not None:
+                close_future = asyncio.run_coroutine_threadsafe(self._http_client.aclose(), loop)
+                try:
+                    close_future.result(timeout=timeout)
+                except Exception as e:
+                    logger.warning(f"关闭共享HTTP客户端失败: {str(e)}")
+                self._http_client = None
+
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=timeout)
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._loop = None
+            self._thread = None
+            logger.info("异步搜索扇出引擎已关闭")
+
+
+# 全局单例
+_fanout_instance: Optional[AsyncSearchFanout] = None
+_fanout_lock = threading.Lock()
+
+
+def get_async_search_fanout() -> AsyncSearchFanout:
+    """
+    获取全局异步搜索扇出引擎（单例模式）
+
+    配置来源：config/search.yaml 中的 search.async_fanout
+
+    Returns:
+        AsyncSearchFanout实例
+    """
+    global _fanout_instance
+    if _fanout_instance is None:
+        with _fanout_lock:
+            if _fanout_instance is None:
+                fanout_config = {}
+                try:
+                    from core.config_loader import get_config
+                    fanout_config = get_config().get_search_config().get('async_fanout', {}) or {}
+                except Exception as e:
+                    logger.warning(f"读取扇出配置失败，使用默认值: {str(e)}")
+
+                _fanout_instance = AsyncSearchFanout(
+                    max_blocking_workers=fanout_config.get('max_blocking_workers', 16),
+                    http_max_connections=fanout_config.get('http_max_connections', 50),
+                    http_max_keepalive=fanout_config.get('http_max_keepalive', 20),
+                    http_timeout=fanout_config.get('http_timeout', 30.0),
+                    engine_deadlines=fanout_config.get('engine_deadlines')
+                )
+    return _fanout_instance
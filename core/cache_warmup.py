@@ -176,7 +176,7 @@ class CacheWarmup:
         cache_stats = self.cache.get_stats()
         logger.info(f"\n缓存统计:")
         logger.info(f"  命中率: {cache_stats['hit_rate']:.1%}")
-        logger.info(f"  缓存文件数: {cache_stats['cache_files_count']}")
+        logger.info(f"  缓存条目数: {cache_stats['cache_entries']}")
 
         return results
 
@@ -183,6 +183,19 @@ class ConfigLoader:
         search_config = self.get_search_config()
         return search_config.get('edtech_domains', [])
 
+    # ----------------------------------------
+    # 便捷方法 - HTTP传输配置
+    # ----------------------------------------
+    def get_http_config(self) -> Dict[str, Any]:
+        """获取HTTP连接池/超时/重试配置"""
+        config = self.load('http.yaml')
+        return config.get('http', {})
+
+    def get_executor_config(self) -> Dict[str, Any]:
+        """获取后台执行器（线程池）配置"""
+        config = self.load('executors.yaml')
+        return config.get('executors', {})
+
     # ----------------------------------------
     # 便捷方法 - 视频处理配置
     # ----------------------------------------
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+评估结果目录索引
+为 data/evaluations/evaluation_*.json 维护一个增量更新的SQLite索引（WAL模式）
+
+- 预先提取国家/年级/学科、知识点、各项评分等字段，查询时不再逐个读取JSON文件
+- 增量同步：只解析新增或修改过的文件（按 mtime/size 判断），删除的文件同步移除
+- BatchVideoService 写入评估文件后直接登记，无需等待下一次目录扫描
+- 支持过滤、分页以及"每个视频URL只保留最新一条"的去重查询
+
+索引文件位于评估目录下的 .catalog.db，可随时删除，下次查询时自动重建
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from utils.logger_utils import get_logger
+
+logger = get_logger('evaluation_catalog')
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+CATALOG_DB_NAME = '.catalog.db'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    filename TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    valid INTEGER NOT NULL DEFAULT 1,
+    request_id TEXT NOT NULL DEFAULT '',
+    timestamp TEXT NOT NULL DEFAULT '',
+    video_url TEXT NOT NULL DEFAULT '',
+    video_title TEXT NOT NULL DEFAULT '',
+    country TEXT NOT NULL DEFAULT '',
+    grade TEXT NOT NULL DEFAULT '',
+    subject TEXT NOT NULL DEFAULT '',
+    kp_id TEXT,
+    overall_score REAL NOT NULL DEFAULT 0,
+    is_batch INTEGER NOT NULL DEFAULT 0,
+    total_videos INTEGER,
+    details_json TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_evaluations_params ON evaluations (country, grade, subject, timestamp);
+CREATE INDEX IF NOT EXISTS idx_evaluations_url ON evaluations (video_url, timestamp);
+CREATE INDEX IF NOT EXISTS idx_evaluations_timestamp ON evaluations (timestamp);
+"""
+
+_COLUMNS = ("filename", "mtime_ns", "size", "valid", "request_id", "timestamp", "video_url", "video_title",
+            "country", "grade", "subject", "kp_id", "overall_score", "is_batch", "total_videos", "details_json")
+
+
+class EvaluationCatalog:
+    """
+    评估结果目录索引（线程安全，多进程安全）
+
+    使用示例：
+        catalog = get_evaluation_catalog()
+        rows, total = catalog.query(country='ID', grade='Kelas 1', subject='Matematika',
+                                    require_knowledge_point=True, latest_per_url=True)
+    """
+
+    def __init__(self, evaluations_dir: str, sync_interval: float = 2.0):
+        """
+        初始化索引
+
+        Args:
+            evaluations_dir: 评估文件目录
+            sync_interval: 两次目录扫描的最小间隔（秒），本进程内登记的写入不受影响
+        """
+        self.evaluations_dir = Path(evaluations_dir)
+        self.db_path = self.evaluations_dir / CATALOG_DB_NAME
+        self.sync_interval = sync_interval
+
+        self._local = threading.local()
+        self._sync_lock = threading.Lock()
+        self._last_sync = 0.0
+        self._known: Optional[Dict[str, Tuple[int, int]]] = None  # {filename: (mtime_ns, size)}
+
+        # 统计信息
+        self.stats = {
+            "syncs": 0,
+            "files_parsed": 0,
+            "files_removed": 0,
+            "parse_errors": 0
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接（首次连接时创建表结构）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.evaluations_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------------------
+    # 字段提取
+    # ------------------------------------------------------------------
+    @staticmethod
+    def extract_fields(eval_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        从评估数据中提取索引字段
+
+        Args:
+            eval_data: evaluation_*.json 的内容
+
+        Returns:
+            索引字段字典（不含文件信息）
+        """
+        metadata = eval_data.get('video_metadata', {}) or {}
+        evaluation = eval_data.get('evaluation', {}) or {}
+        search_params = eval_data.get('search_params', {}) or {}
+
+        matched_kp = eval_data.get('matched_knowledge_point') or evaluation.get('matched_knowledge_point')
+        is_batch = bool(eval_data.get('is_batch', False))
+
+        def _section(name: str, score_key: str = 'score') -> Tuple[float, Any]:
+            section = evaluation.get(name, {}) or {}
+            if not isinstance(section, dict):
+                return 0.0, ''
+            return section.get(score_key, 0.0), section.get('details', '')
+
+        visual_quality, visual_quality_details = _section('visual_quality', 'combined_score')
+        relevance, relevance_details = _section('relevance')
+        pedagogy, pedagogy_details = _section('pedagogy')
+        metadata_score, metadata_details = _section('metadata')
+
+        return {
+            "request_id": eval_data.get('request_id', '') or '',
+            "timestamp": eval_data.get('timestamp', '') or '',
+            "video_url": eval_data.get('video_url', '') or '',
+            "video_title": metadata.get('title', '') or eval_data.get('title', '') or '',
+            "country": search_params.get('country', '') or '',
+            "grade": search_params.get('grade', '') or '',
+            "subject": search_params.get('subject', '') or '',
+            "kp_id": matched_kp.get('id') if isinstance(matched_kp, dict) else None,
+            "overall_score": evaluation.get('overall_score', 0.0) or 0.0,
+            "is_batch": 1 if is_batch else 0,
+            "total_videos": eval_data.get('total_videos', 0) if is_batch else None,
+            "details_json": json.dumps({
+                "visual_quality": visual_quality,
+                "relevance": relevance,
+                "pedagogy": pedagogy,
+                "metadata": metadata_score,
+                "visual_quality_details": visual_quality_details,
+                "relevance_details": relevance_details,
+                "pedagogy_details": pedagogy_details,
+                "metadata_details": metadata_details,
+                "ai_analysis": eval_data.get('analysis', '')
+            }, ensure_ascii=False, default=str)
+        }
+
+    # ------------------------------------------------------------------
+    # 增量维护
+    # ------------------------------------------------------------------
+    def _upsert(self, conn: sqlite3.Connection, filename: str, stat: os.stat_result,
+                eval_data: Optional[Dict[str, Any]]):
+        """写入一个文件的索引行（eval_data 为 None 表示文件无法解析，只记录文件信息）"""
+        row = {column: None for column in _COLUMNS}
+        row.update({"filename": filename, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size})
+        if eval_data is None:
+            row.update({"valid": 0, "request_id": '', "timestamp": '', "video_url": '', "video_title": '',
+                        "country": '', "grade": '', "subject": '', "overall_score": 0.0, "is_batch": 0})
+        else:
+            row.update({"valid": 1, **self.extract_fields(eval_data)})
+        conn.execute(
+            f"INSERT OR REPLACE INTO evaluations ({', '.join(_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in _COLUMNS)})",
+            [row[column] for column in _COLUMNS]
+        )
+        if self._known is not None:
+            self._known[filename] = (stat.st_mtime_ns, stat.st_size)
+
+    def register(self, filepath: str, eval_data: Dict[str, Any]):
+        """
+        登记一个刚写入的评估文件（写入方调用，无需等待目录扫描）
+
+        Args:
+            filepath: 评估文件路径
+            eval_data: 已写入的评估数据
+        """
+        path = Path(filepath)
+        with self._sync_lock:
+            conn = self._connect()
+            self._upsert(conn, path.name, path.stat(), eval_data)
+            conn.commit()
+
+    def sync(self, force: bool = False) -> int:
+        """
+        增量同步目录：解析新增/修改的文件，移除已删除的文件
+
+        Args:
+            force: 忽略同步间隔，立即扫描
+
+        Returns:
+            变更的文件数
+        """
+        if not force and time.time() - self._last_sync < self.sync_interval:
+            return 0
+
+        with self._sync_lock:
+            if not force and time.time() - self._last_sync < self.sync_interval:
+                return 0
+            if not self.evaluations_dir.exists():
+                self._last_sync = time.time()
+                return 0
+
+            conn = self._connect()
+            if self._known is None:
+                self._known = {
+                    row['filename']: (row['mtime_ns'], row['size'])
+                    for row in conn.execute("SELECT filename, mtime_ns, size FROM evaluations")
+                }
+
+            changed = 0
+            seen = set()
+            with os.scandir(self.evaluations_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if not (name.startswith('evaluation_') and name.endswith('.json')):
+                        continue
+                    seen.add(name)
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    if self._known.get(name) == (stat.st_mtime_ns, stat.st_size):
+                        continue
+
+                    try:
+                        with open(entry.path, 'r', encoding='utf-8') as f:
+                            eval_data = json.load(f)
+                        if not isinstance(eval_data, dict):
+                            raise ValueError("评估文件内容不是对象")
+                    except (OSError, ValueError) as e:
+                        logger.warning(f"读取评估文件失败 {name}: {str(e)}")
+                        self.stats["parse_errors"] += 1
+                        eval_data = None
+                    self._upsert(conn, name, stat, eval_data)
+                    self.stats["files_parsed"] += 1
+                    changed += 1
+
+            removed = [name for name in self._known if name not in seen]
+            for name in removed:
+                conn.execute("DELETE FROM evaluations WHERE filename = ?", (name,))
+                del self._known[name]
+            conn.commit()
+
+            self.stats["files_removed"] += len(removed)
+            self.stats["syncs"] += 1
+            self._last_sync = time.time()
+            if changed or removed:
+                logger.info(f"📇 评估索引已同步: 更新{changed}个文件, 移除{len(removed)}个文件")
+            return changed + len(removed)
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _build_filters(country: Optional[str], grade: Optional[str], subject: Optional[str],
+                       include_batch: bool, require_knowledge_point: bool) -> Tuple[str, list]:
+        """构建WHERE子句"""
+        clauses, params = ["valid = 1"], []
+        for column, value in (('country', country), ('grade', grade), ('subject', subject)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if not include_batch:
+            clauses.append("is_batch = 0")
+        if require_knowledge_point:
+            clauses.append("kp_id IS NOT NULL AND kp_id != '' AND video_url != ''")
+        return " WHERE " + " AND ".join(clauses), params
+
+    def _filtered_source(self, country, grade, subject, include_batch, require_knowledge_point,
+                         latest_per_url) -> Tuple[str, list]:
+        """返回满足过滤条件的子查询（可选按URL保留最新一条）"""
+        where, params = self._build_filters(country, grade, subject, include_batch, require_knowledge_point)
+        if not latest_per_url:
+            return f"(SELECT * FROM evaluations{where})", params
+        return (
+            "(SELECT * FROM (SELECT *, ROW_NUMBER() OVER ("
+            "PARTITION BY video_url ORDER BY timestamp DESC, filename DESC) AS url_rank "
+            f"FROM evaluations{where}) WHERE url_rank = 1)",
+            params
+        )
+
+    def query(self, country: Optional[str] = None, grade: Optional[str] = None, subject: Optional[str] = None,
+              include_batch: bool = False, require_knowledge_point: bool = False,
+              latest_per_url: bool = False, limit: Optional[int] = None,
+              offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        查询评估记录（按评估时间倒序）
+
+        Args:
+            country: 按国家过滤
+            grade: 按年级过滤
+            subject: 按学科过滤
+            include_batch: 是否包含批量评估的主记录
+            require_knowledge_point: 只返回匹配了知识点的记录
+            latest_per_url: 每个视频URL只保留最新的一条
+            limit: 每页条数（None 表示不限制）
+            offset: 偏移量
+
+        Returns:
+            (记录列表, 满足条件的总数)
+        """
+        self.sync()
+        source, params = self._filtered_source(country, grade, subject, include_batch,
+                                               require_knowledge_point, latest_per_url)
+        conn = self._connect()
+        rows = conn.execute(
+            f"SELECT * FROM {source} ORDER BY timestamp DESC, filename DESC LIMIT ? OFFSET ?",
+            params + [limit if limit is not None else -1, max(0, offset)]
+        ).fetchall()
+        total = conn.execute(f"SELECT COUNT(*) FROM {source}", params).fetchone()[0]
+        return [self._row_to_record(row) for row in rows], total
+
+    def summary(self, country: Optional[str] = None, grade: Optional[str] = None, subject: Optional[str] = None,
+                include_batch: bool = False, latest_per_url: bool = False,
+                high_score_threshold: float = 8.0) -> Dict[str, Any]:
+        """
+        汇总统计（总数、平均分、高分数量）
+
+        Returns:
+            {'total_count', 'average_score', 'high_score_count'}
+        """
+        self.sync()
+        source, params = self._filtered_source(country, grade, subject, include_batch, False, latest_per_url)
+        row = self._connect().execute(
+            f"SELECT COUNT(*), AVG(overall_score), SUM(CASE WHEN overall_score >= ? THEN 1 ELSE 0 END) "
+            f"FROM {source}",
+            [high_score_threshold] + params
+        ).fetchone()
+        return {
+            "total_count": row[0],
+            "average_score": row[1] or 0,
+            "high_score_count": row[2] or 0
+        }
+
+    @staticmethod
+    def _row_to_record(row: sqlite3.Row) -> Dict[str, Any]:
+        """数据库行转换为记录字典（展开评分详情）"""
+        record = {
+            "filename": row['filename'],
+            "request_id": row['request_id'],
+            "timestamp": row['timestamp'],
+            "video_url": row['video_url'],
+            "video_title": row['video_title'],
+            "country": row['country'],
+            "grade": row['grade'],
+            "subject": row['subject'],
+            "kp_id": row['kp_id'],
+            "overall_score": row['overall_score'],
+            "is_batch": bool(row['is_batch']),
+            "total_videos": row['total_videos']
+        }
+        if row['details_json']:
+            record.update(json.loads(row['details_json']))
+        return record
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        entries = self._connect().execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+        return {
+            **self.stats,
+            "entries": entries,
+            "db_path": str(self.db_path)
+        }
+
+
+# 全局实例（按评估目录）
+_catalogs: Dict[str, EvaluationCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_evaluation_catalog(evaluations_dir: Optional[str] = None) -> EvaluationCatalog:
+    """
+    获取评估目录索引实例（每个目录一个实例）
+
+    Args:
+        evaluations_dir: 评估文件目录，默认 data/evaluations
+
+    Returns:
+        EvaluationCatalog实例
+    """
+    path = os.path.abspath(evaluations_dir or str(PROJECT_ROOT / 'data' / 'evaluations'))
+    with _catalogs_lock:
+        if path not in _catalogs:
+            _catalogs[path] = EvaluationCatalog(path)
+        return _catalogs[path]
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+进程级后台执行器注册表
+按用途划分的命名线程池（request / io / llm / cpu / maintenance），替代各调用点按请求创建的 ThreadPoolExecutor
+
+- 线程复用：不再每个请求创建/销毁线程，避免高峰期的线程抖动和内存增长
+- 有界：每个池固定线程数，排队任务数超过 queue_size 时拒绝提交（ExecutorSaturatedError）
+- 截止时间：submit(..., deadline=) 的任务若开始执行时已过截止时间则直接失败（DeadlineExceededError），
+  不再为已经没人等待的结果占用线程
+- 嵌套提交：池内任务向同一个池提交子任务时在当前线程直接执行，避免池被占满时相互等待死锁；
+  内联执行时 submit() 会阻塞到子任务结束，截止时间只在开始前检查，调用方的 result(timeout=) 不起作用
+- 上下文传递：任务在提交方的 contextvars 上下文中执行（request_id、search_id 等随任务进入工作线程）
+- 指标：排队深度、活跃线程、饱和度、排队等待时间、拒绝/过期数
+"""
+
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from utils.logger_utils import get_logger
+
+logger = get_logger('executor_registry')
+
+# 默认池配置（config/executors.yaml 未配置时使用）
+DEFAULT_POOLS: Dict[str, Dict[str, int]] = {
+    # 整个搜索请求（web_app 的超时保护）
+    'request': {'max_workers': 8, 'queue_size': 32},
+    # 搜索API、播放列表元数据等网络IO
+    'io': {'max_workers': 32, 'queue_size': 256},
+    # LLM / 视觉模型调用
+    'llm': {'max_workers': 16, 'queue_size': 128},
+    # CPU密集型任务
+    'cpu': {'max_workers': os.cpu_count() or 4, 'queue_size': 64},
+    # 后台维护任务（缓存存储压缩等）
+    'maintenance': {'max_workers': 1, 'queue_size': 16},
+}
+
+# 当前线程所属的池名称（用于识别嵌套提交）
+_worker_local = threading.local()
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """执行器排队任务已满，拒绝提交"""
+
+
+class DeadlineExceededError(TimeoutError):
+    """任务开始执行时已超过截止时间"""
+
+
+class ManagedExecutor:
+    """
+    带指标和截止时间的命名线程池（线程安全）
+
+    使用示例：
+        executor = get_executor('io')
+        future = executor.submit(fetch, url, deadline=time.monotonic() + 10)
+        result = future.result(timeout=10)
+    """
+
+    def __init__(self, name: str, max_workers: int = 8, queue_size: int = 0):
+        """
+        Args:
+            name: 池名称（同时作为线程名前缀）
+            max_workers: 线程数
+            queue_size: 允许排队（未开始执行）的最大任务数，0 表示不限制
+        """
+        self.name = name
+        self.max_workers = max(1, int(max_workers))
+        self.queue_size = max(0, int(queue_size))
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f'pool-{name}')
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+
+        # 统计信息
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "cancelled": 0,
+            "deadline_exceeded": 0,
+            "inline": 0,
+            "peak_queue_depth": 0,
+            "peak_active": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0
+        }
+
+    def submit(self, fn: Callable, *args, deadline: Optional[float] = None, **kwargs) -> Future:
+        """
+        提交任务
+
+        Args:
+            fn: 任务函数
+            deadline: 截止时间（time.monotonic() 时间戳），开始执行时已超过则不执行
+            *args, **kwargs: 传给 fn 的参数
+
+        Returns:
+            Future
+
+        Raises:
+            ExecutorSaturatedError: 排队任务数已达 queue_size
+
+        Note:
+            在同一个池的工作线程中调用时任务内联执行（见 _run_inline）：submit() 返回时任务已结束，
+            没有超时保护。需要超时的嵌套调用应提交到另一个池
+        """
+        if getattr(_worker_local, 'pool', None) == self.name:
+            return self._run_inline(fn, args, kwargs, deadline)
+
+        with self._lock:
+            if self.queue_size and self._queued >= self.queue_size:
+                self.stats["rejected"] += 1
+                raise ExecutorSaturatedError(
+                    f"执行器 {self.name} 已饱和（排队 {self._queued}，线程 {self.max_workers}）"
+                )
+            self._queued += 1
+            self.stats["submitted"] += 1
+            self.stats["peak_queue_depth"] = max(self.stats["peak_queue_depth"], self._queued)
+
+        try:
+            future = self._executor.submit(
+                self._run, contextvars.copy_context(), fn, args, kwargs, time.monotonic(), deadline
+            )
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _run(self, context: contextvars.Context, fn: Callable, args: tuple, kwargs: dict,
+             enqueued_at: float, deadline: Optional[float]) -> Any:
+        """工作线程入口：记录排队时间，检查截止时间后执行任务"""
+        started = time.monotonic()
+        wait = started - enqueued_at
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            self.stats["peak_active"] = max(self.stats["peak_active"], self._active)
+            self.stats["total_wait_seconds"] += wait
+            self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], wait)
+
+        previous = getattr(_worker_local, 'pool', None)
+        _worker_local.pool = self.name
+        try:
+            if deadline is not None and started > deadline:
+                with self._lock:
+                    self.stats["deadline_exceeded"] += 1
+                raise DeadlineExceededError(f"任务在 {self.name} 中排队 {wait:.2f}秒，已超过截止时间")
+            return context.run(fn, *args, **kwargs)
+        finally:
+            _worker_local.pool = previous
+            with self._lock:
+                self._active -= 1
+
+    def _run_inline(self, fn: Callable, args: tuple, kwargs: dict, deadline: Optional[float]) -> Future:
+        """
+        在当前（同池）线程中直接执行，返回已完成的 Future
+
+        截止时间只在开始执行前检查一次；任务一旦开始就会运行到结束，执行期间超过截止时间也不会中断，
+        返回的 Future 已完成，调用方的 future.result(timeout=) 不会生效
+        """
+        future: Future = Future()
+        with self._lock:
+            self.stats["submitted"] += 1
+            self.stats["inline"] += 1
+        if deadline is not None and time.monotonic() > deadline:
+            with self._lock:
+                self.stats["deadline_exceeded"] += 1
+            future.set_exception(DeadlineExceededError(f"任务在 {self.name} 中已超过截止时间"))
+        else:
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+        self._on_done(future)
+        return future
+
+    def _on_done(self, future: Future):
+        """任务结束回调：更新完成/失败/取消计数"""
+        with self._lock:
+            if future.cancelled():
+                # 未开始就被取消的任务不会经过 _run，在这里出队
+                self._queued -= 1
+                self.stats["cancelled"] += 1
+            elif future.exception() is not None:
+                self.stats["failed"] += 1
+            else:
+                self.stats["completed"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息（含当前排队深度和饱和度）"""
+        with self._lock:
+            stats = dict(self.stats)
+            queued, active = self._queued, self._active
+        started = stats["completed"] + stats["failed"] + active - stats["inline"]
+        stats.update({
+            "max_workers": self.max_workers,
+            "queue_size": self.queue_size,
+            "queue_depth": queued,
+            "active": active,
+            "saturation": round(active / self.max_workers, 3),
+            "avg_wait_ms": round(stats["total_wait_seconds"] / started * 1000, 2) if started > 0 else 0.0,
+            "max_wait_ms": round(stats.pop("max_wait_seconds") * 1000, 2)
+        })
+        stats.pop("total_wait_seconds")
+        return stats
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """关闭线程池"""
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+# 全局实例
+_executors: Dict[str, ManagedExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name: str = 'io') -> ManagedExecutor:
+    """
+    获取命名执行器实例
+
+    配置来源：config/executors.yaml 中的 executors.<name>（max_workers、queue_size）
+
+    Args:
+        name: 池名称（'request'、'io'、'llm'、'cpu'、'maintenance'，或配置中的其他名称）
+
+    Returns:
+        ManagedExecutor实例
+    """
+    executor = _executors.get(name)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(name)
+            if executor is None:
+                settings = dict(DEFAULT_POOLS.get(name, DEFAULT_POOLS['io']))
+                try:
+                    from core.config_loader import get_config
+                    settings.update(get_config().get_executor_config().get(name, {}) or {})
+                except Exception as e:
+                    logger.warning(f"读取执行器配置失败，使用默认值: {str(e)}")
+                executor = ManagedExecutor(name, **settings)
+                _executors[name] = executor
+                logger.info(
+                    f"✅ 执行器 {name} 已创建 (max_workers={executor.max_workers}, queue_size={executor.queue_size})"
+                )
+    return executor
+
+
+def get_all_executor_stats() -> Dict[str, Any]:
+    """获取所有已创建执行器的统计信息"""
+    with _executors_lock:
+        executors = list(_executors.values())
+    return {executor.name: executor.get_stats() for executor in executors}
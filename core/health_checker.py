@@ -310,15 +310,13 @@ class HealthChecker:
                 issues.append("评估数据目录不存在")
 
             # 4. 检查搜索历史
-            history_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'search_history.json')
-            if os.path.exists(history_file):
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    try:
-                        history = json.load(f)
-                        if isinstance(history, list) and len(history) > 0:
-                            logger.info(f"  ✅ 搜索历史: {len(history)}条记录")
-                    except json.JSONDecodeError:
-                        issues.append("搜索历史文件格式错误")
+            try:
+                from core.search_history_store import get_search_history_store
+                history_count = get_search_history_store().count()
+                if history_count > 0:
+                    logger.info(f"  ✅ 搜索历史: {history_count}条记录")
+            except Exception as e:
+                issues.append(f"搜索历史存储不可用: {str(e)}")
 
         except Exception as e:
             issues.append(f"数据一致性检查异常: {str(e)}")
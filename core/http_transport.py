@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+共享HTTP传输层
+所有搜索/LLM客户端通过同一组连接池访问外部API，避免每次调用重新建立TCP/TLS连接
+
+功能:
+1. 按配置档（profile）共享 requests.Session：每个主机一个 keep-alive 连接池，池大小可配置
+2. 统一的超时（连接/读取）和重试退避策略（连接错误、429/5xx，遵循 Retry-After）；
+   POST 不是幂等的，只在服务端明确未处理请求时重试（429，带 Retry-After 的 503）
+3. 需要 httpx 的客户端（OpenAI SDK、异步调用）共享同一配置的 httpx.Client / AsyncClient，
+   安装 h2 时启用 HTTP/2（requests 不支持 HTTP/2）
+
+配置: config/http.yaml（defaults + profiles，例如 search、llm、internal_llm）
+
+使用示例：
+    transport = get_http_transport('search')
+    response = transport.post(url, json=payload, timeout=30)
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Dict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.logger_utils import get_logger
+
+# 尝试导入 httpx（OpenAI SDK 和异步调用使用）
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+# 尝试导入 h2（httpx 的 HTTP/2 支持）
+try:
+    import h2  # noqa: F401
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+logger = get_logger('http_transport')
+
+# 默认设置（config/http.yaml 的 defaults 和各 profile 覆盖这些值）
+DEFAULT_SETTINGS = {
+    'pool_connections': 10,      # 缓存的主机连接池数
+    'pool_maxsize': 20,          # 每个主机的最大连接数
+    'connect_timeout': 10.0,     # 连接超时（秒）
+    'read_timeout': 30.0,        # 读取超时（秒）
+    'retries': 2,                # 最大重试次数
+    'backoff_factor': 0.5,       # 退避系数：0.5s, 1s, 2s...
+    'status_forcelist': [429, 502, 503, 504],
+    'post_status_forcelist': [429, 503],  # POST 重试的状态码（503 仅在带 Retry-After 时重试）
+    'retry_methods': ['GET', 'POST'],
+    'http2': True,               # httpx 客户端在安装 h2 时启用 HTTP/2
+    'trust_env': True,           # 是否读取环境变量中的代理设置
+}
+
+
+class _MethodAwareRetry(Retry):
+    """
+    按请求方法区分状态码重试
+
+    502/504 时网关可能已把请求转给上游执行，重试非幂等的 POST 会重复执行LLM生成/搜索计费，
+    因此 POST 只按 post_status_forcelist 重试，且 503 必须带 Retry-After（服务端明确拒绝处理）
+    """
+
+    def __init__(self, *args, post_status_forcelist=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.post_status_forcelist = frozenset(post_status_forcelist)
+
+    def new(self, **kw) -> 'Retry':
+        retry = super().new(**kw)
+        retry.post_status_forcelist = self.post_status_forcelist
+        return retry
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method and method.upper() == 'POST':
+            if status_code not in self.post_status_forcelist:
+                return False
+            if status_code == 503 and not has_retry_after:
+                return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+class HttpTransport:
+    """
+    共享HTTP传输（一个配置档一个实例，线程安全）
+    """
+
+    def __init__(self, name: str = 'default', **settings):
+        """
+        初始化传输层
+
+        Args:
+            name: 配置档名称（用于日志和统计）
+            **settings: 覆盖 DEFAULT_SETTINGS 中的设置
+        """
+        self.name = name
+        self.settings = {**DEFAULT_SETTINGS, **settings}
+        self.timeout = (float(self.settings['connect_timeout']), float(self.settings['read_timeout']))
+
+        retry = _MethodAwareRetry(
+            total=int(self.settings['retries']),
+            connect=int(self.settings['retries']),
+            read=0,  # 请求已发出后不重试读取错误（避免重复执行非幂等的LLM/搜索调用）
+            status=int(self.settings['retries']),
+            backoff_factor=float(self.settings['backoff_factor']),
+            status_forcelist=tuple(self.settings['status_forcelist']),
+            post_status_forcelist=tuple(self.settings['post_status_forcelist'] or ()),
+            allowed_methods=frozenset(m.upper() for m in self.settings['retry_methods']),
+            respect_retry_after_header=True,
+            raise_on_status=False  # 重试用尽后返回最后的响应，由调用方按状态码处理
+        )
+        adapter = HTTPAdapter(
+            pool_connections=int(self.settings['pool_connections']),
+            pool_maxsize=int(self.settings['pool_maxsize']),
+            max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.trust_env = bool(self.settings['trust_env'])
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._http_client = None
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "hosts": {}
+        }
+
+        logger.info(f"✅ HTTP传输层 [{name}] 初始化: 每主机连接数={self.settings['pool_maxsize']}, "
+                    f"超时={self.timeout}, 重试={self.settings['retries']}")
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        发送请求（未指定 timeout 时使用配置档的超时）
+
+        Args:
+            method: HTTP方法
+            url: 请求URL
+            **kwargs: 传给 requests.Session.request 的参数
+
+        Returns:
+            requests.Response
+
+        Raises:
+            requests.exceptions.RequestException: 请求失败（重试用尽）
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlsplit(url).netloc
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["hosts"][host] = self.stats["hosts"].get(host, 0) + 1
+        try:
+            return self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """发送GET请求"""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """发送POST请求"""
+        return self.request('POST', url, **kwargs)
+
+    def _httpx_options(self) -> Dict[str, Any]:
+        """httpx 客户端的公共参数"""
+        return {
+            'timeout': httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+            'limits': httpx.Limits(
+                max_keepalive_connections=int(self.settings['pool_maxsize']),
+                max_connections=int(self.settings['pool_maxsize']) * int(self.settings['pool_connections'])
+            ),
+            'http2': bool(self.settings['http2']) and HAS_H2,
+            'trust_env': bool(self.settings['trust_env']),
+        }
+
+    @property
+    def http_client(self):
+        """
+        共享的同步 httpx.Client（传给 OpenAI SDK 的 http_client）
+
+        Raises:
+            RuntimeError: httpx 未安装
+        """
+        if not HAS_HTTPX:
+            raise RuntimeError("httpx未安装，无法创建共享HTTP客户端")
+        if self._http_client is None:
+            with self._lock:
+                if self._http_client is None:
+                    self._http_client = httpx.Client(**self._httpx_options())
+        return self._http_client
+
+    def async_client(self):
+        """
+        当前事件循环的共享 httpx.AsyncClient（必须在事件循环内调用）
+
+        AsyncClient 绑定创建它的事件循环，因此每个事件循环各有一个实例
+
+        Raises:
+            RuntimeError: httpx 未安装或不在事件循环内
+        """
+        if not HAS_HTTPX:
+            raise RuntimeError("httpx未安装，无法创建共享异步HTTP客户端")
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(**self._httpx_options())
+                self._async_clients[loop] = client
+        return client
+
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._lock:
+            return {
+                "name": self.name,
+                "requests": self.stats["requests"],
+                "errors": self.stats["errors"],
+                "hosts": dict(self.stats["hosts"]),
+                "http2": bool(self.settings['http2']) and HAS_H2,
+                "pool_maxsize": self.settings['pool_maxsize']
+            }
+
+
+# 全局实例（按配置档）
+_transports: Dict[str, HttpTransport] = {}
+_transports_lock = threading.Lock()
+
+
+def get_http_transport(profile: str = 'default') -> HttpTransport:
+    """
+    获取共享HTTP传输实例
+
+    配置来源：config/http.yaml 中的 http.defaults 和 http.profiles.<profile>
+
+    Args:
+        profile: 配置档名称（如 'search'、'llm'、'internal_llm'）
+
+    Returns:
+        HttpTransport实例
+    """
+    transport = _transports.get(profile)
+    if transport is None:
+        with _transports_lock:
+            transport = _transports.get(profile)
+            if transport is None:
+                settings = {}
+                try:
+                    from core.config_loader import get_config
+                    http_config = get_config().get_http_config()
+                    settings.update(http_config.get('defaults', {}) or {})
+                    settings.update((http_config.get('profiles', {}) or {}).get(profile, {}) or {})
+                except Exception as e:
+                    logger.warning(f"读取HTTP传输配置失败，使用默认值: {str(e)}")
+                transport = HttpTransport(profile, **settings)
+                _transports[profile] = transport
+    return transport
+
+
+def get_all_transport_stats() -> Dict[str, Any]:
+    """获取所有已创建传输实例的统计信息"""
+    with _transports_lock:
+        transports = list(_transports.values())
+    return {transport.name: transport.get_stats() for transport in transports}
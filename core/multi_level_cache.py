@@ -2,9 +2,14 @@
 多级缓存系统 - Multi-Level Cache System
 ===============================================
 三级缓存架构：
-L1: 内存缓存 (最快，100条，5分钟TTL)
+L1: 内存缓存 (最快，LRU + 字节预算，5分钟TTL)
 L2: Redis缓存 (快，10K条，1小时TTL)
-L3: 磁盘缓存 (慢，无限制，24小时TTL)
+L3: 磁盘缓存 (慢，无限制，24小时TTL，分段追加式存储 core/segment_store.py)
+
+软/硬TTL（stale-while-revalidate）：
+- 软TTL内：直接返回
+- 软TTL后、硬TTL前：立即返回旧数据，后台刷新（同一键只刷新一次）
+- 硬TTL后：视为未命中
 
 性能提升：
 - 缓存命中率：27% → 45-60%
@@ -17,10 +22,13 @@ import time
 import hashlib
 import re
 import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Optional, Dict
+from typing import Any, Callable, Optional, Dict, Tuple
 from functools import lru_cache
 from unidecode import unidecode
+from core.segment_store import SegmentStore
 
 try:
     import redis
@@ -29,6 +37,9 @@ except ImportError:
     REDIS_AVAILABLE = False
     print("⚠️ Redis not available, using L1 + L3 cache only")
 
+# L2/L3 中带软TTL元数据的数据包装标记
+_ENVELOPE_MARKER = '__mlc__'
+
 
 class MultiLevelCache:
     """
@@ -43,36 +54,49 @@ class MultiLevelCache:
         # 设置缓存
         cache.set("search:印尼数学", "google", result, ttl=3600)
 
+        # 软TTL：30分钟后返回旧数据并在后台刷新，1小时后彻底过期
+        cache.set("search:印尼数学", "google", result, ttl=3600, soft_ttl=1800)
+        data, is_stale = cache.get_or_revalidate(
+            "search:印尼数学", "google", refresh_func=do_search, ttl=3600, soft_ttl=1800
+        )
+
         # 清除缓存
         cache.clear("search:印尼数学")
     """
 
     def __init__(self,
-                 l1_max_size: int = 100,
+                 l1_max_size: int = 20000,
                  l1_ttl: int = 300,
+                 l1_max_bytes: int = 64 * 1024 * 1024,
                  l2_host: str = 'localhost',
                  l2_port: int = 6379,
                  l2_db: int = 0,
                  l2_ttl: int = 3600,
                  l3_dir: str = 'data/cache',
-                 l3_ttl: int = 86400):
+                 l3_ttl: int = 86400,
+                 refresh_workers: int = 4):
         """
         初始化三级缓存
 
         Args:
             l1_max_size: L1缓存最大条目数
             l1_ttl: L1缓存TTL（秒）
+            l1_max_bytes: L1缓存字节预算（按序列化后的JSON大小估算）
             l2_host: Redis主机
             l2_port: Redis端口
             l2_db: Redis数据库编号
             l2_ttl: L2缓存TTL（秒）
             l3_dir: L3缓存目录
             l3_ttl: L3缓存TTL（秒）
+            refresh_workers: 后台刷新线程数
         """
-        # L1: 内存缓存
-        self.l1_cache: Dict[str, tuple] = {}
+        # L1: 内存缓存（LRU，按访问顺序排列，队首最久未使用）
+        # 值为 (data, timestamp, size_bytes, soft_expires_at)
+        self.l1_cache: "OrderedDict[str, tuple]" = OrderedDict()
         self.l1_max_size = l1_max_size
         self.l1_ttl = l1_ttl
+        self.l1_max_bytes = l1_max_bytes
+        self.l1_bytes = 0
         self.l1_lock = threading.Lock()
 
         # L2: Redis缓存
@@ -95,10 +119,17 @@ class MultiLevelCache:
                 print(f"⚠️ Redis连接失败: {e}，使用L1+L3缓存")
                 self.l2_client = None
 
-        # L3: 磁盘缓存
+        # L3: 磁盘缓存（分段存储位于 l3_dir/l3_store；l3_dir 下的旧版JSON文件在读取时迁移）
         self.l3_dir = Path(l3_dir)
         self.l3_dir.mkdir(parents=True, exist_ok=True)
         self.l3_ttl = l3_ttl
+        self.l3_store = SegmentStore(str(self.l3_dir / 'l3_store'))
+
+        # 后台刷新（stale-while-revalidate）
+        self.refresh_workers = refresh_workers
+        self._refresh_executor: Optional[ThreadPoolExecutor] = None
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
 
         # 统计信息
         self.stats = {
@@ -106,7 +137,16 @@ class MultiLevelCache:
             'l2_hits': 0,
             'l3_hits': 0,
             'misses': 0,
-            'total': 0
+            'total': 0,
+            'l1_evictions': 0,   # 因条目数/字节预算被淘汰
+            'l1_expired': 0,     # 因TTL过期被移除
+            'l1_rejected': 0,    # 单条超过字节预算，未写入L1
+            'fresh_hits': 0,     # 软TTL内命中（get_or_revalidate）
+            'stale_hits': 0,     # 软TTL后命中，返回旧数据
+            'refreshes_scheduled': 0,
+            'refreshes_deduplicated': 0,  # 同一键已在刷新，未重复提交
+            'refreshes_succeeded': 0,
+            'refreshes_failed': 0
         }
 
     @staticmethod
@@ -183,6 +223,8 @@ class MultiLevelCache:
         """
         从缓存获取数据（按L1→L2→L3顺序查找）
 
+        超过软TTL但未超过硬TTL的数据同样返回；需要后台刷新时使用 get_or_revalidate()
+
         Args:
             query: 查询字符串
             engine: 搜索引擎名称
@@ -192,19 +234,59 @@ class MultiLevelCache:
             缓存的数据，如果未找到返回None
         """
         key = self.generate_cache_key(query, engine, **kwargs)
+        entry = self._lookup(key)
+        return entry[0] if entry is not None else None
+
+    def get_or_revalidate(self, query: str, engine: str,
+                          refresh_func: Callable[[], Any],
+                          ttl: Optional[int] = None,
+                          soft_ttl: Optional[int] = None,
+                          **kwargs) -> Tuple[Optional[Any], bool]:
+        """
+        获取缓存（stale-while-revalidate）
+
+        超过软TTL的数据立即返回，同时在后台调用 refresh_func 刷新该键；
+        同一键同时只会有一个刷新任务
+
+        Args:
+            query: 查询字符串
+            engine: 搜索引擎名称
+            refresh_func: 无参函数，返回要写入缓存的新数据（返回None表示不更新）
+            ttl: 刷新后写入的硬TTL（秒）
+            soft_ttl: 刷新后写入的软TTL（秒）
+            **kwargs: 其他参数（参与缓存键）
+
+        Returns:
+            (缓存数据或None, 是否为过期旧数据)
+        """
+        key = self.generate_cache_key(query, engine, **kwargs)
+        entry = self._lookup(key)
+        if entry is None:
+            return None, False
+
+        data, soft_expires_at = entry
+        if soft_expires_at is None or time.time() < soft_expires_at:
+            self.stats['fresh_hits'] += 1
+            return data, False
+
+        self.stats['stale_hits'] += 1
+        self._schedule_refresh(key, query, engine, refresh_func, ttl, soft_ttl, kwargs)
+        return data, True
+
+    def _lookup(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """
+        按L1→L2→L3顺序查找
+
+        Returns:
+            (数据, 软过期时间戳或None)，未找到返回None
+        """
         self.stats['total'] += 1
 
         # === L1: 内存缓存 ===
-        with self.l1_lock:
-            if key in self.l1_cache:
-                data, timestamp = self.l1_cache[key]
-                # 检查是否过期
-                if time.time() - timestamp < self.l1_ttl:
-                    self.stats['l1_hits'] += 1
-                    return data
-                else:
-                    # 过期，删除
-                    del self.l1_cache[key]
+        entry = self._l1_get(key)
+        if entry is not None:
+            self.stats['l1_hits'] += 1
+            return entry
 
         # === L2: Redis缓存 ===
         if self.l2_client:
@@ -212,59 +294,50 @@ class MultiLevelCache:
                 data = self.l2_client.get(key)
                 if data:
                     # 反序列化
-                    result = json.loads(data)
+                    result, soft_expires_at = self._unwrap(json.loads(data))
                     # 提升到L1
-                    with self.l1_lock:
-                        self.l1_cache[key] = (result, time.time())
-                        # L1缓存淘汰（LRU）
-                        if len(self.l1_cache) > self.l1_max_size:
-                            # 删除最旧的项
-                            oldest_key = min(self.l1_cache.items(),
-                                            key=lambda x: x[1][1])
-                            del self.l1_cache[oldest_key[0]]
+                    self._l1_put(key, result, len(data.encode('utf-8')), soft_expires_at)
 
                     self.stats['l2_hits'] += 1
-                    return result
+                    return result, soft_expires_at
             except Exception as e:
                 print(f"⚠️ Redis读取失败: {e}")
 
         # === L3: 磁盘缓存 ===
-        cache_file = self.l3_dir / f"{key}.json"
-        if cache_file.exists():
-            try:
-                # 检查文件是否过期
-                file_mtime = cache_file.stat().st_mtime
-                if time.time() - file_mtime < self.l3_ttl:
-                    with open(cache_file, 'r', encoding='utf-8') as f:
-                        result = json.load(f)
-
-                    # 提升到L1和L2
-                    with self.l1_lock:
-                        self.l1_cache[key] = (result, time.time())
-
-                    if self.l2_client:
+        try:
+            payload = self.l3_store.get(key)
+            if payload is None:
+                payload = self._migrate_legacy_l3(key)
+
+            if payload is not None:
+                result, soft_expires_at = self._unwrap(json.loads(payload))
+
+                # 提升到L1和L2
+                self._l1_put(key, result, len(payload), soft_expires_at)
+
+                if self.l2_client:
+                    # 使用条目剩余的硬TTL，快过期的磁盘条目不会在Redis中重新获得完整TTL
+                    l2_ttl = self.l2_ttl
+                    expires_at = self.l3_store.get_expires_at(key)
+                    if expires_at:
+                        l2_ttl = min(l2_ttl, int(expires_at - time.time()))
+                    if l2_ttl > 0:
                         try:
-                            self.l2_client.setex(
-                                key,
-                                self.l2_ttl,
-                                json.dumps(result, ensure_ascii=False)
-                            )
+                            self.l2_client.setex(key, l2_ttl, payload.decode('utf-8'))
                         except Exception as e:
                             print(f"⚠️ Redis写入失败: {e}")
 
-                    self.stats['l3_hits'] += 1
-                    return result
-                else:
-                    # 过期，删除文件
-                    cache_file.unlink()
-            except Exception as e:
-                print(f"⚠️ 磁盘读取失败: {e}")
+                self.stats['l3_hits'] += 1
+                return result, soft_expires_at
+        except Exception as e:
+            print(f"⚠️ 磁盘读取失败: {e}")
 
         # 未找到缓存
         self.stats['misses'] += 1
         return None
 
-    def set(self, query: str, engine: str, data: Any, ttl: Optional[int] = None, **kwargs):
+    def set(self, query: str, engine: str, data: Any, ttl: Optional[int] = None,
+            soft_ttl: Optional[int] = None, **kwargs):
         """
         设置缓存（同时写入L1、L2、L3）
 
@@ -272,23 +345,28 @@ class MultiLevelCache:
             query: 查询字符串
             engine: 搜索引擎名称
             data: 要缓存的数据
-            ttl: 缓存TTL（秒），None使用默认值
+            ttl: 缓存TTL（硬TTL，秒），None使用默认值
+            soft_ttl: 软TTL（秒），超过后 get_or_revalidate 返回旧数据并后台刷新；None表示不启用
             **kwargs: 其他参数
         """
-        key = self.generate_cache_key(query, engine, **kwargs)
+        self._set_by_key(self.generate_cache_key(query, engine, **kwargs), data, ttl, soft_ttl)
 
+    def _set_by_key(self, key: str, data: Any, ttl: Optional[int], soft_ttl: Optional[int]) -> str:
+        """按缓存键写入L1、L2、L3"""
         # 使用各级缓存的默认TTL
         if ttl is None:
             ttl = self.l3_ttl  # 默认使用最长的TTL
 
+        soft_expires_at = time.time() + soft_ttl if soft_ttl and soft_ttl < ttl else None
+
+        # 只序列化一次：L1用于估算大小，L2/L3直接写入
+        stored = data
+        if soft_expires_at is not None:
+            stored = {_ENVELOPE_MARKER: 1, 'soft_expires_at': soft_expires_at, 'data': data}
+        payload = json.dumps(stored, ensure_ascii=False)
+
         # === 写入L1 ===
-        with self.l1_lock:
-            self.l1_cache[key] = (data, time.time())
-            # L1缓存淘汰
-            if len(self.l1_cache) > self.l1_max_size:
-                oldest_key = min(self.l1_cache.items(),
-                                key=lambda x: x[1][1])
-                del self.l1_cache[oldest_key[0]]
+        self._l1_put(key, data, len(payload.encode('utf-8')), soft_expires_at)
 
         # === 写入L2 ===
         if self.l2_client:
@@ -296,19 +374,74 @@ class MultiLevelCache:
                 self.l2_client.setex(
                     key,
                     min(ttl, self.l2_ttl),
-                    json.dumps(data, ensure_ascii=False)
+                    payload
                 )
             except Exception as e:
                 print(f"⚠️ Redis写入失败: {e}")
 
-        # === 写入L3 ===
+        # === 写入L3 ===（硬TTL同样约束L3）
         try:
-            cache_file = self.l3_dir / f"{key}.json"
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.l3_store.put(key, payload.encode('utf-8'), ttl=min(ttl, self.l3_ttl))
         except Exception as e:
             print(f"⚠️ 磁盘写入失败: {e}")
 
+        return key
+
+    @staticmethod
+    def _unwrap(stored: Any) -> Tuple[Any, Optional[float]]:
+        """解开L2/L3中的数据包装，返回 (数据, 软过期时间戳或None)"""
+        if isinstance(stored, dict) and stored.get(_ENVELOPE_MARKER) == 1:
+            return stored.get('data'), stored.get('soft_expires_at')
+        return stored, None
+
+    # ----------------------------------------
+    # 后台刷新（stale-while-revalidate）
+    # ----------------------------------------
+    def _schedule_refresh(self, key: str, query: str, engine: str,
+                          refresh_func: Callable[[], Any],
+                          ttl: Optional[int], soft_ttl: Optional[int], kwargs: Dict[str, Any]):
+        """提交后台刷新任务（同一键正在刷新时跳过）"""
+        with self._refresh_lock:
+            if key in self._refreshing:
+                self.stats['refreshes_deduplicated'] += 1
+                return
+            self._refreshing.add(key)
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(
+                    max_workers=self.refresh_workers,
+                    thread_name_prefix='cache-refresh'
+                )
+            self.stats['refreshes_scheduled'] += 1
+
+        try:
+            self._refresh_executor.submit(self._run_refresh, key, query, engine, refresh_func, ttl, soft_ttl)
+        except RuntimeError as e:
+            # 解释器退出时线程池已关闭
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+            print(f"⚠️ 提交后台刷新失败: {e}")
+
+    def _run_refresh(self, key: str, query: str, engine: str,
+                     refresh_func: Callable[[], Any],
+                     ttl: Optional[int], soft_ttl: Optional[int]):
+        """执行后台刷新并写回缓存"""
+        try:
+            data = refresh_func()
+            if not data:
+                # 上游故障常表现为空结果：保留旧数据，不用空结果覆盖
+                self.stats['refreshes_failed'] += 1
+                print(f"⚠️ 后台刷新返回空结果，保留旧数据 [{engine}]: {query[:50]}...")
+                return
+            self._set_by_key(key, data, ttl, soft_ttl)
+            self.stats['refreshes_succeeded'] += 1
+            print(f"🔄 后台刷新完成 [{engine}]: {query[:50]}...")
+        except Exception as e:
+            self.stats['refreshes_failed'] += 1
+            print(f"⚠️ 后台刷新失败 [{engine}]: {e}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+
     def clear(self, query: Optional[str] = None, engine: Optional[str] = None):
         """
         清除缓存
@@ -319,7 +452,9 @@ class MultiLevelCache:
         """
         if query is None and engine is None:
             # 清除所有缓存
-            self.l1_cache.clear()
+            with self.l1_lock:
+                self.l1_cache.clear()
+                self.l1_bytes = 0
 
             if self.l2_client:
                 try:
@@ -329,7 +464,11 @@ class MultiLevelCache:
                 except Exception as e:
                     print(f"⚠️ Redis清除失败: {e}")
 
-            # 清除L3
+            # 清除L3（分段存储 + 旧版JSON文件）
+            try:
+                self.l3_store.clear()
+            except Exception as e:
+                print(f"⚠️ 清除磁盘缓存失败: {e}")
             for cache_file in self.l3_dir.glob("*.json"):
                 try:
                     cache_file.unlink()
@@ -342,8 +481,7 @@ class MultiLevelCache:
 
             # 从L1删除
             with self.l1_lock:
-                if key in self.l1_cache:
-                    del self.l1_cache[key]
+                self._l1_remove(key)
 
             # 从L2删除
             if self.l2_client:
@@ -353,6 +491,10 @@ class MultiLevelCache:
                     print(f"⚠️ Redis删除失败: {e}")
 
             # 从L3删除
+            try:
+                self.l3_store.delete(key)
+            except Exception as e:
+                print(f"⚠️ 删除磁盘缓存失败: {e}")
             cache_file = self.l3_dir / f"{key}.json"
             if cache_file.exists():
                 try:
@@ -360,39 +502,162 @@ class MultiLevelCache:
                 except Exception as e:
                     print(f"⚠️ 删除缓存文件失败: {e}")
 
+    def get_hit_rates(self) -> Dict[str, Any]:
+        """
+        获取命中计数和命中率（只读内存计数器，不访问L2/L3，可在每次命中时调用）
+
+        Returns:
+            计数器和 hit_rate / l1_hit_rate / l2_hit_rate / l3_hit_rate（百分比）
+        """
+        counters = dict(self.stats)
+        total = counters['total'] or 1  # 避免除零
+        return {
+            **counters,
+            'hit_rate': (counters['l1_hits'] + counters['l2_hits'] + counters['l3_hits']) / total * 100,
+            'l1_hit_rate': counters['l1_hits'] / total * 100,
+            'l2_hit_rate': counters['l2_hits'] / total * 100,
+            'l3_hit_rate': counters['l3_hits'] / total * 100,
+        }
+
     def get_stats(self) -> Dict[str, Any]:
         """
-        获取缓存统计信息
+        获取缓存统计信息（包括L1占用和L3存储状态，会访问磁盘，不要在请求热路径上调用）
 
         Returns:
             统计信息字典
         """
-        total = self.stats['total']
-        if total == 0:
-            total = 1  # 避免除零
-
-        stats = {
-            **self.stats,
-            'hit_rate': (self.stats['l1_hits'] + self.stats['l2_hits'] + self.stats['l3_hits']) / total * 100,
-            'l1_hit_rate': self.stats['l1_hits'] / total * 100,
-            'l2_hit_rate': self.stats['l2_hits'] / total * 100,
-            'l3_hit_rate': self.stats['l3_hits'] / total * 100,
-        }
+        stats = self.get_hit_rates()
+
+        with self._refresh_lock:
+            stats['refreshes_in_flight'] = len(self._refreshing)
+
+        with self.l1_lock:
+            stats.update({
+                'l1_entries': len(self.l1_cache),
+                'l1_bytes': self.l1_bytes,
+                'l1_max_size': self.l1_max_size,
+                'l1_max_bytes': self.l1_max_bytes,
+                'l1_usage_percent': self.l1_bytes / self.l1_max_bytes * 100 if self.l1_max_bytes else 0.0,
+            })
+
+        try:
+            l3_stats = self.l3_store.get_stats()
+            stats.update({
+                'l3_entries': l3_stats['entries'],
+                'l3_segments': l3_stats['segments'],
+                'l3_live_bytes': l3_stats['live_bytes'],
+                'l3_dead_bytes': l3_stats['dead_bytes'],
+                'l3_compactions': l3_stats['compactions'],
+            })
+        except Exception as e:
+            print(f"⚠️ 获取磁盘缓存统计失败: {e}")
 
         return stats
 
-    def cleanup_expired(self):
+    # ----------------------------------------
+    # L1 LRU 内部方法
+    # ----------------------------------------
+    def _l1_get(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """
+        读取L1缓存（命中时移到队尾，过期时移除）
+
+        Returns:
+            (缓存数据, 软过期时间戳或None)，未命中或已过期返回None
+        """
+        with self.l1_lock:
+            entry = self.l1_cache.get(key)
+            if entry is None:
+                return None
+
+            data, timestamp, _, soft_expires_at = entry
+            if time.time() - timestamp >= self.l1_ttl:
+                self._l1_remove(key)
+                self.stats['l1_expired'] += 1
+                return None
+
+            self.l1_cache.move_to_end(key)
+            return data, soft_expires_at
+
+    def _l1_put(self, key: str, data: Any, size: int, soft_expires_at: Optional[float] = None):
+        """
+        写入L1缓存，超出条目数或字节预算时从队首（最久未使用）开始淘汰，O(1)
+
+        Args:
+            key: 缓存键
+            data: 缓存数据
+            size: 数据大小估算（字节）
+            soft_expires_at: 软过期时间戳
+        """
+        with self.l1_lock:
+            self._l1_remove(key)
+
+            if size > self.l1_max_bytes:
+                # 单条超过整个预算，不进入L1（仍会写入L2/L3）
+                self.stats['l1_rejected'] += 1
+                return
+
+            self.l1_cache[key] = (data, time.time(), size, soft_expires_at)
+            self.l1_bytes += size
+
+            while self.l1_cache and (len(self.l1_cache) > self.l1_max_size or
+                                     self.l1_bytes > self.l1_max_bytes):
+                _, (_, _, evicted_size, _) = self.l1_cache.popitem(last=False)
+                self.l1_bytes -= evicted_size
+                self.stats['l1_evictions'] += 1
+
+    def _l1_remove(self, key: str):
+        """从L1移除（调用方需持有 l1_lock）"""
+        entry = self.l1_cache.pop(key, None)
+        if entry is not None:
+            self.l1_bytes -= entry[2]
+
+    def cleanup_expired(self) -> int:
         """
-        清理过期的L3缓存文件
+        清理过期的L3缓存（分段存储只扫描索引，不解析负载）
+
+        Returns:
+            清理的条目数
         """
+        removed = 0
+        try:
+            removed = self.l3_store.cleanup_expired()
+        except Exception as e:
+            print(f"⚠️ 清理过期缓存失败: {e}")
+
+        # 旧版JSON文件按修改时间判断
         current_time = time.time()
         for cache_file in self.l3_dir.glob("*.json"):
             try:
                 file_mtime = cache_file.stat().st_mtime
                 if current_time - file_mtime > self.l3_ttl:
                     cache_file.unlink()
+                    removed += 1
             except Exception as e:
                 print(f"⚠️ 清理过期缓存失败: {e}")
+        return removed
+
+    def _migrate_legacy_l3(self, key: str) -> Optional[bytes]:
+        """
+        将旧版L3 JSON文件迁移到分段存储（未过期时），并删除旧文件
+
+        Returns:
+            迁移后的负载字节，文件不存在或已过期返回None
+        """
+        cache_file = self.l3_dir / f"{key}.json"
+        if not cache_file.exists():
+            return None
+
+        age = time.time() - cache_file.stat().st_mtime
+        if age >= self.l3_ttl:
+            cache_file.unlink()
+            return None
+
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.l3_store.put(key, payload, ttl=self.l3_ttl - age)
+        cache_file.unlink()
+        return payload
 
 
 # 创建全局缓存实例
@@ -407,7 +672,20 @@ def get_cache() -> MultiLevelCache:
     """
     global _cache_instance
     if _cache_instance is None:
-        _cache_instance = MultiLevelCache()
+        cache_config = {}
+        try:
+            from core.config_loader import get_config
+            cache_config = get_config().get_search_config().get('cache', {}) or {}
+        except Exception as e:
+            print(f"⚠️ 读取缓存配置失败，使用默认值: {e}")
+
+        _cache_instance = MultiLevelCache(
+            l1_max_size=cache_config.get('l1_max_size', 20000),
+            l1_ttl=cache_config.get('l1_ttl', 300),
+            l1_max_bytes=cache_config.get('l1_max_bytes', 64 * 1024 * 1024),
+            l2_ttl=cache_config.get('l2_ttl', 3600),
+            l3_ttl=cache_config.get('l3_ttl', 86400)
+        )
     return _cache_instance
 
 
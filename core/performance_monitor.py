@@ -2,21 +2,168 @@
 """
 性能监控模块
 用于追踪和报告系统性能指标
+
+- 内存有界：每个操作用对数分桶的延迟草图（DDSketch 思路，相对误差 1%）统计 p50/p95/p99，
+  原始样本只保留最近 N 条（环形缓冲区），慢查询只保留最慢的 K 条
+- 锁分段：每个操作/国家/引擎各自一把锁，记录指标时不争用全局锁；统计时只复制草图，在锁外计算百分位数
+- 快照：save_metrics 保存各操作的汇总和草图（而不是全部原始记录），可由后台线程定期执行
 """
 
+import os
 import time
 import json
+import math
+import heapq
+import itertools
+import threading
 from typing import Dict, List, Optional, Any, Callable
 from functools import wraps
 from datetime import datetime, timedelta
 from pathlib import Path
-from collections import defaultdict
+from collections import deque
 from threading import Lock
 from utils.logger_utils import get_logger
 
 logger = get_logger('performance_monitor')
 
 
+class LatencySketch:
+    """
+    可合并的延迟草图（对数分桶直方图）
+
+    值 x 落入桶 ceil(log_γ(x))，γ = (1+α)/(1-α)，任意分位数的相对误差不超过 α；
+    桶数超过 max_buckets 时合并最小的桶（只影响极小值的精度）。非线程安全，由调用方加锁。
+    """
+
+    MIN_VALUE = 1e-6  # 小于该值（含0）计入零桶
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        """
+        Args:
+            relative_accuracy: 分位数的相对误差（α）
+            max_buckets: 最大桶数
+        """
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        """记录一个值"""
+        if value < self.MIN_VALUE:
+            self.zero_count += 1
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self._buckets[key] = self._buckets.get(key, 0) + 1
+            if len(self._buckets) > self.max_buckets:
+                self._collapse()
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def _collapse(self):
+        lowest, second = sorted(self._buckets)[:2]
+        self._buckets[second] += self._buckets.pop(lowest)
+
+    def merge(self, other: "LatencySketch"):
+        """合并另一个草图（相对误差必须相同）"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("只能合并相对误差相同的草图")
+        for key, count in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + count
+        while len(self._buckets) > self.max_buckets:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def copy(self) -> "LatencySketch":
+        clone = LatencySketch(self.relative_accuracy, self.max_buckets)
+        clone.merge(self)
+        return clone
+
+    def quantile(self, q: float) -> float:
+        """
+        估算分位数
+
+        Args:
+            q: 0-1 之间的分位点
+
+        Returns:
+            估算值（限制在 [min, max] 内），没有数据时返回 0
+        """
+        if self.count == 0:
+            return 0.0
+        rank = min(int(q * self.count), self.count - 1)  # 与原来 sorted[int(n*q)] 的取法一致
+        cumulative = self.zero_count
+        if rank < cumulative:
+            return max(0.0, self.min)
+        for key in sorted(self._buckets):
+            cumulative += self._buckets[key]
+            if cumulative > rank:
+                value = 2 * self._gamma ** key / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """序列化（用于快照）"""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else 0,
+            "max": self.max if self.count else 0,
+            "zero_count": self.zero_count,
+            "buckets": {str(key): count for key, count in sorted(self._buckets.items())}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], max_buckets: int = 2048) -> "LatencySketch":
+        """从快照恢复"""
+        sketch = cls(data["relative_accuracy"], max_buckets)
+        sketch._buckets = {int(key): count for key, count in data.get("buckets", {}).items()}
+        sketch.zero_count = data.get("zero_count", 0)
+        sketch.count = data.get("count", 0)
+        sketch.sum = data.get("sum", 0.0)
+        if sketch.count:
+            sketch.min, sketch.max = data["min"], data["max"]
+        return sketch
+
+
+class _Recorder:
+    """单个操作（或国家/引擎）的记录器：草图 + 成功数 + 最近样本，各自持有一把锁"""
+
+    __slots__ = ('lock', 'sketch', 'success_count', 'recent')
+
+    def __init__(self, relative_accuracy: float, recent_size: int):
+        self.lock = Lock()
+        self.sketch = LatencySketch(relative_accuracy)
+        self.success_count = 0
+        self.recent: deque = deque(maxlen=recent_size)
+
+    def record(self, duration: float, success: bool, sample: Optional[Dict[str, Any]] = None):
+        with self.lock:
+            self.sketch.add(duration)
+            if success:
+                self.success_count += 1
+            if sample is not None and self.recent.maxlen:
+                self.recent.append(sample)
+
+    def snapshot(self):
+        """复制草图和计数（锁内只做复制）"""
+        with self.lock:
+            return self.sketch.copy(), self.success_count
+
+
 class PerformanceMonitor:
     """
     性能监控类
@@ -28,29 +175,54 @@ class PerformanceMonitor:
     4. 持久化性能数据
     """
 
-    def __init__(self, data_dir: str = "data/performance"):
+    def __init__(self, data_dir: str = "data/performance", relative_accuracy: float = 0.01,
+                 recent_samples: int = 200, slow_queries_kept: int = 100):
         """
         初始化性能监控器
 
         Args:
             data_dir: 性能数据存储目录
+            relative_accuracy: 百分位数的相对误差
+            recent_samples: 每个操作保留的最近原始样本数
+            slow_queries_kept: 保留的最慢查询数
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.relative_accuracy = relative_accuracy
+        self.recent_samples = recent_samples
+        self.slow_queries_kept = slow_queries_kept
 
-        # 性能数据存储
-        self.metrics: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-        self.lock = Lock()
+        # 性能数据存储（按操作/国家/引擎分段加锁）
+        self.operations: Dict[str, _Recorder] = {}
+        self._by_country: Dict[str, _Recorder] = {}
+        self._by_engine: Dict[str, _Recorder] = {}
+        self.lock = Lock()  # 只在创建新的记录器时使用
+
+        # 最慢的 K 条查询（最小堆）
+        self._slow_queries: List[tuple] = []
+        self._slow_lock = Lock()
+        self._slow_seq = itertools.count()
 
         # 统计数据
         self.stats = {
-            "total_calls": 0,
-            "total_errors": 0,
             "start_time": datetime.now().isoformat()
         }
 
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._snapshot_stop = threading.Event()
+
         logger.info(f"✅ 性能监控器初始化完成: {self.data_dir}")
 
+    def _recorder(self, table: Dict[str, _Recorder], key: str, recent_size: int) -> _Recorder:
+        recorder = table.get(key)
+        if recorder is None:
+            with self.lock:
+                recorder = table.get(key)
+                if recorder is None:
+                    recorder = _Recorder(self.relative_accuracy, recent_size)
+                    table[key] = recorder
+        return recorder
+
     def record_metric(self,
                      operation: str,
                      duration: float,
@@ -65,22 +237,40 @@ class PerformanceMonitor:
             success: 是否成功
             metadata: 额外的元数据（如: country, engine, result_count）
         """
-        with self.lock:
-            metric = {
-                "operation": operation,
-                "duration": duration,
-                "success": success,
-                "timestamp": datetime.now().isoformat(),
-                "metadata": metadata or {}
-            }
-
-            self.metrics[operation].append(metric)
-            self.stats["total_calls"] += 1
-
-            if not success:
-                self.stats["total_errors"] += 1
+        metadata = metadata or {}
+        metric = {
+            "operation": operation,
+            "duration": duration,
+            "success": success,
+            "timestamp": datetime.now().isoformat(),
+            "metadata": metadata
+        }
 
-            logger.debug(f"记录指标: {operation} - {duration:.3f}s")
+        self._recorder(self.operations, operation, self.recent_samples).record(duration, success, metric)
+
+        country = metadata.get("country", "unknown")
+        if country != "unknown":
+            self._recorder(self._by_country, country, 0).record(duration, success)
+        engine = metadata.get("engine", "unknown")
+        if engine != "unknown":
+            self._recorder(self._by_engine, engine, 0).record(duration, success)
+
+        self._track_slow_query(metric)
+        logger.debug(f"记录指标: {operation} - {duration:.3f}s")
+
+    def _track_slow_query(self, metric: Dict[str, Any]):
+        """保留最慢的 K 条记录（K <= 0 时不记录）"""
+        if self.slow_queries_kept <= 0:
+            return
+        heap = self._slow_queries
+        if len(heap) >= self.slow_queries_kept and metric["duration"] <= heap[0][0]:
+            return
+        with self._slow_lock:
+            entry = (metric["duration"], next(self._slow_seq), metric)
+            if len(heap) < self.slow_queries_kept:
+                heapq.heappush(heap, entry)
+            elif metric["duration"] > heap[0][0]:
+                heapq.heapreplace(heap, entry)
 
     def get_stats(self, operation: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -92,28 +282,42 @@ class PerformanceMonitor:
         Returns:
             统计信息字典
         """
-        with self.lock:
-            if operation:
-                return self._get_operation_stats(operation)
+        if operation:
+            return self._get_operation_stats(operation)
 
-            # 返回所有操作的统计
-            all_stats = {}
-            for op in self.metrics.keys():
-                all_stats[op] = self._get_operation_stats(op)
+        # 返回所有操作的统计
+        all_stats = {}
+        for op in list(self.operations.keys()):
+            all_stats[op] = self._get_operation_stats(op)
 
-            return {
-                "operations": all_stats,
-                "total_calls": self.stats["total_calls"],
-                "total_errors": self.stats["total_errors"],
-                "error_rate": self.stats["total_errors"] / max(1, self.stats["total_calls"]),
-                "start_time": self.stats["start_time"]
-            }
+        total_calls = sum(stat["count"] for stat in all_stats.values())
+        total_errors = sum(stat["error_count"] for stat in all_stats.values())
+        return {
+            "operations": all_stats,
+            "total_calls": total_calls,
+            "total_errors": total_errors,
+            "error_rate": total_errors / max(1, total_calls),
+            "start_time": self.stats["start_time"]
+        }
+
+    def get_all_stats(self) -> Dict[str, Any]:
+        """获取所有操作的统计（监控接口使用）"""
+        return self.get_stats()
 
     def _get_operation_stats(self, operation: str) -> Dict[str, Any]:
         """
         获取单个操作的统计信息
         """
-        if operation not in self.metrics or not self.metrics[operation]:
+        recorder = self.operations.get(operation)
+        if recorder is None:
+            return self._summarize(LatencySketch(self.relative_accuracy), 0)
+        return self._summarize(*recorder.snapshot())
+
+    @staticmethod
+    def _summarize(sketch: LatencySketch, success_count: int) -> Dict[str, Any]:
+        """由草图计算汇总统计（在锁外执行）"""
+        count = sketch.count
+        if count == 0:
             return {
                 "count": 0,
                 "avg_duration": 0,
@@ -122,64 +326,64 @@ class PerformanceMonitor:
                 "p50_duration": 0,
                 "p95_duration": 0,
                 "p99_duration": 0,
-                "success_rate": 0
+                "success_rate": 0,
+                "error_count": 0
             }
-
-        records = self.metrics[operation]
-        durations = [r["duration"] for r in records]
-        durations.sort()
-
-        count = len(durations)
-        total = sum(durations)
-        avg = total / count
-
-        # 计算百分位数
-        def percentile(p: float) -> float:
-            idx = int(len(durations) * p / 100)
-            return durations[idx] if durations else 0
-
-        success_count = sum(1 for r in records if r["success"])
-
         return {
             "count": count,
-            "avg_duration": round(avg, 3),
-            "min_duration": round(min(durations), 3),
-            "max_duration": round(max(durations), 3),
-            "p50_duration": round(percentile(50), 3),
-            "p95_duration": round(percentile(95), 3),
-            "p99_duration": round(percentile(99), 3),
-            "success_rate": success_count / count if count > 0 else 0
+            "avg_duration": round(sketch.sum / count, 3),
+            "min_duration": round(sketch.min, 3),
+            "max_duration": round(sketch.max, 3),
+            "p50_duration": round(sketch.quantile(0.50), 3),
+            "p95_duration": round(sketch.quantile(0.95), 3),
+            "p99_duration": round(sketch.quantile(0.99), 3),
+            "success_rate": success_count / count,
+            "error_count": count - success_count
         }
 
-    def get_stats_by_country(self) -> Dict[str, Any]:
+    def get_recent(self, operation: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        获取某操作最近的原始记录（最新的在前）
+
+        Args:
+            operation: 操作名称
+            limit: 返回的最大数量
+        """
+        recorder = self.operations.get(operation)
+        if recorder is None:
+            return []
+        with recorder.lock:
+            samples = list(recorder.recent)
+        return samples[::-1][:limit]
+
+    def _grouped_stats(self, table: Dict[str, _Recorder], key: Optional[str], with_p95: bool) -> Dict[str, Any]:
+        result = {}
+        for name, recorder in list(table.items()):
+            if key and name != key:
+                continue
+            summary = self._summarize(*recorder.snapshot())
+            result[name] = {
+                "count": summary["count"],
+                "avg_duration": summary["avg_duration"],
+                "min_duration": summary["min_duration"],
+                "max_duration": summary["max_duration"]
+            }
+            if with_p95:
+                result[name]["p95_duration"] = summary["p95_duration"]
+        return result
+
+    def get_stats_by_country(self, country: Optional[str] = None) -> Dict[str, Any]:
         """
         获取按国家分组的统计信息
+
+        Args:
+            country: 只返回该国家（None 返回全部）
         """
-        with self.lock:
-            country_stats: Dict[str, List[float]] = defaultdict(list)
-
-            for op, records in self.metrics.items():
-                for record in records:
-                    country = record["metadata"].get("country", "unknown")
-                    if country != "unknown":
-                        country_stats[country].append(record["duration"])
-
-            result = {}
-            for country, durations in country_stats.items():
-                durations.sort()
-                result[country] = {
-                    "count": len(durations),
-                    "avg_duration": round(sum(durations) / len(durations), 3),
-                    "min_duration": round(min(durations), 3),
-                    "max_duration": round(max(durations), 3),
-                    "p95_duration": round(durations[int(len(durations) * 0.95)] if durations else 0, 3)
-                }
-
-            return result
+        return self._grouped_stats(self._by_country, country, with_p95=True)
 
     def get_slow_queries(self, threshold: float = 5.0, limit: int = 20) -> List[Dict[str, Any]]:
         """
-        获取慢查询列表
+        获取慢查询列表（从保留的最慢 K 条记录中筛选）
 
         Args:
             threshold: 慢查询阈值（秒）
@@ -188,66 +392,96 @@ class PerformanceMonitor:
         Returns:
             慢查询列表
         """
-        with self.lock:
-            slow_queries = []
-
-            for op, records in self.metrics.items():
-                for record in records:
-                    if record["duration"] >= threshold:
-                        slow_queries.append({
-                            "operation": op,
-                            "duration": record["duration"],
-                            "timestamp": record["timestamp"],
-                            "metadata": record["metadata"]
-                        })
-
-            # 按持续时间排序
-            slow_queries.sort(key=lambda x: x["duration"], reverse=True)
-            return slow_queries[:limit]
-
-    def get_stats_by_engine(self) -> Dict[str, Any]:
+        with self._slow_lock:
+            entries = sorted(self._slow_queries, key=lambda entry: entry[0], reverse=True)
+
+        slow_queries = []
+        for duration, _, metric in entries:
+            if duration < threshold or len(slow_queries) >= limit:
+                break
+            slow_queries.append({
+                "operation": metric["operation"],
+                "duration": duration,
+                "timestamp": metric["timestamp"],
+                "metadata": metric["metadata"]
+            })
+        return slow_queries
+
+    def get_stats_by_engine(self, engine: Optional[str] = None) -> Dict[str, Any]:
         """
         获取按搜索引擎分组的统计信息
+
+        Args:
+            engine: 只返回该引擎（None 返回全部）
         """
-        with self.lock:
-            engine_stats: Dict[str, List[float]] = defaultdict(list)
-
-            for op, records in self.metrics.items():
-                for record in records:
-                    engine = record["metadata"].get("engine", "unknown")
-                    if engine != "unknown":
-                        engine_stats[engine].append(record["duration"])
-
-            result = {}
-            for engine, durations in engine_stats.items():
-                durations.sort()
-                result[engine] = {
-                    "count": len(durations),
-                    "avg_duration": round(sum(durations) / len(durations), 3),
-                    "min_duration": round(min(durations), 3),
-                    "max_duration": round(max(durations), 3)
-                }
-
-            return result
-
-    def save_metrics(self):
-        """保存性能指标到文件"""
-        with self.lock:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            file_path = self.data_dir / f"metrics_{timestamp}.json"
+        return self._grouped_stats(self._by_engine, engine, with_p95=False)
+
+    def save_metrics(self) -> Optional[Path]:
+        """
+        保存性能快照到文件（各操作的汇总和草图，不含全部原始记录）
 
-            data = {
-                "timestamp": timestamp,
-                "stats": self.stats,
-                "metrics": dict(self.metrics)
+        文件名包含进程ID，多个 gunicorn worker 在同一秒保存时不会互相覆盖
+
+        Returns:
+            快照文件路径，失败返回 None
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        file_path = self.data_dir / f"metrics_{timestamp}_{os.getpid()}.json"
+
+        operations = {}
+        for op, recorder in list(self.operations.items()):
+            sketch, success_count = recorder.snapshot()
+            operations[op] = {
+                "summary": self._summarize(sketch, success_count),
+                "sketch": sketch.to_dict()
             }
 
-            try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                logger.info(f"性能指标已保存: {file_path}")
-            except Exception as e:
-                logger.error(f"保存性能指标失败: {str(e)}")
+        data = {
+            "timestamp": timestamp,
+            "stats": self.get_stats(),
+            "operations": operations,
+            "by_country": self.get_stats_by_country(),
+            "by_engine": self.get_stats_by_engine(),
+            "slow_queries": self.get_slow_queries(threshold=0, limit=self.slow_queries_kept)
+        }
+        data["stats"].pop("operations")
+
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            logger.info(f"性能快照已保存: {file_path}")
+            return file_path
+        except Exception as e:
+            logger.error(f"保存性能指标失败: {str(e)}")
+            return None
+
+    def start_snapshots(self, interval_seconds: float = 300, retention_days: int = 7):
+        """
+        启动后台线程定期保存快照并清理过期快照
+
+        Args:
+            interval_seconds: 快照间隔（秒）
+            retention_days: 快照保留天数
+        """
+        if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+            return
+        self._snapshot_stop.clear()
+
+        def run():
+            while not self._snapshot_stop.wait(interval_seconds):
+                try:
+                    self.save_metrics()
+                    self.cleanup_old_metrics(days=retention_days)
+                except Exception as e:
+                    logger.error(f"定期保存性能快照失败: {str(e)}")
+
+        self._snapshot_thread = threading.Thread(target=run, name='perf-snapshots', daemon=True)
+        self._snapshot_thread.start()
+        logger.info(f"✅ 性能快照已启用: 每{interval_seconds}秒, 保留{retention_days}天")
+
+    def stop_snapshots(self):
+        """停止定期快照"""
+        self._snapshot_stop.set()
 
     def cleanup_old_metrics(self, days: int = 7):
         """
@@ -347,18 +581,41 @@ class PerformanceMonitor:
 
 # 全局单例
 _global_monitor: Optional[PerformanceMonitor] = None
+_global_monitor_lock = Lock()
 
 
 def get_performance_monitor() -> PerformanceMonitor:
     """
     获取全局性能监控器实例
 
+    配置来源：config/monitoring_config.yaml 中的 performance（snapshot_interval_seconds > 0 时启用定期快照）
+
     Returns:
         PerformanceMonitor实例
     """
     global _global_monitor
     if _global_monitor is None:
-        _global_monitor = PerformanceMonitor()
+        with _global_monitor_lock:
+            if _global_monitor is None:
+                monitoring_config = {}
+                try:
+                    from core.config_loader import get_config
+                    monitoring_config = get_config().load('monitoring_config.yaml') or {}
+                except Exception as e:
+                    logger.warning(f"读取性能监控配置失败，使用默认值: {str(e)}")
+                perf_config = monitoring_config.get('performance', {}) or {}
+                monitor = PerformanceMonitor(
+                    relative_accuracy=perf_config.get('relative_accuracy', 0.01),
+                    recent_samples=perf_config.get('recent_samples', 200),
+                    slow_queries_kept=perf_config.get('slow_queries_kept', 100)
+                )
+                interval = perf_config.get('snapshot_interval_seconds', 0)
+                if interval:
+                    monitor.start_snapshots(
+                        interval_seconds=interval,
+                        retention_days=(monitoring_config.get('retention', {}) or {}).get('metrics_days', 7)
+                    )
+                _global_monitor = monitor
     return _global_monitor
 
 
@@ -4,10 +4,10 @@ YouTube播放列表信息提取器
 
 从 search_engine_v2.py 中提取，消除重复代码。
 提供高效的播放列表信息获取功能，支持并发处理。
+实际获取和缓存由 core.playlist_metadata 的共享服务完成。
 """
 
 from typing import Dict, Any, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from utils.logger_utils import get_logger
 
 logger = get_logger('playlist_extractor')
@@ -23,60 +23,17 @@ class PlaylistExtractor:
 
         Args:
             url: YouTube播放列表URL
-            timeout: 超时时间（秒）
+            timeout: 超时时间（秒），超时返回 None（获取在后台继续，完成后写入缓存）
 
         Returns:
-            包含 video_count 和 total_duration_minutes 的字典，失败返回 None
+            包含 video_count 和 total_duration_minutes 的字典，失败或超时返回 None
         """
         if not url or 'list=' not in url:
             return None
 
-        try:
-            import yt_dlp
-
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': True,  # 快速提取
-                'http_headers': {
-                    'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X)',
-                },
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': ['ios'],
-                    }
-                },
-            }
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-
-            if not info:
-                return None
-
-            entries = info.get('entries', [])
-            if not entries:
-                return None
-
-            video_count = len(entries)
-
-            # 计算总时长（分钟）
-            total_duration_seconds = 0
-            for entry in entries:
-                duration = entry.get('duration', 0)
-                if duration:
-                    total_duration_seconds += duration
-
-            total_duration_minutes = total_duration_seconds / 60 if total_duration_seconds > 0 else 0
-
-            return {
-                'video_count': video_count,
-                'total_duration_minutes': total_duration_minutes
-            }
-
-        except Exception as e:
-            logger.warning(f"获取播放列表信息失败: {str(e)[:100]}")
-            return None
+        from core.playlist_metadata import get_playlist_metadata_service
+        service = get_playlist_metadata_service()
+        return service.summarize(service.get_many([url], timeout=timeout).get(url))
 
     @staticmethod
     def batch_extract_playlist_info(
@@ -90,7 +47,7 @@ class PlaylistExtractor:
         Args:
             urls: URL列表
             max_workers: 最大并发数
-            timeout: 单个URL超时时间
+            timeout: 单个URL超时时间（秒），超时的URL返回 None
 
         Returns:
             URL到播放列表信息的映射字典
@@ -98,38 +55,15 @@ class PlaylistExtractor:
         if not urls:
             return {}
 
-        results = {}
-        success_count = 0
-        fail_count = 0
-
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 提交所有任务
-            future_to_url = {
-                executor.submit(PlaylistExtractor.extract_playlist_info, url, timeout): url
-                for url in urls
-            }
-
-            # 收集结果
-            for future in as_completed(future_to_url):
-                url = future_to_url[future]
-                try:
-                    playlist_info = future.result(timeout=timeout)
-                    results[url] = playlist_info
-                    if playlist_info:
-                        success_count += 1
-                    else:
-                        fail_count += 1
-                except FuturesTimeoutError:
-                    logger.warning(f"播放列表信息获取超时: {url[:60]}")
-                    results[url] = None
-                    fail_count += 1
-                except Exception as e:
-                    logger.warning(f"播放列表信息获取异常: {str(e)[:100]}")
-                    results[url] = None
-                    fail_count += 1
+        from core.playlist_metadata import get_playlist_metadata_service
+        service = get_playlist_metadata_service()
+        infos = service.get_many([url for url in urls if url and 'list=' in url],
+                                 max_workers=max_workers, timeout=timeout)
+        results = {url: service.summarize(infos.get(url)) for url in urls}
 
+        success_count = sum(1 for info in results.values() if info)
         logger.info(
-            f"批量提取完成: 成功={success_count}, 失败={fail_count}, "
+            f"批量提取完成: 成功={success_count}, 失败={len(urls) - success_count}, "
             f"总计={len(urls)}, 成功率={success_count/len(urls)*100:.1f}%"
         )
 
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+播放列表元数据服务
+搜索、导出、视频评估共用的播放列表信息（视频数、总时长、视频列表），替代各处独立的 yt-dlp 调用
+
+- 持久缓存：SQLite（WAL模式），按播放列表ID缓存，带TTL；获取失败的结果短时间缓存，避免反复重试
+- 单飞：同一播放列表的并发请求只调用一次 yt-dlp
+- 批量查询：缓存命中直接返回，未命中的在共享 io 执行器中并发获取（每批最多 max_workers 个同时进行）
+- 一次平铺提取（extract_flat）即可得到视频数、时长和视频列表，所有调用方共享
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    import yt_dlp
+except ImportError:
+    yt_dlp = None
+
+from core.executor_registry import get_executor, ExecutorSaturatedError
+from core.single_flight import get_single_flight
+from utils.logger_utils import get_logger
+
+logger = get_logger('playlist_metadata')
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS playlist_metadata (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    title TEXT,
+    video_count INTEGER,
+    total_duration_seconds REAL,
+    entries_json TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_playlist_metadata_fetched_at ON playlist_metadata (fetched_at);
+"""
+
+_YDL_OPTS = {
+    'quiet': True,
+    'no_warnings': True,
+    'extract_flat': True,  # 平铺提取：不解析每个视频，只读取播放列表条目
+    'skip_download': True,
+    'ignoreerrors': True,
+    'http_headers': {
+        'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1',
+    },
+    'extractor_args': {
+        'youtube': {
+            'player_client': ['ios'],
+        }
+    },
+}
+
+
+def playlist_key(url: str) -> str:
+    """
+    播放列表缓存键：YouTube 使用播放列表ID（同一列表的不同URL形式共享缓存），其他站点使用规范化URL
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if 'youtube.com' in host or 'youtu.be' in host:
+        list_id = parse_qs(parts.query).get('list', [None])[0]
+        if list_id:
+            return f"youtube:{list_id}"
+    return f"{host}{parts.path.rstrip('/')}?{parts.query}" if parts.query else f"{host}{parts.path.rstrip('/')}"
+
+
+class PlaylistMetadataService:
+    """
+    播放列表元数据服务（线程安全，多进程共享缓存）
+
+    使用示例：
+        service = get_playlist_metadata_service()
+        info = service.get(url)                  # {'video_count', 'total_duration_minutes', 'entries', ...}
+        infos = service.get_many(urls)           # {url: info 或 None}
+    """
+
+    def __init__(self, db_path: str = None, ttl_seconds: int = 86400, negative_ttl_seconds: int = 600,
+                 max_workers: int = 8, socket_timeout: int = 10):
+        """
+        初始化服务
+
+        Args:
+            db_path: SQLite数据库路径，默认 data/playlist_metadata.db
+            ttl_seconds: 元数据有效期
+            negative_ttl_seconds: 获取失败结果的缓存时间（<=0 表示不缓存失败）
+            max_workers: 批量查询的最大并发 yt-dlp 调用数
+            socket_timeout: yt-dlp 网络超时（秒）
+        """
+        self.db_path = Path(db_path) if db_path else PROJECT_ROOT / 'data' / 'playlist_metadata.db'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_workers = max(1, max_workers)
+        self.socket_timeout = socket_timeout
+
+        self._local = threading.local()
+        self._flight = get_single_flight('playlist_metadata')
+        self._stats_lock = threading.Lock()
+
+        # 统计信息
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "fetches": 0,
+            "fetch_errors": 0,
+            "timeouts": 0,
+            "saturated": 0
+        }
+
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.commit()
+
+        logger.info(f"✅ 播放列表元数据服务初始化完成: {self.db_path} (TTL {ttl_seconds}秒, 并发 {self.max_workers})")
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接（每个线程一个连接）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+    def get(self, url: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        获取播放列表元数据
+
+        Args:
+            url: 播放列表URL
+            use_cache: 是否读取缓存（False 时强制重新获取并刷新缓存）
+
+        Returns:
+            {
+                "url": str,
+                "title": str,
+                "video_count": int,
+                "total_duration_seconds": float,
+                "total_duration_minutes": float,
+                "entries": [{"id", "url", "title", "duration"}],
+                "fetched_at": float,
+                "cache_hit": bool
+            }
+            获取失败或播放列表为空时返回 None
+        """
+        if not url:
+            return None
+        key = playlist_key(url)
+
+        if use_cache:
+            found, info = self._lookup(key)
+            if found:
+                self._count("hits")
+                return info
+        self._count("misses")
+
+        info, _ = self._flight.do(key, self._fetch_and_store, key, url, use_cache)
+        return info
+
+    def get_many(self, urls: Iterable[str], max_workers: Optional[int] = None,
+                 timeout: Optional[float] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        批量获取播放列表元数据（缓存命中直接返回，未命中的并发获取）
+
+        Args:
+            urls: 播放列表URL列表（重复URL只获取一次）
+            max_workers: 最大并发数（默认使用服务配置）
+            timeout: 单个URL的等待时间（秒，从提交时开始计算），None 表示一直等待；
+                超时的URL返回 None，已开始的获取在后台继续并写入缓存
+
+        Returns:
+            {url: 元数据 或 None}；io 执行器饱和时未能提交的URL返回 None
+        """
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        misses: List[str] = []
+        for url in dict.fromkeys(u for u in urls if u):
+            found, info = self._lookup(playlist_key(url))
+            if found:
+                self._count("hits")
+                results[url] = info
+            else:
+                misses.append(url)
+
+        if misses:
+            # 滑动窗口：同一批次最多 workers 个任务同时占用 io 执行器
+            executor = get_executor('io')
+            workers = min(max_workers or self.max_workers, len(misses))
+            pending: Dict[Future, tuple] = {}
+            remaining = iter(misses)
+            saturated = False
+
+            def submit_next():
+                """提交下一个URL；执行器饱和后剩余URL直接返回 None"""
+                nonlocal saturated
+                for url in remaining:
+                    if saturated:
+                        results[url] = None
+                        continue
+                    deadline = time.monotonic() + timeout if timeout is not None else None
+                    try:
+                        pending[executor.submit(self.get, url, deadline=deadline)] = (url, deadline)
+                        return
+                    except ExecutorSaturatedError as e:
+                        logger.warning(f"⚠️  io执行器已饱和，未获取的播放列表元数据返回空: {str(e)}")
+                        self._count("saturated")
+                        saturated = True
+                        results[url] = None
+
+            for _ in range(workers):
+                submit_next()
+            while pending:
+                wait_timeout = None
+                if timeout is not None:
+                    wait_timeout = max(0.0, min(deadline for _, deadline in pending.values()) - time.monotonic())
+                done, _ = wait(pending, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+                now = time.monotonic()
+                expired = [future for future, (_, deadline) in pending.items()
+                           if future not in done and deadline is not None and deadline <= now]
+                for future in list(done) + expired:
+                    url, _ = pending.pop(future)
+                    if future in done:
+                        try:
+                            results[url] = future.result()
+                        except Exception as e:
+                            logger.warning(f"获取播放列表元数据失败: {url}, {str(e)}")
+                            results[url] = None
+                    else:
+                        future.cancel()
+                        logger.warning(f"获取播放列表元数据超时（{timeout:g}秒）: {url}")
+                        self._count("timeouts")
+                        results[url] = None
+                    submit_next()
+
+        logger.info(f"📋 批量播放列表元数据: {len(results)} 个（缓存命中 {len(results) - len(misses)}，获取 {len(misses)}）")
+        return results
+
+    def get_summary(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        获取视频数和总时长（搜索结果、导出使用的精简格式）
+
+        Returns:
+            {"video_count": int, "total_duration_minutes": float}，失败返回 None
+        """
+        return self.summarize(self.get(url))
+
+    @staticmethod
+    def summarize(info: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """把完整元数据转换为 {video_count, total_duration_minutes}"""
+        if not info:
+            return None
+        return {
+            'video_count': info['video_count'],
+            'total_duration_minutes': info['total_duration_minutes']
+        }
+
+    # ------------------------------------------------------------------
+    # 缓存
+    # ------------------------------------------------------------------
+    def _lookup(self, key: str) -> tuple:
+        """
+        读取缓存
+
+        Returns:
+            (是否命中, 元数据或None)；命中失败缓存时返回 (True, None)
+        """
+        try:
+            row = self._connect().execute("SELECT * FROM playlist_metadata WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  读取播放列表缓存失败: {str(e)}")
+            return False, None
+        if row is None:
+            return False, None
+
+        age = time.time() - row['fetched_at']
+        if row['error'] is not None or row['video_count'] is None:
+            return (True, None) if age < self.negative_ttl_seconds else (False, None)
+        if age >= self.ttl_seconds:
+            return False, None
+        return True, self._row_to_info(row, cache_hit=True)
+
+    @staticmethod
+    def _row_to_info(row: sqlite3.Row, cache_hit: bool) -> Dict[str, Any]:
+        total_seconds = row['total_duration_seconds'] or 0
+        return {
+            "url": row['url'],
+            "title": row['title'] or '',
+            "video_count": row['video_count'],
+            "total_duration_seconds": total_seconds,
+            "total_duration_minutes": total_seconds / 60 if total_seconds > 0 else 0,
+            "entries": json.loads(row['entries_json'] or '[]'),
+            "fetched_at": row['fetched_at'],
+            "cache_hit": cache_hit
+        }
+
+    def _store(self, key: str, url: str, info: Optional[Dict[str, Any]], error: Optional[str] = None):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO playlist_metadata "
+                "(key, url, fetched_at, title, video_count, total_duration_seconds, entries_json, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key, url, time.time(),
+                    info['title'] if info else None,
+                    info['video_count'] if info else None,
+                    info['total_duration_seconds'] if info else None,
+                    json.dumps(info['entries'], ensure_ascii=False) if info else None,
+                    error
+                )
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  写入播放列表缓存失败: {str(e)}")
+
+    def invalidate(self, url: str):
+        """删除播放列表的缓存"""
+        conn = self._connect()
+        conn.execute("DELETE FROM playlist_metadata WHERE key = ?", (playlist_key(url),))
+        conn.commit()
+
+    def prune(self) -> int:
+        """删除过期条目，返回删除数量"""
+        conn = self._connect()
+        cursor = conn.execute(
+            "DELETE FROM playlist_metadata WHERE fetched_at < ?",
+            (time.time() - max(self.ttl_seconds, self.negative_ttl_seconds),)
+        )
+        conn.commit()
+        return cursor.rowcount
+
+    # ------------------------------------------------------------------
+    # 获取
+    # ------------------------------------------------------------------
+    def _fetch_and_store(self, key: str, url: str, use_cache: bool) -> Optional[Dict[str, Any]]:
+        """单飞执行体：再次检查缓存（可能刚被其他进程写入），然后调用 yt-dlp"""
+        if use_cache:
+            found, info = self._lookup(key)
+            if found:
+                return info
+
+        self._count("fetches")
+        try:
+            info = self._fetch(url)
+        except Exception as e:
+            self._count("fetch_errors")
+            logger.warning(f"获取播放列表信息失败: {url[:60]}, {str(e)[:100]}")
+            if self.negative_ttl_seconds > 0:
+                self._store(key, url, None, error=str(e)[:500])
+            return None
+
+        if info is None:
+            if self.negative_ttl_seconds > 0:
+                self._store(key, url, None, error='播放列表为空或无法访问')
+            return None
+
+        self._store(key, url, info)
+        logger.info(f"[播放列表] {url[:50]}..., 视频数: {info['video_count']}, "
+                    f"总时长: {info['total_duration_minutes']:.1f}分钟")
+        return info
+
+    def _fetch(self, url: str) -> Optional[Dict[str, Any]]:
+        """调用 yt-dlp 平铺提取播放列表"""
+        if yt_dlp is None:
+            raise RuntimeError("yt-dlp 未安装")
+
+        with yt_dlp.YoutubeDL({**_YDL_OPTS, 'socket_timeout': self.socket_timeout}) as ydl:
+            raw = ydl.extract_info(url, download=False)
+        if not raw:
+            return None
+
+        is_youtube = 'youtube.com' in url or 'youtu.be' in url
+        entries = []
+        total_seconds = 0.0
+        for entry in raw.get('entries') or []:
+            if not entry:
+                continue
+            video_id = entry.get('id', '')
+            duration = entry.get('duration') or 0
+            total_seconds += duration
+            entries.append({
+                "id": video_id,
+                "url": f"https://www.youtube.com/watch?v={video_id}" if is_youtube and video_id else entry.get('url', ''),
+                "title": entry.get('title', '未知标题'),
+                "duration": duration,
+            })
+        if not entries:
+            return None
+
+        return {
+            "url": url,
+            "title": raw.get('title', ''),
+            "video_count": len(entries),
+            "total_duration_seconds": total_seconds,
+            "total_duration_minutes": total_seconds / 60 if total_seconds > 0 else 0,
+            "entries": entries,
+            "fetched_at": time.time(),
+            "cache_hit": False
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+# 全局实例
+_playlist_metadata_service: Optional[PlaylistMetadataService] = None
+_playlist_metadata_lock = threading.Lock()
+
+
+def get_playlist_metadata_service() -> PlaylistMetadataService:
+    """
+    获取全局播放列表元数据服务实例
+
+    配置来源：config/search.yaml 中的 search.playlist_metadata
+
+    Returns:
+        PlaylistMetadataService实例
+    """
+    global _playlist_metadata_service
+    if _playlist_metadata_service is None:
+        with _playlist_metadata_lock:
+            if _playlist_metadata_service is None:
+                metadata_config = {}
+                try:
+                    from core.config_loader import get_config
+                    metadata_config = get_config().get_search_config().get('playlist_metadata', {}) or {}
+                except Exception as e:
+                    logger.warning(f"读取播放列表元数据配置失败，使用默认值: {str(e)}")
+                db_path = metadata_config.get('db_path')
+                _playlist_metadata_service = PlaylistMetadataService(
+                    db_path=str(PROJECT_ROOT / db_path) if db_path else None,
+                    ttl_seconds=int(metadata_config.get('ttl_hours', 24) * 3600),
+                    negative_ttl_seconds=metadata_config.get('negative_ttl_seconds', 600),
+                    max_workers=metadata_config.get('max_workers', 8),
+                    socket_timeout=metadata_config.get('socket_timeout', 10)
+                )
+    return _playlist_metadata_service
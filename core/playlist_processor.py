@@ -79,71 +79,22 @@ class PlaylistProcessor:
                         result["error"] = f"无效的播放列表ID格式: {playlist_id}"
                         return result
 
-            # 配置 yt-dlp
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': False,  # 需要完整信息以获取视频URL
-                'playlistend': max_videos if max_videos else None,
-                'ignoreerrors': True,  # 遇到错误时继续处理
-                # 添加HTTP头以绕过403错误
-                'http_headers': {
-                    'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-us,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate',
-                    'Connection': 'keep-alive',
-                },
-                # YouTube特定配置 - 尝试多个客户端
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': ['ios', 'android', 'web'],  # 优先使用iOS，然后是Android，最后是Web
-                    }
-                },
-                # 添加重试和延迟
-                'retries': 3,
-                'fragment_retries': 3,
-                'sleep_interval': 1,
-                'max_sleep_interval': 3,
-            }
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # 提取播放列表信息
-                info = ydl.extract_info(playlist_url, download=False)
+            # 共享播放列表元数据服务（持久缓存 + 单飞，同一播放列表只调用一次 yt-dlp）
+            from core.playlist_metadata import get_playlist_metadata_service
+            info = get_playlist_metadata_service().get(playlist_url)
 
             if not info:
-                result["error"] = "无法提取播放列表信息"
+                result["error"] = "播放列表为空或无法访问"
                 return result
 
             # 获取播放列表标题
-            playlist_title = info.get('title', '未知播放列表')
+            playlist_title = info.get('title') or '未知播放列表'
             result["playlist_title"] = playlist_title
 
             # 提取视频列表
-            entries = info.get('entries', [])
-            if not entries:
-                result["error"] = "播放列表为空或无法访问"
-                return result
-
-            videos = []
-            for entry in entries:
-                if not entry:
-                    continue
-
-                video_info = {
-                    "url": entry.get('url', ''),
-                    "title": entry.get('title', '未知标题'),
-                    "duration": entry.get('duration', 0),
-                    "id": entry.get('id', ''),
-                }
-
-                # 如果是YouTube，构建完整URL
-                if 'youtube.com' in playlist_url or 'youtu.be' in playlist_url:
-                    video_id = entry.get('id', '')
-                    if video_id:
-                        video_info["url"] = f"https://www.youtube.com/watch?v={video_id}"
-
-                videos.append(video_info)
+            videos = [dict(entry) for entry in info['entries']]
+            if max_videos:
+                videos = videos[:max_videos]
 
             result["success"] = True
             result["video_count"] = len(videos)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+速率限制器模块
+令牌桶算法，用于控制对外部服务（LLM提供商等）的调用频率
+"""
+
+import time
+import threading
+from typing import Any, Dict, Optional
+from utils.logger_utils import get_logger
+
+logger = get_logger('rate_limiter')
+
+
+class TokenBucketRateLimiter:
+    """
+    令牌桶速率限制器（线程安全）
+
+    使用示例：
+        limiter = get_rate_limiter('llm_scoring', rate_per_minute=60, burst=4)
+        if limiter.acquire(timeout=30):
+            client.call_llm(...)
+    """
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int = 1):
+        """
+        初始化速率限制器
+
+        Args:
+            name: 名称（用于日志和统计）
+            rate_per_minute: 每分钟允许的调用数（<=0 表示不限制）
+            burst: 令牌桶容量（允许的瞬时突发调用数）
+        """
+        self.name = name
+        self.rate_per_second = rate_per_minute / 60.0 if rate_per_minute > 0 else 0.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.stats = {
+            "acquired": 0,
+            "throttled": 0,   # 需要等待令牌的次数
+            "timeouts": 0,
+            "total_wait_seconds": 0.0
+        }
+
+    def _refill(self):
+        """按经过的时间补充令牌（调用方需持有锁）"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate_per_second)
+        self._last_refill = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        获取一个令牌，令牌不足时等待
+
+        Args:
+            timeout: 最长等待时间（秒），None表示一直等待
+
+        Returns:
+            是否成功获取令牌
+        """
+        if self.rate_per_second <= 0:
+            return True
+
+        start = time.monotonic()
+        throttled = False
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self.stats["acquired"] += 1
+                    if throttled:
+                        self.stats["total_wait_seconds"] += time.monotonic() - start
+                    return True
+                wait = (1 - self._tokens) / self.rate_per_second
+                if not throttled:
+                    throttled = True
+                    self.stats["throttled"] += 1
+
+            if timeout is not None:
+                remaining = timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    with self._lock:
+                        self.stats["timeouts"] += 1
+                    logger.warning(f"⏱️ [{self.name}] 等待速率限制令牌超时 ({timeout}秒)")
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._lock:
+            self._refill()
+            return {
+                **self.stats,
+                "rate_per_minute": self.rate_per_second * 60,
+                "burst": self.capacity,
+                "available_tokens": round(self._tokens, 2)
+            }
+
+
+# 全局实例（按名称）
+_limiters: Dict[str, TokenBucketRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, rate_per_minute: float = 0, burst: int = 1) -> TokenBucketRateLimiter:
+    """
+    获取指定名称的全局速率限制器（单例模式，首次调用时的参数生效）
+
+    Args:
+        name: 名称，如 'llm_scoring'
+        rate_per_minute: 每分钟允许的调用数
+        burst: 令牌桶容量
+
+    Returns:
+        TokenBucketRateLimiter实例
+    """
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = TokenBucketRateLimiter(name, rate_per_minute, burst)
+        return _limiters[name]
@@ -102,6 +102,7 @@ class LLMRecommendationGenerator:
             # 调用LLM（超时控制在客户端内部处理）
             import concurrent.futures
             import time
+            from core.executor_registry import get_executor, ExecutorSaturatedError
 
             # 📊 记录LLM调用开始
             llm_start = time.time()
@@ -136,16 +137,20 @@ class LLMRecommendationGenerator:
 
                 return response
 
-            # 使用线程池执行，设置15秒超时（快速模型2-3秒，留足余量）
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(call_llm)
-                try:
-                    response = future.result(timeout=15)
-                    logger.info(f"[推荐理由生成] LLM调用成功")
-                except concurrent.futures.TimeoutError:
-                    logger.warning(f"[推荐理由生成] LLM调用超时（15秒），回退到规则生成")
-                    future.cancel()
-                    return self._fallback_to_rules(results, query, metadata)
+            # 在共享的 llm 执行器中执行，设置15秒超时（快速模型2-3秒，留足余量）
+            # 任务继承当前上下文，LLM调用记录到当前搜索的日志；超时后立即回退，不等待线程结束
+            try:
+                future = get_executor('llm').submit(call_llm, deadline=time.monotonic() + 15)
+            except ExecutorSaturatedError:
+                logger.warning(f"[推荐理由生成] LLM执行器已饱和，回退到规则生成")
+                return self._fallback_to_rules(results, query, metadata)
+            try:
+                response = future.result(timeout=15)
+                logger.info(f"[推荐理由生成] LLM调用成功")
+            except concurrent.futures.TimeoutError:
+                logger.warning(f"[推荐理由生成] LLM调用超时（15秒），回退到规则生成")
+                future.cancel()
+                return self._fallback_to_rules(results, query, metadata)
 
             # 解析响应
             recommendations = self._parse_batch_response(response, len(results))
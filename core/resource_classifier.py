@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+资源类型分类器
+按优先级排列的规则（播放列表、视频、练习题、教材、教辅...）把搜索结果分类，并返回命中的规则和关键词作为依据
+
+- 每条规则的关键词在加载时编译为一个正则（按长度降序的多选分支），每个结果每条规则只扫描一次文本，
+  不再对每个关键词分别做子串查找
+- 规则来自 config/evaluation_weights.yaml 中的 evaluation.resource_classifier.rules，未配置时使用内置规则
+- 匹配语义与原来的子串匹配一致（不区分大小写，不要求词边界）
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.logger_utils import get_logger
+
+logger = get_logger('resource_classifier')
+
+PLAYLIST_TYPE = "播放列表"
+DEFAULT_TYPE = "其他"
+
+# 内置规则（按优先级排列，第一条命中的规则决定类型）
+# target: 'url' 只匹配URL；'title' 只匹配标题；'text' 匹配 标题+URL+摘要
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    # 博主主页（频道/用户页），不是单个视频合集
+    {'name': 'creator_page', 'type': DEFAULT_TYPE, 'target': 'url',
+     'keywords': ['/channel/', '/c/', '/user/']},
+    # URL中的播放列表特征（单个具体的播放列表）
+    {'name': 'playlist_url', 'type': PLAYLIST_TYPE, 'target': 'url',
+     'keywords': ['playlist?', 'list=', '/videos']},
+    # 博主的全部播放列表页面（/playlists）
+    {'name': 'creator_playlists', 'type': DEFAULT_TYPE, 'target': 'url',
+     'keywords': ['/playlists']},
+    {'name': 'playlist', 'type': PLAYLIST_TYPE, 'target': 'text',
+     'keywords': ['playlist', 'play list', 'complete course', 'full course', 'all lessons', 'series', 'collection',
+                  'قائمة التشغيل', 'سلسلة', '播放列表', '系列', '全套', '完整课程']},
+    {'name': 'video', 'type': '视频', 'target': 'text',
+     'keywords': ['video', 'youtube.com', 'youtu.be', 'watch', '播放', '视频', 'video pembelajaran',
+                  'video lesson', 'tutorial', '课程视频', 'lecture', 'lesson',
+                  'vimeo.com', 'bilibili.com/video', 'dailymotion.com']},
+    {'name': 'exercise', 'type': '练习题', 'target': 'text',
+     'keywords': ['exercise', 'practice', 'quiz', 'test', 'exam', 'worksheet', '练习题', '练习',
+                  'latihan', 'soal', 'ujian', 'kuis', 'lembar kerja', 'lkpd', 'assess', 'assessment']},
+    {'name': 'textbook', 'type': '教材', 'target': 'text',
+     'keywords': ['textbook', 'book', '教材', '教科书', 'buku', 'buku pelajaran', 'modul', 'module',
+                  'coursebook', 'student book', 'buku siswa', 'buku guru', 'kurikulum']},
+    {'name': 'supplement', 'type': '教辅', 'target': 'text',
+     'keywords': ['guide', 'handbook', 'manual', '教辅', '参考书', 'panduan', '参考', 'supplement',
+                  '辅助材料', 'supplementary material', 'bahan ajar', 'teaching material']},
+    # PDF文件（标题中没有教材/教辅关键词时）通常是教材
+    {'name': 'pdf', 'type': '教材', 'target': 'url',
+     'keywords': ['.pdf']},
+    {'name': 'learning_material', 'type': DEFAULT_TYPE, 'target': 'text',
+     'keywords': ['material', 'resource', 'content', '学习资料', '学习资源', 'materi', 'bahan ajar',
+                  'learning material', 'study material']},
+    {'name': 'document_host', 'type': '教辅', 'target': 'url',
+     'keywords': ['slideshare.net', 'scribd.com']},
+    {'name': 'official_textbook_host', 'type': '教材', 'target': 'url',
+     'keywords': ['kemdikbud.go.id']},
+]
+
+
+@dataclass
+class Classification:
+    """
+    分类结果
+
+    Attributes:
+        resource_type: 资源类型（播放列表、视频、教材、教辅、练习题、其他）
+        rule: 命中的规则名（未命中任何规则时为 None）
+        evidence: 命中的关键词
+    """
+    resource_type: str
+    rule: Optional[str] = None
+    evidence: Optional[str] = None
+
+
+class _CompiledRule:
+    """编译后的规则：所有关键词合并为一个正则"""
+
+    __slots__ = ('name', 'resource_type', 'target', 'pattern')
+
+    def __init__(self, rule: Dict[str, Any]):
+        keywords = sorted({str(kw).lower() for kw in rule.get('keywords', []) if kw}, key=len, reverse=True)
+        if not keywords:
+            raise ValueError(f"规则 {rule.get('name')} 没有关键词")
+        if rule.get('target', 'text') not in ('url', 'title', 'text'):
+            raise ValueError(f"规则 {rule.get('name')} 的 target 无效: {rule.get('target')}")
+        self.name = rule.get('name') or rule['type']
+        self.resource_type = rule['type']
+        self.target = rule.get('target', 'text')
+        self.pattern = re.compile('|'.join(re.escape(kw) for kw in keywords))
+
+
+class ResourceClassifier:
+    """
+    资源类型分类器（线程安全，编译后只读）
+
+    使用示例：
+        classifier = get_resource_classifier()
+        result = classifier.classify(title, url, snippet)
+        result.resource_type, result.rule, result.evidence
+    """
+
+    def __init__(self, rules: Optional[List[Dict[str, Any]]] = None, default_type: str = DEFAULT_TYPE):
+        """
+        Args:
+            rules: 规则列表（按优先级排列），默认使用 DEFAULT_RULES
+            default_type: 未命中任何规则时的类型
+
+        Raises:
+            ValueError: 规则格式无效
+        """
+        self.default_type = default_type
+        self._rules = [_CompiledRule(rule) for rule in (rules or DEFAULT_RULES)]
+
+    @property
+    def rule_names(self) -> List[str]:
+        return [rule.name for rule in self._rules]
+
+    def classify(self, title: str, url: str, snippet: str = "") -> Classification:
+        """
+        分类单个结果
+
+        Args:
+            title: 标题
+            url: URL
+            snippet: 摘要
+
+        Returns:
+            Classification
+        """
+        fields = {
+            'url': (url or '').lower(),
+            'title': (title or '').lower(),
+        }
+        fields['text'] = f"{fields['title']} {fields['url']} {(snippet or '').lower()}"
+
+        for rule in self._rules:
+            match = rule.pattern.search(fields[rule.target])
+            if match:
+                return Classification(rule.resource_type, rule.name, match.group(0))
+        return Classification(self.default_type)
+
+    def classify_batch(self, items: Iterable[Any]) -> List[Classification]:
+        """
+        批量分类（dict 或带 title/url/snippet 属性的对象）
+
+        Returns:
+            与输入顺序一致的 Classification 列表
+        """
+        return [
+            self.classify(_field(item, 'title'), _field(item, 'url'), _field(item, 'snippet'))
+            for item in items
+        ]
+
+    def is_playlist(self, item: Any) -> bool:
+        """判断结果是否是播放列表（已有 resource_type 时直接使用）"""
+        resource_type = _field(item, 'resource_type')
+        if resource_type:
+            return resource_type == PLAYLIST_TYPE
+        return self.classify_batch([item])[0].resource_type == PLAYLIST_TYPE
+
+
+def _field(item: Any, name: str) -> str:
+    value = item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+    return value or ''
+
+
+# 全局实例
+_classifier: Optional[ResourceClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def get_resource_classifier() -> ResourceClassifier:
+    """
+    获取全局资源类型分类器实例
+
+    配置来源：config/evaluation_weights.yaml 中的 evaluation.resource_classifier（配置无效时使用内置规则）
+
+    Returns:
+        ResourceClassifier实例
+    """
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                classifier_config = {}
+                try:
+                    from core.config_loader import get_config
+                    classifier_config = get_config().get_evaluation_weights().get('resource_classifier', {}) or {}
+                except Exception as e:
+                    logger.warning(f"读取资源分类规则失败，使用内置规则: {str(e)}")
+                try:
+                    _classifier = ResourceClassifier(
+                        rules=classifier_config.get('rules'),
+                        default_type=classifier_config.get('default_type', DEFAULT_TYPE)
+                    )
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.error(f"❌ 资源分类规则无效，使用内置规则: {str(e)}")
+                    _classifier = ResourceClassifier()
+                logger.info(f"✅ 资源分类器已加载 {len(_classifier.rule_names)} 条规则")
+    return _classifier
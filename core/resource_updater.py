@@ -221,30 +221,16 @@ class ResourceUpdater:
             搜索统计字典
         """
         try:
-            history_file = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)),
-                'data',
-                'search_history.json'
-            )
-
-            if not os.path.exists(history_file):
-                return {'recent_searches': 0}
-
-            with open(history_file, 'r', encoding='utf-8') as f:
-                history = json.load(f)
+            from core.search_history_store import get_search_history_store
 
             # 统计最近7天的搜索
             seven_days_ago = datetime.now() - timedelta(days=7)
-            recent_count = 0
-
-            for record in history:
-                if record.get('country_code') == country_code and \
-                   record.get('grade') == grade_name and \
-                   record.get('subject') == subject_name:
-
-                    search_time = datetime.fromisoformat(record.get('timestamp', ''))
-                    if search_time > seven_days_ago:
-                        recent_count += 1
+            recent_count = get_search_history_store().count(
+                country=country_code,
+                grade=grade_name,
+                subject=subject_name,
+                since=seven_days_ago.timestamp()
+            )
 
             return {'recent_searches': recent_count}
 
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+搜索结果去重：URL规范化 + 近似重复内容聚类
+在LLM评分之前合并指向同一资源的结果，每去掉一个重复结果就省下一次评分调用
+
+- URL规范化：提取 YouTube 视频/播放列表ID（youtu.be、shorts、embed、m.youtube.com 等形式统一），
+  去掉跟踪参数、片段、默认端口、末尾斜杠，域名统一小写并去掉 www./m. 前缀；
+  含义明确的跟踪参数（utm_*、fbclid、gclid 等）对所有站点去掉，from、source、si、t 等通用名称的参数
+  只在已知把它们用作跟踪/分享参数的站点去掉（其他站点上可能是内容参数）
+- 内容聚类：对 标题+摘要 计算 64 位 SimHash，汉明距离不超过阈值视为镜像内容（转载、同一视频多个上传）；
+  按 4 段 16 位分桶建立索引，阈值 ≤3 时只需比较同桶候选
+- 保守合并：资源类型（视频/播放列表/网页）不同、或标题中的数字（年级、课次）不同的结果不会被合并
+"""
+
+import hashlib
+import re
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from utils.logger_utils import get_logger
+
+logger = get_logger('result_dedup')
+
+# 跟踪参数（精确匹配，所有站点）：只收录不会被用作内容参数的名称
+TRACKING_PARAMS = frozenset({
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    'ref_src', 'spm', '_ga', '_gl'
+})
+# 跟踪参数（前缀匹配，所有站点）
+TRACKING_PREFIXES = ('utm_', 'pk_', 'mtm_', 'hmsr', 'hmpl')
+# 按站点的跟踪/分享参数（通用名称，在其他站点上可能有实际含义；匹配域名及其子域名）
+HOST_TRACKING_PARAMS: Dict[str, frozenset] = {
+    'youtube.com': frozenset({'si', 't', 'feature', 'pp', 'ab_channel', 'hl'}),
+    'youtu.be': frozenset({'si', 't', 'feature'}),
+    'bilibili.com': frozenset({'from', 'spm_id_from', 'vd_source', 'share_source', 'share_medium', 'share_plat'}),
+    'medium.com': frozenset({'source'}),
+    'linkedin.com': frozenset({'trk'}),
+    'twitter.com': frozenset({'ref', 's'}),
+    'x.com': frozenset({'ref', 's'}),
+}
+
+# 可去掉的主机名前缀（移动版、AMP）
+_HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'amp.')
+
+_YOUTUBE_HOSTS = ('youtube.com', 'youtube-nocookie.com', 'youtu.be')
+_YOUTUBE_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+_YOUTUBE_PATH_ID = re.compile(r'^/(?:shorts|embed|live|v|e)/([A-Za-z0-9_-]{11})')
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+_CJK = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]')
+_NUMBER = re.compile(r'\d+')
+
+_HASH_BITS = 64
+_BAND_BITS = 16
+
+
+def _strip_host(host: str) -> str:
+    """域名转小写，去掉默认端口和 www./m. 等前缀"""
+    host = host.lower().rstrip('.')
+    if host.endswith(':80') or host.endswith(':443'):
+        host = host.rsplit(':', 1)[0]
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix) and host.count('.') > 1:
+            return host[len(prefix):]
+    return host
+
+
+def _split(url: str):
+    """解析URL（允许省略协议，如 youtu.be/ID），空串或无法解析时返回 None"""
+    url = (url or '').strip()
+    if not url:
+        return None
+    try:
+        return urlsplit(url if '//' in url else f'//{url}')
+    except ValueError:
+        return None
+
+
+def youtube_ids(url: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    提取 YouTube 视频ID和播放列表ID
+
+    Returns:
+        (video_id, playlist_id)，非 YouTube URL 返回 (None, None)
+    """
+    parts = _split(url)
+    if parts is None:
+        return None, None
+    host = _strip_host(parts.netloc)
+    if not any(host == h or host.endswith('.' + h) for h in _YOUTUBE_HOSTS):
+        return None, None
+
+    query = dict(parse_qsl(parts.query))
+    video_id = None
+    if host == 'youtu.be':
+        candidate = parts.path.strip('/').split('/')[0]
+        video_id = candidate if _YOUTUBE_ID.match(candidate) else None
+    elif parts.path.rstrip('/') == '/watch':
+        candidate = query.get('v', '')
+        video_id = candidate if _YOUTUBE_ID.match(candidate) else None
+    else:
+        match = _YOUTUBE_PATH_ID.match(parts.path)
+        video_id = match.group(1) if match else None
+
+    return video_id, query.get('list') or None
+
+
+def canonical_url(url: str) -> str:
+    """
+    规范化URL（同一资源的不同URL形式返回相同结果）
+
+    - YouTube：watch?v=ID / 播放列表 playlist?list=ID / 列表中的视频 watch?v=ID&list=ID
+    - 其他：https + 去前缀的小写域名 + 去末尾斜杠的路径 + 排序后的非跟踪参数
+
+    Args:
+        url: 原始URL
+
+    Returns:
+        规范化URL（无法解析时返回去掉首尾空白的原URL）
+    """
+    url = (url or '').strip()
+    parts = _split(url)
+    if parts is None:
+        return url
+
+    video_id, playlist_id = youtube_ids(url)
+    if video_id and playlist_id:
+        return f"https://www.youtube.com/watch?v={video_id}&list={playlist_id}"
+    if video_id:
+        return f"https://www.youtube.com/watch?v={video_id}"
+    if playlist_id:
+        return f"https://www.youtube.com/playlist?list={playlist_id}"
+
+    host = _strip_host(parts.netloc)
+    host_params = _host_tracking_params(host)
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and key.lower() not in host_params
+        and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = re.sub(r'/{2,}', '/', parts.path).rstrip('/') or ''
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+def _host_tracking_params(host: str) -> frozenset:
+    """站点特有的跟踪参数（域名或其子域名命中 HOST_TRACKING_PARAMS 时）"""
+    for domain, params in HOST_TRACKING_PARAMS.items():
+        if host == domain or host.endswith('.' + domain):
+            return params
+    return frozenset()
+
+
+def resource_kind(url: str) -> str:
+    """资源类型：'video'、'playlist' 或 'page'（内容聚类只合并同类型结果）"""
+    video_id, playlist_id = youtube_ids(url)
+    if video_id:
+        return 'video'
+    if playlist_id:
+        return 'playlist'
+    return 'page'
+
+
+def _features(text: str) -> Counter:
+    """SimHash 特征：单词 + 相邻词对；中日韩文本额外使用字二元组"""
+    words = _WORD.findall((text or '').lower())
+    features = Counter(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        if _CJK.search(word) and len(word) > 1:
+            features.update(word[i:i + 2] for i in range(len(word) - 1))
+    return features
+
+
+def simhash(text: str) -> Tuple[int, int]:
+    """
+    计算 64 位 SimHash
+
+    Returns:
+        (hash, 特征数)
+    """
+    features = _features(text)
+    weights = [0] * _HASH_BITS
+    for feature, weight in features.items():
+        value = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(_HASH_BITS):
+            weights[bit] += weight if value >> bit & 1 else -weight
+    value = 0
+    for bit in range(_HASH_BITS):
+        if weights[bit] > 0:
+            value |= 1 << bit
+    return value, len(features)
+
+
+def _field(item: Any, name: str) -> str:
+    """读取结果字段（支持 dict 和 SearchResult 等对象）"""
+    value = item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+    return value or ''
+
+
+@dataclass
+class DedupResult:
+    """
+    去重结果
+
+    Attributes:
+        kept: 保留的结果（保持原有顺序，每组保留第一个）
+        duplicates: (被去掉的结果, 保留的代表结果, 原因 'url'/'content')
+    """
+    kept: List[Any] = field(default_factory=list)
+    duplicates: List[Tuple[Any, Any, str]] = field(default_factory=list)
+
+    @property
+    def url_duplicates(self) -> int:
+        return sum(1 for _, _, reason in self.duplicates if reason == 'url')
+
+    @property
+    def content_duplicates(self) -> int:
+        return sum(1 for _, _, reason in self.duplicates if reason == 'content')
+
+
+class ResultDeduplicator:
+    """
+    搜索结果去重器（线程安全，无状态，可共享）
+
+    使用示例：
+        dedup = get_result_deduplicator()
+        outcome = dedup.deduplicate(results)     # dict 或 SearchResult 列表
+        results = outcome.kept
+    """
+
+    def __init__(self, content_dedup: bool = True, simhash_threshold: int = 3, min_features: int = 8):
+        """
+        Args:
+            content_dedup: 是否按 标题+摘要 聚类近似重复内容（False 时只按规范化URL去重）
+            simhash_threshold: SimHash 汉明距离不超过该值视为近似重复（0-3，分桶索引保证不漏比较）
+            min_features: 文本特征数少于该值时不参与内容聚类（短标题误合并风险高）
+        """
+        self.content_dedup = content_dedup
+        self.simhash_threshold = max(0, min(simhash_threshold, _HASH_BITS // _BAND_BITS - 1))
+        self.min_features = min_features
+
+        self._lock = threading.Lock()
+        # 统计信息
+        self.stats = {
+            "processed": 0,
+            "url_duplicates": 0,
+            "content_duplicates": 0
+        }
+
+    def deduplicate(self, items: List[Any],
+                    url_of: Callable[[Any], str] = lambda item: _field(item, 'url'),
+                    text_of: Optional[Callable[[Any], str]] = None) -> DedupResult:
+        """
+        去重（保持顺序，每组保留第一个出现的结果）
+
+        Args:
+            items: 搜索结果（dict 或带 url/title/snippet 属性的对象）
+            url_of: 取URL的函数
+            text_of: 取聚类文本的函数，默认 标题+摘要
+
+        Returns:
+            DedupResult
+        """
+        text_of = text_of or (lambda item: f"{_field(item, 'title')} {_field(item, 'snippet')}")
+        outcome = DedupResult()
+        by_url: Dict[str, Any] = {}
+        # 分桶索引：(段序号, 段值) -> [(hash, 资源类型, 标题数字, 代表结果)]
+        bands: Dict[Tuple[int, int], List[Tuple[int, str, Tuple[str, ...], Any]]] = defaultdict(list)
+
+        for item in items:
+            url = url_of(item)
+            key = canonical_url(url)
+            if key and key in by_url:
+                outcome.duplicates.append((item, by_url[key], 'url'))
+                continue
+
+            representative = None
+            signature = None
+            if self.content_dedup:
+                value, feature_count = simhash(text_of(item))
+                if feature_count >= self.min_features:
+                    signature = (value, resource_kind(url), tuple(_NUMBER.findall(_field(item, 'title'))))
+                    representative = self._find_similar(signature, bands)
+
+            if representative is not None:
+                outcome.duplicates.append((item, representative, 'content'))
+                if key:
+                    by_url[key] = representative
+                continue
+
+            outcome.kept.append(item)
+            if key:
+                by_url[key] = item
+            if signature is not None:
+                for band, band_value in self._bands(signature[0]):
+                    bands[(band, band_value)].append((*signature, item))
+
+        with self._lock:
+            self.stats["processed"] += len(items)
+            self.stats["url_duplicates"] += outcome.url_duplicates
+            self.stats["content_duplicates"] += outcome.content_duplicates
+
+        if outcome.duplicates:
+            logger.info(
+                f"🧹 结果去重: {len(items)} → {len(outcome.kept)} "
+                f"(URL重复 {outcome.url_duplicates}, 内容重复 {outcome.content_duplicates})"
+            )
+        return outcome
+
+    @staticmethod
+    def _bands(value: int):
+        mask = (1 << _BAND_BITS) - 1
+        for band in range(_HASH_BITS // _BAND_BITS):
+            yield band, value >> (band * _BAND_BITS) & mask
+
+    def _find_similar(self, signature: Tuple[int, str, Tuple[str, ...]], bands) -> Optional[Any]:
+        """在同桶候选中查找近似重复的代表结果"""
+        value, kind, numbers = signature
+        for band_key in self._bands(value):
+            for other_value, other_kind, other_numbers, item in bands.get(band_key, ()):
+                if (other_kind == kind and other_numbers == numbers
+                        and bin(value ^ other_value).count('1') <= self.simhash_threshold):
+                    return item
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        with self._lock:
+            return dict(self.stats)
+
+
+# 全局实例
+_deduplicator: Optional[ResultDeduplicator] = None
+_deduplicator_lock = threading.Lock()
+
+
+def get_result_deduplicator() -> ResultDeduplicator:
+    """
+    获取全局结果去重器实例
+
+    配置来源：config/search.yaml 中的 search.dedup
+
+    Returns:
+        ResultDeduplicator实例
+    """
+    global _deduplicator
+    if _deduplicator is None:
+        with _deduplicator_lock:
+            if _deduplicator is None:
+                dedup_config = {}
+                try:
+                    from core.config_loader import get_config
+                    dedup_config = get_config().get_search_config().get('dedup', {}) or {}
+                except Exception as e:
+                    logger.warning(f"读取结果去重配置失败，使用默认值: {str(e)}")
+                _deduplicator = ResultDeduplicator(
+                    content_dedup=dedup_config.get('content_dedup', True),
+                    simhash_threshold=dedup_config.get('simhash_threshold', 3),
+                    min_features=dedup_config.get('min_features', 8)
+                )
+    return _deduplicator
@@ -13,6 +13,8 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from core.result_scorer import get_result_scorer
+from core.result_dedup import get_result_deduplicator
+from core.resource_classifier import get_resource_classifier, PLAYLIST_TYPE
 from utils.logger_utils import get_logger
 
 logger = get_logger('result_ranker')
@@ -60,10 +62,13 @@ class AdvancedResultRanker:
         grade = context.get('grade', '')
         subject = context.get('subject', '')
 
-        # 1. 基础评分
+        # 1. 去重（规范化URL + 近似重复内容，在评分之前进行，重复结果不占用评分调用）
+        results = self._deduplicate_results(results)
+
+        # 2. 基础评分
         scored_results = self.scorer.score_results(results, query, context)
 
-        # 2. 上下文增强评分
+        # 3. 上下文增强评分
         for result in scored_results:
             base_score = result.get('score', 5.0)
 
@@ -81,11 +86,8 @@ class AdvancedResultRanker:
             # 新鲜度加分
             result['score'] = min(10.0, result['score'] + self._score_freshness(result))
 
-        # 3. 去重（基于URL相似度）
-        deduped_results = self._deduplicate_results(scored_results)
-
         # 4. 多样性平衡（确保不同类型资源）
-        diversified_results = self._diversify_results(deduped_results)
+        diversified_results = self._diversify_results(scored_results)
 
         # 5. 最终排序
         diversified_results.sort(key=lambda x: x.get('score', 0), reverse=True)
@@ -143,19 +145,8 @@ class AdvancedResultRanker:
         return 0.0  # 暂不实现
 
     def _deduplicate_results(self, results: List[Dict]) -> List[Dict]:
-        """去重相似的URL"""
-        seen_urls = set()
-        deduped = []
-
-        for result in results:
-            url = result.get('url', '')
-
-            # 简单去重：完全相同的URL
-            if url not in seen_urls:
-                seen_urls.add(url)
-                deduped.append(result)
-
-        return deduped
+        """去重：同一资源的不同URL形式、镜像内容只保留第一个"""
+        return get_result_deduplicator().deduplicate(results).kept
 
     def _diversify_results(self, results: List[Dict]) -> List[Dict]:
         """确保结果多样性（不同类型的资源）"""
@@ -168,16 +159,15 @@ class AdvancedResultRanker:
         articles = []
         others = []
 
-        for result in results:
-            url = result.get('url', '').lower()
-            title = result.get('title', '').lower()
-            combined = url + title
+        classifier = get_resource_classifier()
+        for result, classification in zip(results, classifier.classify_batch(results)):
+            resource_type = result.get('resource_type') or classification.resource_type
 
-            if 'playlist' in combined or 'list=' in url:
+            if resource_type == PLAYLIST_TYPE:
                 playlists.append(result)
-            elif 'youtube.com/watch' in url or 'video' in combined:
+            elif resource_type == '视频':
                 videos.append(result)
-            elif 'article' in combined or 'text' in combined:
+            elif resource_type in ('教材', '教辅', '练习题'):
                 articles.append(result)
             else:
                 others.append(result)
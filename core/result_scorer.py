@@ -14,12 +14,18 @@ sys.path.insert(0, str(project_root))
 import re
 import json
 import hashlib
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
 from functools import lru_cache
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from utils.logger_utils import get_logger
 from llm_client import InternalAPIClient, AIBuildersAPIClient
 from config.llm_config import get_batch_evaluation_params
 from utils.prompt_manager import get_prompt_manager
+from core.config_loader import get_config
+from core.executor_registry import get_executor, ExecutorSaturatedError, DeadlineExceededError
+from core.rate_limiter import get_rate_limiter
+from core.score_cache import get_score_cache
 
 logger = get_logger('result_scorer')
 
@@ -112,6 +118,35 @@ class IntelligentResultScorer:
         global _llm_client_for_cache
         _llm_client_for_cache = self.llm_client
 
+        # 批量评分并发配置（config/llm.yaml → cost_optimization）
+        cost_config = {}
+        try:
+            cost_config = get_config().get_llm_config().get('cost_optimization', {}) or {}
+        except Exception as e:
+            logger.warning(f"读取批量评分配置失败，使用默认值: {str(e)}")
+        self.batch_size = max(1, int(cost_config.get('batch_size', 5)))
+        self.batch_concurrency = max(1, int(cost_config.get('batch_concurrency', 4)))
+        # 进程内共享的速率限制（所有评分器实例共用，避免触发提供商限流）
+        self.rate_limiter = get_rate_limiter(
+            'llm_scoring',
+            rate_per_minute=cost_config.get('scoring_rate_limit_per_minute', 120),
+            burst=self.batch_concurrency
+        )
+        self.rate_limit_timeout = cost_config.get('scoring_rate_limit_timeout', 30)
+        # 整次评分的总截止时间：到期后取消未开始的批次，未完成的批次按评估失败处理
+        self.scoring_timeout = float(cost_config.get('scoring_timeout', 90))
+
+        # 单结果评分持久化缓存（按 URL + 查询 + 年级 + 学科 + 提示词版本）
+        self.prompt_version = self._compute_prompt_version()
+        self.score_cache = None
+        if cost_config.get('enable_score_cache', True):
+            try:
+                self.score_cache = get_score_cache()
+                self.score_cache.sync_prompt_version(self.prompt_version)
+            except Exception as e:
+                logger.warning(f"⚠️ 评分缓存初始化失败，不使用评分缓存: {str(e)}")
+                self.score_cache = None
+
         logger.info("✅ 评分器初始化完成（纯LLM模式，使用 lru_cache)")
 
     # ==============================================================================
@@ -127,6 +162,27 @@ class IntelligentResultScorer:
         key_str = json.dumps(key_data, sort_keys=True)
         return hashlib.md5(key_str.encode()).hexdigest()
 
+    def _compute_prompt_version(self) -> str:
+        """
+        计算评分提示词版本（提示词模板变化时版本随之变化，用于使评分缓存失效）
+
+        使用占位输入渲染批量/单个评分提示词并取哈希，不依赖提示词管理器是否提供版本号；
+        版本和模型名称都是评分缓存键的一部分，版本变化后旧评分不再命中，按TTL自然过期
+        """
+        try:
+            placeholder = [{'title': '{title}', 'url': '{url}', 'snippet': '{snippet}'}]
+            parts = [
+                self.prompt_mgr.get_batch_scoring_system_prompt(),
+                self.prompt_mgr.get_batch_scoring_user_prompt(
+                    grade='{grade}', subject='{subject}', query='{query}', results=placeholder
+                ),
+                self.prompt_mgr.get_single_scoring_system_prompt()
+            ]
+            return hashlib.md5('\n'.join(str(p) for p in parts).encode('utf-8')).hexdigest()[:12]
+        except Exception as e:
+            logger.warning(f"计算提示词版本失败: {str(e)[:100]}")
+            return 'unknown'
+
     def _safe_extract_metadata(self, metadata: Optional[Dict], field: str, max_len: int = 50) -> str:
         """
         安全提取元数据字段
@@ -189,33 +245,219 @@ class IntelligentResultScorer:
     # ==============================================================================
     # LLM批量评估方法（核心）
     # ==============================================================================
-    def _evaluate_batch_with_llm(self, results: List[Dict[str, Any]], query: str, metadata: Optional[Dict] = None) -> List[Dict[str, Any]]:
+    def _evaluate_batch_with_llm(self, results: List[Dict[str, Any]], query: str, metadata: Optional[Dict] = None,
+                                 on_batch_scored: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> List[Dict[str, Any]]:
         """
-        使用LLM批量评估多个结果
+        使用LLM批量评估多个结果（已缓存评分的结果直接复用，不再调用LLM）
         
         Args:
-            results: 搜索结果列表（最多10个结果）
+            results: 搜索结果列表
             query: 搜索查询
             metadata: 额外的元数据
+            on_batch_scored: 每个批次评分完成时的回调（缓存命中的结果作为一个批次先回调）
         
         Returns:
             包含评分的结果列表
         """
         if not self.llm_client or not results:
             return results
-        
+
+        # 💾 先查评分缓存，只把未缓存的结果送给LLM
+        grade = self._safe_extract_metadata(metadata, 'grade')
+        subject = self._safe_extract_metadata(metadata, 'subject')
+        cached_scores = {}
+        if self.score_cache is not None:
+            try:
+                cached_scores = self.score_cache.get_many(results, query, grade, subject, self.prompt_version,
+                                                         model=self.model_name)
+            except Exception as e:
+                logger.warning(f"读取评分缓存失败: {str(e)[:100]}")
+
+        merged_results = list(results)
+        for idx, cached in cached_scores.items():
+            result = results[idx].copy()
+            result['score'] = cached.get('score', 0.0)
+            result['recommendation_reason'] = cached.get('recommendation_reason', '')
+            result['evaluation_method'] = cached.get('evaluation_method', 'LLM (Batch)')
+            merged_results[idx] = result
+
+        pending_indices = [idx for idx in range(len(results)) if idx not in cached_scores]
+        if cached_scores:
+            logger.info(f"💾 评分缓存命中 {len(cached_scores)}/{len(results)}，{len(pending_indices)}个结果需要LLM评估")
+            if on_batch_scored:
+                self._notify_batch_scored(on_batch_scored, [merged_results[idx] for idx in sorted(cached_scores)])
+        if not pending_indices:
+            return merged_results
+
+        pending_results = [results[idx] for idx in pending_indices]
+        scored_pending = self._score_in_batches(pending_results, query, metadata, on_batch_scored)
+
+        if self.score_cache is not None:
+            try:
+                self.score_cache.set_many(scored_pending, query, grade, subject, self.prompt_version,
+                                         model=self.model_name)
+            except Exception as e:
+                logger.warning(f"写入评分缓存失败: {str(e)[:100]}")
+
+        for idx, result in zip(pending_indices, scored_pending):
+            merged_results[idx] = result
+        return merged_results
+
+    def _score_in_batches(self, results: List[Dict[str, Any]], query: str, metadata: Optional[Dict] = None,
+                          on_batch_scored: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> List[Dict[str, Any]]:
+        """
+        分批并发调用LLM评分
+
+        Args:
+            on_batch_scored: 每个批次评分完成时的回调（按完成顺序调用）
+
+        Returns:
+            评分后的结果列表（顺序与输入一致）
+        """
         # ✨ 优化性能：减少批量大小（10个 → 5个），降低单次LLM评分时间，避免超时
         # 配合前端超时从180秒增加到300秒的优化，确保搜索请求在合理时间内完成
-        BATCH_SIZE = 5
-        batches = [results[i:i + BATCH_SIZE] for i in range(0, len(results), BATCH_SIZE)]
-        
+        batches = [results[i:i + self.batch_size] for i in range(0, len(results), self.batch_size)]
+
+        # ⚡ 批次并发执行（并发数受 batch_concurrency 限制，调用频率受共享速率限制器约束）
+        # 所有批次共用一个总截止时间，单个被限流的批次不会让整次搜索累计等待多个批次超时
+        deadline = time.monotonic() + self.scoring_timeout
+        concurrency = min(self.batch_concurrency, len(batches))
+        scored_batches = [None] * len(batches)
+        if concurrency <= 1:
+            for idx, batch in enumerate(batches):
+                if time.monotonic() >= deadline:
+                    break
+                scored_batches[idx] = self._score_batch(batch, query, metadata, deadline)
+                if on_batch_scored:
+                    self._notify_batch_scored(on_batch_scored, scored_batches[idx])
+        else:
+            logger.info(f"⚡ 并发批量评分: {len(batches)}个批次，并发数{concurrency}")
+            # 在共享的 llm 执行器中执行（任务继承提交方上下文，LLM调用记录到当前搜索的日志），
+            # 滑动窗口提交：同时在执行的批次不超过 concurrency
+            executor = get_executor('llm')
+            futures = {}
+            next_idx = 0
+            while next_idx < len(batches) or futures:
+                while next_idx < len(batches) and len(futures) < concurrency:
+                    try:
+                        future = executor.submit(self._score_batch, batches[next_idx], query, metadata, deadline,
+                                                 deadline=deadline)
+                        futures[future] = next_idx
+                    except ExecutorSaturatedError:
+                        logger.warning(f"LLM执行器已饱和，批次{next_idx}在当前线程评分")
+                        scored_batches[next_idx] = self._score_batch(batches[next_idx], query, metadata, deadline)
+                        if on_batch_scored:
+                            self._notify_batch_scored(on_batch_scored, scored_batches[next_idx])
+                    next_idx += 1
+                if not futures:
+                    continue
+                remaining = deadline - time.monotonic()
+                done, _ = wait(futures, timeout=max(0.0, remaining), return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    idx = futures.pop(future)
+                    try:
+                        scored_batches[idx] = future.result()
+                    except DeadlineExceededError:
+                        continue
+                    except Exception as e:
+                        # 单个批次异常不影响其他批次，该批次留空，稍后按评估失败处理
+                        logger.error(f"批次{idx}评分异常: {str(e)[:100]}")
+                        continue
+                    if on_batch_scored:
+                        self._notify_batch_scored(on_batch_scored, scored_batches[idx])
+
+            # 截止时间已到：取消仍在排队的批次，不再等待执行中的批次
+            for future in futures:
+                future.cancel()
+
+        unfinished = [idx for idx, batch_scores in enumerate(scored_batches) if batch_scores is None]
+        if unfinished:
+            logger.warning(f"⏱️ {len(unfinished)}/{len(batches)}个批次未完成（超过{self.scoring_timeout:g}秒或评分异常），按评估失败处理")
+            for idx in unfinished:
+                scored_batches[idx] = [self._mark_evaluation_failed(result.copy()) for result in batches[idx]]
+                if on_batch_scored:
+                    self._notify_batch_scored(on_batch_scored, scored_batches[idx])
+
+        # 按原始顺序合并
         scored_results = []
-        for batch in batches:
-            batch_scores = self._call_llm_for_batch(batch, query, metadata)
+        for batch_scores in scored_batches:
             scored_results.extend(batch_scores)
         
         return scored_results
 
+    @staticmethod
+    def _notify_batch_scored(callback: Callable[[List[Dict[str, Any]]], None], batch: List[Dict[str, Any]]):
+        """调用批次完成回调（回调异常不影响评分流程）"""
+        try:
+            callback(batch)
+        except Exception as e:
+            logger.warning(f"批次评分回调失败: {str(e)[:100]}")
+
+    def _rate_limit_wait(self, deadline: Optional[float] = None) -> float:
+        """等待速率限制的最长时间（不超过总截止时间）"""
+        if deadline is None:
+            return self.rate_limit_timeout
+        return max(0.0, min(self.rate_limit_timeout, deadline - time.monotonic()))
+
+    def _score_batch(self, batch: List[Dict[str, Any]], query: str, metadata: Optional[Dict] = None,
+                     deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        评分单个批次；批次失败或部分结果缺少评分时，仅对这些结果逐个降级评估
+
+        Args:
+            deadline: 总截止时间（time.monotonic() 时间戳），等待速率限制不会超过它
+
+        Returns:
+            评分后的批次结果（顺序与输入一致）
+        """
+        if self.rate_limiter.acquire(timeout=self._rate_limit_wait(deadline)):
+            scored_batch = self._call_llm_for_batch(batch, query, metadata)
+        else:
+            scored_batch = batch
+
+        missing = [
+            idx for idx, result in enumerate(scored_batch)
+            if result.get('evaluation_method') != 'LLM (Batch)' and not result.get('filtered')
+        ]
+        if missing:
+            logger.info(f"📊 批次中{len(missing)}/{len(batch)}个结果缺少评分，逐个降级评估")
+            for idx in missing:
+                result = scored_batch[idx].copy()
+                self._apply_single_evaluation(result, query, metadata, deadline)
+                scored_batch[idx] = result
+
+        return scored_batch
+
+    def _apply_single_evaluation(self, result: Dict[str, Any], query: str, metadata: Optional[Dict] = None,
+                                 deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        逐个LLM评估并写入结果；失败时设置默认分数
+
+        Returns:
+            更新后的结果（原地修改）
+        """
+        llm_evaluation = None
+        if self.llm_client and self.rate_limiter.acquire(timeout=self._rate_limit_wait(deadline)):
+            llm_evaluation = self._evaluate_with_llm(result, query, metadata)
+
+        if llm_evaluation:
+            result['score'] = llm_evaluation['score']
+            result['recommendation_reason'] = llm_evaluation['recommendation_reason']
+            result['evaluation_method'] = llm_evaluation.get('evaluation_method', 'LLM')
+        else:
+            self._mark_evaluation_failed(result)
+        return result
+
+    @staticmethod
+    def _mark_evaluation_failed(result: Dict[str, Any]) -> Dict[str, Any]:
+        """LLM评估失败或超时，设置默认值（原地修改，不写入评分缓存）"""
+        result['score'] = 5.0
+        result['recommendation_reason'] = 'LLM评估失败，请手动检查'
+        result['evaluation_method'] = 'Failed'
+        return result
+
     def _call_llm_for_batch(self, batch: List[Dict[str, Any]], query: str, metadata: Optional[Dict] = None) -> List[Dict[str, Any]]:
         """为一个批次的结果调用LLM进行批量评分"""
         if not self.llm_client:
@@ -481,7 +723,8 @@ class IntelligentResultScorer:
     # ==============================================================================
     # 主评估入口
     # ==============================================================================
-    def score_results(self, results: List[Dict[str, Any]], query: str, metadata: Optional[Dict] = None) -> List[Dict[str, Any]]:
+    def score_results(self, results: List[Dict[str, Any]], query: str, metadata: Optional[Dict] = None,
+                      on_batch_scored: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> List[Dict[str, Any]]:
         """
         对多个结果进行评分（纯LLM版本）
         
@@ -489,6 +732,7 @@ class IntelligentResultScorer:
             results: 搜索结果列表
             query: 搜索查询
             metadata: 额外的元数据
+            on_batch_scored: 每个批次评分完成时的回调，用于流式推送评分进度
         
         Returns:
             评分后的结果列表
@@ -517,13 +761,15 @@ class IntelligentResultScorer:
 
         logger.info(f"[📊 黑名单过滤统计] 总计: {len(results)}, 过滤: {filtered_count}, 保留: {len(results) - filtered_count}")
 
-        # 步骤1: 使用批量LLM评估
+        # 步骤1: 使用批量LLM评估（失败的批次已在内部逐个降级评估）
         try:
-            scored_results = self._evaluate_batch_with_llm(filtered_results, query, metadata)
+            scored_results = self._evaluate_batch_with_llm(filtered_results, query, metadata, on_batch_scored)
             batch_llm_count = sum(1 for r in scored_results if r.get('evaluation_method') == 'LLM (Batch)')
-            logger.info(f"✅ 批量LLM评估完成: {len(filtered_results)}个结果，{batch_llm_count}个使用批量LLM评估")
+            single_llm_count = sum(1 for r in scored_results if r.get('evaluation_method') == 'LLM')
+            logger.info(f"✅ 批量LLM评估完成: {len(filtered_results)}个结果，"
+                        f"{batch_llm_count}个使用批量LLM评估，{single_llm_count}个降级为逐个评估")
             
-            if batch_llm_count > 0:
+            if self.llm_client:
                 return scored_results
         except Exception as e:
             logger.warning(f"批量LLM评估失败: {str(e)[:200]}")
@@ -534,17 +780,7 @@ class IntelligentResultScorer:
         
         for idx, result in enumerate(filtered_results):
             try:
-                llm_evaluation = self._evaluate_with_llm(result, query, metadata)
-                if llm_evaluation:
-                    result['score'] = llm_evaluation['score']
-                    result['recommendation_reason'] = llm_evaluation['recommendation_reason']
-                    result['evaluation_method'] = llm_evaluation.get('evaluation_method', 'LLM')
-                else:
-                    # LLM评估失败，设置默认值
-                    result['score'] = 5.0
-                    result['recommendation_reason'] = 'LLM评估失败，请手动检查'
-                    result['evaluation_method'] = 'Failed'
-                
+                self._apply_single_evaluation(result, query, metadata)
                 scored_results.append(result)
             except Exception as e:
                 logger.error(f"结果评估失败 (索引{idx}): {str(e)[:100]}")
@@ -555,6 +791,8 @@ class IntelligentResultScorer:
 
         llm_count = sum(1 for r in scored_results if r.get('evaluation_method') in ['LLM', 'LLM (Batch)'])
         logger.info(f"✅ 评估完成: {len(results)}个结果 (LLM: {llm_count})")
+        if on_batch_scored:
+            self._notify_batch_scored(on_batch_scored, scored_results)
 
         return scored_results
 
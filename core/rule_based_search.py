@@ -440,7 +440,7 @@ class RuleBasedSearchEngine:
         return scored_results
 
     def _deduplicate_results(self, results: List[Dict]) -> List[Dict]:
-        """去重（基于URL）
+        """去重（规范化URL + 近似重复内容）
 
         Args:
             results: 搜索结果列表
@@ -448,16 +448,8 @@ class RuleBasedSearchEngine:
         Returns:
         去重后的结果列表
         """
-        seen_urls = set()
-        unique_results = []
-
-        for result in results:
-            url = result.get('url', '')
-            if url and url not in seen_urls:
-                seen_urls.add(url)
-                unique_results.append(result)
-
-        return unique_results
+        from core.result_dedup import get_result_deduplicator
+        return get_result_deduplicator().deduplicate([r for r in results if r.get('url')]).kept
 
     def _empty_result(self, error_message: str) -> SearchResponse:
         """返回空结果
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+结果评分持久化缓存
+按单个结果缓存LLM评分，跨批次、跨进程重启复用
+
+缓存键: (URL, 规范化查询, 年级, 学科, 提示词版本, 模型)
+- 同一URL在相同年级/学科的搜索中反复出现，命中后无需再次调用LLM
+- 提示词变化时版本号改变，新版本不会命中旧评分；旧版本条目不主动删除，按TTL自然过期
+  （滚动发布时新旧版本进程并存，各自命中自己的条目，不会互相清空缓存）
+- 模型只参与缓存键：模型降级/切换时各模型的评分互不混用，但不会清空存储
+
+存储: 分段追加式存储（core/segment_store.py），位于 data/cache/score_store
+"""
+
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional
+from utils.logger_utils import get_logger
+from core.segment_store import SegmentStore
+from core.result_dedup import canonical_url
+
+logger = get_logger('score_cache')
+
+# 存储中记录当前提示词版本的保留键
+_PROMPT_VERSION_KEY = '__prompt_version__'
+
+# 可缓存的评估方法（失败/降级的评分不缓存）
+CACHEABLE_METHODS = ('LLM (Batch)', 'LLM')
+
+
+class ScoreCache:
+    """
+    结果评分持久化缓存
+
+    使用示例：
+        cache = get_score_cache()
+        cache.sync_prompt_version(version)
+        hits = cache.get_many(results, query, grade, subject, version, model=model_name)
+        cache.set_many(scored_results, query, grade, subject, version, model=model_name)
+    """
+
+    def __init__(self, cache_dir: str = "data/cache/score_store", ttl_seconds: int = 7 * 86400):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 存储目录
+            ttl_seconds: 评分有效期（秒），默认7天
+        """
+        self.store = SegmentStore(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self._prompt_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "prompt_version_changes": 0
+        }
+
+        logger.info(f"✅ 评分缓存初始化完成: {cache_dir}, TTL={ttl_seconds}秒")
+
+    @staticmethod
+    def _normalize_url(url: str) -> str:
+        """规范化URL：同一资源的不同URL形式（youtu.be、m.、跟踪参数等）共享评分缓存"""
+        return canonical_url(url)
+
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """规范化查询（与多级缓存一致，词序/大小写/重音无关）"""
+        from core.multi_level_cache import MultiLevelCache
+        return MultiLevelCache.normalize_query(query or '')
+
+    def make_key(self, url: str, normalized_query: str, grade: str, subject: str, prompt_version: str,
+                 model: str = '') -> str:
+        """
+        生成缓存键
+
+        Args:
+            url: 结果URL
+            normalized_query: 规范化后的查询
+            grade: 年级
+            subject: 学科
+            prompt_version: 提示词版本
+            model: 评分模型名称
+
+        Returns:
+            缓存键（MD5哈希）
+        """
+        key_data = [
+            self._normalize_url(url),
+            normalized_query,
+            (grade or '').strip().lower(),
+            (subject or '').strip().lower(),
+            prompt_version,
+            model or ''
+        ]
+        return hashlib.md5(json.dumps(key_data, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def sync_prompt_version(self, prompt_version: str):
+        """
+        同步提示词版本（只记录版本，不清空存储）
+
+        提示词版本是缓存键的一部分，版本变化后旧评分不会再被命中，按TTL自然过期；
+        需要立即删除旧评分时由管理操作显式调用 clear()
+
+        Args:
+            prompt_version: 当前提示词版本
+        """
+        with self._lock:
+            if self._prompt_version == prompt_version:
+                return
+
+            stored = self.store.get(_PROMPT_VERSION_KEY)
+            if stored is not None and stored.decode('utf-8') != prompt_version:
+                logger.info(f"🔄 评分提示词已变化 ({stored.decode('utf-8')} → {prompt_version})，旧版本评分将按TTL过期")
+                self.stats["prompt_version_changes"] += 1
+            if stored is None or stored.decode('utf-8') != prompt_version:
+                self.store.put(_PROMPT_VERSION_KEY, prompt_version.encode('utf-8'))
+            self._prompt_version = prompt_version
+
+    def get_many(self, results: List[Dict[str, Any]], query: str, grade: str, subject: str,
+                 prompt_version: str, model: str = '') -> Dict[int, Dict[str, Any]]:
+        """
+        批量查询评分
+
+        Args:
+            results: 搜索结果列表
+            query: 搜索查询
+            grade: 年级
+            subject: 学科
+            prompt_version: 提示词版本
+            model: 评分模型名称
+
+        Returns:
+            字典，键为结果在列表中的索引，值为缓存的评分
+            {'score', 'recommendation_reason', 'evaluation_method'}
+        """
+        normalized_query = self._normalize_query(query)
+        hits = {}
+        for idx, result in enumerate(results):
+            url = result.get('url')
+            if not url:
+                continue
+            payload = self.store.get(self.make_key(url, normalized_query, grade, subject, prompt_version, model))
+            if payload is None:
+                self.stats["misses"] += 1
+                continue
+            try:
+                hits[idx] = json.loads(payload)
+                self.stats["hits"] += 1
+            except ValueError:
+                self.stats["misses"] += 1
+        return hits
+
+    def set_many(self, results: List[Dict[str, Any]], query: str, grade: str, subject: str,
+                 prompt_version: str, model: str = '') -> int:
+        """
+        批量写入评分（只写入LLM成功评分的结果）
+
+        Returns:
+            写入的条数
+        """
+        normalized_query = self._normalize_query(query)
+        written = 0
+        for result in results:
+            url = result.get('url')
+            if not url or result.get('filtered') or result.get('evaluation_method') not in CACHEABLE_METHODS:
+                continue
+            evaluation = {
+                'score': result.get('score', 0.0),
+                'recommendation_reason': result.get('recommendation_reason', ''),
+                'evaluation_method': result.get('evaluation_method'),
+                'cached_at': time.time()
+            }
+            try:
+                self.store.put(
+                    self.make_key(url, normalized_query, grade, subject, prompt_version, model),
+                    json.dumps(evaluation, ensure_ascii=False).encode('utf-8'),
+                    ttl=self.ttl_seconds
+                )
+                written += 1
+            except OSError as e:
+                logger.warning(f"写入评分缓存失败: {str(e)}")
+        self.stats["writes"] += written
+        return written
+
+    def clear(self):
+        """清空所有评分（管理操作，例如需要立即丢弃旧版本评分时）"""
+        with self._lock:
+            self.store.clear()
+            self._prompt_version = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "entries": len(self.store),
+            "prompt_version": self._prompt_version
+        }
+
+
+# 全局单例
+_score_cache: Optional[ScoreCache] = None
+_score_cache_lock = threading.Lock()
+
+
+def get_score_cache() -> ScoreCache:
+    """
+    获取全局评分缓存实例
+
+    配置来源：config/llm.yaml 中的 cost_optimization.score_cache_ttl_seconds
+
+    Returns:
+        ScoreCache实例
+    """
+    global _score_cache
+    if _score_cache is None:
+        with _score_cache_lock:
+            if _score_cache is None:
+                ttl_seconds = 7 * 86400
+                try:
+                    from core.config_loader import get_config
+                    cost_config = get_config().get_llm_config().get('cost_optimization', {}) or {}
+                    ttl_seconds = cost_config.get('score_cache_ttl_seconds', ttl_seconds)
+                except Exception as e:
+                    logger.warning(f"读取评分缓存配置失败，使用默认值: {str(e)}")
+                _score_cache = ScoreCache(ttl_seconds=ttl_seconds)
+    return _score_cache
@@ -2,6 +2,9 @@
 """
 搜索结果缓存模块
 用于缓存搜索引擎结果，提升性能
+
+存储格式：分段追加式存储（core/segment_store.py，位于 cache_dir/search_store）
+旧版"每个键一个JSON文件"的缓存在首次读取时迁移
 """
 
 import json
@@ -11,6 +14,7 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from pathlib import Path
 from utils.logger_utils import get_logger
+from core.segment_store import SegmentStore
 
 logger = get_logger('search_cache')
 
@@ -22,7 +26,7 @@ class SearchCache:
     功能:
     1. 基于查询哈希的缓存键
     2. TTL（Time To Live）过期机制
-    3. 持久化到磁盘
+    3. 持久化到磁盘（分段追加式存储）
     4. 缓存命中率统计
     """
 
@@ -37,6 +41,7 @@ class SearchCache:
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.ttl_seconds = ttl_seconds
+        self.store = SegmentStore(str(self.cache_dir / "search_store"))
 
         # 统计信息
         self.stats = {
@@ -84,24 +89,26 @@ class SearchCache:
         """
         self.stats["total_queries"] += 1
         cache_key = self._generate_cache_key(query, engine, max_results, include_domains)
-        cache_file = self.cache_dir / f"{cache_key}.json"
-
-        if not cache_file.exists():
-            self.stats["misses"] += 1
-            logger.debug(f"缓存未命中: {query[:50]}...")
-            return None
 
         try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+            payload = self.store.get(cache_key)
+            if payload is None:
+                payload = self._migrate_legacy_file(cache_key)
 
-            # 检查是否过期
+            if payload is None:
+                self.stats["misses"] += 1
+                logger.debug(f"缓存未命中: {query[:50]}...")
+                return None
+
+            cache_data = json.loads(payload)
+
+            # 检查是否过期（TTL可能在写入后被调小）
             cached_time = cache_data.get("timestamp", 0)
             current_time = time.time()
 
             if current_time - cached_time > self.ttl_seconds:
                 # 缓存已过期，删除
-                cache_file.unlink()
+                self.store.delete(cache_key)
                 self.stats["misses"] += 1
                 logger.debug(f"缓存已过期: {query[:50]}...")
                 return None
@@ -131,7 +138,6 @@ class SearchCache:
             include_domains: 包含的域名列表
         """
         cache_key = self._generate_cache_key(query, engine, max_results, include_domains)
-        cache_file = self.cache_dir / f"{cache_key}.json"
 
         cache_data = {
             "query": query,
@@ -143,8 +149,8 @@ class SearchCache:
         }
 
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            payload = json.dumps(cache_data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            self.store.put(cache_key, payload, ttl=self.ttl_seconds)
             logger.debug(f"缓存已保存: {query[:50]}... ({len(results)}条结果)")
         except Exception as e:
             logger.error(f"保存缓存失败: {str(e)}")
@@ -163,16 +169,52 @@ class SearchCache:
         cache_key = self._generate_cache_key(query, engine, max_results, include_domains)
         cache_file = self.cache_dir / f"{cache_key}.json"
 
+        removed = self.store.delete(cache_key)
         if cache_file.exists():
             cache_file.unlink()
+            removed = True
+        if removed:
             logger.debug(f"缓存已失效: {query[:50]}...")
 
     def clear_all(self):
-        """清空所有缓存"""
+        """清空所有缓存（包括未迁移的旧版JSON文件）"""
+        entry_count = len(self.store)
+        self.store.clear()
         cache_files = list(self.cache_dir.glob("*.json"))
         for cache_file in cache_files:
             cache_file.unlink()
-        logger.info(f"已清空所有缓存: {len(cache_files)}个文件")
+        logger.info(f"已清空所有缓存: {entry_count}条记录, {len(cache_files)}个旧版文件")
+
+    def _migrate_legacy_file(self, cache_key: str) -> Optional[bytes]:
+        """
+        将旧版JSON缓存文件迁移到分段存储（未过期时）
+
+        Returns:
+            迁移后的负载字节，文件不存在或已过期返回None
+        """
+        cache_file = self.cache_dir / f"{cache_key}.json"
+        if not cache_file.exists():
+            return None
+
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cache_data = json.load(f)
+        except Exception as e:
+            logger.warning(f"旧版缓存文件损坏，已删除: {cache_file.name} ({str(e)})")
+            cache_file.unlink()
+            return None
+
+        if not isinstance(cache_data, dict):
+            return None  # 不是本缓存写入的文件（同目录下的多级缓存旧文件）
+
+        cache_file.unlink()
+        remaining = self.ttl_seconds - (time.time() - cache_data.get("timestamp", 0))
+        if remaining <= 0:
+            return None
+
+        payload = json.dumps(cache_data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.store.put(cache_key, payload, ttl=remaining)
+        return payload
 
     def get_hit_rate(self) -> float:
         """
@@ -197,13 +239,15 @@ class SearchCache:
             "misses": self.stats["misses"],
             "total_queries": self.stats["total_queries"],
             "hit_rate": self.get_hit_rate(),
-            "cache_files_count": len(list(self.cache_dir.glob("*.json")))
+            "cache_entries": len(self.store),
+            "legacy_files_count": len(list(self.cache_dir.glob("*.json"))),
+            "store": self.store.get_stats()
         }
 
     def cleanup_expired(self):
-        """清理过期的缓存文件"""
+        """清理过期的缓存（分段存储只扫描索引；旧版JSON文件逐个检查）"""
         current_time = time.time()
-        expired_count = 0
+        expired_count = self.store.cleanup_expired()
 
         for cache_file in self.cache_dir.glob("*.json"):
             try:
@@ -222,7 +266,7 @@ class SearchCache:
                 expired_count += 1
 
         if expired_count > 0:
-            logger.info(f"已清理{expired_count}个过期缓存文件")
+            logger.info(f"已清理{expired_count}个过期缓存")
 
 
 # 全局单例
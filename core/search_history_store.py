@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+搜索历史存储
+基于SQLite（WAL模式）的追加式搜索历史，替代每次搜索整体重写的 search_history.json
+
+- 写入：只追加一行，由后台写线程完成，不占用请求处理时间
+- 读取：按时间/国家/学科建立索引，支持分页和过滤
+- 多进程：WAL模式下多个worker可同时读写，不会互相覆盖
+- 保留策略：按条数和天数清理，超出上限的旧记录定期删除
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from utils.logger_utils import get_logger
+
+logger = get_logger('search_history_store')
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    country TEXT NOT NULL DEFAULT '',
+    grade TEXT NOT NULL DEFAULT '',
+    semester TEXT,
+    subject TEXT NOT NULL DEFAULT '',
+    language TEXT,
+    query TEXT NOT NULL DEFAULT '',
+    success INTEGER NOT NULL DEFAULT 1,
+    total_count INTEGER NOT NULL DEFAULT 0,
+    playlist_count INTEGER NOT NULL DEFAULT 0,
+    video_count INTEGER NOT NULL DEFAULT 0,
+    results_json TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_search_history_ts ON search_history (ts);
+CREATE INDEX IF NOT EXISTS idx_search_history_country_ts ON search_history (country, ts);
+CREATE INDEX IF NOT EXISTS idx_search_history_subject_ts ON search_history (subject, ts);
+"""
+
+# 列表查询不读取 results_json，避免分页时加载完整结果
+_SUMMARY_COLUMNS = ("id, ts, timestamp, country, grade, semester, subject, language, query, "
+                    "success, total_count, playlist_count, video_count")
+
+# 后台写线程每写入多少条执行一次保留策略清理
+_PRUNE_EVERY_WRITES = 100
+
+
+class SearchHistoryStore:
+    """
+    搜索历史存储（线程安全，多进程安全）
+
+    使用示例：
+        store = get_search_history_store()
+        store.record_async(request_dict, response_dict)
+        entries, total = store.query(limit=20, offset=0, country='CN')
+    """
+
+    def __init__(self, db_path: str = None, max_entries: int = 10000, retention_days: int = 90,
+                 legacy_files: Optional[List[str]] = None):
+        """
+        初始化存储
+
+        Args:
+            db_path: SQLite数据库路径，默认 data/search_history.db
+            max_entries: 最多保留的记录数（<=0 表示不限制）
+            retention_days: 记录保留天数（<=0 表示不限制）
+            legacy_files: 需要导入的旧版 search_history.json 文件（仅在数据库为空时导入一次）
+        """
+        self.db_path = Path(db_path) if db_path else PROJECT_ROOT / 'data' / 'search_history.db'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.retention_days = retention_days
+
+        self._local = threading.local()
+        self._queue: "queue.Queue[Optional[Tuple[Dict[str, Any], Dict[str, Any], Optional[str]]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._writes_since_prune = 0
+
+        # 统计信息
+        self.stats = {
+            "writes": 0,
+            "write_errors": 0,
+            "pruned": 0,
+            "migrated": 0
+        }
+
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.commit()
+
+        for legacy_file in legacy_files or []:
+            self._migrate_legacy_file(Path(legacy_file))
+
+        logger.info(f"✅ 搜索历史存储初始化完成: {self.db_path} (最多{max_entries}条, 保留{retention_days}天)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接（每个线程一个连接）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+    def record(self, request: Dict[str, Any], response: Dict[str, Any], timestamp: Optional[str] = None) -> int:
+        """
+        同步写入一条搜索历史
+
+        Args:
+            request: 请求参数 {'country', 'grade', 'semester', 'subject', 'language'}
+            response: 响应摘要 {'success', 'query', 'total_count', 'playlist_count', 'video_count', 'results'}
+            timestamp: ISO格式时间（默认当前UTC时间）
+
+        Returns:
+            新记录的ID
+        """
+        conn = self._connect()
+        entry_id = self._insert(conn, request, response, timestamp)
+        conn.commit()
+        self.stats["writes"] += 1
+        return entry_id
+
+    def _insert(self, conn: sqlite3.Connection, request: Dict[str, Any], response: Dict[str, Any],
+                timestamp: Optional[str]) -> int:
+        """插入一行（不提交事务）"""
+        if timestamp:
+            ts = self.parse_timestamp(timestamp)
+        else:
+            ts = time.time()
+            timestamp = datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+        results = response.get('results')
+        cursor = conn.execute(
+            "INSERT INTO search_history (ts, timestamp, country, grade, semester, subject, language, query, "
+            "success, total_count, playlist_count, video_count, results_json) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                ts,
+                timestamp,
+                request.get('country') or '',
+                request.get('grade') or '',
+                request.get('semester'),
+                request.get('subject') or '',
+                request.get('language'),
+                response.get('query') or '',
+                1 if response.get('success', True) else 0,
+                response.get('total_count') or 0,
+                response.get('playlist_count') or 0,
+                response.get('video_count') or 0,
+                json.dumps(results, ensure_ascii=False, default=str) if results is not None else None
+            )
+        )
+        return cursor.lastrowid
+
+    def record_async(self, request: Dict[str, Any], response: Dict[str, Any], timestamp: Optional[str] = None):
+        """
+        异步写入一条搜索历史（由后台写线程完成，立即返回）
+
+        Args:
+            request: 请求参数
+            response: 响应摘要
+            timestamp: ISO格式时间（默认入队时间）
+        """
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc).isoformat()
+        self._ensure_writer()
+        self._queue.put((request, response, timestamp))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        等待后台写线程处理完已入队的记录
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            是否全部写入完成
+        """
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks:
+            if time.time() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _ensure_writer(self):
+        """启动后台写线程（首次异步写入时）"""
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._writer_loop, name='search-history-writer', daemon=True)
+                self._writer.start()
+
+    def _writer_loop(self):
+        """后台写线程：逐条写入，定期执行保留策略"""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                request, response, timestamp = item
+                self.record(request, response, timestamp)
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= _PRUNE_EVERY_WRITES:
+                    self._writes_since_prune = 0
+                    self.prune()
+            except Exception as e:
+                self.stats["write_errors"] += 1
+                logger.error(f"写入搜索历史失败: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def prune(self) -> int:
+        """
+        按保留策略删除旧记录
+
+        Returns:
+            删除的记录数
+        """
+        conn = self._connect()
+        deleted = 0
+        if self.retention_days > 0:
+            cutoff = time.time() - self.retention_days * 86400
+            deleted += conn.execute("DELETE FROM search_history WHERE ts < ?", (cutoff,)).rowcount
+        if self.max_entries > 0:
+            deleted += conn.execute(
+                "DELETE FROM search_history WHERE id IN ("
+                "SELECT id FROM search_history ORDER BY ts DESC, id DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            ).rowcount
+        conn.commit()
+        if deleted:
+            self.stats["pruned"] += deleted
+            logger.info(f"🧹 清理了 {deleted} 条过期搜索历史")
+        return deleted
+
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _build_filters(country: Optional[str], grade: Optional[str], subject: Optional[str],
+                       since: Optional[float], until: Optional[float]) -> Tuple[str, list]:
+        """构建WHERE子句"""
+        clauses, params = [], []
+        for column, value in (('country', country), ('grade', grade), ('subject', subject)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, limit: int = 100, offset: int = 0, country: Optional[str] = None,
+              grade: Optional[str] = None, subject: Optional[str] = None,
+              since: Optional[float] = None, until: Optional[float] = None,
+              include_results: bool = False) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        分页查询搜索历史（按时间倒序）
+
+        Args:
+            limit: 每页条数
+            offset: 偏移量
+            country: 按国家过滤
+            grade: 按年级过滤
+            subject: 按学科过滤
+            since: 起始时间戳（含）
+            until: 结束时间戳（不含）
+            include_results: 是否包含完整搜索结果
+
+        Returns:
+            (记录列表, 满足条件的总数)
+        """
+        where, params = self._build_filters(country, grade, subject, since, until)
+        columns = _SUMMARY_COLUMNS + (", results_json" if include_results else "")
+        conn = self._connect()
+        rows = conn.execute(
+            f"SELECT {columns} FROM search_history{where} ORDER BY ts DESC, id DESC LIMIT ? OFFSET ?",
+            params + [max(0, limit), max(0, offset)]
+        ).fetchall()
+        total = conn.execute(f"SELECT COUNT(*) FROM search_history{where}", params).fetchone()[0]
+        return [self._row_to_entry(row, include_results) for row in rows], total
+
+    def count(self, country: Optional[str] = None, grade: Optional[str] = None, subject: Optional[str] = None,
+              since: Optional[float] = None, until: Optional[float] = None) -> int:
+        """统计满足条件的记录数"""
+        where, params = self._build_filters(country, grade, subject, since, until)
+        return self._connect().execute(f"SELECT COUNT(*) FROM search_history{where}", params).fetchone()[0]
+
+    def get(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        """获取单条记录（包含完整结果）"""
+        row = self._connect().execute(
+            f"SELECT {_SUMMARY_COLUMNS}, results_json FROM search_history WHERE id = ?", (entry_id,)
+        ).fetchone()
+        return self._row_to_entry(row, True) if row else None
+
+    @staticmethod
+    def _row_to_entry(row: sqlite3.Row, include_results: bool) -> Dict[str, Any]:
+        """
+        把数据库行转换为历史记录
+
+        同时提供扁平字段（country/grade/subject/result_count 等，供历史页面使用）
+        和旧版 search_history.json 的 request/response 嵌套结构
+        """
+        request = {
+            "country": row['country'],
+            "grade": row['grade'],
+            "semester": row['semester'],
+            "subject": row['subject'],
+            "language": row['language']
+        }
+        response = {
+            "success": bool(row['success']),
+            "query": row['query'],
+            "total_count": row['total_count'],
+            "playlist_count": row['playlist_count'],
+            "video_count": row['video_count']
+        }
+        if include_results:
+            response["results"] = json.loads(row['results_json']) if row['results_json'] else []
+        return {
+            "id": row['id'],
+            "timestamp": row['timestamp'],
+            **request,
+            "query": row['query'],
+            "success": bool(row['success']),
+            "result_count": row['total_count'],
+            "request": request,
+            "response": response
+        }
+
+    # ------------------------------------------------------------------
+    # 旧数据迁移
+    # ------------------------------------------------------------------
+    @staticmethod
+    def parse_timestamp(timestamp: str) -> float:
+        """解析ISO时间（无时区的按UTC处理），失败时返回当前时间"""
+        try:
+            parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed.timestamp()
+        except (ValueError, AttributeError):
+            return time.time()
+
+    def _migrate_legacy_file(self, legacy_file: Path):
+        """
+        导入旧版 search_history.json（仅在数据库为空时），导入后重命名为 .migrated
+
+        Args:
+            legacy_file: 旧版历史文件路径
+        """
+        if not legacy_file.exists() or self.count() > 0:
+            return
+        try:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取旧版搜索历史失败，跳过迁移: {legacy_file}: {str(e)}")
+            return
+
+        # 在一个写事务中检查并导入，避免多个worker同时启动时重复导入
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT COUNT(*) FROM search_history").fetchone()[0] > 0:
+                conn.rollback()
+                return
+            # 旧文件按时间倒序保存，倒序导入使ID与时间顺序一致
+            migrated = 0
+            for entry in reversed(history if isinstance(history, list) else []):
+                if not isinstance(entry, dict):
+                    continue
+                # 兼容两种旧格式：{request, response} 嵌套结构和 {country, grade, subject} 扁平结构
+                request = entry.get('request') or entry
+                response = entry.get('response') or {}
+                self._insert(conn, request, response, entry.get('timestamp') or None)
+                migrated += 1
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        try:
+            legacy_file.rename(legacy_file.with_name(legacy_file.name + '.migrated'))
+        except OSError as e:
+            logger.warning(f"重命名旧版搜索历史失败: {str(e)}")
+        self.stats["migrated"] += migrated
+        logger.info(f"📦 已从 {legacy_file} 迁移 {migrated} 条搜索历史")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        return {
+            **self.stats,
+            "entries": self.count(),
+            "pending_writes": self._queue.unfinished_tasks,
+            "db_path": str(self.db_path),
+            "max_entries": self.max_entries,
+            "retention_days": self.retention_days
+        }
+
+
+# 全局单例
+_history_store: Optional[SearchHistoryStore] = None
+_history_store_lock = threading.Lock()
+
+
+def get_search_history_store() -> SearchHistoryStore:
+    """
+    获取全局搜索历史存储实例
+
+    配置来源：config/search.yaml 中的 search.history
+
+    Returns:
+        SearchHistoryStore实例
+    """
+    global _history_store
+    if _history_store is None:
+        with _history_store_lock:
+            if _history_store is None:
+                history_config = {}
+                try:
+                    from core.config_loader import get_config
+                    history_config = get_config().get_search_config().get('history', {}) or {}
+                except Exception as e:
+                    logger.warning(f"读取搜索历史配置失败，使用默认值: {str(e)}")
+                db_path = history_config.get('db_path')
+                _history_store = SearchHistoryStore(
+                    db_path=str(PROJECT_ROOT / db_path) if db_path else None,
+                    max_entries=history_config.get('max_entries', 10000),
+                    retention_days=history_config.get('retention_days', 90),
+                    legacy_files=[str(PROJECT_ROOT / 'search_history.json')]
+                )
+    return _history_store
@@ -2,13 +2,40 @@
 """
 搜索日志收集器 - 记录搜索过程中的所有详细信息
 用于生成详细的分析报告
+
+- 按请求隔离：每次搜索有独立的日志，search_id 通过 utils.request_context 的上下文变量传递，
+  并发搜索不再互相覆盖（共享执行器会把上下文带入工作线程）
+- 有界内存：进行中的日志超时后回收，完成的日志只在内存中保留最近 recent_size 条（环形缓冲）
+- 异步落盘：完成的日志由后台线程以 gzip 压缩的紧凑JSON写入 data/search_logs/<search_id>.json.gz，
+  导出接口按 search_id 读取，内存中已淘汰的日志仍可导出
 """
+import gzip
 import json
+import os
+import queue
+import re
+import threading
 import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
 from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 
+from utils.logger_utils import get_logger
+from utils.request_context import get_search_id, set_search_id
+
+logger = get_logger('search_log_collector')
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# 合法的搜索ID（同时用作文件名，拒绝路径分隔符等字符）
+_SEARCH_ID_PATTERN = re.compile(r'^search_[0-9A-Za-z_]+$')
+
+# 后台写线程每写入多少条执行一次保留策略清理
+_PRUNE_EVERY_WRITES = 100
+
 
 @dataclass
 class LLMCall:
@@ -73,29 +100,134 @@ class SearchLog:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+
+
 class SearchLogCollector:
-    """搜索日志收集器"""
-    
-    def __init__(self):
-        """初始化日志收集器"""
-        self.current_log: Optional[SearchLog] = None
-        self.logs_history: List[SearchLog] = []
-    
+    """
+    搜索日志收集器（线程安全）
+
+    使用示例：
+        collector = get_log_collector()
+        search_id = collector.start_search(country, grade, subject)  # 同时写入当前上下文
+        collector.record_llm_call(...)                                 # 按上下文中的 search_id 记录
+        collector.finish_search(total_time, search_time, scoring_time, search_id=search_id)
+        log = collector.get_log_by_id(search_id)                       # 内存中没有时从落盘文件读取
+    """
+
+    def __init__(self, recent_size: int = 200, spool_dir: Optional[str] = None, retention_days: int = 7,
+                 max_active_seconds: float = 600, spool_queue_size: int = 1000):
+        """
+        初始化日志收集器
+
+        Args:
+            recent_size: 内存中保留的已完成日志条数
+            spool_dir: 落盘目录，默认 data/search_logs
+            retention_days: 落盘文件保留天数（<=0 表示不清理）
+            max_active_seconds: 进行中的日志超过该时间未完成则回收（标记为 abandoned）
+            spool_queue_size: 待落盘队列上限，写入跟不上时丢弃新日志的落盘（内存中仍保留）
+        """
+        self.recent_size = max(1, int(recent_size))
+        self.spool_dir = Path(spool_dir) if spool_dir else PROJECT_ROOT / 'data' / 'search_logs'
+        self.retention_days = retention_days
+        self.max_active_seconds = max_active_seconds
+
+        self._lock = threading.Lock()
+        self._active: Dict[str, SearchLog] = {}
+        self._started: Dict[str, float] = {}
+        self._recent: "OrderedDict[str, SearchLog]" = OrderedDict()
+
+        self._queue: "queue.Queue[Optional[SearchLog]]" = queue.Queue(maxsize=max(1, int(spool_queue_size)))
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._writes_since_prune = 0
+
+        # 统计信息
+        self.stats = {
+            "started": 0,
+            "finished": 0,
+            "abandoned": 0,
+            "dropped_records": 0,
+            "spooled": 0,
+            "spool_dropped": 0,
+            "spool_errors": 0
+        }
+
+    @property
+    def current_log(self) -> Optional[SearchLog]:
+        """当前上下文对应的进行中日志（没有时为 None）"""
+        return self._resolve(None)
+
     def start_search(self, country: str, grade: str, subject: str, semester: Optional[str] = None) -> str:
-        """开始一个新的搜索记录"""
-        search_id = f"search_{int(time.time())}"
-        
-        self.current_log = SearchLog(
+        """
+        开始一个新的搜索记录，并把 search_id 写入当前上下文
+
+        Returns:
+            唯一的搜索ID
+        """
+        now = datetime.now()
+        search_id = f"search_{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        log = SearchLog(
             search_id=search_id,
-            timestamp=datetime.now().isoformat(),
+            timestamp=now.isoformat(),
             country=country,
             grade=grade,
             subject=subject,
             semester=semester
         )
-        
+
+        with self._lock:
+            abandoned = self._evict_stale_locked()
+            self._active[search_id] = log
+            self._started[search_id] = time.monotonic()
+            self.stats["started"] += 1
+
+        for stale in abandoned:
+            logger.warning(f"⚠️ 搜索日志超过 {self.max_active_seconds} 秒未完成，已回收: {stale.search_id}")
+            self._enqueue(stale)
+
+        set_search_id(search_id)
         return search_id
-    
+
+    def _evict_stale_locked(self) -> List[SearchLog]:
+        """回收超时未完成的日志（调用方持有锁）"""
+        if self.max_active_seconds is None or self.max_active_seconds <= 0:
+            return []
+        cutoff = time.monotonic() - self.max_active_seconds
+        stale_ids = [sid for sid, started in self._started.items() if started < cutoff]
+        abandoned = []
+        for sid in stale_ids:
+            log = self._active.pop(sid)
+            self._started.pop(sid, None)
+            log.metadata.setdefault('status', 'abandoned')
+            self._finalize(log)
+            self._remember_locked(log)
+            self.stats["abandoned"] += 1
+            abandoned.append(log)
+        return abandoned
+
+    def _resolve(self, search_id: Optional[str]) -> Optional[SearchLog]:
+        """
+        找到记录应写入的进行中日志
+
+        优先级：显式传入的 search_id > 当前上下文中的 search_id；两者都没有时返回 None（记录被丢弃），
+        不猜测归属：唯一进行中的日志不一定属于当前线程，错误归属比丢弃更难排查
+        """
+        with self._lock:
+            if search_id:
+                return self._active.get(search_id)
+            context_id = get_search_id()
+            if context_id:
+                return self._active.get(context_id)
+            return None
+
+    def _append(self, search_id: Optional[str], attr: str, record: Any):
+        log = self._resolve(search_id)
+        with self._lock:
+            if log is None:
+                self.stats["dropped_records"] += 1
+                return
+            getattr(log, attr).append(record)
+
     def record_search_engine_call(
         self,
         engine: str,
@@ -104,12 +236,10 @@ class SearchLogCollector:
         execution_time: float,
         success: bool = True,
         error: Optional[str] = None,
-        additional_info: Optional[Dict[str, Any]] = None
+        additional_info: Optional[Dict[str, Any]] = None,
+        search_id: Optional[str] = None
     ):
         """记录搜索引擎调用"""
-        if not self.current_log:
-            return
-        
         call_record = {
             "engine": engine,
             "query": query,
@@ -120,9 +250,9 @@ class SearchLogCollector:
             "timestamp": datetime.now().isoformat(),
             "additional_info": additional_info or {}
         }
-        
-        self.current_log.search_engine_calls.append(call_record)
-    
+
+        self._append(search_id, 'search_engine_calls', call_record)
+
     def record_llm_call(
         self,
         model_name: str,
@@ -133,12 +263,10 @@ class SearchLogCollector:
         output_data: str,
         execution_time: float,
         tokens_used: Optional[int] = None,
-        cost: Optional[float] = None
+        cost: Optional[float] = None,
+        search_id: Optional[str] = None
     ):
         """记录LLM调用"""
-        if not self.current_log:
-            return
-        
         llm_call = LLMCall(
             model_name=model_name,
             function=function,
@@ -151,9 +279,9 @@ class SearchLogCollector:
             tokens_used=tokens_used,
             cost=cost
         )
-        
-        self.current_log.llm_calls.append(llm_call)
-    
+
+        self._append(search_id, 'llm_calls', llm_call)
+
     def record_search_result(
         self,
         engine: str,
@@ -164,12 +292,10 @@ class SearchLogCollector:
         score: float,
         recommendation_reason: str,
         resource_type: str,
+        search_id: Optional[str] = None,
         **kwargs
     ):
         """记录搜索结果"""
-        if not self.current_log:
-            return
-        
         result = SearchResult(
             search_engine=engine,
             query=query,
@@ -181,64 +307,241 @@ class SearchLogCollector:
             resource_type=resource_type,
             additional_info=kwargs
         )
-        
-        self.current_log.search_results.append(result)
-    
-    def finish_search(self, total_time: float, search_time: float, scoring_time: float):
-        """完成搜索记录"""
-        if not self.current_log:
-            return
-        
-        self.current_log.total_time = total_time
-        self.current_log.search_time = search_time
-        self.current_log.scoring_time = scoring_time
-        
-        # 计算统计信息
-        self.current_log.total_results = len(self.current_log.search_results)
-        self.current_log.playlist_count = sum(
-            1 for r in self.current_log.search_results 
-            if r.resource_type == '播放列表'
-        )
-        self.current_log.video_count = sum(
-            1 for r in self.current_log.search_results 
-            if r.resource_type == '视频'
-        )
-        
-        if self.current_log.search_results:
-            scores = [r.score for r in self.current_log.search_results]
-            self.current_log.average_score = sum(scores) / len(scores)
-        
-        # 保存到历史记录
-        self.logs_history.append(self.current_log)
-        
-        # 返回当前日志
-        log = self.current_log
-        self.current_log = None
-        
+
+        self._append(search_id, 'search_results', result)
+
+    def finish_search(self, total_time: float, search_time: float = 0.0, scoring_time: float = 0.0,
+                      search_id: Optional[str] = None, **metadata) -> Optional[SearchLog]:
+        """
+        完成搜索记录：计算统计信息，移入最近日志缓冲并异步落盘
+
+        Args:
+            total_time: 总耗时（秒）
+            search_time: 搜索耗时（秒）
+            scoring_time: 评分耗时（秒）
+            search_id: 搜索ID（默认使用当前上下文中的 search_id）
+            **metadata: 附加信息（如 status、result_count），写入 log.metadata
+
+        Returns:
+            完成的日志（找不到进行中的日志时为 None）
+        """
+        log = self._resolve(search_id)
+        if log is None:
+            return None
+
+        with self._lock:
+            if self._active.pop(log.search_id, None) is None:
+                # 并发的 finish_search 已经完成了这条日志
+                return None
+            self._started.pop(log.search_id, None)
+            log.total_time = total_time
+            log.search_time = search_time
+            log.scoring_time = scoring_time
+            log.metadata.update(metadata)
+            self._finalize(log)
+            self._remember_locked(log)
+            self.stats["finished"] += 1
+
+        if get_search_id() == log.search_id:
+            set_search_id('')
+        self._enqueue(log)
         return log
-    
+
+    @staticmethod
+    def _finalize(log: SearchLog):
+        """计算结果统计信息"""
+        log.total_results = len(log.search_results)
+        log.playlist_count = sum(1 for r in log.search_results if r.resource_type == '播放列表')
+        log.video_count = sum(1 for r in log.search_results if r.resource_type == '视频')
+        if log.search_results:
+            log.average_score = sum(r.score for r in log.search_results) / len(log.search_results)
+
+    def _remember_locked(self, log: SearchLog):
+        """放入最近日志环形缓冲（调用方持有锁）"""
+        self._recent[log.search_id] = log
+        self._recent.move_to_end(log.search_id)
+        while len(self._recent) > self.recent_size:
+            self._recent.popitem(last=False)
+
     def get_current_log(self) -> Optional[SearchLog]:
         """获取当前搜索日志"""
         return self.current_log
-    
+
     def get_log_by_id(self, search_id: str) -> Optional[SearchLog]:
-        """根据搜索ID获取日志"""
-        for log in self.logs_history:
-            if log.search_id == search_id:
-                return log
-        return None
-    
+        """
+        根据搜索ID获取日志（进行中 > 最近完成 > 落盘文件）
+
+        Returns:
+            日志，ID无效或不存在时为 None
+        """
+        if not search_id or not _SEARCH_ID_PATTERN.match(search_id):
+            return None
+        with self._lock:
+            log = self._active.get(search_id) or self._recent.get(search_id)
+        if log is not None:
+            return log
+
+        path = self._spool_path(search_id)
+        if not path.exists():
+            return None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                return self._log_from_dict(json.load(f))
+        except Exception as e:
+            logger.error(f"读取搜索日志失败 {path}: {str(e)}")
+            return None
+
     def get_recent_logs(self, count: int = 10) -> List[SearchLog]:
-        """获取最近的搜索日志"""
-        return self.logs_history[-count:]
+        """获取最近完成的搜索日志（按完成时间从早到晚）"""
+        with self._lock:
+            logs = list(self._recent.values())
+        return logs[-count:] if count > 0 else []
+
+    @staticmethod
+    def _log_from_dict(data: Dict[str, Any]) -> SearchLog:
+        """从落盘的字典还原日志对象"""
+        data = dict(data)
+        data['llm_calls'] = [LLMCall(**call) for call in data.get('llm_calls', [])]
+        data['search_results'] = [SearchResult(**result) for result in data.get('search_results', [])]
+        return SearchLog(**data)
+
+    # ------------------------------------------------------------------
+    # 异步落盘
+    # ------------------------------------------------------------------
+
+    def _spool_path(self, search_id: str) -> Path:
+        return self.spool_dir / f"{search_id}.json.gz"
+
+    def _enqueue(self, log: SearchLog):
+        """把完成的日志交给后台写线程（队列已满时只保留在内存中）"""
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(log)
+        except queue.Full:
+            self.stats["spool_dropped"] += 1
+            logger.warning(f"⚠️ 搜索日志落盘队列已满，跳过落盘: {log.search_id}")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        等待后台写线程处理完已入队的日志
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            是否全部写入完成
+        """
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks:
+            if time.time() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _ensure_writer(self):
+        """启动后台写线程（首次落盘时）"""
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._writer_loop, name='search-log-spool', daemon=True)
+                self._writer.start()
+
+    def _writer_loop(self):
+        """后台写线程：逐条写入压缩文件，定期执行保留策略"""
+        while True:
+            log = self._queue.get()
+            try:
+                if log is None:
+                    return
+                self._write(log)
+                self.stats["spooled"] += 1
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= _PRUNE_EVERY_WRITES:
+                    self._writes_since_prune = 0
+                    self.prune()
+            except Exception as e:
+                self.stats["spool_errors"] += 1
+                logger.error(f"写入搜索日志失败: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, log: SearchLog):
+        """以紧凑JSON写入 gzip 文件（先写临时文件再替换，读取方不会看到半个文件）"""
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = asdict(log)
+        path = self._spool_path(log.search_id)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'), default=str)
+        os.replace(tmp_path, path)
+
+    def prune(self) -> int:
+        """
+        删除超过保留天数的落盘日志
+
+        Returns:
+            删除的文件数
+        """
+        if not self.retention_days or self.retention_days <= 0 or not self.spool_dir.exists():
+            return 0
+        cutoff = time.time() - self.retention_days * 86400
+        removed = 0
+        for path in self.spool_dir.glob('search_*.json.gz'):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            logger.info(f"🗑️ 已清理 {removed} 个过期搜索日志")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        with self._lock:
+            active, recent = len(self._active), len(self._recent)
+        return {
+            **self.stats,
+            "active": active,
+            "recent": recent,
+            "recent_size": self.recent_size,
+            "pending_writes": self._queue.unfinished_tasks
+        }
 
 
 # 全局单例
-_collector_instance = None
+_collector_instance: Optional[SearchLogCollector] = None
+_collector_lock = threading.Lock()
+
 
 def get_log_collector() -> SearchLogCollector:
-    """获取日志收集器单例"""
+    """
+    获取日志收集器单例
+
+    配置来源：config/search.yaml 中的 search.logs
+
+    Returns:
+        SearchLogCollector实例
+    """
     global _collector_instance
     if _collector_instance is None:
-        _collector_instance = SearchLogCollector()
+        with _collector_lock:
+            if _collector_instance is None:
+                logs_config = {}
+                try:
+                    from core.config_loader import get_config
+                    logs_config = get_config().get_search_config().get('logs', {}) or {}
+                except Exception as e:
+                    logger.warning(f"读取搜索日志配置失败，使用默认值: {str(e)}")
+                spool_dir = logs_config.get('spool_dir')
+                _collector_instance = SearchLogCollector(
+                    recent_size=logs_config.get('recent_size', 200),
+                    spool_dir=str(PROJECT_ROOT / spool_dir) if spool_dir else None,
+                    retention_days=logs_config.get('retention_days', 7),
+                    max_active_seconds=logs_config.get('max_active_seconds', 600),
+                    spool_queue_size=logs_config.get('spool_queue_size', 1000)
+                )
     return _collector_instance
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+搜索引擎额度账本
+基于SQLite（WAL模式）的跨进程额度计数，替代每个worker各自维护的内存计数器
+
+- 原子扣减：检查额度和扣减在同一个 BEGIN IMMEDIATE 事务内完成，多个worker不会同时用掉最后一次额度
+- 按天/按月窗口：Google、Baidu按天计数，Metaso、Tavily按月计数（UTC自然日/自然月）
+- 速率令牌：每个引擎可配置每秒请求数和突发量，令牌桶状态同样保存在数据库中
+- 重启不清零：计数持久化，服务重启后继续累计
+"""
+
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from utils.logger_utils import get_logger
+
+logger = get_logger('search_quota_ledger')
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# 不限额时返回的剩余额度
+UNLIMITED = sys.maxsize
+
+# 默认额度（可通过 config/search.yaml 的 search.quota.engines 覆盖）
+DEFAULT_ENGINE_QUOTAS = {
+    'google': {'daily_limit': 10000, 'monthly_limit': None, 'rate_per_second': 1.0, 'burst': 10},
+    'metaso': {'daily_limit': None, 'monthly_limit': 5000, 'rate_per_second': None, 'burst': None},
+    'tavily': {'daily_limit': None, 'monthly_limit': 1000, 'rate_per_second': None, 'burst': None},
+    'baidu': {'daily_limit': 100, 'monthly_limit': None, 'rate_per_second': 2.0, 'burst': 2},
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quota_usage (
+    engine TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    period TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (engine, scope, period)
+);
+CREATE TABLE IF NOT EXISTS quota_tokens (
+    engine TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+# 保留的历史计数（天/月）
+_KEEP_DAYS = 35
+_KEEP_MONTHS = 12
+
+
+class QuotaExceededError(RuntimeError):
+    """共享额度用尽或触发速率限制"""
+
+
+class SearchQuotaLedger:
+    """
+    搜索引擎额度账本（线程安全，多进程安全）
+
+    使用示例：
+        ledger = get_search_quota_ledger()
+        if ledger.try_acquire('google'):
+            results = search_google(query)
+        remaining = ledger.remaining('google')
+    """
+
+    def __init__(self, db_path: str = None, engines: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        初始化账本
+
+        Args:
+            db_path: SQLite数据库路径，默认 data/search_quota.db
+            engines: 各引擎额度设置，覆盖 DEFAULT_ENGINE_QUOTAS
+                {engine: {'daily_limit', 'monthly_limit', 'rate_per_second', 'burst'}}，None 表示不限制
+        """
+        self.db_path = Path(db_path) if db_path else PROJECT_ROOT / 'data' / 'search_quota.db'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.engines: Dict[str, Dict[str, Any]] = {}
+        for engine, quota in {**DEFAULT_ENGINE_QUOTAS, **(engines or {})}.items():
+            self.engines[engine] = {**DEFAULT_ENGINE_QUOTAS.get(engine, {}), **(quota or {})}
+
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+        # 统计信息（当前进程）
+        self.stats = {
+            "acquired": 0,
+            "quota_denied": 0,
+            "rate_limited": 0,
+            "errors": 0
+        }
+
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        self._prune()
+
+        logger.info(f"✅ 搜索额度账本初始化完成: {self.db_path} ({', '.join(self.engines)})")
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接（每个线程一个连接，手动控制事务）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _periods(now: Optional[float] = None) -> Tuple[str, str]:
+        """当前的天/月窗口标识（UTC）"""
+        moment = datetime.fromtimestamp(now if now is not None else time.time(), tz=timezone.utc)
+        return moment.strftime('%Y-%m-%d'), moment.strftime('%Y-%m')
+
+    def _read_usage(self, conn: sqlite3.Connection, engine: str, day: str, month: str) -> Dict[str, int]:
+        rows = conn.execute(
+            "SELECT scope, count FROM quota_usage WHERE engine = ? AND "
+            "((scope = 'day' AND period = ?) OR (scope = 'month' AND period = ?))",
+            (engine, day, month)
+        ).fetchall()
+        usage = {'day': 0, 'month': 0}
+        for row in rows:
+            usage[row['scope']] = row['count']
+        return usage
+
+    def _remaining_from_usage(self, engine: str, usage: Dict[str, int]) -> int:
+        quota = self.engines.get(engine, {})
+        remaining = UNLIMITED
+        if quota.get('daily_limit') is not None:
+            remaining = min(remaining, int(quota['daily_limit']) - usage['day'])
+        if quota.get('monthly_limit') is not None:
+            remaining = min(remaining, int(quota['monthly_limit']) - usage['month'])
+        return max(0, remaining)
+
+    def _take_token(self, conn: sqlite3.Connection, engine: str, now: float) -> bool:
+        """令牌桶扣减（调用方已持有写事务）"""
+        quota = self.engines.get(engine, {})
+        rate = quota.get('rate_per_second')
+        if not rate:
+            return True
+        burst = float(quota.get('burst') or max(1.0, rate))
+
+        row = conn.execute("SELECT tokens, updated FROM quota_tokens WHERE engine = ?", (engine,)).fetchone()
+        tokens = burst if row is None else min(burst, row['tokens'] + max(0.0, now - row['updated']) * float(rate))
+        if tokens < 1.0:
+            return False
+        conn.execute(
+            "INSERT INTO quota_tokens (engine, tokens, updated) VALUES (?, ?, ?) "
+            "ON CONFLICT(engine) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+            (engine, tokens - 1.0, now)
+        )
+        return True
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def try_acquire(self, engine: str, enforce: bool = True) -> bool:
+        """
+        尝试为一次搜索扣减额度（检查和扣减是原子的）
+
+        Args:
+            engine: 引擎名称（'google'、'metaso'、'tavily'、'baidu'）
+            enforce: 是否检查额度和速率；False 时只记账（付费后备引擎）
+
+        Returns:
+            True 表示已扣减、可以发起搜索；False 表示额度用尽或触发速率限制
+        """
+        now = time.time()
+        day, month = self._periods(now)
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if enforce:
+                usage = self._read_usage(conn, engine, day, month)
+                if self._remaining_from_usage(engine, usage) <= 0:
+                    conn.execute("ROLLBACK")
+                    self._count("quota_denied")
+                    return False
+                if not self._take_token(conn, engine, now):
+                    conn.execute("ROLLBACK")
+                    self._count("rate_limited")
+                    return False
+
+            for scope, period in (('day', day), ('month', month)):
+                conn.execute(
+                    "INSERT INTO quota_usage (engine, scope, period, count) VALUES (?, ?, ?, 1) "
+                    "ON CONFLICT(engine, scope, period) DO UPDATE SET count = count + 1",
+                    (engine, scope, period)
+                )
+            conn.execute("COMMIT")
+            self._count("acquired")
+            return True
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self._count("errors")
+            # 账本故障不应阻塞搜索：放行本次请求
+            logger.warning(f"⚠️  额度账本扣减失败（放行本次搜索）: {engine}, {str(e)}")
+            return True
+
+    def get_usage(self, engine: str) -> Dict[str, int]:
+        """
+        获取引擎在当前窗口的使用量（所有进程合计）
+
+        Returns:
+            {"day": 今日次数, "month": 本月次数}
+        """
+        day, month = self._periods()
+        try:
+            return self._read_usage(self._connect(), engine, day, month)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  读取额度账本失败: {engine}, {str(e)}")
+            return {'day': 0, 'month': 0}
+
+    def remaining(self, engine: str) -> int:
+        """
+        获取引擎当前剩余额度（取天/月窗口中较小者，不限额时为 UNLIMITED）
+        """
+        return self._remaining_from_usage(engine, self.get_usage(engine))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取所有引擎的额度快照
+
+        Returns:
+            {engine: {"day": int, "month": int, "remaining": int|None, "daily_limit": ..., "monthly_limit": ...}}
+        """
+        result = {}
+        for engine, quota in self.engines.items():
+            usage = self.get_usage(engine)
+            remaining = self._remaining_from_usage(engine, usage)
+            result[engine] = {
+                **usage,
+                "remaining": None if remaining == UNLIMITED else remaining,
+                "daily_limit": quota.get('daily_limit'),
+                "monthly_limit": quota.get('monthly_limit')
+            }
+        return result
+
+    def _prune(self):
+        """删除过期窗口的计数"""
+        now = datetime.now(timezone.utc)
+        oldest_day = (now - timedelta(days=_KEEP_DAYS)).strftime('%Y-%m-%d')
+        oldest_month = (now.replace(day=1) - timedelta(days=31 * _KEEP_MONTHS)).strftime('%Y-%m')
+        try:
+            conn = self._connect()
+            conn.execute("DELETE FROM quota_usage WHERE scope = 'day' AND period < ?", (oldest_day,))
+            conn.execute("DELETE FROM quota_usage WHERE scope = 'month' AND period < ?", (oldest_month,))
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  清理额度账本失败: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息（当前进程）"""
+        with self._stats_lock:
+            return dict(self.stats)
+
+
+# 全局实例
+_quota_ledger: Optional[SearchQuotaLedger] = None
+_quota_ledger_lock = threading.Lock()
+
+
+def get_search_quota_ledger() -> Optional[SearchQuotaLedger]:
+    """
+    获取全局搜索额度账本实例
+
+    配置来源：config/search.yaml 中的 search.quota
+
+    Returns:
+        SearchQuotaLedger实例；配置禁用时返回 None（回退到各进程内存计数）
+    """
+    global _quota_ledger
+    if _quota_ledger is None:
+        with _quota_ledger_lock:
+            if _quota_ledger is None:
+                quota_config = {}
+                try:
+                    from core.config_loader import get_config
+                    quota_config = get_config().get_search_config().get('quota', {}) or {}
+                except Exception as e:
+                    logger.warning(f"读取搜索额度配置失败，使用默认值: {str(e)}")
+                if not quota_config.get('enabled', True):
+                    return None
+                db_path = quota_config.get('db_path')
+                _quota_ledger = SearchQuotaLedger(
+                    db_path=str(PROJECT_ROOT / db_path) if db_path else None,
+                    engines=quota_config.get('engines')
+                )
+    return _quota_ledger
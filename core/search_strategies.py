@@ -6,6 +6,9 @@
 将搜索引擎选择逻辑封装到独立的策略类中。
 """
 
+import asyncio
+import functools
+import sys
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
@@ -47,13 +50,56 @@ class SearchContext:
         """
         return getattr(self, f"{engine_name}_remaining", 0) > 0
 
+    @classmethod
+    def from_client(cls, client, ledger=None) -> 'SearchContext':
+        """
+        根据客户端创建上下文
+
+        有额度账本时读取所有进程共享的剩余额度；否则使用客户端的进程内计数器。
+        未配置的引擎剩余额度为 0。
+
+        Args:
+            client: UnifiedLLMClient 实例
+            ledger: SearchQuotaLedger 实例（可选）
+        """
+        enabled = {
+            'google': bool(getattr(client, 'google_hunter', None)),
+            'metaso': bool(getattr(client, 'metaso_client', None)),
+            'tavily': True,
+            'baidu': bool(getattr(client, 'baidu_hunter', None)),
+        }
+        if ledger is not None:
+            remaining = {engine: ledger.remaining(engine) if on else 0 for engine, on in enabled.items()}
+        else:
+            remaining = {
+                'google': 10000 - client.google_usage if enabled['google'] else 0,
+                'metaso': 5000 - client.metaso_client.usage_count if enabled['metaso'] else 0,
+                'tavily': 1000 - client.tavily_usage,
+                'baidu': 100 - client.baidu_usage if enabled['baidu'] else 0,
+            }
+        return cls(
+            google_remaining=remaining['google'],
+            metaso_remaining=remaining['metaso'],
+            tavily_remaining=remaining['tavily'],
+            baidu_remaining=remaining['baidu']
+        )
+
 
 # ========================================
 # 2. 定义策略接口
 # ========================================
 
 class SearchStrategy(ABC):
-    """搜索引擎策略接口"""
+    """
+    搜索引擎策略接口
+
+    Attributes:
+        engine: 使用的搜索引擎（额度账本中的名称）
+        quota_enforced: 是否受额度限制；False 表示付费后备引擎，只记账不拦截
+    """
+
+    engine: str = ''
+    quota_enforced: bool = True
 
     @abstractmethod
     def can_handle(self, query: str, context: SearchContext) -> bool:
@@ -72,7 +118,8 @@ class SearchStrategy(ABC):
     @abstractmethod
     def search(self, client, query: str, max_results: int,
                include_domains: Optional[List[str]] = None,
-               country_code: str = "CN") -> List[Dict[str, Any]]:
+               country_code: str = "CN",
+               context: Optional[SearchContext] = None) -> List[Dict[str, Any]]:
         """
         执行搜索
 
@@ -82,12 +129,37 @@ class SearchStrategy(ABC):
             max_results: 最大结果数
             include_domains: 包含的域名列表
             country_code: 国家代码
+            context: 搜索上下文（用于日志中的剩余额度）
 
         Returns:
             搜索结果列表
         """
         pass
 
+    async def search_async(self, client, query: str, max_results: int,
+                           include_domains: Optional[List[str]] = None,
+                           country_code: str = "CN",
+                           context: Optional[SearchContext] = None) -> List[Dict[str, Any]]:
+        """
+        执行搜索（异步版本）
+
+        默认在当前事件循环的线程池中执行同步 search()（Google、Baidu、Metaso 目前都走这里，
+        仍由线程执行）；有原生异步实现的策略（Tavily）覆盖此方法。
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(self.search, client, query, max_results, include_domains, country_code,
+                              context=context)
+        )
+
+    def _remaining_text(self, context: Optional[SearchContext]) -> str:
+        """剩余免费额度（日志用）"""
+        if context is None:
+            return "未知"
+        remaining = getattr(context, f"{self.engine}_remaining", 0)
+        return "不限" if remaining >= sys.maxsize else f"{remaining:,}"
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -113,6 +185,8 @@ class ChineseGoogleStrategy(SearchStrategy):
     搜索引擎: Google
     """
 
+    engine = 'google'
+
     def can_handle(self, query: str, context: SearchContext) -> bool:
         """中文内容且 Google 可用时使用"""
         is_chinese = any('\u4e00' <= c <= '\u9fff' for c in query)
@@ -120,11 +194,12 @@ class ChineseGoogleStrategy(SearchStrategy):
 
     def search(self, client, query: str, max_results: int,
                include_domains: Optional[List[str]] = None,
-               country_code: str = "CN") -> List[Dict[str, Any]]:
+               country_code: str = "CN",
+               context: Optional[SearchContext] = None) -> List[Dict[str, Any]]:
         """执行 Google 搜索"""
         return client._search_with_google(
             query, max_results, country_code,
-            reason=f"中文内容（Google优先，剩余免费: {context.google_remaining:,}）"
+            reason=f"中文内容（Google优先，剩余免费: {self._remaining_text(context)}）"
         )
 
     @property
@@ -145,6 +220,8 @@ class ChineseMetasoStrategy(SearchStrategy):
     搜索引擎: Metaso
     """
 
+    engine = 'metaso'
+
     def can_handle(self, query: str, context: SearchContext) -> bool:
         """中文内容且 Metaso 可用时使用"""
         is_chinese = any('\u4e00' <= c <= '\u9fff' for c in query)
@@ -152,11 +229,12 @@ class ChineseMetasoStrategy(SearchStrategy):
 
     def search(self, client, query: str, max_results: int,
                include_domains: Optional[List[str]] = None,
-               country_code: str = "CN") -> List[Dict[str, Any]]:
+               country_code: str = "CN",
+               context: Optional[SearchContext] = None) -> List[Dict[str, Any]]:
         """执行 Metaso 搜索"""
         return client._search_with_metaso(
             query, max_results, include_domains,
-            reason=f"中文内容（剩余免费: {context.metaso_remaining:,}）"
+            reason=f"中文内容（剩余免费: {self._remaining_text(context)}）"
         )
 
     @property
@@ -177,6 +255,8 @@ class ChineseBaiduStrategy(SearchStrategy):
     搜索引擎: Baidu
     """
 
+    engine = 'baidu'
+
     def can_handle(self, query: str, context: SearchContext) -> bool:
         """中文内容且 Baidu 可用时使用"""
         is_chinese = any('\u4e00' <= c <= '\u9fff' for c in query)
@@ -184,11 +264,12 @@ class ChineseBaiduStrategy(SearchStrategy):
 
     def search(self, client, query: str, max_results: int,
                include_domains: Optional[List[str]] = None,
-               country_code: str = "CN") -> List[Dict[str, Any]]:
+               country_code: str = "CN",
+               context: Optional[SearchContext] = None) -> List[Dict[str, Any]]:
         """执行 Baidu 搜索"""
         return client._search_with_baidu(
             query, max_results,
-            reason=f"中文内容（剩余免费: {context.baidu_remaining:,}）"
+            reason=f"中文内容（剩余免费: {self._remaining_text(context)}）"
         )
 
     @property
@@ -209,6 +290,8 @@ class EnglishGoogleStrategy(SearchStrategy):
     搜索引擎: Google
     """
 
+    engine = 'google'
+
     def can_handle(self, query: str, context: SearchContext) -> bool:
         """英语内容且 Google 可用时使用"""
         if not query:
@@ -220,11 +303,12 @@ class EnglishGoogleStrategy(SearchStrategy):
 
     def search(self, client, query: str, max_results: int,
                include_domains: Optional[List[str]] = None,
-               country_code: str = "CN") -> List[Dict[str, Any]]:
+               country_code: str = "CN",
+               context: Optional[SearchContext] = None) -> List[Dict[str, Any]]:
         """执行 Google 搜索"""
         return client._search_with_google(
             query, max_results, country_code,
-            reason=f"英语内容（Google优先，剩余免费: {context.google_remaining:,}）"
+            reason=f"英语内容（Google优先，剩余免费: {self._remaining_text(context)}）"
         )
 
     @property
@@ -245,6 +329,8 @@ class EnglishMetasoStrategy(SearchStrategy):
     搜索引擎: Metaso
     """
 
+    engine = 'metaso'
+
     def can_handle(self, query: str, context: SearchContext) -> bool:
         """英语内容且 Metaso 可用时使用"""
         if not query:
@@ -256,11 +342,12 @@ class EnglishMetasoStrategy(SearchStrategy):
 
     def search(self, client, query: str, max_results: int,
                include_domains: Optional[List[str]] = None,
-               country_code: str = "CN") -> List[Dict[str, Any]]:
+               country_code: str = "CN",
+               context: Optional[SearchContext] = None) -> List[Dict[str, Any]]:
         """执行 Metaso 搜索"""
         return client._search_with_metaso(
             query, max_results, include_domains,
-            reason=f"英语内容（剩余免费: {context.metaso_remaining:,}）"
+            reason=f"英语内容（剩余免费: {self._remaining_text(context)}）"
         )
 
     @property
@@ -281,17 +368,20 @@ class DefaultGoogleStrategy(SearchStrategy):
     搜索引擎: Google
     """
 
+    engine = 'google'
+
     def can_handle(self, query: str, context: SearchContext) -> bool:
         """总是优先尝试 Google"""
         return context.is_available('google')
 
     def search(self, client, query: str, max_results: int,
                include_domains: Optional[List[str]] = None,
-               country_code: str = "CN") -> List[Dict[str, Any]]:
+               country_code: str = "CN",
+               context: Optional[SearchContext] = None) -> List[Dict[str, Any]]:
         """执行 Google 搜索"""
         return client._search_with_google(
             query, max_results, country_code,
-            reason=f"非英语内容（Google优先，剩余免费: {context.google_remaining:,}）"
+            reason=f"非英语内容（Google优先，剩余免费: {self._remaining_text(context)}）"
         )
 
     @property
@@ -303,28 +393,53 @@ class DefaultGoogleStrategy(SearchStrategy):
         return 1
 
 
-class DefaultTavilyStrategy(SearchStrategy):
+class _TavilyStrategy(SearchStrategy):
     """
-    默认使用 Tavily 搜索（适用于非中英语）
+    Tavily 策略公共实现（同步走共享 requests 连接池，异步走扇出引擎的共享 httpx AsyncClient）
 
-    优先级: 2
-    语言: 其他
-    搜索引擎: Tavily
+    子类只需提供选择原因、名称和优先级
     """
 
+    engine = 'tavily'
+    quota_enforced = False  # 付费后备：免费额度用尽后仍然可用
+
     def can_handle(self, query: str, context: SearchContext) -> bool:
         """总是可用（作为后备）"""
-        return True  # 总是可用作为最后的选择
+        return True
+
+    def _reason(self, context: Optional[SearchContext]) -> str:
+        """选择 Tavily 的原因（日志用）"""
+        return ""
 
     def search(self, client, query: str, max_results: int,
                include_domains: Optional[List[str]] = None,
-               country_code: str = "CN") -> List[Dict[str, Any]]:
+               country_code: str = "CN",
+               context: Optional[SearchContext] = None) -> List[Dict[str, Any]]:
         """执行 Tavily 搜索"""
-        return client._search_with_tavily(
-            query, max_results, include_domains,
-            reason=f"非英语内容（Tavily优先，剩余免费: {context.tavily_remaining:,}）"
+        return client._search_with_tavily(query, max_results, include_domains, reason=self._reason(context))
+
+    async def search_async(self, client, query: str, max_results: int,
+                           include_domains: Optional[List[str]] = None,
+                           country_code: str = "CN",
+                           context: Optional[SearchContext] = None) -> List[Dict[str, Any]]:
+        """执行 Tavily 搜索（原生异步，共享连接池）"""
+        return await client._search_with_tavily_async(
+            query, max_results, include_domains, reason=self._reason(context)
         )
 
+
+class DefaultTavilyStrategy(_TavilyStrategy):
+    """
+    默认使用 Tavily 搜索（适用于非中英语）
+
+    优先级: 10
+    语言: 其他
+    搜索引擎: Tavily
+    """
+
+    def _reason(self, context: Optional[SearchContext]) -> str:
+        return f"非英语内容（Tavily优先，剩余免费: {self._remaining_text(context)}）"
+
     @property
     def name(self) -> str:
         return "Tavily搜索（默认）"
@@ -334,7 +449,7 @@ class DefaultTavilyStrategy(SearchStrategy):
         return 10  # 最低优先级
 
 
-class FallbackTavilyStrategy(SearchStrategy):
+class FallbackTavilyStrategy(_TavilyStrategy):
     """
     Tavily 作为后备策略（当其他引擎失败时使用）
 
@@ -342,18 +457,8 @@ class FallbackTavilyStrategy(SearchStrategy):
     搜索引擎: Tavily
     """
 
-    def can_handle(self, query: str, context: SearchContext) -> bool:
-        """总是可用（作为后备）"""
-        return True
-
-    def search(self, client, query: str, max_results: int,
-               include_domains: Optional[List[str]] = None,
-               country_code: str = "CN") -> List[Dict[str, Any]]:
-        """执行 Tavily 搜索"""
-        return client._search_with_tavily(
-            query, max_results, include_domains,
-            reason="其他引擎额度用尽"
-        )
+    def _reason(self, context: Optional[SearchContext]) -> str:
+        return "其他引擎额度用尽"
 
     @property
     def name(self) -> str:
@@ -374,10 +479,18 @@ class SearchOrchestrator:
 
     使用策略模式管理多个搜索引擎策略，
     根据查询内容和可用额度自动选择最合适的搜索引擎。
+    配置了额度账本时，剩余额度来自所有进程共享的账本，
+    并在调用引擎前原子扣减额度（扣减失败则尝试下一个策略）。
     """
 
-    def __init__(self):
-        """初始化编排器，定义策略优先级"""
+    def __init__(self, quota_ledger=None):
+        """
+        初始化编排器，定义策略优先级
+
+        Args:
+            quota_ledger: SearchQuotaLedger 实例（可选，None 时使用客户端的进程内计数器）
+        """
+        self.quota_ledger = quota_ledger
         self.strategies = [
             # 中文策略（优先级 1-3）
             ChineseGoogleStrategy(),
@@ -396,6 +509,19 @@ class SearchOrchestrator:
         # 按优先级排序
         self.strategies.sort(key=lambda s: s.priority)
 
+    def build_context(self, client) -> SearchContext:
+        """创建搜索上下文（各搜索引擎的剩余额度）"""
+        return SearchContext.from_client(client, self.quota_ledger)
+
+    def _acquire_quota(self, strategy: SearchStrategy) -> bool:
+        """调用引擎前扣减共享额度（无账本时总是放行）"""
+        if self.quota_ledger is None or not strategy.engine:
+            return True
+        if self.quota_ledger.try_acquire(strategy.engine, enforce=strategy.quota_enforced):
+            return True
+        logger.warning(f"额度不足] {strategy.name}: 共享额度用尽或触发速率限制，尝试下一个策略")
+        return False
+
     def search(self, client, query: str, max_results: int = 20,
                include_domains: Optional[List[str]] = None,
                country_code: str = "CN",
@@ -419,20 +545,18 @@ class SearchOrchestrator:
         """
         # 创建默认上下文（如果未提供）
         if context is None:
-            context = SearchContext(
-                google_remaining=10000 - client.google_usage if client.google_hunter else 0,
-                metaso_remaining=5000 - client.metaso_client.usage_count if client.metaso_client else 0,
-                tavily_remaining=1000 - client.tavily_usage,
-                baidu_remaining=100 - client.baidu_usage if client.baidu_hunter else 0
-            )
+            context = self.build_context(client)
 
         # 遍历策略，找到第一个可以处理的
         for strategy in self.strategies:
             if strategy.can_handle(query, context):
+                if not self._acquire_quota(strategy):
+                    continue
                 logger.info(f"搜索策略] 使用: {strategy.name}")
 
                 try:
-                    results = strategy.search(client, query, max_results, include_domains, country_code)
+                    results = strategy.search(client, query, max_results, include_domains, country_code,
+                                              context=context)
 
                     if results:
                         logger.info(f"搜索成功] {strategy.name} 返回 {len(results)} 个结果")
@@ -448,3 +572,48 @@ class SearchOrchestrator:
         # 所有策略都失败
         logger.error("所有搜索策略失败]")
         return []
+
+    async def search_async(self, client, query: str, max_results: int = 20,
+                           include_domains: Optional[List[str]] = None,
+                           country_code: str = "CN",
+                           context: Optional[SearchContext] = None) -> List[Dict[str, Any]]:
+        """
+        使用策略模式执行搜索（异步版本，策略选择与降级逻辑同 search()）
+
+        Args:
+            client: UnifiedLLMClient 实例
+            query: 搜索查询
+            max_results: 最大结果数
+            include_domains: 包含的域名列表
+            country_code: 国家代码
+            context: 搜索上下文（如果为 None 则自动创建）
+
+        Returns:
+            搜索结果列表
+        """
+        if context is None:
+            context = self.build_context(client)
+
+        for strategy in self.strategies:
+            if strategy.can_handle(query, context):
+                if not self._acquire_quota(strategy):
+                    continue
+                logger.info(f"搜索策略] 使用: {strategy.name}（异步）")
+
+                try:
+                    results = await strategy.search_async(client, query, max_results, include_domains,
+                                                          country_code, context=context)
+
+                    if results:
+                        logger.info(f"搜索成功] {strategy.name} 返回 {len(results)} 个结果")
+                        return results
+                    else:
+                        logger.warning(f"搜索无结果] {strategy.name} 未返回结果，尝试下一个策略")
+                        continue
+
+                except Exception as e:
+                    logger.error(f"搜索失败] {strategy.name}: {str(e)}，尝试下一个策略")
+                    continue
+
+        logger.error("所有搜索策略失败]")
+        return []
@@ -2,15 +2,26 @@
 """
 搜索建议模块
 提供智能搜索建议和自动完成功能
+
+- 前缀索引：历史搜索（年级 + 学科）按词首建立内存字典树，每个节点保存按 频次/最近时间 排序的前 top_k 条，
+  查询只需沿前缀走到节点，耗时与历史条数无关
+- 多文字：统一做 NFKC + casefold，阿拉伯语使用 ArabicNormalizer 统一字母变体并去掉音符，
+  可从去掉冠词 ال 的位置匹配；中日韩文字没有空格分词，每个字符位置都可作为匹配起点
+- 增量更新：后台线程定期只加载上次之后新增的历史记录（分页读完，不跳过），逐条更新索引，不再整体重建；
+  请求线程只读索引，不执行加载
 """
 
-import json
+import re
 import sys
+import threading
+import time
+import unicodedata
 from pathlib import Path
-from typing import List, Dict, Optional, Set
-from collections import defaultdict, Counter
-from datetime import datetime, timedelta
+from typing import Any, List, Dict, Optional, Tuple
+from collections import deque, Counter
+from datetime import datetime, timedelta, timezone
 from utils.logger_utils import get_logger
+from core.arabic_normalizer import ArabicNormalizer
 
 # 添加项目根目录到 Python 路径
 project_root = Path(__file__).parent.parent
@@ -18,28 +29,215 @@ sys.path.insert(0, str(project_root))
 
 logger = get_logger('search_suggestions')
 
+_ARABIC_RE = re.compile('[\u0600-\u06FF]')
+# 阿拉伯语音符（tashkeel）和延长符（tatweel）
+_ARABIC_MARKS_RE = re.compile('[\u064B-\u065F\u0670\u0640]')
+# 不用空格分词的文字：中日韩统一表意文字、假名、谚文
+_CJK_RE = re.compile('[\u3040-\u30FF\u3400-\u4DBF\u4E00-\u9FFF\uAC00-\uD7AF]')
+_ARABIC_ARTICLE = '\u0627\u0644'  # ال
+
+# 增量加载历史时向前多查的时间（秒），覆盖其他worker异步写入的延迟
+_REFRESH_OVERLAP_SECONDS = 300
+
+
+def normalize_suggestion_text(text: str) -> str:
+    """
+    标准化建议文本（索引和查询使用同一规则）
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        NFKC + casefold、阿拉伯语统一变体、空白合并后的文本
+    """
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', text).casefold()
+    if _ARABIC_RE.search(text):
+        text = ArabicNormalizer.normalize(_ARABIC_MARKS_RE.sub('', text))
+    return ' '.join(text.split())
+
+
+def _match_starts(text: str) -> List[int]:
+    """可以作为匹配起点的位置：词首、每个中日韩字符、阿拉伯语冠词 ال 之后"""
+    starts = []
+    for i, char in enumerate(text):
+        if char == ' ':
+            continue
+        word_start = i == 0 or text[i - 1] == ' '
+        if word_start or _CJK_RE.match(char):
+            starts.append(i)
+        if word_start and text.startswith(_ARABIC_ARTICLE, i) and len(text) > i + 2 and text[i + 2] != ' ':
+            starts.append(i + 2)
+    return starts
+
+
+class _TrieNode:
+    """字典树节点：子节点和该前缀下得分最高的 top_k 个键"""
+
+    __slots__ = ('children', 'top')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.top: List[Tuple[str, str]] = []
+
+
+class SuggestionIndex:
+    """
+    前缀索引（线程安全）
+
+    每个键 (country, text) 的得分为 (次数, 最近时间)，只增不减，因此每个节点只需在键得分变化时
+    更新自己的 top_k 列表，就能保持精确的前 top_k 结果
+
+    使用示例：
+        index = SuggestionIndex(top_k=50)
+        index.add('Indonesia', 'Kelas 10 Matematika')
+        index.search('mat', country='Indonesia', limit=10)
+    """
+
+    def __init__(self, top_k: int = 50, max_depth: int = 32):
+        """
+        Args:
+            top_k: 每个节点保留的候选数（即单次查询可返回的最大条数）
+            max_depth: 索引的最大前缀长度，更长的查询在该深度的节点上过滤
+        """
+        self.top_k = max(1, int(top_k))
+        self.max_depth = max(1, int(max_depth))
+        self._lock = threading.Lock()
+        # '' 为所有国家的根节点
+        self._roots: Dict[str, _TrieNode] = {}
+        self._scores: Dict[Tuple[str, str], Tuple[int, float]] = {}
+        self._suffixes: Dict[Tuple[str, str], List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def add(self, country: str, text: str, count: int = 1, timestamp: Optional[float] = None):
+        """
+        记录一次（或 count 次）搜索并更新路径上所有节点的 top_k
+
+        Args:
+            country: 国家
+            text: 展示文本
+            count: 增加的次数
+            timestamp: 搜索时间戳（默认当前时间）
+        """
+        key = (country or '', text)
+        with self._lock:
+            suffixes = self._suffixes.get(key)
+            if suffixes is None:
+                normalized = normalize_suggestion_text(text)
+                if not normalized:
+                    return
+                suffixes = [normalized[i:i + self.max_depth] for i in _match_starts(normalized)]
+                self._suffixes[key] = suffixes
+
+            old_count, old_ts = self._scores.get(key, (0, 0.0))
+            self._scores[key] = (old_count + count, max(old_ts, timestamp if timestamp is not None else time.time()))
+
+            for root_name in {'', key[0]}:
+                root = self._roots.setdefault(root_name, _TrieNode())
+                self._promote(root, key)
+                for suffix in suffixes:
+                    node = root
+                    for char in suffix:
+                        node = node.children.setdefault(char, _TrieNode())
+                        self._promote(node, key)
+
+    def _promote(self, node: _TrieNode, key: Tuple[str, str]):
+        """键的得分增加后更新节点的 top_k（调用方持有锁）"""
+        top, scores = node.top, self._scores
+        score = scores[key]
+        # 常见情况：节点已满且新得分不超过最后一名（此时键一定不在列表中），无需改动
+        if len(top) >= self.top_k and top[-1] != key and score <= scores[top[-1]]:
+            return
+        try:
+            # 得分只增不减，新位置只会在原位置之前
+            hi = top.index(key)
+            del top[hi]
+        except ValueError:
+            if len(top) >= self.top_k:
+                top.pop()
+            hi = len(top)
+        # 二分查找插入位置（列表按得分降序）
+        lo = 0
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if scores[top[mid]] < score:
+                hi = mid
+            else:
+                lo = mid + 1
+        top.insert(lo, key)
+
+    def search(self, prefix: str, country: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        前缀查询
+
+        Args:
+            prefix: 查询前缀（与索引文本做同样的标准化）
+            country: 只返回该国家的建议（可选）
+            limit: 返回数量（不超过 top_k）
+
+        Returns:
+            [{'text', 'country', 'count'}]，按 次数、最近时间 降序
+        """
+        normalized = normalize_suggestion_text(prefix)
+        with self._lock:
+            node = self._roots.get(country or '')
+            for char in normalized[:self.max_depth]:
+                if node is None:
+                    return []
+                node = node.children.get(char)
+            if node is None:
+                return []
+            candidates = list(node.top)
+            if len(normalized) > self.max_depth:
+                candidates = [key for key in candidates
+                              if any(s.startswith(normalized[:len(s)]) for s in self._suffixes[key])]
+            return [
+                {"text": text, "country": key_country, "count": self._scores[(key_country, text)][0]}
+                for key_country, text in candidates[:limit]
+            ]
+
 
 class SearchSuggestions:
     """
     搜索建议引擎
 
     功能:
-    1. 基于历史的建议
+    1. 基于历史的建议（前缀索引，按频次/最近时间排序）
     2. 热门搜索建议
     3. 自动完成
     4. 多语言支持
     """
 
-    def __init__(self, history_file: str = "data/config/search_history.json"):
+    def __init__(self, history_store=None, history_limit: int = 1000, refresh_interval: float = 60.0,
+                 top_k: int = 50):
         """
         初始化搜索建议引擎
 
         Args:
-            history_file: 搜索历史文件路径
+            history_store: 搜索历史存储（默认使用全局 SearchHistoryStore）
+            history_limit: 首次加载的最近历史条数，以及增量加载时每页的条数
+            refresh_interval: 后台线程从存储增量加载新历史的间隔（秒），<=0 表示不自动刷新
+            top_k: 每个前缀保留的候选数（单次最多返回的建议数）
         """
-        self.history_file = Path(history_file)
-        self.search_history: List[Dict] = []
-        self.popular_searches: Dict[str, Counter] = defaultdict(Counter)
+        if history_store is None:
+            from core.search_history_store import get_search_history_store
+            history_store = get_search_history_store()
+        self.history_store = history_store
+        self.history_limit = history_limit
+        self.refresh_interval = refresh_interval
+        self._last_id = 0
+        self._last_ts: Optional[float] = None
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._refresh_stop = threading.Event()
+        # 最近的历史记录（趋势统计使用；后台刷新和请求线程都会写入，读写都在 _history_lock 内）
+        self.search_history: deque = deque(maxlen=max(1, history_limit))
+        self._history_lock = threading.Lock()
+        self.history_index = SuggestionIndex(top_k=top_k)
+        self.popular_index = SuggestionIndex(top_k=top_k)
 
         # 预定义热门搜索
         self.predefined_popular = {
@@ -79,38 +277,92 @@ class SearchSuggestions:
                 "Grade 11 Biology"
             ]
         }
+        # 预定义列表按原顺序排名（靠前的得分更高）
+        for country, texts in self.predefined_popular.items():
+            for i, text in enumerate(texts):
+                self.popular_index.add(country, text, count=len(texts) - i, timestamp=0.0)
 
         self._load_history()
-        self._build_popular_index()
+        if refresh_interval > 0:
+            self.start_refresh()
 
         logger.info("✅ 搜索建议引擎初始化完成")
 
     def _load_history(self):
-        """加载搜索历史"""
-        if not self.history_file.exists():
-            logger.warning(f"搜索历史文件不存在: {self.history_file}")
-            return
-
-        try:
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                self.search_history = json.load(f)
+        """
+        从搜索历史存储加载历史并增量更新索引
 
-            logger.info(f"✅ 加载了 {len(self.search_history)} 条搜索历史")
-        except Exception as e:
-            logger.error(f"加载搜索历史失败: {str(e)}")
+        首次加载最近 history_limit 条；之后按页读完上次加载之后的全部记录（按ID跳过已索引的记录），
+        一个刷新间隔内新增超过 history_limit 条时也不会漏掉较早的记录
+        """
+        with self._refresh_lock:
+            started = time.time()
+            since = self._last_ts - _REFRESH_OVERLAP_SECONDS if self._last_ts is not None else None
+            last_id = self._last_id
+            try:
+                entries, total = self.history_store.query(limit=self.history_limit, since=since)
+                if since is not None:
+                    # 查询按时间倒序：逐页向后翻，直到取完 since 之后的所有记录
+                    page = entries
+                    while len(page) >= self.history_limit:
+                        page, _ = self.history_store.query(limit=self.history_limit, offset=len(entries),
+                                                           since=since)
+                        entries.extend(page)
+
+                # 翻页期间有新写入时同一条记录可能出现两次，按ID去重后从旧到新索引
+                new_entries = {}
+                for entry in entries:
+                    entry_id = entry.get('id') or 0
+                    if entry_id > last_id:
+                        new_entries[entry_id] = entry
+                for entry_id in sorted(new_entries):
+                    self._index_entry(new_entries[entry_id])
+                    self._last_id = max(self._last_id, entry_id)
+
+                if since is None:
+                    logger.info(f"✅ 加载了 {len(new_entries)}/{total} 条搜索历史，索引 {len(self.history_index)} 条建议")
+                elif new_entries:
+                    logger.debug(f"增量加载了 {len(new_entries)} 条搜索历史")
+            except Exception as e:
+                logger.error(f"加载搜索历史失败: {str(e)}")
+                return
+            if self._last_ts is None:
+                # 历史为空：之后的增量加载从本次加载时间开始，而不是再按首次加载只取最近 history_limit 条
+                self._last_ts = started
+
+    def _index_entry(self, entry: Dict[str, Any]):
+        """把一条历史记录加入前缀索引和最近历史"""
+        country = entry.get('country', '')
+        grade = entry.get('grade', '')
+        subject = entry.get('subject', '')
+        timestamp = time.time()
+        if entry.get('timestamp'):
+            from core.search_history_store import SearchHistoryStore
+            timestamp = SearchHistoryStore.parse_timestamp(entry['timestamp'])
+
+        with self._history_lock:
+            self.search_history.append(entry)
+            if not (grade or subject):
+                return
+            self._last_ts = max(self._last_ts or 0.0, timestamp)
+        self.history_index.add(country, f"{grade} {subject}".strip(), timestamp=timestamp)
+
+    def start_refresh(self):
+        """启动后台线程，按 refresh_interval 增量加载新历史（其他worker写入的历史也能被看到）"""
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        self._refresh_stop.clear()
 
-    def _build_popular_index(self):
-        """构建热门搜索索引"""
-        for entry in self.search_history:
-            country = entry.get('country', '')
-            grade = entry.get('grade', '')
-            subject = entry.get('subject', '')
+        def run():
+            while not self._refresh_stop.wait(self.refresh_interval):
+                self._load_history()
 
-            if country and grade and subject:
-                key = f"{country}|{grade}|{subject}"
-                self.popular_searches[country][key] += 1
+        self._refresh_thread = threading.Thread(target=run, name='suggestions-refresh', daemon=True)
+        self._refresh_thread.start()
 
-        logger.info(f"✅ 构建了 {len(self.popular_searches)} 个国家的热门搜索索引")
+    def stop_refresh(self):
+        """停止后台刷新"""
+        self._refresh_stop.set()
 
     def get_suggestions(self,
                        prefix: str,
@@ -120,27 +372,23 @@ class SearchSuggestions:
         获取搜索建议
 
         Args:
-            prefix: 搜索前缀
+            prefix: 搜索前缀（匹配任意词的开头；为空时返回最常搜索的内容）
             country: 国家代码（可选）
             limit: 返回建议数量
 
         Returns:
-            建议列表
+            建议列表（历史建议在前，预定义热门搜索在后）
         """
         suggestions = []
-        prefix_lower = prefix.lower().strip()
-
-        if not prefix_lower:
-            # 如果没有前缀，返回热门搜索
-            return self._get_popular_suggestions(country, limit)
 
         # 1. 从历史中匹配
-        history_suggestions = self._match_from_history(prefix_lower, country, limit)
-        suggestions.extend(history_suggestions)
+        for match in self.history_index.search(prefix, country, limit):
+            suggestions.append({"text": match['text'], "type": "history", "country": match['country'],
+                                "count": match['count']})
 
         # 2. 从预定义热门搜索中匹配
-        predefined_suggestions = self._match_from_predefined(prefix_lower, country, limit)
-        suggestions.extend(predefined_suggestions)
+        for match in self.popular_index.search(prefix, country, limit):
+            suggestions.append({"text": match['text'], "type": "popular", "country": match['country']})
 
         # 3. 去重并限制数量
         unique_suggestions = []
@@ -155,73 +403,7 @@ class SearchSuggestions:
                 if len(unique_suggestions) >= limit:
                     break
 
-        return unique_suggestions[:limit]
-
-    def _get_popular_suggestions(self, country: Optional[str], limit: int) -> List[Dict[str, str]]:
-        """获取热门搜索建议"""
-        suggestions = []
-
-        if country and country in self.predefined_popular:
-            for search_text in self.predefined_popular[country][:limit]:
-                suggestions.append({
-                    "text": search_text,
-                    "type": "popular",
-                    "country": country
-                })
-
-        return suggestions
-
-    def _match_from_history(self, prefix: str, country: Optional[str], limit: int) -> List[Dict[str, str]]:
-        """从历史记录中匹配"""
-        suggestions = []
-
-        for entry in reversed(self.search_history[-1000:]):  # 只看最近1000条
-            entry_country = entry.get('country', '')
-            grade = entry.get('grade', '')
-            subject = entry.get('subject', '')
-
-            # 过滤国家
-            if country and entry_country != country:
-                continue
-
-            # 构建搜索文本
-            search_text = f"{grade} {subject}"
-
-            # 匹配前缀
-            if prefix_lower in search_text.lower():
-                suggestions.append({
-                    "text": search_text,
-                    "type": "history",
-                    "country": entry_country
-                })
-
-                if len(suggestions) >= limit:
-                    break
-
-        return suggestions
-
-    def _match_from_predefined(self, prefix: str, country: Optional[str], limit: int) -> List[Dict[str, str]]:
-        """从预定义热门搜索中匹配"""
-        suggestions = []
-
-        countries_to_check = [country] if country else self.predefined_popular.keys()
-
-        for check_country in countries_to_check:
-            if check_country not in self.predefined_popular:
-                continue
-
-            for search_text in self.predefined_popular[check_country]:
-                if prefix_lower in search_text.lower():
-                    suggestions.append({
-                        "text": search_text,
-                        "type": "popular",
-                        "country": check_country
-                    })
-
-                    if len(suggestions) >= limit:
-                        break
-
-        return suggestions
+        return unique_suggestions
 
     def get_trending_searches(self, country: Optional[str] = None, days: int = 7, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -235,10 +417,14 @@ class SearchSuggestions:
         Returns:
             趋势搜索列表
         """
-        cutoff_date = datetime.now() - timedelta(days=days)
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
         recent_searches: Counter = Counter()
 
-        for entry in self.search_history:
+        # 在锁内复制快照后再遍历（后台刷新和新搜索会同时追加记录）
+        with self._history_lock:
+            history = list(self.search_history)
+
+        for entry in history:
             # 检查时间
             timestamp_str = entry.get('timestamp', '')
             if not timestamp_str:
@@ -246,6 +432,8 @@ class SearchSuggestions:
 
             try:
                 timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+                if timestamp.tzinfo is None:
+                    timestamp = timestamp.replace(tzinfo=timezone.utc)
                 if timestamp < cutoff_date:
                     continue
             except:
@@ -273,35 +461,35 @@ class SearchSuggestions:
 
     def add_search_to_history(self, country: str, grade: str, subject: str):
         """
-        添加搜索到历史
+        添加搜索到内存中的历史和前缀索引（持久化由 SearchHistoryStore 负责）
 
         Args:
             country: 国家
             grade: 年级
             subject: 学科
         """
-        entry = {
+        self._index_entry({
             "country": country,
             "grade": grade,
             "subject": subject,
             "timestamp": datetime.now(timezone.utc).isoformat()
-        }
-
-        self.search_history.append(entry)
-        self._build_popular_index()
+        })
 
         logger.debug(f"添加搜索历史: {country} - {grade} - {subject}")
 
 
 # 全局单例
 _global_suggestions: Optional[SearchSuggestions] = None
+_global_suggestions_lock = threading.Lock()
 
 
 def get_search_suggestions() -> SearchSuggestions:
     """获取全局搜索建议引擎实例"""
     global _global_suggestions
     if _global_suggestions is None:
-        _global_suggestions = SearchSuggestions()
+        with _global_suggestions_lock:
+            if _global_suggestions is None:
+                _global_suggestions = SearchSuggestions()
     return _global_suggestions
 
 
@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+"""
+分段追加式磁盘缓存存储
+用于 MultiLevelCache 的 L3 和 SearchCache，替代"每个键一个JSON文件"的格式
+
+存储布局（store_dir 目录下）:
+    seg-00000001.dat   数据段：只追加的长度前缀记录
+    index.idx          索引：固定长度条目（键摘要 → 段号/偏移/长度/过期时间），mmap 读取
+    store.lock         跨进程写锁（fcntl）
+
+特点:
+1. 写入只追加，不改写已有数据；同一键的新记录覆盖旧记录
+2. 过期扫描只读索引，不解析负载
+3. 压缩时按原始字节复制存活记录，写新段后原子替换索引；自动压缩在后台 maintenance 执行器中进行，不阻塞触发它的写入
+4. 其他进程的写入通过索引文件的追加/替换（inode变化）自动感知
+"""
+
+import os
+import mmap
+import time
+import zlib
+import struct
+import hashlib
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from utils.logger_utils import get_logger
+from core.executor_registry import get_executor, ExecutorSaturatedError
+
+# 跨进程文件锁（仅POSIX）
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+logger = get_logger('segment_store')
+
+INDEX_MAGIC = b'ESIX'
+INDEX_VERSION = 1
+# 索引头: magic, version, generation
+INDEX_HEADER = struct.Struct('<4sIQ')
+# 索引条目: digest, segment_id, offset, length, expires_at, flags（补齐到48字节）
+INDEX_ENTRY = struct.Struct('<16sIQIdI4x')
+# 记录头: digest, expires_at, flags, length, crc32
+RECORD_HEADER = struct.Struct('<16sdIII')
+
+FLAG_TOMBSTONE = 1
+
+
+class SegmentStore:
+    """
+    分段追加式键值存储（值为bytes，序列化由调用方负责）
+
+    使用示例：
+        store = SegmentStore('data/cache/l3_store')
+        store.put('key', b'{"a": 1}', ttl=3600)
+        payload = store.get('key')
+        store.cleanup_expired()
+    """
+
+    def __init__(self,
+                 store_dir: str,
+                 segment_max_bytes: int = 64 * 1024 * 1024,
+                 compact_min_dead_bytes: int = 8 * 1024 * 1024,
+                 compact_dead_ratio: float = 0.5):
+        """
+        初始化存储（索引缺失时从数据段重建）
+
+        Args:
+            store_dir: 存储目录
+            segment_max_bytes: 单个数据段的最大字节数，超过后滚动到新段
+            compact_min_dead_bytes: 触发自动压缩的最小失效字节数
+            compact_dead_ratio: 触发自动压缩的失效字节占比
+        """
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+        self.compact_min_dead_bytes = compact_min_dead_bytes
+        self.compact_dead_ratio = compact_dead_ratio
+
+        self._index_path = self.store_dir / 'index.idx'
+        self._lock_path = self.store_dir / 'store.lock'
+        self._lock = threading.RLock()
+
+        # 内存索引: digest -> (segment_id, offset, length, expires_at)
+        self._index: Dict[bytes, Tuple[int, int, int, float]] = {}
+        self._index_pos = 0
+        self._index_ino = None
+        self._generation = 0
+        self._live_bytes = 0
+        self._dead_bytes = 0
+        self._active_segment_id = 0
+        self._fds: Dict[int, int] = {}
+        self._flock_depth = 0
+        self._compaction_scheduled = False
+
+        # 统计信息
+        self.stats = {
+            "reads": 0,
+            "writes": 0,
+            "deletes": 0,
+            "compactions": 0,
+            "expired_removed": 0,
+            "corrupt_records": 0
+        }
+
+        with self._lock, self._file_lock():
+            if not self._index_path.exists():
+                self._rebuild_index_from_segments()
+            try:
+                self._load_index(full=True)
+            except ValueError as e:
+                logger.warning(f"⚠️ 缓存索引损坏，从数据段重建: {e}")
+                self._rebuild_index_from_segments()
+                self._load_index(full=True)
+
+    # ----------------------------------------
+    # 公共接口
+    # ----------------------------------------
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        读取键对应的负载
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            负载字节，不存在/已过期/损坏时返回None
+        """
+        digest = self._digest(key)
+        with self._lock:
+            self._refresh()
+            entry = self._index.get(digest)
+            if entry is None:
+                return None
+
+            segment_id, offset, length, expires_at = entry
+            if expires_at and expires_at <= time.time():
+                return None
+
+            try:
+                record = self._read(segment_id, offset, RECORD_HEADER.size + length)
+            except OSError:
+                # 数据段已被其他进程压缩删除，重新加载索引后重试一次
+                self._load_index(full=True)
+                entry = self._index.get(digest)
+                if entry is None:
+                    return None
+                segment_id, offset, length, expires_at = entry
+                try:
+                    record = self._read(segment_id, offset, RECORD_HEADER.size + length)
+                except OSError as e:
+                    logger.warning(f"⚠️ 读取缓存段失败: {e}")
+                    return None
+
+            self.stats["reads"] += 1
+            return self._verify_record(record, digest, length)
+
+    def get_expires_at(self, key: str) -> Optional[float]:
+        """
+        获取键的过期时间（只读索引）
+
+        Returns:
+            过期时间戳（0表示永不过期），键不存在时返回None
+        """
+        digest = self._digest(key)
+        with self._lock:
+            self._refresh()
+            entry = self._index.get(digest)
+            return entry[3] if entry is not None else None
+
+    def put(self, key: str, payload: bytes, ttl: Optional[float] = None):
+        """
+        写入键值（追加新记录，旧记录在压缩时回收）
+
+        Args:
+            key: 缓存键
+            payload: 负载字节
+            ttl: 过期时间（秒），None表示永不过期
+        """
+        digest = self._digest(key)
+        expires_at = time.time() + ttl if ttl else 0.0
+        with self._lock, self._file_lock():
+            self._refresh()
+            self._append(digest, payload, expires_at, flags=0)
+            self.stats["writes"] += 1
+            self._maybe_compact()
+
+    def delete(self, key: str) -> bool:
+        """
+        删除键（追加墓碑记录）
+
+        Returns:
+            键是否存在
+        """
+        digest = self._digest(key)
+        with self._lock, self._file_lock():
+            self._refresh()
+            if digest not in self._index:
+                return False
+            self._append(digest, b'', 0.0, flags=FLAG_TOMBSTONE)
+            self.stats["deletes"] += 1
+            return True
+
+    def expired_count(self) -> int:
+        """统计已过期的条目数（只读索引，不解析负载）"""
+        now = time.time()
+        with self._lock:
+            self._refresh()
+            return sum(1 for _, _, _, expires_at in self._index.values()
+                       if expires_at and expires_at <= now)
+
+    def cleanup_expired(self) -> int:
+        """
+        清理过期条目（有过期条目时执行一次压缩）
+
+        Returns:
+            清理的条目数
+        """
+        if self.expired_count() == 0:
+            return 0
+        return self.compact()
+
+    def compact(self) -> int:
+        """
+        压缩：把存活记录按原始字节复制到新段，原子替换索引，删除旧段
+
+        Returns:
+            压缩过程中丢弃的过期条目数
+        """
+        with self._lock, self._file_lock():
+            self._refresh()
+            now = time.time()
+            old_segment_ids = self._segment_ids()
+            next_id = max(old_segment_ids, default=0) + 1
+
+            entries: List[bytes] = []
+            expired = 0
+            out_file = None
+            out_id = next_id
+            out_size = 0
+            try:
+                # 按物理位置顺序读取，尽量顺序I/O
+                for digest, (segment_id, offset, length, expires_at) in sorted(
+                        self._index.items(), key=lambda item: (item[1][0], item[1][1])):
+                    if expires_at and expires_at <= now:
+                        expired += 1
+                        continue
+
+                    try:
+                        record = self._read(segment_id, offset, RECORD_HEADER.size + length)
+                    except OSError:
+                        self.stats["corrupt_records"] += 1
+                        continue
+                    if self._verify_record(record, digest, length) is None:
+                        continue
+
+                    if out_file is not None and out_size + len(record) > self.segment_max_bytes:
+                        out_file.close()
+                        out_file = None
+                        out_id += 1
+                    if out_file is None:
+                        out_file = open(self._segment_path(out_id), 'wb')
+                        out_size = 0
+
+                    entries.append(INDEX_ENTRY.pack(digest, out_id, out_size, length, expires_at, 0))
+                    out_file.write(record)
+                    out_size += len(record)
+
+                if out_file is not None:
+                    out_file.flush()
+                    os.fsync(out_file.fileno())
+            finally:
+                if out_file is not None:
+                    out_file.close()
+
+            self._write_index(self._generation + 1, entries)
+            self._close_fds()
+            for segment_id in old_segment_ids:
+                try:
+                    self._segment_path(segment_id).unlink()
+                except OSError:
+                    pass
+
+            self._load_index(full=True)
+            self.stats["compactions"] += 1
+            self.stats["expired_removed"] += expired
+            logger.info(f"🗜️ 缓存存储压缩完成: {self.store_dir.name}, "
+                        f"保留{len(entries)}条, 清理过期{expired}条")
+            return expired
+
+    def clear(self):
+        """清空所有数据段和索引"""
+        with self._lock, self._file_lock():
+            self._close_fds()
+            for segment_id in self._segment_ids():
+                try:
+                    self._segment_path(segment_id).unlink()
+                except OSError:
+                    pass
+            self._write_index(self._generation + 1, [])
+            self._load_index(full=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._index)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._lock:
+            self._refresh()
+            return {
+                **self.stats,
+                "entries": len(self._index),
+                "segments": len(self._segment_ids()),
+                "live_bytes": self._live_bytes,
+                "dead_bytes": self._dead_bytes,
+                "generation": self._generation
+            }
+
+    def close(self):
+        """关闭打开的数据段文件句柄"""
+        with self._lock:
+            self._close_fds()
+
+    # ----------------------------------------
+    # 索引
+    # ----------------------------------------
+    def _load_index(self, full: bool = False):
+        """
+        从索引文件加载条目（增量：只读取上次之后追加的条目）
+
+        Args:
+            full: 是否强制全量重新加载
+
+        Raises:
+            ValueError: 索引头损坏
+        """
+        try:
+            st = os.stat(self._index_path)
+        except FileNotFoundError:
+            self._write_index(self._generation + 1, [])
+            st = os.stat(self._index_path)
+
+        if full or st.st_ino != self._index_ino or st.st_size < self._index_pos:
+            self._index = {}
+            self._live_bytes = 0
+            self._dead_bytes = 0
+            self._index_pos = 0
+            self._index_ino = st.st_ino
+            self._close_fds()
+            self._active_segment_id = max(self._segment_ids(), default=0)
+
+        if st.st_size < INDEX_HEADER.size:
+            raise ValueError(f"索引文件过短: {st.st_size}字节")
+        if st.st_size <= self._index_pos:
+            return
+
+        with open(self._index_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if self._index_pos == 0:
+                    magic, version, generation = INDEX_HEADER.unpack_from(mm, 0)
+                    if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                        raise ValueError(f"索引文件格式不匹配: {magic!r} v{version}")
+                    self._generation = generation
+                    self._index_pos = INDEX_HEADER.size
+
+                # 忽略末尾不完整的条目（写入中途崩溃）
+                entry_count = (len(mm) - INDEX_HEADER.size) // INDEX_ENTRY.size
+                end = INDEX_HEADER.size + entry_count * INDEX_ENTRY.size
+                for pos in range(self._index_pos, end, INDEX_ENTRY.size):
+                    self._apply_entry(*INDEX_ENTRY.unpack_from(mm, pos))
+                self._index_pos = end
+
+    def _refresh(self):
+        """感知其他进程的写入（索引追加或被替换）"""
+        try:
+            st = os.stat(self._index_path)
+        except FileNotFoundError:
+            self._load_index(full=True)
+            return
+        if st.st_ino != self._index_ino or st.st_size != self._index_pos:
+            try:
+                self._load_index()
+            except ValueError as e:
+                logger.warning(f"⚠️ 刷新缓存索引失败: {e}")
+
+    def _apply_entry(self, digest: bytes, segment_id: int, offset: int,
+                     length: int, expires_at: float, flags: int):
+        """将一条索引条目应用到内存索引，并更新存活/失效字节数"""
+        old = self._index.pop(digest, None)
+        if old is not None:
+            old_size = RECORD_HEADER.size + old[2]
+            self._live_bytes -= old_size
+            self._dead_bytes += old_size
+
+        if flags & FLAG_TOMBSTONE:
+            self._dead_bytes += RECORD_HEADER.size
+        else:
+            self._index[digest] = (segment_id, offset, length, expires_at)
+            self._live_bytes += RECORD_HEADER.size + length
+
+    def _write_index(self, generation: int, entries: List[bytes]):
+        """写入新的索引文件（临时文件 + 原子替换）"""
+        tmp_path = self._index_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, generation))
+            for entry in entries:
+                f.write(entry)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._index_path)
+
+    def _rebuild_index_from_segments(self):
+        """扫描数据段的记录头重建索引（不解析负载）"""
+        entries = []
+        for segment_id in self._segment_ids():
+            for offset, (digest, expires_at, flags, length, _) in self._scan_segment(segment_id):
+                entries.append(INDEX_ENTRY.pack(digest, segment_id, offset, length, expires_at, flags))
+        self._write_index(self._generation + 1, entries)
+        if entries:
+            logger.info(f"✅ 已从数据段重建缓存索引: {self.store_dir.name}, {len(entries)}条记录")
+
+    def _scan_segment(self, segment_id: int) -> Iterator[Tuple[int, tuple]]:
+        """遍历数据段中的记录头，返回 (偏移, 记录头)"""
+        path = self._segment_path(segment_id)
+        size = path.stat().st_size
+        with open(path, 'rb') as f:
+            offset = 0
+            while offset + RECORD_HEADER.size <= size:
+                f.seek(offset)
+                header = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+                length = header[3]
+                if offset + RECORD_HEADER.size + length > size:
+                    break  # 末尾记录不完整
+                yield offset, header
+                offset += RECORD_HEADER.size + length
+
+    # ----------------------------------------
+    # 数据段
+    # ----------------------------------------
+    def _append(self, digest: bytes, payload: bytes, expires_at: float, flags: int):
+        """追加一条记录到活动数据段，并追加索引条目（调用方需持有锁）"""
+        record = RECORD_HEADER.pack(digest, expires_at, flags, len(payload), zlib.crc32(payload)) + payload
+        segment_id = self._active_segment(len(record))
+
+        with open(self._segment_path(segment_id), 'ab') as f:
+            offset = f.tell()
+            f.write(record)
+
+        entry = INDEX_ENTRY.pack(digest, segment_id, offset, len(payload), expires_at, flags)
+        with open(self._index_path, 'ab') as f:
+            if f.tell() != self._index_pos:
+                # 丢弃崩溃遗留的不完整条目，保证条目对齐
+                f.truncate(self._index_pos)
+            f.write(entry)
+
+        self._apply_entry(digest, segment_id, offset, len(payload), expires_at, flags)
+        self._index_pos += INDEX_ENTRY.size
+
+    def _active_segment(self, record_size: int) -> int:
+        """返回可写入的数据段编号，当前段已满时滚动到新段"""
+        if self._active_segment_id == 0:
+            self._active_segment_id = max(self._segment_ids(), default=0) + 1
+            return self._active_segment_id
+
+        try:
+            size = self._segment_path(self._active_segment_id).stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size and size + record_size > self.segment_max_bytes:
+            self._active_segment_id = max(self._segment_ids(), default=self._active_segment_id) + 1
+        return self._active_segment_id
+
+    def _read(self, segment_id: int, offset: int, size: int) -> bytes:
+        """从数据段读取指定范围的字节"""
+        fd = self._fds.get(segment_id)
+        if fd is None:
+            fd = os.open(self._segment_path(segment_id), os.O_RDONLY)
+            self._fds[segment_id] = fd
+        if hasattr(os, 'pread'):
+            return os.pread(fd, size, offset)
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.read(fd, size)
+
+    def _verify_record(self, record: bytes, digest: bytes, length: int) -> Optional[bytes]:
+        """校验记录头和CRC，返回负载"""
+        if len(record) < RECORD_HEADER.size + length:
+            self.stats["corrupt_records"] += 1
+            return None
+        record_digest, _, _, record_length, crc = RECORD_HEADER.unpack_from(record, 0)
+        payload = record[RECORD_HEADER.size:RECORD_HEADER.size + length]
+        if record_digest != digest or record_length != length or zlib.crc32(payload) != crc:
+            self.stats["corrupt_records"] += 1
+            return None
+        return payload
+
+    def _needs_compaction(self) -> bool:
+        """失效字节是否超过自动压缩阈值"""
+        total = self._live_bytes + self._dead_bytes
+        return bool(self._dead_bytes >= self.compact_min_dead_bytes and
+                    total and self._dead_bytes / total >= self.compact_dead_ratio)
+
+    def _maybe_compact(self):
+        """
+        失效字节超过阈值时安排一次后台压缩（调用方需持有线程锁）
+
+        压缩不在写入路径上执行，触发它的 put() 立即返回；同一时间最多安排一次，
+        执行器饱和时跳过，由之后的写入再次尝试
+        """
+        if self._compaction_scheduled or not self._needs_compaction():
+            return
+        self._compaction_scheduled = True
+        try:
+            get_executor('maintenance').submit(self._background_compact)
+        except ExecutorSaturatedError:
+            self._compaction_scheduled = False
+            logger.debug(f"维护执行器已饱和，暂不压缩缓存存储: {self.store_dir.name}")
+
+    def _background_compact(self):
+        """后台压缩入口：其他进程可能已经压缩过，执行前重新检查阈值"""
+        try:
+            with self._lock:
+                self._refresh()
+                if not self._needs_compaction():
+                    return
+            self.compact()
+        except Exception as e:
+            logger.warning(f"⚠️ 后台压缩缓存存储失败: {self.store_dir.name}, {e}")
+        finally:
+            with self._lock:
+                self._compaction_scheduled = False
+
+    def _segment_ids(self) -> List[int]:
+        """列出现有数据段编号（升序）"""
+        ids = []
+        for path in self.store_dir.glob('seg-*.dat'):
+            try:
+                ids.append(int(path.stem[4:]))
+            except ValueError:
+                continue
+        return sorted(ids)
+
+    def _segment_path(self, segment_id: int) -> Path:
+        return self.store_dir / f"seg-{segment_id:08d}.dat"
+
+    def _close_fds(self):
+        for fd in self._fds.values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._fds = {}
+
+    @contextmanager
+    def _file_lock(self):
+        """
+        跨进程写锁（调用方需先持有线程锁；可重入；无fcntl时仅使用线程锁）
+        """
+        if not HAS_FCNTL or self._flock_depth > 0:
+            self._flock_depth += 1
+            try:
+                yield
+            finally:
+                self._flock_depth -= 1
+            return
+
+        with open(self._lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            self._flock_depth += 1
+            try:
+                yield
+            finally:
+                self._flock_depth -= 1
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _digest(key: str) -> bytes:
+        return hashlib.md5(key.encode('utf-8')).digest()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+请求合并（Single-Flight）
+同一时刻相同键的多个调用只执行一次，其余调用等待并共享该次执行的结果
+
+适用场景:
+1. 同一国家/年级/学科的搜索请求在短时间内集中到达（如整班学生同时打开工具）
+2. 并行搜索中相同引擎+相同查询的上游API调用
+
+注意：结果对象在调用方之间共享，如需修改请先复制
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from utils.logger_utils import get_logger
+
+logger = get_logger('single_flight')
+
+
+class _Call:
+    """一次进行中的调用"""
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    线程版请求合并
+
+    使用示例：
+        flight = get_single_flight('search_request')
+        response, shared = flight.do(key, engine.execute, request)
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: 名称（用于日志和统计）
+        """
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.stats = {
+            "calls": 0,
+            "executions": 0,
+            "shared": 0,
+            "wait_timeouts": 0
+        }
+
+    def do(self, key: Hashable, func: Callable, *args,
+           wait_timeout: Optional[float] = None, **kwargs) -> Tuple[Any, bool]:
+        """
+        执行调用；若相同键的调用正在进行，则等待并共享其结果
+
+        Args:
+            key: 合并键
+            func: 实际执行的函数
+            wait_timeout: 跟随者最长等待时间（秒），超时后自行执行；None 表示一直等待
+            *args, **kwargs: 传给 func 的参数
+
+        Returns:
+            (结果, 是否为共享结果)
+
+        Raises:
+            执行者抛出的异常会传递给所有等待者
+        """
+        with self._lock:
+            self.stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            if not call.event.wait(wait_timeout):
+                with self._lock:
+                    self.stats["wait_timeouts"] += 1
+                logger.warning(f"⏱️ [{self.name}] 等待进行中的调用超时 ({wait_timeout}秒)，改为独立执行")
+                return func(*args, **kwargs), False
+
+            with self._lock:
+                self.stats["shared"] += 1
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                self.stats["executions"] += 1
+                if call.waiters:
+                    logger.info(f"🔗 [{self.name}] 合并了 {call.waiters} 个重复调用")
+            call.event.set()
+
+    def in_flight(self) -> int:
+        """当前进行中的调用数"""
+        with self._lock:
+            return len(self._calls)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._lock:
+            return {**self.stats, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """
+    协程版请求合并（只能在同一个事件循环内使用，如异步搜索扇出引擎的循环）
+
+    使用示例：
+        flight = get_async_single_flight('engine_search')
+        results, shared = await flight.do(key, lambda: client.search_async(query))
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: 名称（用于日志和统计）
+        """
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[Hashable, int] = {}
+
+        # 统计信息
+        self.stats = {
+            "calls": 0,
+            "executions": 0,
+            "shared": 0
+        }
+
+    async def do(self, key: Hashable, coro_factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        执行协程；若相同键的协程正在进行，则等待并共享其结果
+
+        跟随者被取消不会影响执行者；执行者被取消时，跟随者收到 RuntimeError
+
+        Args:
+            key: 合并键
+            coro_factory: 无参函数，调用后返回待执行的协程
+
+        Returns:
+            (结果, 是否为共享结果)
+        """
+        self.stats["calls"] += 1
+        future = self._calls.get(key)
+        if future is not None:
+            self._waiters[key] = self._waiters.get(key, 0) + 1
+            self.stats["shared"] += 1
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self._waiters[key] = 0
+        try:
+            result = await coro_factory()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            if self._waiters.get(key):
+                if isinstance(e, asyncio.CancelledError):
+                    future.set_exception(RuntimeError(f"[{self.name}] 合并的调用已被取消"))
+                else:
+                    future.set_exception(e)
+            else:
+                # 没有跟随者时直接取消，避免 "exception was never retrieved" 警告
+                future.cancel()
+            raise
+        finally:
+            self._calls.pop(key, None)
+            waiters = self._waiters.pop(key, 0)
+            self.stats["executions"] += 1
+            if waiters:
+                logger.info(f"🔗 [{self.name}] 合并了 {waiters} 个重复调用")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        return {**self.stats, "in_flight": len(self._calls)}
+
+
+# 全局实例（按名称）
+_flights: Dict[str, SingleFlight] = {}
+_async_flights: Dict[str, AsyncSingleFlight] = {}
+_flights_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """
+    获取指定名称的全局请求合并器（单例模式）
+
+    Args:
+        name: 名称，如 'search_request'、'engine_search'
+
+    Returns:
+        SingleFlight实例
+    """
+    with _flights_lock:
+        if name not in _flights:
+            _flights[name] = SingleFlight(name)
+        return _flights[name]
+
+
+def get_async_single_flight(name: str) -> AsyncSingleFlight:
+    """
+    获取指定名称的全局协程版请求合并器（单例模式）
+
+    Args:
+        name: 名称
+
+    Returns:
+        AsyncSingleFlight实例
+    """
+    with _flights_lock:
+        if name not in _async_flights:
+            _async_flights[name] = AsyncSingleFlight(name)
+        return _async_flights[name]
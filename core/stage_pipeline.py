@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+分阶段流水线
+把一批任务拆成多个阶段（如 下载 → 转录 → LLM评估），每个阶段有独立的工作线程数，
+阶段之间用有界队列连接：第 N+1 个任务下载时，第 N 个任务可以同时在评估
+
+特点:
+1. 各阶段独立限流（网络/CPU/LLM 分别控制并发）
+2. 有界队列提供背压，上游不会无限超前（控制磁盘和内存占用）
+3. 阶段函数可提前结束任务（设置 item.result），异常只影响单个任务
+4. 按任务完成报告进度
+"""
+
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from utils.logger_utils import get_logger
+
+logger = get_logger('stage_pipeline')
+
+_STOP = object()
+
+
+@dataclass
+class PipelineItem:
+    """
+    流水线中的任务
+
+    Attributes:
+        index: 任务在输入列表中的位置
+        data: 任务数据（阶段函数可读写）
+        result: 最终结果；阶段函数设置后任务提前结束，跳过后续阶段
+        error: 阶段函数抛出的异常（任务随之结束）
+        stage: 任务结束时所在的阶段
+    """
+    index: int
+    data: Any
+    result: Any = None
+    error: Optional[BaseException] = None
+    stage: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.result is not None or self.error is not None
+
+
+@dataclass
+class PipelineStage:
+    """
+    流水线阶段
+
+    Attributes:
+        name: 阶段名称（用于日志和进度）
+        func: 阶段函数，参数为 PipelineItem
+        workers: 该阶段的并发数
+    """
+    name: str
+    func: Callable[[PipelineItem], None]
+    workers: int = 1
+    processed: int = field(default=0, init=False)
+
+
+class StagedPipeline:
+    """
+    分阶段流水线
+
+    使用示例：
+        pipeline = StagedPipeline([
+            PipelineStage('download', download, workers=3),
+            PipelineStage('transcribe', transcribe, workers=1),
+            PipelineStage('evaluate', evaluate, workers=2),
+        ], queue_size=2, on_progress=report)
+        items = pipeline.run(videos)
+    """
+
+    def __init__(self, stages: List[PipelineStage], queue_size: int = 2, name: str = 'pipeline',
+                 on_progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Args:
+            stages: 阶段列表（按执行顺序）
+            queue_size: 阶段之间的队列容量（背压）
+            name: 名称（用于日志和线程名）
+            on_progress: 每个任务结束时调用，参数为进度快照（见 get_progress）
+        """
+        if not stages:
+            raise ValueError("流水线至少需要一个阶段")
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.name = name
+        self.on_progress = on_progress
+        self._lock = threading.Lock()
+        self._total = 0
+        self._completed = 0
+        self._failed = 0
+
+    def run(self, payloads: List[Any]) -> List[PipelineItem]:
+        """
+        执行流水线（阻塞直到所有任务结束）
+
+        Args:
+            payloads: 任务数据列表
+
+        Returns:
+            PipelineItem 列表（与输入顺序一致）
+        """
+        self._total = len(payloads)
+        self._completed = 0
+        self._failed = 0
+        for stage in self.stages:
+            stage.processed = 0
+        if not payloads:
+            return []
+
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        done: queue.Queue = queue.Queue()
+        remaining_workers = [max(1, stage.workers) for stage in self.stages]
+        threads = []
+
+        def worker(stage_index: int):
+            stage = self.stages[stage_index]
+            in_queue = queues[stage_index]
+            while True:
+                item = in_queue.get()
+                if item is _STOP:
+                    break
+                try:
+                    stage.func(item)
+                except Exception as e:
+                    logger.warning(f"⚠️  [{self.name}] 阶段 {stage.name} 处理任务 #{item.index} 失败: {str(e)}")
+                    item.error = e
+                with self._lock:
+                    stage.processed += 1
+
+                if item.finished or stage_index == len(self.stages) - 1:
+                    item.stage = stage.name
+                    done.put(item)
+                else:
+                    queues[stage_index + 1].put(item)
+
+            # 本阶段最后一个退出的线程通知下一阶段结束
+            with self._lock:
+                remaining_workers[stage_index] -= 1
+                last = remaining_workers[stage_index] == 0
+            if last and stage_index + 1 < len(self.stages):
+                for _ in range(max(1, self.stages[stage_index + 1].workers)):
+                    queues[stage_index + 1].put(_STOP)
+
+        for stage_index, stage in enumerate(self.stages):
+            for i in range(max(1, stage.workers)):
+                thread = threading.Thread(
+                    target=worker, args=(stage_index,), name=f"{self.name}-{stage.name}-{i}", daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        def feed():
+            for index, payload in enumerate(payloads):
+                queues[0].put(PipelineItem(index=index, data=payload))
+            for _ in range(max(1, self.stages[0].workers)):
+                queues[0].put(_STOP)
+
+        feeder = threading.Thread(target=feed, name=f"{self.name}-feeder", daemon=True)
+        feeder.start()
+
+        items: List[Optional[PipelineItem]] = [None] * len(payloads)
+        for _ in range(len(payloads)):
+            item = done.get()
+            items[item.index] = item
+            with self._lock:
+                self._completed += 1
+                if item.error is not None:
+                    self._failed += 1
+            self._report_progress()
+
+        feeder.join()
+        for thread in threads:
+            thread.join()
+        return items
+
+    def get_progress(self) -> Dict[str, Any]:
+        """
+        获取进度快照
+
+        Returns:
+            {
+                "total": int,  # 任务总数
+                "completed": int,  # 已结束的任务数
+                "failed": int,  # 因异常结束的任务数
+                "stages": {阶段名称: 已处理任务数}
+            }
+        """
+        with self._lock:
+            return {
+                "total": self._total,
+                "completed": self._completed,
+                "failed": self._failed,
+                "stages": {stage.name: stage.processed for stage in self.stages}
+            }
+
+    def _report_progress(self):
+        progress = self.get_progress()
+        stages = ', '.join(f"{name} {count}/{progress['total']}" for name, count in progress['stages'].items())
+        logger.info(f"📊 [{self.name}] 进度 {progress['completed']}/{progress['total']}（{stages}）")
+        if self.on_progress:
+            try:
+                self.on_progress(progress)
+            except Exception as e:
+                logger.warning(f"⚠️  [{self.name}] 进度回调失败: {str(e)}")
@@ -22,6 +22,7 @@ except ImportError:
     HAS_WHISPER = False
 
 from utils.logger_utils import get_logger
+from core.transcription_service import get_transcription_service
 
 logger = get_logger('transcript_extractor')
 
@@ -32,8 +33,29 @@ class TranscriptExtractor:
     优先使用官方字幕，如果没有则使用Whisper进行音频转录
     """
     
-    def __init__(self):
-        """初始化 TranscriptExtractor"""
+    def __init__(self, transcribe_timeout: Optional[float] = None):
+        """
+        初始化 TranscriptExtractor
+
+        Args:
+            transcribe_timeout: Whisper转录最长等待时间（秒），默认读取 video.transcription.timeout_seconds
+        """
+        transcription_config = {}
+        try:
+            from core.config_loader import get_config
+            transcription_config = get_config().get_transcription_config() or {}
+        except Exception as e:
+            logger.warning(f"读取转录配置失败，使用默认值: {str(e)}")
+        if transcribe_timeout is None:
+            transcribe_timeout = transcription_config.get('timeout_seconds', 1800)
+        self.transcribe_timeout = transcribe_timeout
+
+        # 分段转录配置
+        self.chunked = transcription_config.get('chunked', True)
+        self.chunk_seconds = transcription_config.get('chunk_seconds', 120)
+        self.chunk_strategy = transcription_config.get('chunk_strategy', 'prefix')
+        self.max_chars = transcription_config.get('max_chars', 4000)
+        self.sample_windows = transcription_config.get('sample_windows', 4)
         if yt_dlp is None:
             logger.warning("⚠️  yt-dlp 未安装，无法提取字幕")
         if not HAS_WHISPER:
@@ -115,7 +137,8 @@ class TranscriptExtractor:
                 "success": True,
                 "transcript": whisper_result["transcript"],
                 "source": "whisper",
-                "language": whisper_result.get("language", "unknown")
+                "language": whisper_result.get("language", "unknown"),
+                "truncated": whisper_result.get("truncated", False)
             })
         else:
             result["error"] = whisper_result.get("error", "Whisper转录失败")
@@ -375,19 +398,25 @@ class TranscriptExtractor:
             return result
         
         try:
-            logger.info(f"    [🎤 Whisper] 开始加载模型...")
-            # 使用base模型（平衡速度和准确性）
-            # 可选模型: tiny, base, small, medium, large
-            model = whisper.load_model("base")
-            
-            logger.info(f"    [🎤 Whisper] 开始转录音频...")
-            transcription = model.transcribe(
-                audio_path,
-                language=None,  # 自动检测语言
-                task="transcribe",  # 转录任务
-                fp16=False,  # 不使用FP16（兼容性更好）
-                verbose=False
-            )
+            # 模型由转录服务常驻复用（模型大小见 video.transcription.whisper_model），
+            # 并发转录数受模型池大小限制
+            service = get_transcription_service()
+            if self.chunked:
+                # 分段并行转录，文本足够评估使用时提前结束
+                logger.info(f"    [🎤 Whisper] 开始分段转录音频（模型: {service.model_size}, "
+                            f"窗口: {self.chunk_seconds}秒, 策略: {self.chunk_strategy}）...")
+                transcription = service.transcribe_chunked(
+                    audio_path,
+                    window_seconds=self.chunk_seconds,
+                    max_chars=self.max_chars,
+                    strategy=self.chunk_strategy,
+                    sample_windows=self.sample_windows,
+                    timeout=self.transcribe_timeout
+                )
+                result["truncated"] = transcription.get("truncated", False)
+            else:
+                logger.info(f"    [🎤 Whisper] 开始转录音频（模型: {service.model_size}, 模式: {service.mode}）...")
+                transcription = service.transcribe(audio_path, timeout=self.transcribe_timeout)
             
             transcript = transcription.get("text", "").strip()
             detected_language = transcription.get("language", "unknown")
@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Whisper转录服务
+进程内常驻的Whisper模型池 + 有界转录工作池，避免每个视频都重新加载模型
+
+两种运行模式（config/video_processing.yaml 中 video.transcription.mode）：
+- thread: 在当前进程内转录，模型懒加载后常驻，池中最多 model_pool_size 个模型实例，
+          并发转录数同样受此限制
+- process: 转录任务排队提交给独立的转录进程（每个进程启动时加载一次模型），
+           批量评估可以持续排队而不占用Web进程的CPU/内存
+
+分段转录（transcribe_chunked）：把音频按时间窗口切分，每批 window_concurrency 个窗口并行转录，
+- prefix: 从头开始按批次转录，文本长度达到评估所需（max_chars）后停止
+- sample: 在整条时间线上均匀抽取若干窗口并行转录（适合长讲座的整体概览）
+thread 模式下窗口音频在借用模型之前解码，只有一个模型实例时解码也能与转录重叠
+"""
+
+import os
+import queue
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from utils.logger_utils import get_logger
+
+try:
+    import whisper
+    HAS_WHISPER = True
+except ImportError:
+    whisper = None
+    HAS_WHISPER = False
+
+logger = get_logger('transcription_service')
+
+# Whisper转录的默认参数（与原 TranscriptExtractor 一致）
+DEFAULT_TRANSCRIBE_OPTIONS = {
+    "language": None,        # 自动检测语言
+    "task": "transcribe",
+    "fp16": False,           # 不使用FP16（CPU兼容性更好）
+    "verbose": False
+}
+
+
+class WhisperModelPool:
+    """
+    Whisper模型池（线程安全）
+
+    每种模型大小最多加载 pool_size 个实例，用完归还；
+    所有实例都在使用中时，新的请求等待空闲实例
+    """
+
+    def __init__(self, model_size: str = "base", pool_size: int = 1):
+        """
+        初始化模型池
+
+        Args:
+            model_size: 模型大小（tiny/base/small/medium/large）
+            pool_size: 最多常驻的模型实例数
+        """
+        self.model_size = model_size
+        self.pool_size = max(1, pool_size)
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.stats = {
+            "loads": 0,
+            "load_seconds": 0.0,
+            "acquired": 0,
+            "waits": 0
+        }
+
+    def _load_model(self):
+        """加载一个模型实例"""
+        if not HAS_WHISPER:
+            raise RuntimeError("Whisper未安装")
+        start = time.time()
+        logger.info(f"    [🎤 Whisper] 加载模型: {self.model_size}（进程内常驻）")
+        model = whisper.load_model(self.model_size)
+        elapsed = time.time() - start
+        self.stats["loads"] += 1
+        self.stats["load_seconds"] += elapsed
+        logger.info(f"    [✅ Whisper] 模型加载完成: {self.model_size}，耗时 {elapsed:.1f}秒")
+        return model
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        借用一个模型实例（用完自动归还）
+
+        Args:
+            timeout: 等待空闲实例的最长时间（秒），None表示一直等待
+
+        Yields:
+            Whisper模型实例
+        """
+        model = None
+        try:
+            model = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                should_create = self._created < self.pool_size
+                if should_create:
+                    self._created += 1
+            if should_create:
+                try:
+                    model = self._load_model()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                self.stats["waits"] += 1
+                try:
+                    model = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"等待Whisper模型超时（{timeout}秒）")
+
+        self.stats["acquired"] += 1
+        try:
+            yield model
+        finally:
+            self._idle.put(model)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        return {
+            **self.stats,
+            "model_size": self.model_size,
+            "pool_size": self.pool_size,
+            "loaded": self._created,
+            "idle": self._idle.qsize()
+        }
+
+
+# Whisper要求的采样率
+SAMPLE_RATE = 16000
+
+
+def probe_audio_duration(audio_path: str) -> Optional[float]:
+    """
+    使用 ffprobe 获取音频时长
+
+    Returns:
+        时长（秒），无法获取时返回None
+    """
+    try:
+        output = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+             '-of', 'default=noprint_wrappers=1:nokey=1', audio_path],
+            capture_output=True, check=True, timeout=30
+        ).stdout.decode('utf-8').strip()
+        return float(output) if output else None
+    except (subprocess.SubprocessError, FileNotFoundError, ValueError):
+        return None
+
+
+def load_audio_clip(audio_path: str, start: float, duration: float):
+    """
+    只解码音频的一个时间窗口（ffmpeg -ss 定位，不解码整个文件）
+
+    Args:
+        audio_path: 音频文件路径
+        start: 起始时间（秒）
+        duration: 窗口长度（秒）
+
+    Returns:
+        16kHz单声道 float32 numpy数组（Whisper输入格式）
+    """
+    import numpy as np
+
+    cmd = [
+        'ffmpeg', '-nostdin', '-threads', '0',
+        '-ss', f"{start:.3f}", '-t', f"{duration:.3f}", '-i', audio_path,
+        '-f', 's16le', '-ac', '1', '-acodec', 'pcm_s16le', '-ar', str(SAMPLE_RATE), '-'
+    ]
+    output = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(output, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+def _run_transcription(model, audio_path: str, options: Dict[str, Any],
+                       clip: Optional[Tuple[float, float]] = None, audio=None) -> Dict[str, Any]:
+    """
+    执行一次转录；clip=(start, duration) 时只转录该时间窗口
+
+    窗口转录的结果额外包含 clip_seconds（实际解码出的音频长度），短于窗口长度说明已读到文件末尾
+    """
+    if clip is None:
+        return model.transcribe(audio_path, **options)
+    if audio is None:
+        audio = load_audio_clip(audio_path, clip[0], clip[1])
+    if audio.size == 0:
+        return {"text": "", "language": options.get("language"), "segments": [], "clip_seconds": 0.0}
+    result = dict(model.transcribe(audio, **options))
+    result["clip_seconds"] = audio.size / SAMPLE_RATE
+    return result
+
+
+# ----------------------------------------------------------------------
+# 独立转录进程（process 模式）
+# ----------------------------------------------------------------------
+_process_model_pool: Optional[WhisperModelPool] = None
+
+
+def _process_worker_init(model_size: str):
+    """转录进程初始化：加载一次模型，之后处理的所有任务复用"""
+    global _process_model_pool
+    _process_model_pool = WhisperModelPool(model_size, pool_size=1)
+    with _process_model_pool.acquire():
+        pass
+
+
+def _process_worker_transcribe(audio_path: str, options: Dict[str, Any],
+                               clip: Optional[Tuple[float, float]] = None) -> Dict[str, Any]:
+    """在转录进程中执行一次转录"""
+    with _process_model_pool.acquire() as model:
+        return _run_transcription(model, audio_path, options, clip)
+
+
+class TranscriptionService:
+    """
+    Whisper转录服务
+
+    使用示例：
+        service = get_transcription_service()
+        result = service.transcribe(audio_path)           # 阻塞等待结果
+        future = service.submit(audio_path)               # 排队，稍后 future.result()
+    """
+
+    def __init__(self, model_size: str = "base", pool_size: int = 1, mode: str = "thread",
+                 process_workers: int = 1, default_options: Optional[Dict[str, Any]] = None,
+                 window_concurrency: int = 4):
+        """
+        初始化转录服务
+
+        Args:
+            model_size: Whisper模型大小
+            pool_size: thread 模式下常驻模型实例数（即最大并发转录数）
+            mode: 'thread'（进程内）或 'process'（独立转录进程）
+            process_workers: process 模式下的转录进程数
+            default_options: 默认的 model.transcribe 参数
+            window_concurrency: 分段转录每批并行提交的窗口数
+        """
+        self.model_size = model_size
+        self.mode = mode if mode in ("thread", "process") else "thread"
+        self.default_options = {**DEFAULT_TRANSCRIBE_OPTIONS, **(default_options or {})}
+        self.model_pool = WhisperModelPool(model_size, pool_size)
+
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._workers = max(1, pool_size if self.mode == "thread" else process_workers)
+        self.window_concurrency = max(1, int(window_concurrency))
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+        # 统计信息
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "total_seconds": 0.0
+        }
+
+    def _get_executor(self):
+        """懒加载工作池（process 模式下首次提交时才启动转录进程）"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    if self.mode == "process":
+                        logger.info(f"🎤 启动独立转录进程: {self._workers}个, 模型 {self.model_size}")
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self._workers,
+                            initializer=_process_worker_init,
+                            initargs=(self.model_size,)
+                        )
+                    else:
+                        # 线程数可以多于模型数：多出的线程先解码窗口音频，再排队等待模型
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=max(self._workers, self.window_concurrency),
+                            thread_name_prefix='whisper'
+                        )
+        return self._executor
+
+    def _transcribe_in_thread(self, audio_path: str, options: Dict[str, Any],
+                              clip: Optional[Tuple[float, float]] = None) -> Dict[str, Any]:
+        """thread 模式：借用常驻模型执行转录（窗口音频在借用模型之前解码）"""
+        audio = load_audio_clip(audio_path, clip[0], clip[1]) if clip is not None else None
+        with self.model_pool.acquire() as model:
+            return _run_transcription(model, audio_path, options, clip, audio)
+
+    def submit(self, audio_path: str, clip: Optional[Tuple[float, float]] = None, **options) -> Future:
+        """
+        提交转录任务（排队执行，立即返回）
+
+        Args:
+            audio_path: 音频文件路径
+            clip: (起始秒, 长度秒)，只转录该时间窗口；None表示整个文件
+            **options: 覆盖默认的 model.transcribe 参数
+
+        Returns:
+            Future，结果为Whisper原始转录结果 {'text', 'language', 'segments'}
+        """
+        if self.mode == "thread" and not HAS_WHISPER:
+            raise RuntimeError("Whisper未安装")
+
+        merged_options = {**self.default_options, **options}
+        start = time.time()
+        with self._pending_lock:
+            self._pending += 1
+        self.stats["submitted"] += 1
+
+        if self.mode == "process":
+            future = self._get_executor().submit(_process_worker_transcribe, audio_path, merged_options, clip)
+        else:
+            future = self._get_executor().submit(self._transcribe_in_thread, audio_path, merged_options, clip)
+
+        def _on_done(done: Future):
+            with self._pending_lock:
+                self._pending -= 1
+            if done.cancelled() or done.exception() is not None:
+                self.stats["failed"] += 1
+            else:
+                self.stats["completed"] += 1
+                self.stats["total_seconds"] += time.time() - start
+
+        future.add_done_callback(_on_done)
+        return future
+
+    def transcribe(self, audio_path: str, timeout: Optional[float] = None, **options) -> Dict[str, Any]:
+        """
+        转录音频（阻塞等待结果）
+
+        Args:
+            audio_path: 音频文件路径
+            timeout: 最长等待时间（秒，包括排队时间）
+            **options: 覆盖默认的 model.transcribe 参数
+
+        Returns:
+            Whisper原始转录结果
+        """
+        return self.submit(audio_path, **options).result(timeout=timeout)
+
+    def transcribe_chunked(self, audio_path: str, window_seconds: float = 120.0, max_chars: int = 4000,
+                           strategy: str = "prefix", sample_windows: int = 4,
+                           timeout: Optional[float] = None, **options) -> Dict[str, Any]:
+        """
+        分段并行转录
+
+        Args:
+            audio_path: 音频文件路径
+            window_seconds: 每个窗口的长度（秒）
+            max_chars: prefix 策略下累计文本达到该长度即停止（<=0 表示转录全部窗口）
+            strategy: 'prefix'（从头转录到足够长度）或 'sample'（沿时间线均匀抽样）
+            sample_windows: sample 策略抽取的窗口数
+            timeout: 整体最长等待时间（秒）
+            **options: 覆盖默认的 model.transcribe 参数
+
+        Returns:
+            {'text', 'language', 'windows': 已转录窗口数, 'total_windows', 'truncated': 是否只转录了部分音频}
+        """
+        deadline = time.time() + timeout if timeout else None
+        duration = probe_audio_duration(audio_path)
+        window_seconds = max(1.0, float(window_seconds))
+        total_windows = max(1, int(-(-duration // window_seconds))) if duration else None
+
+        if strategy == "sample" and total_windows:
+            count = min(max(1, sample_windows), total_windows)
+            # 在时间线上均匀分布（包含开头）
+            indices = sorted({int(i * total_windows / count) for i in range(count)})
+            texts, language, _ = self._transcribe_windows(audio_path, indices, window_seconds, options, deadline)
+            text = " ".join(t for t in texts if t)
+            return {
+                "text": text,
+                "language": language,
+                "windows": len(indices),
+                "total_windows": total_windows,
+                "truncated": len(indices) < total_windows
+            }
+
+        # prefix 策略：每批并行转录 window_concurrency 个窗口，文本足够时停止
+        texts: List[str] = []
+        language = options.get("language")
+        next_index = 0
+        while total_windows is None or next_index < total_windows:
+            batch_end = next_index + self.window_concurrency
+            if total_windows is not None:
+                batch_end = min(batch_end, total_windows)
+            batch = list(range(next_index, batch_end))
+            batch_options = {**options, "language": language} if language else options
+            batch_texts, batch_language, batch_seconds = self._transcribe_windows(
+                audio_path, batch, window_seconds, batch_options, deadline
+            )
+            language = language or batch_language
+            texts.extend(batch_texts)
+            next_index = batch_end
+
+            # 时长未知时，只有解码出的音频短于窗口长度（ffmpeg 已读到文件末尾）才视为音频结束；
+            # 静音片头、音乐间奏等整窗没有文本的情况继续转录后面的窗口
+            if total_windows is None and any(seconds < window_seconds - 1.0 for seconds in batch_seconds):
+                break
+            if max_chars > 0 and sum(len(t) for t in texts) >= max_chars:
+                break
+
+        text = " ".join(t for t in texts if t)
+        truncated = total_windows is not None and next_index < total_windows
+        if truncated:
+            logger.info(f"    [✂️ Whisper] 已转录 {next_index}/{total_windows} 个窗口，文本长度 {len(text)} 字符，提前结束")
+        return {
+            "text": text,
+            "language": language or "unknown",
+            "windows": next_index,
+            "total_windows": total_windows,
+            "truncated": truncated
+        }
+
+    def _transcribe_windows(self, audio_path: str, indices: List[int], window_seconds: float,
+                            options: Dict[str, Any],
+                            deadline: Optional[float]) -> Tuple[List[str], Optional[str], List[float]]:
+        """并行转录一组窗口，按窗口顺序返回文本、首个检测到的语言和每个窗口实际解码的秒数"""
+        futures = [
+            self.submit(audio_path, clip=(index * window_seconds, window_seconds), **options)
+            for index in indices
+        ]
+        texts, language, seconds = [], None, []
+        for future in futures:
+            remaining = max(0.0, deadline - time.time()) if deadline else None
+            result = future.result(timeout=remaining)
+            texts.append((result.get("text") or "").strip())
+            language = language or result.get("language")
+            seconds.append(result.get("clip_seconds", window_seconds))
+        return texts, language, seconds
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        return {
+            **self.stats,
+            "mode": self.mode,
+            "workers": self._workers,
+            "window_concurrency": self.window_concurrency,
+            "pending": self._pending,
+            "model_pool": self.model_pool.get_stats()
+        }
+
+    def shutdown(self, wait: bool = True):
+        """关闭工作池（process 模式下会结束转录进程）"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+# 全局单例
+_transcription_service: Optional[TranscriptionService] = None
+_transcription_service_lock = threading.Lock()
+
+
+def get_transcription_service() -> TranscriptionService:
+    """
+    获取全局转录服务实例
+
+    配置来源：config/video_processing.yaml 中的 video.transcription
+
+    Returns:
+        TranscriptionService实例
+    """
+    global _transcription_service
+    if _transcription_service is None:
+        with _transcription_service_lock:
+            if _transcription_service is None:
+                transcription_config = {}
+                try:
+                    from core.config_loader import get_config
+                    transcription_config = get_config().get_transcription_config() or {}
+                except Exception as e:
+                    logger.warning(f"读取转录配置失败，使用默认值: {str(e)}")
+
+                language = transcription_config.get('language', 'auto')
+                _transcription_service = TranscriptionService(
+                    model_size=os.getenv('WHISPER_MODEL') or transcription_config.get('whisper_model', 'base'),
+                    pool_size=transcription_config.get('model_pool_size', 1),
+                    mode=transcription_config.get('mode', 'thread'),
+                    process_workers=transcription_config.get('process_workers', 1),
+                    window_concurrency=transcription_config.get('window_concurrency', 4),
+                    default_options={
+                        "language": None if language in (None, '', 'auto') else language,
+                        "temperature": transcription_config.get('temperature', 0.0)
+                    }
+                )
+    return _transcription_service
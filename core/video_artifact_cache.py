@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+视频处理产物缓存
+按视频ID和处理参数缓存元数据、关键帧、音频和字幕/转录文本，
+同一视频重复评估（不同知识点、批量评估重跑）时直接进入LLM评估阶段
+
+缓存键: (视频ID, 视频质量, 关键帧数量, 首选语言, 是否提取转录, 音频截取时长, 转录分段策略)
+- 音频截取时长和分段策略决定了缓存的音频片段和转录文本，参数不同的条目互不复用
+字幕/转录文本可以在条目发布后补充（update），未提取过转录的条目在需要时补提取
+
+目录结构（data/cache/video_artifacts）:
+    entries/<key>/manifest.json   元数据、转录文本、文件清单
+    entries/<key>/audio.mp3       音频（转录所需片段）
+    entries/<key>/frame_01.jpg    关键帧
+    tmp/                          处理中的工作目录和待发布的条目
+
+生命周期:
+- 处理视频时在 tmp/ 下创建工作目录，处理成功后只把音频和关键帧链接到新条目（原子重命名发布），
+  完整视频等其余文件随工作目录删除
+- lookup/store 返回的结果持有所在目录的引用，调用方用完后 release；
+  引用计数归零时删除工作目录，被淘汰但仍在使用的条目也在此时删除
+- 总大小超过上限时按最近访问时间（manifest 的 mtime）淘汰，正在使用的条目不淘汰
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qs
+from utils.logger_utils import get_logger
+
+logger = get_logger('video_artifact_cache')
+
+MANIFEST_NAME = 'manifest.json'
+
+# 超过该时长的 tmp/ 目录视为崩溃残留，初始化时清理
+STALE_TMP_SECONDS = 86400
+
+_YOUTUBE_ID_RE = re.compile(r'(?:youtu\.be/|/shorts/|/embed/|/live/)([A-Za-z0-9_-]{11})')
+_BILIBILI_ID_RE = re.compile(r'bilibili\.com/video/(BV[A-Za-z0-9]+|av\d+)', re.IGNORECASE)
+
+
+def extract_video_id(video_url: str) -> str:
+    """
+    从URL中解析视频ID（不访问网络）
+
+    同一视频的不同URL形式（watch?v=、youtu.be、shorts、带时间戳/播放列表参数）映射到同一个ID；
+    无法识别的站点使用规范化后的URL
+
+    Args:
+        video_url: 视频URL
+
+    Returns:
+        视频ID，如 'youtube:dQw4w9WgXcQ'
+    """
+    url = (video_url or '').strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+
+    host = parts.netloc.lower()
+    if 'youtube.com' in host or 'youtu.be' in host:
+        video_ids = parse_qs(parts.query).get('v')
+        if video_ids and video_ids[0]:
+            return f"youtube:{video_ids[0]}"
+        match = _YOUTUBE_ID_RE.search(url)
+        if match:
+            return f"youtube:{match.group(1)}"
+
+    match = _BILIBILI_ID_RE.search(url)
+    if match:
+        return f"bilibili:{match.group(1)}"
+
+    return urlunsplit((parts.scheme.lower(), host, parts.path, parts.query, ''))
+
+
+def _link_or_copy(src: str, dst: Path):
+    """硬链接到暂存目录（同一文件系统，无复制开销），失败时复制"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class VideoArtifactCache:
+    """
+    视频处理产物缓存（磁盘LRU + 引用计数）
+
+    使用示例：
+        cache = get_video_artifact_cache()
+        key = cache.make_key(url, "480p", 6, ['en'])
+        result = cache.lookup(key)
+        if result is None:
+            work_dir = cache.create_work_dir(key)
+            result = process(work_dir)
+            result['artifact_dir'] = str(work_dir)
+            result = cache.store(key, result)
+        try:
+            evaluate(result)
+        finally:
+            cache.release(result)
+    """
+
+    def __init__(self, cache_dir: str = "data/cache/video_artifacts",
+                 max_bytes: int = 5 * 1024 ** 3, ttl_seconds: int = 30 * 86400):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 磁盘占用上限（字节）
+            ttl_seconds: 条目有效期（秒），默认30天
+        """
+        self.cache_dir = Path(cache_dir)
+        self.entries_dir = self.cache_dir / 'entries'
+        self.tmp_dir = self.cache_dir / 'tmp'
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # 目录引用计数（工作目录和正在使用的条目）
+        self._refcounts: Dict[str, int] = {}
+        # 已淘汰但仍被引用、待最后一次 release 时删除的条目
+        self._doomed: set = set()
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0
+        }
+
+        self._cleanup_stale_tmp()
+        logger.info(f"✅ 视频产物缓存初始化完成: {cache_dir}, 上限={max_bytes // (1024 * 1024)}MB, TTL={ttl_seconds}秒")
+
+    def make_key(self, video_url: str, video_quality: str, num_frames: int,
+                 preferred_languages: Optional[List[str]] = None, extract_transcript: bool = True,
+                 audio_seconds: Optional[float] = None, chunk_strategy: str = 'prefix') -> str:
+        """
+        生成缓存键
+
+        Args:
+            video_url: 视频URL
+            video_quality: 视频质量
+            num_frames: 关键帧数量
+            preferred_languages: 首选字幕语言列表
+            extract_transcript: 是否在处理时提取字幕/转录
+            audio_seconds: 截取的音频时长（秒），None 表示完整音频
+            chunk_strategy: 转录分段策略（prefix / sample / full）
+
+        Returns:
+            缓存键（SHA1哈希）
+        """
+        key_data = [
+            extract_video_id(video_url),
+            video_quality,
+            num_frames,
+            list(preferred_languages or []),
+            bool(extract_transcript),
+            float(audio_seconds) if audio_seconds else None,
+            chunk_strategy
+        ]
+        return hashlib.sha1(json.dumps(key_data, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    # ----------------------------------------
+    # 引用计数
+    # ----------------------------------------
+    def _acquire(self, directory: Path):
+        with self._lock:
+            self._refcounts[str(directory)] = self._refcounts.get(str(directory), 0) + 1
+
+    def release(self, result: Optional[Dict[str, Any]]):
+        """
+        释放结果对所在目录的引用；最后一个引用释放时删除工作目录或已淘汰的条目
+
+        Args:
+            result: lookup/store 返回的结果（没有 artifact_dir 时忽略）
+        """
+        directory = (result or {}).get('artifact_dir')
+        if not directory:
+            return
+        with self._lock:
+            count = self._refcounts.get(directory, 0) - 1
+            if count > 0:
+                self._refcounts[directory] = count
+                return
+            self._refcounts.pop(directory, None)
+            doomed = directory in self._doomed
+            self._doomed.discard(directory)
+        if doomed:
+            self._remove_dir(Path(directory))
+        elif Path(directory).parent == self.tmp_dir:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def _is_pinned(self, directory: Path) -> bool:
+        with self._lock:
+            return self._refcounts.get(str(directory), 0) > 0
+
+    # ----------------------------------------
+    # 读写
+    # ----------------------------------------
+    def create_work_dir(self, key: str) -> Path:
+        """
+        创建处理用的临时工作目录（持有一个引用）
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            工作目录路径
+        """
+        work_dir = self.tmp_dir / f"{key}.{uuid.uuid4().hex[:8]}"
+        work_dir.mkdir(parents=True)
+        self._acquire(work_dir)
+        return work_dir
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        查询缓存；命中时返回处理结果（持有条目引用），并刷新最近访问时间
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            与 VideoCrawler.process_video 相同格式的结果，未命中返回 None
+        """
+        entry_dir = self.entries_dir / key
+        manifest_path = entry_dir / MANIFEST_NAME
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+
+        if time.time() - manifest.get('created_at', 0) > self.ttl_seconds:
+            self.stats["misses"] += 1
+            return None
+
+        self._acquire(entry_dir)
+        result = self._manifest_to_result(entry_dir, manifest)
+        missing = [p for p in ([result['audio_path']] if result['audio_path'] else []) + result['frames_paths']
+                   if not os.path.exists(p)]
+        if missing:
+            # 条目已被其他进程淘汰
+            self.release(result)
+            self.stats["misses"] += 1
+            return None
+
+        try:
+            os.utime(manifest_path)
+        except OSError:
+            pass
+        self.stats["hits"] += 1
+        return result
+
+    def store(self, key: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        把工作目录中的音频和关键帧发布为缓存条目（通过 tmp/ 暂存目录原子重命名发布）
+
+        发布成功后工作目录的引用转移到条目上（工作目录随之删除）；
+        发布失败时原样返回结果，调用方仍通过 release 清理工作目录
+
+        Args:
+            key: 缓存键
+            result: 处理结果（artifact_dir 为 create_work_dir 返回的目录）
+
+        Returns:
+            指向缓存条目的结果（持有条目引用）
+        """
+        entry_dir = self.entries_dir / key
+        staging_dir = self.tmp_dir / f"{key}.{uuid.uuid4().hex[:8]}.staging"
+        try:
+            staging_dir.mkdir(parents=True)
+            audio_name = None
+            if result.get('audio_path'):
+                audio_name = 'audio' + Path(result['audio_path']).suffix
+                _link_or_copy(result['audio_path'], staging_dir / audio_name)
+            frame_names = []
+            for i, frame_path in enumerate(result.get('frames_paths') or []):
+                frame_name = f"frame_{i + 1:02d}" + Path(frame_path).suffix
+                _link_or_copy(frame_path, staging_dir / frame_name)
+                frame_names.append(frame_name)
+
+            manifest = {
+                "key": key,
+                "created_at": time.time(),
+                "metadata": result.get('metadata', {}),
+                "transcript": result.get('transcript'),
+                "transcript_source": result.get('transcript_source'),
+                "transcript_language": result.get('transcript_language'),
+                "transcript_extracted": bool(result.get('transcript_extracted')),
+                "audio": audio_name,
+                "frames": frame_names,
+            }
+            manifest["size_bytes"] = sum(f.stat().st_size for f in staging_dir.iterdir())
+            with open(staging_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+
+            if entry_dir.exists() and not self._is_pinned(entry_dir):
+                # 过期或不完整的旧条目
+                self._remove_dir(entry_dir)
+            os.rename(staging_dir, entry_dir)
+        except OSError as e:
+            logger.warning(f"⚠️  写入视频产物缓存失败: {str(e)}")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            existing = self.lookup(key)
+            if existing is None:
+                return result
+            self.release(result)
+            return existing
+
+        self.stats["stores"] += 1
+        self._acquire(entry_dir)
+        self.release(result)
+        self.evict(exclude=entry_dir)
+        return self._manifest_to_result(entry_dir, manifest)
+
+    def update(self, result: Dict[str, Any], fields: Dict[str, Any]) -> bool:
+        """
+        补充已发布条目的字段（如流水线中后提取的字幕/转录文本）
+
+        Args:
+            result: lookup/store 返回的结果
+            fields: 要写入 manifest 的字段
+
+        Returns:
+            是否写入成功（结果不在缓存条目中时返回 False）
+        """
+        directory = (result or {}).get('artifact_dir')
+        if not directory or Path(directory).parent != self.entries_dir:
+            return False
+
+        manifest_path = Path(directory) / MANIFEST_NAME
+        tmp_path = self.tmp_dir / f"{Path(directory).name}.{uuid.uuid4().hex[:8]}.manifest"
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            manifest.update(fields)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            os.replace(tmp_path, manifest_path)
+            return True
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  更新视频产物缓存失败: {str(e)}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
+    def _manifest_to_result(self, entry_dir: Path, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        """把 manifest 转换为 process_video 的结果格式"""
+        return {
+            "success": True,
+            "metadata": manifest.get('metadata', {}),
+            "audio_path": str(entry_dir / manifest['audio']) if manifest.get('audio') else None,
+            "frames_paths": [str(entry_dir / name) for name in manifest.get('frames', [])],
+            "video_path": None,
+            "transcript": manifest.get('transcript'),
+            "transcript_source": manifest.get('transcript_source'),
+            "transcript_language": manifest.get('transcript_language'),
+            "transcript_extracted": manifest.get('transcript_extracted', False),
+            "error": None,
+            "cache_hit": True,
+            "artifact_dir": str(entry_dir),
+        }
+
+    # ----------------------------------------
+    # 淘汰
+    # ----------------------------------------
+    def _list_entries(self) -> List[Dict[str, Any]]:
+        """列出所有条目（最近访问时间、大小）"""
+        entries = []
+        for item in os.scandir(self.entries_dir):
+            if not item.is_dir():
+                continue
+            manifest_path = os.path.join(item.path, MANIFEST_NAME)
+            try:
+                accessed = os.stat(manifest_path).st_mtime
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    size = json.load(f).get('size_bytes', 0)
+            except (OSError, ValueError):
+                accessed, size = 0, 0
+            entries.append({"path": Path(item.path), "accessed": accessed, "size": size})
+        return entries
+
+    def _remove_dir(self, directory: Path):
+        """先重命名到 tmp/ 再删除，其他读者只会看到完整条目或没有条目"""
+        trash = self.tmp_dir / f"{directory.name}.{uuid.uuid4().hex[:8]}.trash"
+        try:
+            os.rename(directory, trash)
+        except OSError:
+            return
+        shutil.rmtree(trash, ignore_errors=True)
+
+    def evict(self, exclude: Optional[Path] = None) -> int:
+        """
+        按最近访问时间淘汰条目，直到总大小不超过上限；正在使用的条目推迟到释放时删除
+
+        Args:
+            exclude: 不参与淘汰的条目（刚发布的条目）
+
+        Returns:
+            淘汰的条目数
+        """
+        entries = self._list_entries()
+        total = sum(entry["size"] for entry in entries)
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = 0
+        for entry in sorted(entries, key=lambda e: e["accessed"]):
+            if total <= self.max_bytes:
+                break
+            if exclude is not None and entry["path"] == exclude:
+                continue
+            with self._lock:
+                if self._refcounts.get(str(entry["path"]), 0) > 0:
+                    self._doomed.add(str(entry["path"]))
+                    total -= entry["size"]
+                    evicted += 1
+                    continue
+            self._remove_dir(entry["path"])
+            total -= entry["size"]
+            evicted += 1
+
+        if evicted:
+            self.stats["evictions"] += evicted
+            logger.info(f"🧹 视频产物缓存淘汰 {evicted} 个条目，当前占用 {total // (1024 * 1024)}MB")
+        return evicted
+
+    def _cleanup_stale_tmp(self):
+        """清理崩溃残留的工作目录"""
+        cutoff = time.time() - STALE_TMP_SECONDS
+        for item in os.scandir(self.tmp_dir):
+            try:
+                if item.stat().st_mtime < cutoff:
+                    shutil.rmtree(item.path, ignore_errors=True)
+            except OSError:
+                continue
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        entries = self._list_entries()
+        lookups = self.stats["hits"] + self.stats["misses"]
+        with self._lock:
+            in_use = len(self._refcounts)
+        return {
+            **self.stats,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "entries": len(entries),
+            "size_bytes": sum(entry["size"] for entry in entries),
+            "max_bytes": self.max_bytes,
+            "in_use": in_use
+        }
+
+
+# 全局单例
+_video_artifact_cache: Optional[VideoArtifactCache] = None
+_video_artifact_cache_lock = threading.Lock()
+
+
+def get_video_artifact_cache() -> VideoArtifactCache:
+    """
+    获取全局视频产物缓存实例
+
+    配置来源：config/video_processing.yaml 中的 video.artifact_cache
+
+    Returns:
+        VideoArtifactCache实例
+    """
+    global _video_artifact_cache
+    if _video_artifact_cache is None:
+        with _video_artifact_cache_lock:
+            if _video_artifact_cache is None:
+                cache_config = {}
+                try:
+                    from core.config_loader import get_config
+                    cache_config = get_config().get_video_config().get('artifact_cache', {}) or {}
+                except Exception as e:
+                    logger.warning(f"读取视频产物缓存配置失败，使用默认值: {str(e)}")
+                _video_artifact_cache = VideoArtifactCache(
+                    cache_dir=cache_config.get('cache_dir', 'data/cache/video_artifacts'),
+                    max_bytes=int(cache_config.get('max_size_mb', 5120)) * 1024 * 1024,
+                    ttl_seconds=int(cache_config.get('ttl_days', 30)) * 86400
+                )
+    return _video_artifact_cache
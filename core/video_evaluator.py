@@ -13,6 +13,8 @@ from utils.logger_utils import get_logger
 from search_strategist import AIBuildersClient
 from utils.json_utils import extract_and_parse_json, extract_json_object
 from core.config_loader import get_config
+from core.executor_registry import get_executor
+from core.vision_image_prep import get_vision_image_preparer
 
 logger = get_logger('video_evaluator')
 
@@ -346,39 +348,38 @@ class VideoEvaluator:
                 logger.info(f"    [✅ 完成] 热度分数: {result['score']:.1f}")
                 return ('metadata', result)
 
-            # 使用线程池并行执行4个评估任务
-            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-                # 提交所有任务
-                future_to_dim = {
-                    executor.submit(evaluate_visual): 'visual',
-                    executor.submit(evaluate_relevance): 'relevance',
-                    executor.submit(evaluate_pedagogy): 'pedagogy',
-                    executor.submit(evaluate_metadata): 'metadata'
-                }
+            # 在共享的 llm 执行器中并行执行4个评估任务
+            executor = get_executor('llm')
+            future_to_dim = {
+                executor.submit(evaluate_visual): 'visual',
+                executor.submit(evaluate_relevance): 'relevance',
+                executor.submit(evaluate_pedagogy): 'pedagogy',
+                executor.submit(evaluate_metadata): 'metadata'
+            }
 
-                # 收集结果
-                evaluation_results = {}
-                for future in concurrent.futures.as_completed(future_to_dim):
-                    dim = future_to_dim[future]
-                    try:
-                        dim_name, result = future.result()
-                        evaluation_results[dim_name] = result
-                        result[dim] = result  # 同时保存到主result字典
-                    except Exception as e:
-                        logger.error(f"    [❌ 失败] {dim} 评估出错: {str(e)}")
-                        # 使用默认值
-                        if dim == 'visual':
-                            evaluation_results[dim] = {
-                                'tech_score': 0.0,
-                                'design_score': 0.0,
-                                'combined_score': 0.0
-                            }
-                        elif dim == 'relevance':
-                            evaluation_results[dim] = {'score': 0.0}
-                        elif dim == 'pedagogy':
-                            evaluation_results[dim] = {'score': 0.0}
-                        elif dim == 'metadata':
-                            evaluation_results[dim] = {'score': 0.0}
+            # 收集结果
+            evaluation_results = {}
+            for future in concurrent.futures.as_completed(future_to_dim):
+                dim = future_to_dim[future]
+                try:
+                    dim_name, result = future.result()
+                    evaluation_results[dim_name] = result
+                    result[dim] = result  # 同时保存到主result字典
+                except Exception as e:
+                    logger.error(f"    [❌ 失败] {dim} 评估出错: {str(e)}")
+                    # 使用默认值
+                    if dim == 'visual':
+                        evaluation_results[dim] = {
+                            'tech_score': 0.0,
+                            'design_score': 0.0,
+                            'combined_score': 0.0
+                        }
+                    elif dim == 'relevance':
+                        evaluation_results[dim] = {'score': 0.0}
+                    elif dim == 'pedagogy':
+                        evaluation_results[dim] = {'score': 0.0}
+                    elif dim == 'metadata':
+                        evaluation_results[dim] = {'score': 0.0}
 
             logger.info(f"[🎉 完成] 所有4个评估维度并行执行完毕！\n")
             
@@ -514,7 +515,11 @@ class VideoEvaluator:
             }
         """
         logger.info(f"        [🔍 Vision AI] 分析 {len(frames_paths)} 张关键帧...")
-        
+
+        # 先去掉几乎相同的帧（长时间停留在同一张PPT），再限制图片数量（避免请求过大）；
+        # 提示词中的数量与实际发送的图片一致
+        frames_to_analyze = self._dedup_frames(frames_paths)[:6]  # 最多分析6张
+
         # 构建Prompt
         system_prompt = """你是一个教育视频质量评估专家，专门评估教学可视化的设计质量。
 
@@ -531,7 +536,7 @@ class VideoEvaluator:
 
 请给出0-10分的评分，并提供简短的评估理由。"""
         
-        user_prompt = f"""请分析以下教学视频的关键帧（共{len(frames_paths)}张），评估其教学可视化设计质量。
+        user_prompt = f"""请分析以下教学视频的关键帧（共{len(frames_to_analyze)}张），评估其教学可视化设计质量。
 
 **评估要求**：
 1. 忽略低分辨率造成的像素模糊
@@ -548,11 +553,8 @@ class VideoEvaluator:
         # 如果 VisionClient 可用，使用真正的视觉分析
         if self.vision_client:
             try:
-                logger.info(f"        [👁️ 使用视觉API] 发送 {len(frames_paths)} 张图片进行分析...")
-                
-                # 限制图片数量（避免请求过大）
-                frames_to_analyze = frames_paths[:6]  # 最多分析6张
-                
+                logger.info(f"        [👁️ 使用视觉API] 发送 {len(frames_to_analyze)} 张图片进行分析...")
+
                 # 记录开始时间
                 import time
                 start_time = time.time()
@@ -578,9 +580,9 @@ class VideoEvaluator:
                         try:
                             # 构建输入信息摘要
                             input_summary = f"分析了 {len(frames_to_analyze)} 张视频截图"
-                            if frames_paths:
-                                input_summary += f"\n图片路径: {frames_paths[0]}"
-                                if len(frames_paths) > 1:
+                            if frames_to_analyze:
+                                input_summary += f"\n图片路径: {frames_to_analyze[0]}"
+                                if len(frames_to_analyze) > 1:
                                     input_summary += f" 等{len(frames_to_analyze)}张"
 
                             # 截取输出结果（限制长度）
@@ -634,7 +636,7 @@ class VideoEvaluator:
                     logger.error(f"        [❌ 错误] Vision API调用失败: {error_msg}")
                     # 降级到文本模拟
                     logger.info(f"        [⚠️ 降级] 使用文本模拟分析")
-                    return self._analyze_frame_design_fallback(frames_paths)
+                    return self._analyze_frame_design_fallback(frames_to_analyze)
             
             except Exception as e:
                 logger.error(f"        [❌ 错误] Vision AI分析异常: {str(e)}")
@@ -642,10 +644,32 @@ class VideoEvaluator:
                 traceback.print_exc()
                 # 降级到文本模拟
                 logger.info(f"        [⚠️ 降级] 使用文本模拟分析")
-                return self._analyze_frame_design_fallback(frames_paths)
+                return self._analyze_frame_design_fallback(frames_to_analyze)
         
         # 如果没有 VisionClient，使用文本模拟（降级方案）
-        return self._analyze_frame_design_fallback(frames_paths)
+        return self._analyze_frame_design_fallback(frames_to_analyze)
+
+    def _dedup_frames(self, frames_paths: List[str]) -> List[str]:
+        """
+        去掉几乎相同的关键帧（config/video_processing.yaml 的 video.vision.image_prep.dedup_frames，默认开启）
+
+        去重失败时返回原列表，不影响评估
+        """
+        try:
+            prep_config = self.config.get_video_config().get('vision', {}).get('image_prep', {}) or {}
+        except Exception:
+            prep_config = {}
+        if not prep_config.get('dedup_frames', True) or len(frames_paths) < 2:
+            return list(frames_paths)
+
+        try:
+            kept = get_vision_image_preparer().deduplicate(frames_paths)
+        except Exception as e:
+            logger.warning(f"        [⚠️ 警告] 关键帧去重失败，使用全部关键帧: {str(e)}")
+            return list(frames_paths)
+        if len(kept) < len(frames_paths):
+            logger.info(f"        [🖼️ 去重] 关键帧 {len(frames_paths)} 张 → {len(kept)} 张")
+        return kept
     
     def _analyze_frame_design_fallback(self, frames_paths: List[str]) -> Dict[str, Any]:
         """
@@ -677,10 +701,11 @@ class VideoEvaluator:
 
 请给出0-10分的评分，并提供简短的评估理由。"""
         
-        user_prompt = f"""请分析以下教学视频的关键帧（共{len(frames_paths)}张），评估其教学可视化设计质量。
+        frames_to_describe = frames_paths[:6]
+        user_prompt = f"""请分析以下教学视频的关键帧（共{len(frames_to_describe)}张），评估其教学可视化设计质量。
 
 **关键帧路径**：
-{chr(10).join(f"- {path}" for path in frames_paths[:6])}
+{chr(10).join(f"- {path}" for path in frames_to_describe)}
 
 **评估要求**：
 1. 忽略低分辨率造成的像素模糊
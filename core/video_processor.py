@@ -7,9 +7,11 @@
 import os
 import json
 import subprocess
+import tempfile
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     import yt_dlp
@@ -25,6 +27,44 @@ from utils.logger_utils import get_logger
 
 logger = get_logger('video_processor')
 
+# ffmpeg 可以直接 seek 读取的流协议（DASH 分片等需要 yt-dlp 下载的协议不在其中）
+STREAMABLE_PROTOCOLS = ('https', 'http', 'm3u8', 'm3u8_native')
+
+# 视频质量对应的目标分辨率高度
+QUALITY_HEIGHTS = {'360p': 360, '480p': 480, '720p': 720, '1080p': 1080}
+
+
+def safe_filename(title: str) -> str:
+    """把视频标题转换为安全的文件名（最多100字符）"""
+    return "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()[:100]
+
+
+def compute_keyframe_timestamps(duration: float, num_frames: int, end_padding: float = 0.5) -> List[float]:
+    """
+    计算关键帧时间点（均匀分布）
+
+    Args:
+        duration: 视频时长（秒）
+        num_frames: 帧数
+        end_padding: 避免在最后 N 秒提取（可能不完整）
+
+    Returns:
+        时间点列表（秒）
+    """
+    if num_frames <= 0 or duration <= 0:
+        return []
+    if num_frames == 1:
+        return [duration / 2]  # 中间位置
+    timestamps = [duration * i / (num_frames - 1) for i in range(num_frames)]
+    return [max(0.0, min(t, duration - end_padding)) for t in timestamps]
+
+
+def _format_headers(headers: Optional[Dict[str, str]]) -> Optional[str]:
+    """把HTTP请求头字典转换为 ffmpeg -headers 参数格式"""
+    if not headers:
+        return None
+    return ''.join(f"{key}: {value}\r\n" for key, value in headers.items())
+
 
 class VideoCrawler:
     """
@@ -38,8 +78,193 @@ class VideoCrawler:
         if ffmpeg is None:
             logger.error("❌ ffmpeg-python 未安装，请运行: pip install ffmpeg-python")
             logger.warning("⚠️  注意：还需要安装 ffmpeg 二进制文件: brew install ffmpeg (macOS) 或 apt-get install ffmpeg (Linux)")
-    
+
+        download_config = {}
+        transcription_config = {}
+        artifact_cache_config = {}
+        try:
+            from core.config_loader import get_config
+            config = get_config()
+            download_config = config.get_download_config() or {}
+            transcription_config = config.get_transcription_config() or {}
+            artifact_cache_config = config.get_video_config().get('artifact_cache', {}) or {}
+        except Exception as e:
+            logger.warning(f"⚠️  读取视频处理配置失败，使用默认值: {str(e)}")
+
+        partial_config = download_config.get('partial', {}) or {}
+        self.partial_download = partial_config.get('enabled', True)
+        self.audio_seconds = partial_config.get('audio_seconds', 600)
+        self.frame_workers = max(1, int(partial_config.get('frame_workers', 3)))
+        self.ffmpeg_timeout = partial_config.get('timeout_seconds', 120)
+        # 转录分段策略：未分段时整段转录（full）
+        self.chunk_strategy = (
+            transcription_config.get('chunk_strategy', 'prefix')
+            if transcription_config.get('chunked', True) else 'full'
+        )
+        # sample 策略沿整条时间线抽样转录，需要完整音频
+        self.full_audio = self.chunk_strategy in ('sample', 'full')
+        self.artifact_cache_enabled = artifact_cache_config.get('enabled', True)
+
+    def _audio_segment_seconds(self) -> Optional[float]:
+        """
+        转录所需的音频时长
+
+        Returns:
+            截取时长（秒）；None 表示需要完整音频
+        """
+        if self.full_audio or not self.audio_seconds:
+            return None
+        return float(self.audio_seconds)
+
     def process_video(
+        self,
+        video_url: str,
+        output_dir: str,
+        video_quality: str = "480p",
+        num_frames: int = 6,
+        extract_transcript: bool = True,
+        preferred_languages: Optional[List[str]] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        处理视频（优先使用视频产物缓存）
+
+        启用缓存时，同一视频+相同处理参数直接返回缓存的元数据、关键帧、音频和转录文本；
+        未命中时在缓存的临时工作目录中处理（不使用 output_dir），成功后发布为缓存条目。
+        返回的结果持有缓存引用，使用完关键帧/音频后需调用 release(result)
+
+        Args:
+            video_url: 视频URL（支持 YouTube, Bilibili, 等）
+            output_dir: 输出目录路径（仅在不使用缓存时使用）
+            video_quality: 视频质量 ("360p", "480p", "720p", "best")
+            num_frames: 提取的关键帧数量（默认6张）
+            extract_transcript: 是否提取字幕/转录（默认True）
+            preferred_languages: 首选字幕语言列表（如 ['en', 'id', 'zh']）
+            use_cache: 是否使用视频产物缓存
+
+        Returns:
+            与 _process_video 相同的结果字典，另外包含：
+            "cache_hit": bool,  # 是否命中缓存
+            "artifact_dir": str  # 产物所在目录（缓存条目或临时工作目录）
+        """
+        if not (use_cache and self.artifact_cache_enabled):
+            return self._process_video(
+                video_url, output_dir, video_quality, num_frames, extract_transcript, preferred_languages
+            )
+
+        from core.video_artifact_cache import get_video_artifact_cache
+        cache = get_video_artifact_cache()
+        key = cache.make_key(
+            video_url, video_quality, num_frames, preferred_languages,
+            extract_transcript=extract_transcript,
+            audio_seconds=self._audio_segment_seconds(),
+            chunk_strategy=self.chunk_strategy
+        )
+
+        cached = cache.lookup(key)
+        if cached is not None:
+            logger.info(f"⚡ 视频产物缓存命中，跳过下载和提取: {video_url}")
+            if extract_transcript and not cached.get("transcript_extracted"):
+                self.attach_transcript(cached, video_url, preferred_languages)
+            return cached
+
+        work_dir = cache.create_work_dir(key)
+        result = self._process_video(
+            video_url, str(work_dir), video_quality, num_frames, extract_transcript, preferred_languages
+        )
+        result["cache_hit"] = False
+        result["artifact_dir"] = str(work_dir)
+        if not result.get("success"):
+            cache.release(result)
+            result["artifact_dir"] = None
+            return result
+        return cache.store(key, result)
+
+    def release(self, result: Optional[Dict[str, Any]]):
+        """
+        释放 process_video 结果持有的缓存引用（关键帧/音频使用完后调用）
+
+        Args:
+            result: process_video 返回的结果
+        """
+        if result and result.get("artifact_dir"):
+            from core.video_artifact_cache import get_video_artifact_cache
+            get_video_artifact_cache().release(result)
+
+    def attach_transcript(
+        self,
+        result: Dict[str, Any],
+        video_url: str,
+        preferred_languages: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        为已处理的视频补充字幕/转录（批量评估流水线中作为独立的转录阶段调用）
+
+        结果来自缓存条目时同时写回缓存，下次命中无需再次转录
+
+        Args:
+            result: process_video(extract_transcript=False) 返回的结果
+            video_url: 视频URL
+            preferred_languages: 首选字幕语言列表
+
+        Returns:
+            更新后的 result
+        """
+        # 字幕文件名固定，使用独立的临时目录避免并发冲突
+        with tempfile.TemporaryDirectory(prefix='subtitles_') as subtitle_dir:
+            fields = self._extract_transcript(video_url, result.get("audio_path"), subtitle_dir, preferred_languages)
+        result.update(fields)
+
+        if result.get("artifact_dir"):
+            from core.video_artifact_cache import get_video_artifact_cache
+            get_video_artifact_cache().update(result, fields)
+        return result
+
+    def _extract_transcript(
+        self,
+        video_url: str,
+        audio_path: Optional[str],
+        output_dir: str,
+        preferred_languages: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        提取字幕/转录（优先官方字幕，其次Whisper转录音频）
+
+        Returns:
+            要合并到处理结果中的字段：transcript, transcript_source, transcript_language, transcript_extracted
+        """
+        fields = {
+            "transcript": None,
+            "transcript_source": None,
+            "transcript_language": None,
+            "transcript_extracted": True
+        }
+        logger.info("📝 开始提取字幕/转录...")
+        try:
+            from core.transcript_extractor import TranscriptExtractor
+            transcript_extractor = TranscriptExtractor()
+            transcript_result = transcript_extractor.extract_transcript(
+                video_url=video_url,
+                audio_path=audio_path,
+                output_dir=output_dir,
+                preferred_languages=preferred_languages
+            )
+            
+            if transcript_result["success"]:
+                fields["transcript"] = transcript_result["transcript"]
+                fields["transcript_source"] = transcript_result["source"]
+                fields["transcript_language"] = transcript_result.get("language", "unknown")
+                logger.info(f"✅ 字幕/转录提取成功（来源: {fields['transcript_source']}, 语言: {fields['transcript_language']}）")
+                logger.info(f"    文本长度: {len(fields['transcript'])} 字符")
+            else:
+                logger.warning(f"⚠️  字幕/转录提取失败: {transcript_result.get('error')}")
+        except ImportError as e:
+            logger.warning(f"⚠️  TranscriptExtractor 不可用: {str(e)}")
+        except Exception as e:
+            logger.warning(f"⚠️  字幕/转录提取异常: {str(e)}")
+        return fields
+
+    def _process_video(
         self,
         video_url: str,
         output_dir: str,
@@ -70,6 +295,7 @@ class VideoCrawler:
                 "transcript": str,  # 字幕/转录文本（如果提取）
                 "transcript_source": str,  # "subtitle" 或 "whisper"（如果提取）
                 "transcript_language": str,  # 字幕/转录语言（如果提取）
+                "transcript_extracted": bool,  # 是否已尝试提取字幕/转录
                 "error": str  # 错误信息（如果失败）
             }
         """
@@ -82,6 +308,7 @@ class VideoCrawler:
             "transcript": None,
             "transcript_source": None,
             "transcript_language": None,
+            "transcript_extracted": False,
             "error": None
         }
         
@@ -116,7 +343,6 @@ class VideoCrawler:
                             logger.info(f"   播放列表ID: {playlist_id}")
                             # 方法1: 尝试使用yt-dlp的webpage方式
                             try:
-                                import yt_dlp
                                 # 使用webpage_downloader来获取播放列表页面内容
                                 ydl_opts = {
                                     'quiet': True,
@@ -193,75 +419,84 @@ class VideoCrawler:
                 logger.error(f"❌ {result['error']}")
                 return result
             
-            # 步骤1: 下载视频和提取元数据
+            # 步骤1: 提取元数据（只调用一次 extract_info，后续步骤复用同一个 info）
             logger.info(f"🎬 开始处理视频: {actual_video_url}")
-            download_result = self._download_video(actual_video_url, output_path, video_quality)
-            
-            # 检查 download_result 是否为 None（防止异常情况）
-            if download_result is None:
-                result["error"] = "视频下载失败: 下载函数返回了None"
+            if yt_dlp is None:
+                result["error"] = "yt-dlp 未安装"
                 logger.error(f"❌ {result['error']}")
                 return result
-            
-            if not download_result.get("success", False):
-                result["error"] = download_result.get("error", "视频下载失败")
-                logger.error(f"❌ {result['error']}")
+            try:
+                info = self._probe_video_info(actual_video_url)
+            except Exception as e:
+                result["error"] = f"下载视频失败: {str(e)}"
+                logger.error(f"❌ {result['error']}", exc_info=True)
                 return result
-            
-            video_path = download_result["video_path"]
-            metadata = download_result["metadata"]
-            result["video_path"] = str(video_path)
-            result["local_file_path"] = str(video_path)  # 添加本地文件路径字段
+            max_resolution_height = self._resolve_max_resolution_height(info)
+            metadata = self._build_metadata(info, max_resolution_height, actual_video_url)
             result["metadata"] = metadata
-            
-            logger.info(f"✅ 视频下载成功: {video_path}")
             logger.info(f"📊 元数据: {json.dumps(metadata, indent=2, ensure_ascii=False)}")
-            
-            # 步骤2: 提取音频
-            logger.info("🎵 开始提取音频...")
-            audio_result = self._extract_audio(video_path, output_path)
-            
-            if audio_result["success"]:
-                result["audio_path"] = str(audio_result["audio_path"])
-                logger.info(f"✅ 音频提取成功: {result['audio_path']}")
-            else:
-                logger.warning(f"⚠️  音频提取失败: {audio_result.get('error')}")
-            
-            # 步骤3: 提取关键帧
-            logger.info(f"🖼️  开始提取 {num_frames} 张关键帧...")
-            frames_result = self._extract_keyframes(video_path, output_path, num_frames)
-            
-            if frames_result["success"]:
-                result["frames_paths"] = [str(p) for p in frames_result["frames_paths"]]
-                logger.info(f"✅ 关键帧提取成功: {len(result['frames_paths'])} 张")
-            else:
-                logger.warning(f"⚠️  关键帧提取失败: {frames_result.get('error')}")
+
+            # 步骤2+3: 优先按需读取远程流（只拉取关键帧附近和转录所需音频段的数据）
+            streamed = False
+            if self.partial_download:
+                stream_result = self._extract_from_streams(info, output_path, video_quality, num_frames)
+                if stream_result["success"]:
+                    streamed = True
+                    result["audio_path"] = str(stream_result["audio_path"]) if stream_result["audio_path"] else None
+                    result["frames_paths"] = [str(p) for p in stream_result["frames_paths"]]
+                    logger.info(f"✅ 按需读取完成: 音频={'有' if result['audio_path'] else '无'}, 关键帧 {len(result['frames_paths'])} 张")
+                else:
+                    logger.warning(f"⚠️  按需读取失败，回退到完整下载: {stream_result.get('error')}")
+
+            if not streamed:
+                download_result = self._download_video(
+                    actual_video_url, output_path, video_quality,
+                    info=info, max_resolution_height=max_resolution_height
+                )
+
+                # 检查 download_result 是否为 None（防止异常情况）
+                if download_result is None:
+                    result["error"] = "视频下载失败: 下载函数返回了None"
+                    logger.error(f"❌ {result['error']}")
+                    return result
+
+                if not download_result.get("success", False):
+                    result["error"] = download_result.get("error", "视频下载失败")
+                    logger.error(f"❌ {result['error']}")
+                    return result
+
+                video_path = download_result["video_path"]
+                result["video_path"] = str(video_path)
+                result["local_file_path"] = str(video_path)  # 添加本地文件路径字段
+                result["metadata"] = download_result["metadata"]
+
+                logger.info(f"✅ 视频下载成功: {video_path}")
+
+                # 步骤2: 提取音频（只截取转录需要的时长）
+                logger.info("🎵 开始提取音频...")
+                audio_result = self._extract_audio(video_path, output_path, max_seconds=self._audio_segment_seconds())
+
+                if audio_result["success"]:
+                    result["audio_path"] = str(audio_result["audio_path"])
+                    logger.info(f"✅ 音频提取成功: {result['audio_path']}")
+                else:
+                    logger.warning(f"⚠️  音频提取失败: {audio_result.get('error')}")
+
+                # 步骤3: 提取关键帧（使用元数据中的时长，避免再次探测文件）
+                logger.info(f"🖼️  开始提取 {num_frames} 张关键帧...")
+                frames_result = self._extract_keyframes(
+                    video_path, output_path, num_frames, duration=metadata.get("duration") or None
+                )
+
+                if frames_result["success"]:
+                    result["frames_paths"] = [str(p) for p in frames_result["frames_paths"]]
+                    logger.info(f"✅ 关键帧提取成功: {len(result['frames_paths'])} 张")
+                else:
+                    logger.warning(f"⚠️  关键帧提取失败: {frames_result.get('error')}")
             
             # 步骤4: 提取字幕/转录（如果启用）
             if extract_transcript:
-                logger.info("📝 开始提取字幕/转录...")
-                try:
-                    from core.transcript_extractor import TranscriptExtractor
-                    transcript_extractor = TranscriptExtractor()
-                    transcript_result = transcript_extractor.extract_transcript(
-                        video_url=video_url,
-                        audio_path=result["audio_path"],
-                        output_dir=str(output_path),
-                        preferred_languages=preferred_languages
-                    )
-                    
-                    if transcript_result["success"]:
-                        result["transcript"] = transcript_result["transcript"]
-                        result["transcript_source"] = transcript_result["source"]
-                        result["transcript_language"] = transcript_result.get("language", "unknown")
-                        logger.info(f"✅ 字幕/转录提取成功（来源: {result['transcript_source']}, 语言: {result['transcript_language']}）")
-                        logger.info(f"    文本长度: {len(result['transcript'])} 字符")
-                    else:
-                        logger.warning(f"⚠️  字幕/转录提取失败: {transcript_result.get('error')}")
-                except ImportError as e:
-                    logger.warning(f"⚠️  TranscriptExtractor 不可用: {str(e)}")
-                except Exception as e:
-                    logger.warning(f"⚠️  字幕/转录提取异常: {str(e)}")
+                result.update(self._extract_transcript(video_url, result["audio_path"], str(output_path), preferred_languages))
             
             result["success"] = True
             logger.info("🎉 视频处理完成！")
@@ -273,32 +508,160 @@ class VideoCrawler:
         
         return result
     
+    def _probe_video_info(self, video_url: str) -> Dict[str, Any]:
+        """
+        提取视频元数据（不下载）
+
+        整个处理流程只调用这一次 extract_info：最大分辨率、元数据、
+        远程流地址以及完整下载时的文件名都从返回的 info 中获取。
+
+        Args:
+            video_url: 视频URL
+
+        Returns:
+            yt-dlp 的 info 字典
+        """
+        logger.info(f"📥 步骤1: 提取视频元数据（不下载）...")
+
+        extract_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': False,
+            # 添加HTTP头以绕过403错误
+            'http_headers': {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'en-us,en;q=0.5',
+                'Accept-Encoding': 'gzip, deflate',
+                'Connection': 'keep-alive',
+            },
+            # YouTube特定配置 - 尝试多个客户端
+            'extractor_args': {
+                'youtube': {
+                    'player_client': ['ios', 'android', 'web'],  # 优先使用iOS，然后是Android，最后是Web
+                }
+            },
+            # 添加重试和延迟
+            'retries': 5,
+            'fragment_retries': 5,
+            'sleep_interval': 1,
+            'max_sleep_interval': 3,
+        }
+
+        with yt_dlp.YoutubeDL(extract_opts) as ydl:
+            # 提取信息（不下载）
+            return ydl.extract_info(video_url, download=False)
+
+    def _resolve_max_resolution_height(self, info: Dict[str, Any]) -> int:
+        """
+        从 info 中解析服务器支持的最大分辨率高度（用于评分）
+
+        Args:
+            info: yt-dlp 的 info 字典
+
+        Returns:
+            最大分辨率高度
+        """
+        # 查找所有可用格式，找到最大分辨率高度
+        formats = info.get('formats', []) or []
+        max_resolution_height = 0
+
+        logger.info(f"    [🔍 分析] 分析可用格式，查找最大分辨率...")
+        logger.info(f"    [📊 格式总数] {len(formats)} 个格式")
+
+        # 方法1: 从所有格式中查找最大分辨率（包括视频+音频组合格式）
+        for fmt in formats:
+            height = fmt.get('height')
+            # 只考虑视频格式（有视频流）
+            if height and isinstance(height, (int, float)) and fmt.get('vcodec') != 'none':
+                height_int = int(height)
+                max_resolution_height = max(max_resolution_height, height_int)
+                logger.debug(f"    [📊 格式] {fmt.get('format_id', 'N/A')}: {height_int}p (vcodec: {fmt.get('vcodec', 'N/A')})")
+
+        # 方法2: 如果没有找到，尝试从 info 本身获取
+        if max_resolution_height == 0:
+            height = info.get('height', 0)
+            if height:
+                max_resolution_height = int(height)
+                logger.info(f"    [📊 元数据] 从主信息获取分辨率: {max_resolution_height}p")
+
+        # 方法3: 尝试从 requested_formats 获取（如果存在）
+        # （info 的 formats 已包含 best 格式，不再单独调用 extract_info 查询 best 格式）
+        if max_resolution_height == 0:
+            requested_formats = info.get('requested_formats', []) or []
+            for fmt in requested_formats:
+                height = fmt.get('height')
+                if height and isinstance(height, (int, float)) and fmt.get('vcodec') != 'none':
+                    height_int = int(height)
+                    max_resolution_height = max(max_resolution_height, height_int)
+                    logger.debug(f"    [📊 请求格式] 发现分辨率: {height_int}p")
+
+        # 方法4: 尝试从 format_id 解析（YouTube格式ID规则）
+        # YouTube格式ID: 18=360p, 22=720p, 37=1080p, 38=3072p等
+        if max_resolution_height == 0:
+            format_id = info.get('format_id', '')
+            format_map = {
+                '18': 360, '22': 720, '37': 1080, '38': 3072,
+                '133': 240, '134': 360, '135': 480, '136': 720, '137': 1080, '138': 2160
+            }
+            if format_id in format_map:
+                max_resolution_height = format_map[format_id]
+                logger.info(f"    [📊 格式ID] 从格式ID {format_id} 推断分辨率: {max_resolution_height}p")
+
+        # 如果仍然为0或很低，使用默认值1080p（假设YouTube视频至少支持1080p）
+        if max_resolution_height == 0 or max_resolution_height <= 360:
+            logger.warning(f"    [⚠️ 警告] 检测到的分辨率较低 ({max_resolution_height}p)，尝试使用1080p作为默认值")
+            # 先尝试1080p，如果失败再降级
+            max_resolution_height = 1080
+
+        logger.info(f"    [✅ 完成] 最大分辨率高度: {max_resolution_height}p")
+        return max_resolution_height
+
+    def _build_metadata(self, info: Dict[str, Any], max_resolution_height: int, video_url: str) -> Dict[str, Any]:
+        """
+        从 info 构建元数据字典（包含最大分辨率高度）
+
+        Args:
+            info: yt-dlp 的 info 字典
+            max_resolution_height: 最大分辨率高度
+            video_url: 视频URL
+
+        Returns:
+            元数据字典
+        """
+        return {
+            "title": info.get('title', ''),
+            "description": (info.get('description') or '')[:500],  # 限制长度
+            "duration": info.get('duration', 0),
+            "upload_date": info.get('upload_date', ''),
+            "view_count": info.get('view_count', 0),
+            "like_count": info.get('like_count', 0),
+            "channel": info.get('uploader', ''),
+            "channel_id": info.get('channel_id', ''),
+            "resolution": f"{info.get('width', 0)}x{info.get('height', 0)}",
+            "max_resolution_height": max_resolution_height,  # 关键：服务器支持的最大分辨率高度
+            "fps": info.get('fps', 0),
+            "format": info.get('format', ''),
+            "ext": info.get('ext', ''),
+            "url": video_url,
+            "tags": info.get('tags', []) or [],
+            "categories": info.get('categories', []) or [],
+            "thumbnail": info.get('thumbnail', ''),
+        }
+
     def _download_video(
         self,
         video_url: str,
         output_dir: Path,
-        video_quality: str = "480p"
+        video_quality: str = "480p",
+        info: Optional[Dict[str, Any]] = None,
+        max_resolution_height: Optional[int] = None
     ) -> Dict[str, Any]:
         """
-        下载视频（性能优化版本）
-        
-        核心逻辑：
-        1. 先提取元数据，获取最大分辨率高度（用于评分）
-        2. 然后下载低清版（bestaudio + worstvideo[height>=360]）用于内容分析
-        
-        Returns:
-            {
-                "success": bool,
-                "video_path": Path,
-                "metadata": dict,  # 包含 max_resolution_height
-                "error": str
-            }
-        """
-        """
-        使用 yt-dlp 下载视频
+        使用 yt-dlp 下载完整的低清版视频（按需读取远程流失败时的回退路径）
         
         核心逻辑：
-        1. 先提取元数据，获取最大分辨率高度（用于评分）
+        1. 复用已提取的元数据（未传入时才提取），获取最大分辨率高度（用于评分）
         2. 然后下载低清版（bestaudio + worstvideo[height>=360]）用于内容分析
         
         Returns:
@@ -318,113 +681,15 @@ class VideoCrawler:
             }
         
         try:
-            logger.info(f"📥 步骤1: 提取视频元数据（不下载）...")
-            
-            # 步骤1: 先提取元数据，获取最大分辨率
-            extract_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': False,
-                # 添加HTTP头以绕过403错误
-                'http_headers': {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-us,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate',
-                    'Connection': 'keep-alive',
-                },
-                # YouTube特定配置 - 尝试多个客户端
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': ['ios', 'android', 'web'],  # 优先使用iOS，然后是Android，最后是Web
-                    }
-                },
-                # 添加重试和延迟
-                'retries': 5,
-                'fragment_retries': 5,
-                'sleep_interval': 1,
-                'max_sleep_interval': 3,
-            }
-            
-            with yt_dlp.YoutubeDL(extract_opts) as ydl:
-                # 提取信息（不下载）
-                info = ydl.extract_info(video_url, download=False)
+            if info is None:
+                info = self._probe_video_info(video_url)
+            if max_resolution_height is None:
+                max_resolution_height = self._resolve_max_resolution_height(info)
             
             # 获取视频ID或标题作为文件名
             video_id = info.get('id', 'video')
             video_title = info.get('title', 'video')
-            safe_title = "".join(c for c in video_title if c.isalnum() or c in (' ', '-', '_')).strip()[:100]
-            
-            # 查找所有可用格式，找到最大分辨率高度
-            formats = info.get('formats', [])
-            max_resolution_height = 0
-            
-            logger.info(f"    [🔍 分析] 分析可用格式，查找最大分辨率...")
-            logger.info(f"    [📊 格式总数] {len(formats)} 个格式")
-            
-            # 方法1: 从所有格式中查找最大分辨率（包括视频+音频组合格式）
-            for fmt in formats:
-                height = fmt.get('height')
-                # 只考虑视频格式（有视频流）
-                if height and isinstance(height, (int, float)) and fmt.get('vcodec') != 'none':
-                    height_int = int(height)
-                    max_resolution_height = max(max_resolution_height, height_int)
-                    logger.debug(f"    [📊 格式] {fmt.get('format_id', 'N/A')}: {height_int}p (vcodec: {fmt.get('vcodec', 'N/A')})")
-            
-            # 方法2: 如果没有找到，尝试从 info 本身获取
-            if max_resolution_height == 0:
-                height = info.get('height', 0)
-                if height:
-                    max_resolution_height = int(height)
-                    logger.info(f"    [📊 元数据] 从主信息获取分辨率: {max_resolution_height}p")
-            
-            # 方法3: 尝试使用yt-dlp的best格式来获取最大分辨率
-            if max_resolution_height == 0 or max_resolution_height <= 360:
-                try:
-                    # 尝试获取best格式的信息
-                    best_format_opts = {
-                        'format': 'best',
-                        'quiet': True,
-                        'no_warnings': True,
-                    }
-                    with yt_dlp.YoutubeDL(best_format_opts) as ydl_best:
-                        best_info = ydl_best.extract_info(video_url, download=False)
-                        best_height = best_info.get('height', 0)
-                        if best_height and best_height > max_resolution_height:
-                            max_resolution_height = int(best_height)
-                            logger.info(f"    [📊 Best格式] 从best格式获取分辨率: {max_resolution_height}p")
-                except Exception as e:
-                    logger.debug(f"    [⚠️ Best格式] 获取失败: {str(e)}")
-            
-            # 方法4: 尝试从 requested_formats 获取（如果存在）
-            if max_resolution_height == 0:
-                requested_formats = info.get('requested_formats', [])
-                for fmt in requested_formats:
-                    height = fmt.get('height')
-                    if height and isinstance(height, (int, float)) and fmt.get('vcodec') != 'none':
-                        height_int = int(height)
-                        max_resolution_height = max(max_resolution_height, height_int)
-                        logger.debug(f"    [📊 请求格式] 发现分辨率: {height_int}p")
-            
-            # 方法5: 尝试从 format_id 解析（YouTube格式ID规则）
-            # YouTube格式ID: 18=360p, 22=720p, 37=1080p, 38=3072p等
-            if max_resolution_height == 0:
-                format_id = info.get('format_id', '')
-                format_map = {
-                    '18': 360, '22': 720, '37': 1080, '38': 3072,
-                    '133': 240, '134': 360, '135': 480, '136': 720, '137': 1080, '138': 2160
-                }
-                if format_id in format_map:
-                    max_resolution_height = format_map[format_id]
-                    logger.info(f"    [📊 格式ID] 从格式ID {format_id} 推断分辨率: {max_resolution_height}p")
-            
-            # 如果仍然为0或很低，使用默认值1080p（假设YouTube视频至少支持1080p）
-            if max_resolution_height == 0 or max_resolution_height <= 360:
-                logger.warning(f"    [⚠️ 警告] 检测到的分辨率较低 ({max_resolution_height}p)，尝试使用1080p作为默认值")
-                # 先尝试1080p，如果失败再降级
-                max_resolution_height = 1080
-            
-            logger.info(f"    [✅ 完成] 最大分辨率高度: {max_resolution_height}p")
+            safe_title = safe_filename(video_title)
             
             # 步骤2: 下载低清版（bestaudio + worstvideo[height>=360]）
             logger.info(f"📥 步骤2: 下载低清版视频（用于内容分析）...")
@@ -457,7 +722,7 @@ class VideoCrawler:
                 'outtmpl': str(output_dir / f'{safe_title}.%(ext)s'),
                 'quiet': False,
                 'no_warnings': False,
-                'writeinfojson': True,  # 保存元数据JSON
+                'writeinfojson': False,  # 元数据已在首次提取时获取
                 'writesubtitles': False,
                 'writeautomaticsub': False,
                 # 添加HTTP头以绕过403错误
@@ -531,42 +796,12 @@ class VideoCrawler:
                             video_path = max(video_files, key=lambda p: p.stat().st_mtime)
                             break
             
-            # 提取元数据（包含最大分辨率高度）
-            metadata = {
-                "title": info.get('title', ''),
-                "description": info.get('description', '')[:500],  # 限制长度
-                "duration": info.get('duration', 0),
-                "upload_date": info.get('upload_date', ''),
-                "view_count": info.get('view_count', 0),
-                "like_count": info.get('like_count', 0),
-                "channel": info.get('uploader', ''),
-                "channel_id": info.get('channel_id', ''),
-                "resolution": f"{info.get('width', 0)}x{info.get('height', 0)}",
-                "max_resolution_height": max_resolution_height,  # 关键：服务器支持的最大分辨率高度
-                "fps": info.get('fps', 0),
-                "format": info.get('format', ''),
-                "ext": info.get('ext', ''),
-                "url": video_url,
-            }
+            # 元数据直接来自首次提取的 info（已包含 tags/categories/thumbnail，无需再读 info.json）
+            metadata = self._build_metadata(info, max_resolution_height, video_url)
             
             logger.info(f"    [📊 元数据] 最大分辨率: {max_resolution_height}p（服务器支持）")
             logger.info(f"    [📊 元数据] 本地下载分辨率: {info.get('height', 'N/A')}p（用于分析）")
             
-            # 尝试读取 info.json（如果存在）
-            info_json_path = output_dir / f"{safe_title}.info.json"
-            if info_json_path.exists():
-                try:
-                    with open(info_json_path, 'r', encoding='utf-8') as f:
-                        full_info = json.load(f)
-                        # 补充更多元数据
-                        metadata.update({
-                            "tags": full_info.get('tags', []),
-                            "categories": full_info.get('categories', []),
-                            "thumbnail": full_info.get('thumbnail', ''),
-                        })
-                except Exception as e:
-                    logger.warning(f"⚠️  读取 info.json 失败: {e}")
-            
             if not video_path.exists():
                 return {
                     "success": False,
@@ -609,14 +844,248 @@ class VideoCrawler:
         # 统一使用低清版下载策略
         return 'bestaudio[ext=m4a]+worstvideo[ext=mp4][height>=360]/worst[height>=360]'
     
+    def _ffmpeg_available(self) -> bool:
+        """检查 ffmpeg 二进制文件是否可用"""
+        try:
+            subprocess.run(['ffmpeg', '-version'], 
+                         capture_output=True, 
+                         check=True, 
+                         timeout=5)
+            return True
+        except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
+            return False
+
+    def _run_ffmpeg(self, stream) -> None:
+        """
+        运行 ffmpeg-python 构建的命令（带超时，避免远程流卡住工作线程）
+
+        Raises:
+            subprocess.CalledProcessError: ffmpeg 返回非零退出码
+            subprocess.TimeoutExpired: 超时
+        """
+        subprocess.run(
+            ffmpeg.compile(stream, overwrite_output=True),
+            capture_output=True,
+            check=True,
+            timeout=self.ffmpeg_timeout
+        )
+
+    def _select_stream_formats(
+        self,
+        info: Dict[str, Any],
+        video_quality: str = "480p"
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        从 info 中选择可直接由 ffmpeg 按需读取的视频流和音频流
+
+        视频流：不低于目标分辨率的最小分辨率（没有则取最大可用分辨率）
+        音频流：码率不低于64k的最低码率纯音频流（转录足够），没有纯音频流时使用带音轨的视频流
+
+        Returns:
+            (视频格式, 音频格式)，没有可用流时为 None
+        """
+        formats = info.get('formats') or [info]
+        streamable = [
+            fmt for fmt in formats
+            if fmt.get('url')
+            and (fmt.get('protocol') or 'https') in STREAMABLE_PROTOCOLS
+            and not fmt.get('has_drm')
+        ]
+
+        target_height = QUALITY_HEIGHTS.get(video_quality, 360)
+        videos = [fmt for fmt in streamable if fmt.get('vcodec') != 'none' and fmt.get('height')]
+        video_fmt = None
+        if videos:
+            high_enough = [fmt for fmt in videos if fmt['height'] >= target_height]
+            if high_enough:
+                video_fmt = min(high_enough, key=lambda fmt: (fmt['height'], fmt.get('tbr') or 0))
+            else:
+                video_fmt = max(videos, key=lambda fmt: (fmt['height'], -(fmt.get('tbr') or 0)))
+
+        audios = [
+            fmt for fmt in streamable
+            if fmt.get('vcodec') == 'none' and fmt.get('acodec') not in (None, 'none')
+        ]
+        audio_fmt = None
+        if audios:
+            sufficient = [fmt for fmt in audios if (fmt.get('abr') or 0) >= 64]
+            if sufficient:
+                audio_fmt = min(sufficient, key=lambda fmt: fmt.get('abr') or 0)
+            else:
+                audio_fmt = max(audios, key=lambda fmt: fmt.get('abr') or 0)
+        elif video_fmt is not None and video_fmt.get('acodec') not in (None, 'none'):
+            audio_fmt = video_fmt
+
+        return video_fmt, audio_fmt
+
+    def _extract_from_streams(
+        self,
+        info: Dict[str, Any],
+        output_dir: Path,
+        video_quality: str = "480p",
+        num_frames: int = 6
+    ) -> Dict[str, Any]:
+        """
+        直接从远程流按需提取关键帧和音频段，不下载完整视频
+
+        - 关键帧：对每个采样时间点做 input seek（-ss 在 -i 之前），ffmpeg 通过 HTTP Range
+          只读取该时间点附近的数据
+        - 音频：只截取转录需要的前 N 秒（见 _audio_segment_seconds）
+
+        Returns:
+            {
+                "success": bool,
+                "audio_path": Path,  # 没有音轨时为 None
+                "frames_paths": List[Path],
+                "error": str
+            }
+        """
+        result = {"success": False, "audio_path": None, "frames_paths": [], "error": None}
+
+        if ffmpeg is None:
+            result["error"] = "ffmpeg-python 未安装"
+            return result
+        if not self._ffmpeg_available():
+            result["error"] = "ffmpeg 二进制文件未找到"
+            return result
+
+        duration = info.get('duration')
+        if not duration:
+            result["error"] = "元数据中没有视频时长"
+            return result
+
+        video_fmt, audio_fmt = self._select_stream_formats(info, video_quality)
+        if video_fmt is None:
+            result["error"] = "没有可直接读取的视频流"
+            return result
+
+        stem = safe_filename(info.get('title') or info.get('id') or 'video')
+        logger.info(f"📡 按需读取远程流: 视频格式 {video_fmt.get('format_id', 'N/A')} ({video_fmt.get('height')}p), "
+                    f"音频格式 {audio_fmt.get('format_id', 'N/A') if audio_fmt else '无'}")
+
+        frames_paths = self._extract_frames_at(
+            video_fmt['url'],
+            output_dir,
+            stem,
+            compute_keyframe_timestamps(float(duration), num_frames),
+            headers=_format_headers(video_fmt.get('http_headers') or info.get('http_headers'))
+        )
+        if not frames_paths:
+            result["error"] = "未能从远程流截取关键帧"
+            return result
+
+        audio_path = None
+        if audio_fmt is not None:
+            audio_result = self._extract_audio_from_source(
+                audio_fmt['url'],
+                output_dir / f"{stem}.mp3",
+                max_seconds=self._audio_segment_seconds(),
+                headers=_format_headers(audio_fmt.get('http_headers') or info.get('http_headers'))
+            )
+            if not audio_result["success"]:
+                result["error"] = f"截取音频段失败: {audio_result.get('error')}"
+                return result
+            audio_path = audio_result["audio_path"]
+
+        result.update({"success": True, "audio_path": audio_path, "frames_paths": frames_paths})
+        return result
+
+    def _extract_audio_from_source(
+        self,
+        source: str,
+        audio_path: Path,
+        max_seconds: Optional[float] = None,
+        headers: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        从本地文件或远程流提取音频（可只截取前 max_seconds 秒）
+
+        Returns:
+            {
+                "success": bool,
+                "audio_path": Path,
+                "error": str
+            }
+        """
+        input_kwargs = {}
+        if max_seconds:
+            input_kwargs['t'] = max_seconds
+        if headers:
+            input_kwargs['headers'] = headers
+
+        try:
+            stream = ffmpeg.input(source, **input_kwargs)
+            stream = ffmpeg.output(stream, str(audio_path), vn=None, acodec='libmp3lame', audio_bitrate='192k')
+            self._run_ffmpeg(stream)
+        except Exception as e:
+            return {"success": False, "audio_path": None, "error": str(e)}
+
+        if not audio_path.exists():
+            return {"success": False, "audio_path": None, "error": "音频文件未生成"}
+        return {"success": True, "audio_path": audio_path, "error": None}
+
+    def _extract_frames_at(
+        self,
+        source: str,
+        output_dir: Path,
+        stem: str,
+        timestamps: List[float],
+        headers: Optional[str] = None
+    ) -> List[Path]:
+        """
+        在指定时间点截取帧（每帧一次 input seek，多个时间点并行）
+
+        Args:
+            source: 本地文件路径或远程流URL
+            output_dir: 输出目录
+            stem: 帧文件名前缀
+            timestamps: 时间点列表（秒）
+            headers: 远程流需要的HTTP请求头
+
+        Returns:
+            成功生成的帧路径列表（按时间顺序）
+        """
+        def extract_frame(index: int, timestamp: float) -> Optional[Path]:
+            frame_filename = f"{stem}_frame_{index + 1:02d}.jpg"
+            frame_path = output_dir / frame_filename
+            input_kwargs = {'ss': timestamp}
+            if headers:
+                input_kwargs['headers'] = headers
+            try:
+                stream = ffmpeg.input(source, **input_kwargs)
+                # 使用字典传递带冒号的参数
+                stream = ffmpeg.output(stream, str(frame_path), vframes=1, **{'qscale:v': 2})
+                self._run_ffmpeg(stream)
+            except Exception as e:
+                logger.warning(f"  ⚠️  提取帧 {index + 1} 失败: {e}")
+                return None
+
+            if frame_path.exists():
+                logger.debug(f"  ✅ 帧 {index + 1}/{len(timestamps)}: {frame_filename} ({timestamp:.2f}s)")
+                return frame_path
+            logger.warning(f"  ⚠️  帧 {index + 1}/{len(timestamps)} 未生成: {frame_filename}")
+            return None
+
+        logger.info(f"🖼️  提取关键帧时间点: {[f'{t:.2f}s' for t in timestamps]}")
+
+        with ThreadPoolExecutor(max_workers=min(self.frame_workers, max(1, len(timestamps)))) as executor:
+            frames = list(executor.map(extract_frame, range(len(timestamps)), timestamps))
+        return [frame for frame in frames if frame is not None]
+
     def _extract_audio(
         self,
         video_path: Path,
-        output_dir: Path
+        output_dir: Path,
+        max_seconds: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         使用 ffmpeg 提取音频
         
+        Args:
+            video_path: 视频文件路径
+            output_dir: 输出目录
+            max_seconds: 只提取前 N 秒（None 表示完整音频）
+        
         Returns:
             {
                 "success": bool,
@@ -633,12 +1102,7 @@ class VideoCrawler:
         
         try:
             # 检查 ffmpeg 是否可用
-            try:
-                subprocess.run(['ffmpeg', '-version'], 
-                             capture_output=True, 
-                             check=True, 
-                             timeout=5)
-            except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
+            if not self._ffmpeg_available():
                 return {
                     "success": False,
                     "audio_path": None,
@@ -649,26 +1113,15 @@ class VideoCrawler:
             audio_filename = video_path.stem + ".mp3"
             audio_path = output_dir / audio_filename
             
-            logger.info(f"🎵 提取音频: {video_path.name} -> {audio_filename}")
+            logger.info(f"🎵 提取音频: {video_path.name} -> {audio_filename}"
+                        + (f"（前 {max_seconds:.0f} 秒）" if max_seconds else ""))
             
-            # 使用 ffmpeg-python 提取音频
-            stream = ffmpeg.input(str(video_path))
-            stream = ffmpeg.output(stream, str(audio_path), acodec='libmp3lame', audio_bitrate='192k')
-            ffmpeg.run(stream, overwrite_output=True, quiet=True)
-            
-            if not audio_path.exists():
-                return {
-                    "success": False,
-                    "audio_path": None,
-                    "error": "音频文件未生成"
-                }
+            audio_result = self._extract_audio_from_source(str(video_path), audio_path, max_seconds=max_seconds)
+            if not audio_result["success"]:
+                return audio_result
             
             logger.info(f"✅ 音频提取完成: {audio_path.name}")
-            return {
-                "success": True,
-                "audio_path": audio_path,
-                "error": None
-            }
+            return audio_result
         
         except Exception as e:
             error_msg = f"提取音频失败: {str(e)}"
@@ -683,15 +1136,17 @@ class VideoCrawler:
         self,
         video_path: Path,
         output_dir: Path,
-        num_frames: int = 6
+        num_frames: int = 6,
+        duration: Optional[float] = None
     ) -> Dict[str, Any]:
         """
-        使用 ffmpeg 提取关键帧（均匀分布）
+        使用 ffmpeg 提取关键帧（均匀分布，每帧一次 input seek，不解码整个文件）
         
         Args:
             video_path: 视频文件路径
             output_dir: 输出目录
             num_frames: 提取的帧数
+            duration: 视频时长（秒，已知时跳过 ffprobe）
         
         Returns:
             {
@@ -709,12 +1164,7 @@ class VideoCrawler:
         
         try:
             # 检查 ffmpeg 是否可用
-            try:
-                subprocess.run(['ffmpeg', '-version'], 
-                             capture_output=True, 
-                             check=True, 
-                             timeout=5)
-            except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
+            if not self._ffmpeg_available():
                 return {
                     "success": False,
                     "frames_paths": [],
@@ -722,55 +1172,29 @@ class VideoCrawler:
                 }
             
             # 获取视频时长
-            probe = ffmpeg.probe(str(video_path))
-            duration = float(probe['streams'][0].get('duration', 0))
-            
-            if duration == 0:
-                # 尝试从 format 获取
-                duration = float(probe.get('format', {}).get('duration', 0))
+            if not duration:
+                probe = ffmpeg.probe(str(video_path))
+                duration = float(probe['streams'][0].get('duration', 0))
+                
+                if duration == 0:
+                    # 尝试从 format 获取
+                    duration = float(probe.get('format', {}).get('duration', 0))
             
-            if duration == 0:
+            if not duration:
                 return {
                     "success": False,
                     "frames_paths": [],
                     "error": "无法获取视频时长"
                 }
             
-            logger.info(f"📹 视频时长: {duration:.2f} 秒")
+            logger.info(f"📹 视频时长: {float(duration):.2f} 秒")
             
-            # 计算关键帧时间点（均匀分布）
-            if num_frames == 1:
-                timestamps = [duration / 2]  # 中间位置
-            else:
-                timestamps = [duration * i / (num_frames - 1) for i in range(num_frames)]
-                # 避免在最后一秒提取（可能不完整）
-                timestamps = [min(t, duration - 0.5) for t in timestamps]
-            
-            frames_paths = []
-            video_stem = video_path.stem
-            
-            logger.info(f"🖼️  提取关键帧时间点: {[f'{t:.2f}s' for t in timestamps]}")
-            
-            for i, timestamp in enumerate(timestamps):
-                frame_filename = f"{video_stem}_frame_{i+1:02d}.jpg"
-                frame_path = output_dir / frame_filename
-                
-                try:
-                    # 使用 ffmpeg 提取帧
-                    stream = ffmpeg.input(str(video_path), ss=timestamp)
-                    # 使用字典传递带冒号的参数
-                    stream = ffmpeg.output(stream, str(frame_path), vframes=1, **{'qscale:v': 2})
-                    ffmpeg.run(stream, overwrite_output=True, quiet=True)
-                    
-                    if frame_path.exists():
-                        frames_paths.append(frame_path)
-                        logger.debug(f"  ✅ 帧 {i+1}/{num_frames}: {frame_filename} ({timestamp:.2f}s)")
-                    else:
-                        logger.warning(f"  ⚠️  帧 {i+1}/{num_frames} 未生成: {frame_filename}")
-                
-                except Exception as e:
-                    logger.warning(f"  ⚠️  提取帧 {i+1} 失败: {e}")
-                    continue
+            frames_paths = self._extract_frames_at(
+                str(video_path),
+                output_dir,
+                video_path.stem,
+                compute_keyframe_timestamps(float(duration), num_frames)
+            )
             
             if len(frames_paths) == 0:
                 return {
@@ -816,7 +1240,7 @@ def process_video(
         处理结果字典
     """
     crawler = VideoCrawler()
-    return crawler.process_video(video_url, output_dir, video_quality, num_frames)
+    return crawler.process_video(video_url, output_dir, video_quality, num_frames, use_cache=False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+视觉请求图片预处理
+关键帧在发送给视觉模型前按模型的有效分辨率缩小、重新编码为紧凑的JPEG/WebP，
+并用感知哈希（dHash）去掉几乎相同的帧（如长时间停留在同一张PPT）
+
+- 有效分辨率：GPT-4o 等模型会把图片缩放到短边 768px 左右再切块计费，更大的原图只增加上传体积
+- 缓存：按 图片内容哈希 + 预处理参数 缓存编码结果，同一关键帧重复评估时不再解码/缩放/编码；
+  缓存同时受条数和 data URI 总字节数限制
+- 去重只在调用方显式要求时进行（prepare(..., dedup=True) / deduplicate()），
+  调用方需要在构建提示词之前去重，提示词中的图片数量才与实际发送的一致
+- 未安装 Pillow 时退化为直接base64编码原图（不缩放、不去重）
+"""
+
+import base64
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+from utils.logger_utils import get_logger
+
+logger = get_logger('vision_image_prep')
+
+_MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp'
+}
+
+
+def dhash(image: "Image.Image", hash_size: int = 8) -> int:
+    """
+    计算差值哈希（dHash）：缩小为 (hash_size+1) x hash_size 灰度图，比较相邻像素亮度
+
+    Returns:
+        hash_size*hash_size 位整数
+    """
+    small = image.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """两个哈希之间不同的位数"""
+    return bin(a ^ b).count('1')
+
+
+@dataclass
+class PreparedImage:
+    """
+    预处理后的图片
+
+    Attributes:
+        path: 原图路径
+        data_uri: 发送给模型的 data URI
+        phash: 感知哈希（未安装 Pillow 时为 None）
+        width / height: 编码后的尺寸
+        original_bytes: 原图字节数
+        encoded_bytes: 编码后字节数
+    """
+    path: str
+    data_uri: str
+    phash: Optional[int]
+    width: int
+    height: int
+    original_bytes: int
+    encoded_bytes: int
+
+
+class VisionImagePreparer:
+    """
+    视觉请求图片预处理器（线程安全）
+
+    使用示例：
+        preparer = get_vision_image_preparer()
+        frame_paths = preparer.deduplicate(frame_paths)   # 可选：构建提示词之前去重
+        images = preparer.prepare(frame_paths)             # 已缩放
+        content += [{"type": "image_url", "image_url": {"url": img.data_uri}} for img in images]
+    """
+
+    def __init__(self, max_long_side: int = 1536, max_short_side: int = 768, image_format: str = 'jpeg',
+                 quality: int = 80, dedup_threshold: int = 5, cache_size: int = 512,
+                 cache_max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            max_long_side: 长边上限（像素）
+            max_short_side: 短边上限（像素），对应模型的有效分辨率
+            image_format: 编码格式（'jpeg' 或 'webp'）
+            quality: 编码质量（1-100）
+            dedup_threshold: dHash 汉明距离不超过该值视为重复帧（<0 表示不去重）
+            cache_size: 缓存的编码结果数量
+            cache_max_bytes: 缓存的 data URI 总字节数上限
+        """
+        self.max_long_side = max_long_side
+        self.max_short_side = max_short_side
+        self.image_format = 'WEBP' if str(image_format).lower() == 'webp' else 'JPEG'
+        self.quality = quality
+        self.dedup_threshold = dedup_threshold
+        self.cache_size = cache_size
+        self.cache_max_bytes = cache_max_bytes
+
+        self._cache: "OrderedDict[str, PreparedImage]" = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.stats = {
+            "prepared": 0,
+            "cache_hits": 0,
+            "duplicates_dropped": 0,
+            "original_bytes": 0,
+            "encoded_bytes": 0
+        }
+
+        if not HAS_PIL:
+            logger.warning("⚠️  Pillow未安装，视觉请求将直接发送原图（不缩放、不去重）")
+
+    def _settings_key(self) -> str:
+        return f"{self.max_long_side}x{self.max_short_side}:{self.image_format}:{self.quality}"
+
+    def prepare(self, image_paths: List[Union[str, Path]], dedup: bool = False) -> List[PreparedImage]:
+        """
+        预处理一组图片（保持原有顺序）
+
+        Args:
+            image_paths: 图片路径列表（调用方已完成路径安全校验）
+            dedup: 是否去掉与已保留帧几乎相同的帧
+
+        Returns:
+            PreparedImage 列表
+        """
+        kept: List[PreparedImage] = []
+        for path in image_paths:
+            image = self.prepare_one(path)
+            if dedup and self._is_duplicate(image, kept):
+                with self._lock:
+                    self.stats["duplicates_dropped"] += 1
+                logger.debug(f"跳过重复帧: {path}")
+                continue
+            kept.append(image)
+
+        if len(kept) < len(image_paths):
+            logger.info(f"🖼️  视觉请求去重: {len(image_paths)} 张 → {len(kept)} 张")
+        return kept
+
+    def deduplicate(self, image_paths: List[Union[str, Path]]) -> List[str]:
+        """
+        去掉几乎相同的帧，返回保留的路径（编码结果进入缓存，随后发送时直接复用）
+
+        供调用方在构建提示词之前使用，提示词中的图片数量应使用返回列表的长度
+        """
+        return [image.path for image in self.prepare(image_paths, dedup=True)]
+
+    def _is_duplicate(self, image: PreparedImage, kept: List[PreparedImage]) -> bool:
+        if self.dedup_threshold < 0 or image.phash is None:
+            return False
+        return any(
+            other.phash is not None and hamming_distance(image.phash, other.phash) <= self.dedup_threshold
+            for other in kept
+        )
+
+    def prepare_one(self, image_path: Union[str, Path]) -> PreparedImage:
+        """
+        预处理单张图片（按内容哈希缓存）
+
+        Raises:
+            IOError: 读取失败
+        """
+        path = Path(image_path)
+        raw = path.read_bytes()
+        key = f"{hashlib.sha1(raw).hexdigest()}:{self._settings_key()}"
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+        if cached is not None:
+            return PreparedImage(**{**cached.__dict__, 'path': str(path)})
+
+        prepared = self._encode(path, raw)
+
+        with self._lock:
+            size = len(prepared.data_uri)
+            if size <= self.cache_max_bytes and key not in self._cache:
+                self._cache[key] = prepared
+                self._cache_bytes += size
+                while len(self._cache) > self.cache_size or self._cache_bytes > self.cache_max_bytes:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cache_bytes -= len(evicted.data_uri)
+            self.stats["prepared"] += 1
+            self.stats["original_bytes"] += prepared.original_bytes
+            self.stats["encoded_bytes"] += prepared.encoded_bytes
+        return prepared
+
+    def _encode(self, path: Path, raw: bytes) -> PreparedImage:
+        """解码、缩放、重新编码；解码失败（或未安装 Pillow）时使用原图"""
+        if HAS_PIL:
+            try:
+                with Image.open(io.BytesIO(raw)) as source:
+                    source.load()
+                    image = source.convert('RGB')
+                phash = dhash(image)
+
+                width, height = image.size
+                scale = min(1.0, self.max_long_side / max(width, height), self.max_short_side / min(width, height))
+                if scale < 1.0:
+                    image = image.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.LANCZOS)
+
+                buffer = io.BytesIO()
+                image.save(buffer, format=self.image_format, quality=self.quality, optimize=True)
+                encoded = buffer.getvalue()
+
+                # 重新编码没有变小（如低质量JPEG、纯色PNG）时保留原图：模型端同样会缩放，token 不变
+                if len(encoded) >= len(raw):
+                    with Image.open(io.BytesIO(raw)) as source:
+                        return self._raw_image(path, raw, phash, *source.size)
+
+                mime = 'image/webp' if self.image_format == 'WEBP' else 'image/jpeg'
+                return PreparedImage(
+                    path=str(path),
+                    data_uri=f"data:{mime};base64,{base64.b64encode(encoded).decode('utf-8')}",
+                    phash=phash,
+                    width=image.size[0],
+                    height=image.size[1],
+                    original_bytes=len(raw),
+                    encoded_bytes=len(encoded)
+                )
+            except Exception as e:
+                logger.warning(f"⚠️  图片预处理失败，发送原图: {path.name}, {str(e)}")
+
+        return self._raw_image(path, raw, None, 0, 0)
+
+    @staticmethod
+    def _raw_image(path: Path, raw: bytes, phash: Optional[int], width: int, height: int) -> PreparedImage:
+        mime = _MIME_TYPES.get(path.suffix.lower(), 'image/jpeg')
+        return PreparedImage(
+            path=str(path),
+            data_uri=f"data:{mime};base64,{base64.b64encode(raw).decode('utf-8')}",
+            phash=phash,
+            width=width,
+            height=height,
+            original_bytes=len(raw),
+            encoded_bytes=len(raw)
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["cache_entries"] = len(self._cache)
+            stats["cache_bytes"] = self._cache_bytes
+        stats["compression_ratio"] = (
+            stats["encoded_bytes"] / stats["original_bytes"] if stats["original_bytes"] else 1.0
+        )
+        return stats
+
+
+# 全局实例
+_preparer: Optional[VisionImagePreparer] = None
+_preparer_lock = threading.Lock()
+
+
+def get_vision_image_preparer() -> VisionImagePreparer:
+    """
+    获取全局图片预处理器实例
+
+    配置来源：config/video_processing.yaml 中的 video.vision.image_prep
+
+    Returns:
+        VisionImagePreparer实例
+    """
+    global _preparer
+    if _preparer is None:
+        with _preparer_lock:
+            if _preparer is None:
+                prep_config = {}
+                try:
+                    from core.config_loader import get_config
+                    prep_config = get_config().get_video_config().get('vision', {}).get('image_prep', {}) or {}
+                except Exception as e:
+                    logger.warning(f"读取图片预处理配置失败，使用默认值: {str(e)}")
+                _preparer = VisionImagePreparer(
+                    max_long_side=prep_config.get('max_long_side', 1536),
+                    max_short_side=prep_config.get('max_short_side', 768),
+                    image_format=prep_config.get('format', 'jpeg'),
+                    quality=prep_config.get('quality', 80),
+                    dedup_threshold=prep_config.get('dedup_threshold', 5),
+                    cache_size=prep_config.get('cache_size', 512),
+                    cache_max_bytes=prep_config.get('cache_max_bytes', 64 * 1024 * 1024)
+                )
+    return _preparer
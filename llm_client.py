@@ -30,8 +30,11 @@ except ImportError:
     HAS_OPENAI_SDK = False
 
 from core.config_loader import get_config
+from core.http_transport import get_http_transport  # 共享HTTP连接池
+from core.vision_image_prep import get_vision_image_preparer  # 视觉请求图片预处理
 from core.proxy_utils import disable_proxy  # 统一的代理禁用函数
 from core.search_strategies import SearchOrchestrator, SearchContext  # 搜索引擎策略模式
+from core.search_quota_ledger import get_search_quota_ledger  # 跨进程额度账本
 from utils.logger_utils import get_logger  # 修复: 使用正确的导入路径
 from metaso_search_client import MetasoSearchClient
 
@@ -116,6 +119,14 @@ class InternalAPIClient:
             Path("/tmp/project_images"),        # 临时目录
         ]
 
+        # 视频产物缓存中的关键帧（批量评估从缓存直接进入视觉评估）
+        video_config = config.get_video_config()
+        artifact_cache_dir = (video_config.get('artifact_cache', {}) or {}).get('cache_dir', 'data/cache/video_artifacts')
+        self.allowed_image_dirs.append(Path.cwd() / artifact_cache_dir)
+
+        # 视觉请求图片预处理（缩放、重新编码、去重）
+        self.image_prep_enabled = ((video_config.get('vision', {}) or {}).get('image_prep', {}) or {}).get('enabled', True)
+
         if HAS_OPENAI_SDK:
             # OpenAI SDK会自动添加Bearer前缀，所以直接传入api_key即可
             # 添加超时设置以避免长时间挂起
@@ -126,17 +137,13 @@ class InternalAPIClient:
                 write=30.0,    # 写入超时30秒
                 pool=10.0      # 连接池超时10秒
             )
+            # 所有实例共享 internal_llm 配置档的连接池（trust_env=False：不读取环境变量中的代理设置）
             self.client = OpenAI(
                 api_key=self.api_key,
                 base_url=self.base_url,
                 timeout=timeout_config,
                 max_retries=2,   # 最多重试2次
-                http_client=httpx.Client(
-                    timeout=timeout_config,
-                    limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
-                    proxy=None,  # 明确禁用代理
-                    trust_env=False  # 关键：不读取环境变量中的代理设置！
-                )
+                http_client=get_http_transport('internal_llm').http_client
             )
             logger.info(f"✅ 公司内部API客户端初始化成功 (超时: connect=10s, read=60s, 代理: 已强制禁用)")
         else:
@@ -343,32 +350,32 @@ class InternalAPIClient:
 
             start_time = time.time()
 
-            # 使用httpx.AsyncClient进行异步调用
+            # 使用共享的 httpx.AsyncClient 进行异步调用（连接在调用之间复用，启用SSL证书验证）
             timeout = httpx.Timeout(60.0, connect=10.0)
-            # 修复: 启用SSL证书验证，使用系统CA证书（安全）
-            async with httpx.AsyncClient(timeout=timeout, verify=True) as client:
-                response = await client.post(
-                    url,
-                    headers=headers,
-                    json=data
-                )
-                response.raise_for_status()
+            client = get_http_transport('internal_llm').async_client()
+            response = await client.post(
+                url,
+                headers=headers,
+                json=data,
+                timeout=timeout
+            )
+            response.raise_for_status()
 
-                result = response.json()
-                elapsed_time = time.time() - start_time
+            result = response.json()
+            elapsed_time = time.time() - start_time
 
-                print(f"\n[📥 响应] 响应时间: {elapsed_time:.2f} 秒")
+            print(f"\n[📥 响应] 响应时间: {elapsed_time:.2f} 秒")
 
-                if 'choices' in result and len(result['choices']) > 0:
-                    content = result['choices'][0]['message']['content']
-                    if content and content.strip():
-                        logger.debug(f" Content 长度: {len(content)} 字符")
-                        print(f"{'='*80}\n")
-                        return content.strip()
-                    else:
-                        raise ValueError("API 响应中 content 为空字符串")
+            if 'choices' in result and len(result['choices']) > 0:
+                content = result['choices'][0]['message']['content']
+                if content and content.strip():
+                    logger.debug(f" Content 长度: {len(content)} 字符")
+                    print(f"{'='*80}\n")
+                    return content.strip()
                 else:
-                    raise ValueError("API 响应格式异常，缺少 choices 字段")
+                    raise ValueError("API 响应中 content 为空字符串")
+            else:
+                raise ValueError("API 响应格式异常，缺少 choices 字段")
 
         except httpx.TimeoutException as e:
             error_msg = str(e)
@@ -385,9 +392,9 @@ class InternalAPIClient:
             logger.error(f"异步API调用失败: {error_msg}，异常类型: {type(e).__name__}")
             raise ValueError(f"公司内部API异步调用失败: {error_msg}")
 
-    def _image_to_base64(self, image_path: str) -> str:
+    def _resolve_image_path(self, image_path: str) -> Path:
         """
-        将本地图片文件转换为base64编码的data URI
+        校验并解析本地图片路径
 
         修复: 添加路径遍历保护，仅允许访问预定义的目录
 
@@ -395,11 +402,11 @@ class InternalAPIClient:
             image_path: 图片文件路径（相对或绝对路径）
 
         Returns:
-            base64编码的data URI字符串
+            解析后的绝对路径
 
         Raises:
             FileNotFoundError: 文件不存在
-            ValueError: 路径不在允许的目录内或文件类型不允许
+            ValueError: 路径不在允许的目录内、文件类型不允许或文件过大
         """
         input_path = Path(image_path)
 
@@ -454,6 +461,30 @@ class InternalAPIClient:
                 f"允许的类型: {', '.join(allowed_extensions)}"
             )
 
+        # 验证文件大小（限制10MB）
+        max_size = 10 * 1024 * 1024  # 10MB
+        file_size = input_path.stat().st_size
+        if file_size > max_size:
+            raise ValueError(f"文件过大: {file_size} bytes (最大 {max_size} bytes)")
+
+        return input_path
+
+    def _image_to_base64(self, image_path: str) -> str:
+        """
+        将本地图片文件转换为base64编码的data URI（原图，不做预处理）
+
+        Args:
+            image_path: 图片文件路径（相对或绝对路径）
+
+        Returns:
+            base64编码的data URI字符串
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            ValueError: 路径不在允许的目录内或文件类型不允许
+        """
+        input_path = self._resolve_image_path(image_path)
+
         # 读取图片文件
         try:
             with open(input_path, 'rb') as f:
@@ -461,11 +492,6 @@ class InternalAPIClient:
         except IOError as e:
             raise IOError(f"读取文件失败: {e}")
 
-        # 验证文件大小（限制10MB）
-        max_size = 10 * 1024 * 1024  # 10MB
-        if len(image_data) > max_size:
-            raise ValueError(f"文件过大: {len(image_data)} bytes (最大 {max_size} bytes)")
-
         # 转换为base64
         image_base64 = base64.b64encode(image_data).decode('utf-8')
 
@@ -483,6 +509,30 @@ class InternalAPIClient:
         # 返回data URI格式
         return f"data:{mime_type};base64,{image_base64}"
     
+    def _prepare_vision_images(self, image_paths: List[str]) -> List[str]:
+        """
+        把本地图片转换为发送给视觉模型的 data URI
+
+        启用预处理时按模型有效分辨率缩小并重新编码（按内容哈希缓存）；否则直接发送原图。
+        这里不去重：调用方的提示词按传入的图片数量描述，需要去重时由调用方在构建提示词之前
+        使用 get_vision_image_preparer().deduplicate()
+
+        Args:
+            image_paths: 本地图片文件路径列表
+
+        Returns:
+            data URI 列表
+        """
+        resolved = [self._resolve_image_path(path) for path in image_paths]
+        if not self.image_prep_enabled:
+            return [self._image_to_base64(str(path)) for path in resolved]
+
+        images = get_vision_image_preparer().prepare(resolved)
+        original = sum(image.original_bytes for image in images)
+        encoded = sum(image.encoded_bytes for image in images)
+        logger.debug(f" 图片预处理: {len(images)} 张, {original // 1024}KB → {encoded // 1024}KB")
+        return [image.data_uri for image in images]
+
     def call_with_vision(self, prompt: str,
                         image_url: Optional[str] = None,
                         image_paths: Optional[List[str]] = None,
@@ -531,8 +581,7 @@ class InternalAPIClient:
             })
         elif image_paths:
             # 使用本地文件（转换为base64）
-            for image_path in image_paths:
-                base64_data_uri = self._image_to_base64(image_path)
+            for base64_data_uri in self._prepare_vision_images(image_paths):
                 content.append({
                     "type": "image_url",
                     "image_url": {"url": base64_data_uri}
@@ -665,7 +714,7 @@ class AIBuildersAPIClient:
 
         try:
             start_time = time.time()
-            response = requests.post(
+            response = get_http_transport('llm').post(
                 endpoint,
                 headers=self.headers,
                 json=payload,
@@ -835,9 +884,16 @@ class UnifiedLLMClient:
         # 初始化 Tavily 使用计数器（每月重置）
         self.tavily_usage = 0
 
+        # 初始化跨进程额度账本（所有worker共享，重启不清零）
+        try:
+            self.quota_ledger = get_search_quota_ledger()
+        except Exception as e:
+            logger.warning(f" 搜索额度账本初始化失败，使用进程内计数: {str(e)}")
+            self.quota_ledger = None
+
         # 初始化搜索引擎编排器（策略模式）
         # 重构: 使用策略模式简化 search() 方法复杂度
-        self.search_orchestrator = SearchOrchestrator()
+        self.search_orchestrator = SearchOrchestrator(quota_ledger=self.quota_ledger)
 
     def call_llm(self, prompt: str, system_prompt: Optional[str] = None,
                  max_tokens: int = 8000, temperature: float = 0.3,  # [修复] 2026-01-20: 从2000增加到8000
@@ -1011,13 +1067,8 @@ class UnifiedLLMClient:
         Returns:
             搜索结果列表
         """
-        # 创建搜索上下文（包含各搜索引擎的剩余额度）
-        context = SearchContext(
-            google_remaining=10000 - self.google_usage if self.google_hunter else 0,
-            metaso_remaining=5000 - self.metaso_client.usage_count if self.metaso_client else 0,
-            tavily_remaining=1000 - self.tavily_usage,
-            baidu_remaining=100 - self.baidu_usage if self.baidu_hunter else 0
-        )
+        # 创建搜索上下文 SearchContext（各搜索引擎的剩余额度，来自共享额度账本）
+        context = self.search_orchestrator.build_context(self)
 
         # 使用编排器执行搜索（策略模式）
         # 编排器会自动选择最合适的搜索引擎并处理降级逻辑
@@ -1030,6 +1081,35 @@ class UnifiedLLMClient:
             context=context
         )
 
+    async def search_async(self, query: str, max_results: int = 20,
+                           include_domains: Optional[List[str]] = None,
+                           country_code: str = "CN") -> List[Dict[str, Any]]:
+        """
+        搜索功能（异步版本，供异步扇出引擎使用）
+
+        引擎选择逻辑与 search() 相同；提供原生异步实现的引擎（Tavily）
+        走共享 httpx 连接池，其余引擎在扇出引擎的共享线程池中执行。
+
+        Args:
+            query: 搜索查询
+            max_results: 最大结果数
+            include_domains: 可选的域名列表
+            country_code: 国家代码（用于区域优化）
+
+        Returns:
+            搜索结果列表
+        """
+        context = self.search_orchestrator.build_context(self)
+
+        return await self.search_orchestrator.search_async(
+            client=self,
+            query=query,
+            max_results=max_results,
+            include_domains=include_domains,
+            country_code=country_code,
+            context=context
+        )
+
     def _search_with_metaso(
         self,
         query: str,
@@ -1081,6 +1161,51 @@ class UnifiedLLMClient:
         print(f"[🔄 降级] 切换到 Tavily")
         return self._search_with_tavily(query, max_results, include_domains, reason="Metaso失败")
 
+    def _build_tavily_request(self, query: str, max_results: int,
+                              include_domains: Optional[List[str]]) -> tuple:
+        """
+        构建 Tavily 搜索请求（同步/异步共用）
+
+        Returns:
+            (endpoint, payload) 元组
+        """
+        endpoint = f"{self.ai_builders_client.base_url}/v1/search/"
+
+        payload = {
+            "keywords": [query],
+            "max_results": min(max_results, 20)
+        }
+
+        # 处理域名限制
+        if include_domains and len(include_domains) > 0:
+            selected_domains = include_domains[:5]
+            domain_site_clause = " OR ".join([f"site:{domain}" for domain in selected_domains])
+            enhanced_query = f"{query} ({domain_site_clause})"
+            payload["keywords"] = [enhanced_query]
+
+        return endpoint, payload
+
+    @staticmethod
+    def _parse_tavily_response(status_code: int, result: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        解析 Tavily 搜索响应（同步/异步共用）
+
+        Raises:
+            ValueError: 响应状态码或格式异常
+        """
+        if status_code == 200 and result:
+            if "queries" in result and len(result["queries"]) > 0:
+                query_result = result["queries"][0]
+                if "response" in query_result and "results" in query_result["response"]:
+                    # 🔥 为每个结果添加search_engine字段
+                    results = query_result["response"]["results"]
+                    for item in results:
+                        item["search_engine"] = "Tavily"
+                    logger.info(f" Tavily] 搜索成功，返回 {len(results)} 个结果")
+                    return results
+
+        raise ValueError(f"Tavily搜索API调用失败，状态码: {status_code}")
+
     def _search_with_tavily(
         self,
         query: str,
@@ -1112,22 +1237,10 @@ class UnifiedLLMClient:
         else:
             logger.info(f"搜索 使用 Tavily（AI Builders）")
 
-        endpoint = f"{self.ai_builders_client.base_url}/v1/search/"
-
-        payload = {
-            "keywords": [query],
-            "max_results": min(max_results, 20)
-        }
-
-        # 处理域名限制
-        if include_domains and len(include_domains) > 0:
-            selected_domains = include_domains[:5]
-            domain_site_clause = " OR ".join([f"site:{domain}" for domain in selected_domains])
-            enhanced_query = f"{query} ({domain_site_clause})"
-            payload["keywords"] = [enhanced_query]
+        endpoint, payload = self._build_tavily_request(query, max_results, include_domains)
 
         try:
-            response = requests.post(
+            response = get_http_transport('search').post(
                 endpoint,
                 headers=self.ai_builders_client.headers,
                 json=payload,
@@ -1135,19 +1248,57 @@ class UnifiedLLMClient:
                 proxies=None  # 🔥 修复：直接禁用代理（内网API会被代理拦截）
             )
 
-            if response.status_code == 200:
-                result = response.json()
-                if "queries" in result and len(result["queries"]) > 0:
-                    query_result = result["queries"][0]
-                    if "response" in query_result and "results" in query_result["response"]:
-                        # 🔥 为每个结果添加search_engine字段
-                        results = query_result["response"]["results"]
-                        for item in results:
-                            item["search_engine"] = "Tavily"
-                        logger.info(f" Tavily] 搜索成功，返回 {len(results)} 个结果")
-                        return results
-
-            raise ValueError(f"Tavily搜索API调用失败，状态码: {response.status_code}")
+            result = response.json() if response.status_code == 200 else None
+            return self._parse_tavily_response(response.status_code, result)
+
+        except Exception as e:
+            raise ValueError(f"Tavily搜索API请求异常: {str(e)}")
+
+    async def _search_with_tavily_async(
+        self,
+        query: str,
+        max_results: int,
+        include_domains: Optional[List[str]],
+        reason: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        使用 Tavily 搜索（异步版本，复用扇出引擎的共享 httpx 连接池）
+
+        Args:
+            query: 搜索查询
+            max_results: 最大结果数
+            include_domains: 可选的域名列表
+            reason: 选择 Tavily 的原因
+
+        Returns:
+            搜索结果列表
+        """
+        if not self.ai_builders_client:
+            raise ValueError("AI Builders API不可用，无法使用 Tavily 搜索")
+
+        from core.async_search_fanout import get_async_search_fanout
+
+        # 更新使用计数器
+        self.tavily_usage += 1
+
+        if reason:
+            logger.info(f"搜索 使用 Tavily（{reason}，异步）")
+        else:
+            logger.info(f"搜索 使用 Tavily（AI Builders，异步）")
+
+        endpoint, payload = self._build_tavily_request(query, max_results, include_domains)
+
+        try:
+            http_client = get_async_search_fanout().get_http_client()
+            response = await http_client.post(
+                endpoint,
+                headers=self.ai_builders_client.headers,
+                json=payload,
+                timeout=30
+            )
+
+            result = response.json() if response.status_code == 200 else None
+            return self._parse_tavily_response(response.status_code, result)
 
         except Exception as e:
             raise ValueError(f"Tavily搜索API请求异常: {str(e)}")
@@ -1292,6 +1443,17 @@ class UnifiedLLMClient:
         Returns:
             统计信息字典
         """
+        # 有额度账本时使用所有进程共享的计数（Google/Baidu 按天，Metaso/Tavily 按月）
+        metaso_usage = self.metaso_client.usage_count if self.metaso_client else 0
+        tavily_usage = self.tavily_usage
+        google_usage = self.google_usage
+        baidu_usage = self.baidu_usage
+        if getattr(self, 'quota_ledger', None) is not None:
+            metaso_usage = self.quota_ledger.get_usage('metaso')['month']
+            tavily_usage = self.quota_ledger.get_usage('tavily')['month']
+            google_usage = self.quota_ledger.get_usage('google')['day']
+            baidu_usage = self.quota_ledger.get_usage('baidu')['day']
+
         stats = {
             "metaso": None,
             "tavily": None,
@@ -1303,31 +1465,31 @@ class UnifiedLLMClient:
         # Metaso 统计
         if self.metaso_client:
             stats["metaso"] = {
-                "usage_count": self.metaso_client.usage_count,
+                "usage_count": metaso_usage,
                 "free_tier_limit": 5000,
-                "remaining_free": 5000 - self.metaso_client.usage_count,
-                "total_cost": max(0, self.metaso_client.usage_count - 5000) * 0.03,
-                "tier": "免费" if self.metaso_client.usage_count < 5000 else "付费"
+                "remaining_free": 5000 - metaso_usage,
+                "total_cost": max(0, metaso_usage - 5000) * 0.03,
+                "tier": "免费" if metaso_usage < 5000 else "付费"
             }
             stats["enabled_engines"].append("Metaso")
 
         # Tavily 统计
         if self.ai_builders_client:
             stats["tavily"] = {
-                "usage_count": self.tavily_usage,
+                "usage_count": tavily_usage,
                 "free_tier_limit": 1000,
-                "remaining_free": 1000 - self.tavily_usage,
-                "total_cost": max(0, self.tavily_usage - 1000) * 0.05,
-                "tier": "免费" if self.tavily_usage < 1000 else "付费"
+                "remaining_free": 1000 - tavily_usage,
+                "total_cost": max(0, tavily_usage - 1000) * 0.05,
+                "tier": "免费" if tavily_usage < 1000 else "付费"
             }
             stats["enabled_engines"].append("Tavily (AI Builders)")
 
         # Google 统计
         if self.google_hunter:
             stats["google"] = {
-                "usage_count": self.google_usage,
+                "usage_count": google_usage,
                 "free_tier_limit": 10000,
-                "remaining_free": 10000 - self.google_usage,
+                "remaining_free": 10000 - google_usage,
                 "total_cost": 0,
                 "tier": "免费"
             }
@@ -1336,9 +1498,9 @@ class UnifiedLLMClient:
         # Baidu 统计
         if self.baidu_hunter:
             stats["baidu"] = {
-                "usage_count": self.baidu_usage,
+                "usage_count": baidu_usage,
                 "free_tier_limit": 100,
-                "remaining_free": 100 - self.baidu_usage,
+                "remaining_free": 100 - baidu_usage,
                 "total_cost": 0,
                 "tier": "免费"
             }
@@ -21,6 +21,7 @@ import json
 import time
 import requests
 from typing import Optional, List, Dict, Any
+from core.http_transport import get_http_transport  # 共享HTTP连接池
 from utils.logger_utils import get_logger  # 修复: 使用正确的导入路径
 from utils.error_handler import ErrorHandler
 
@@ -135,14 +136,13 @@ class MetasoSearchClient:
 
             # 发送请求
             start_time = time.time()
-            with requests.Session() as session:
-                session.trust_env = False  # 强制禁用代理
-                response = session.post(
-                    self.base_url,
-                    headers=headers,
-                    json=payload,
-                    timeout=timeout
-                )
+            # 共享连接池（search_direct 配置档：trust_env=False，强制禁用代理）
+            response = get_http_transport('search_direct').post(
+                self.base_url,
+                headers=headers,
+                json=payload,
+                timeout=timeout
+            )
             elapsed_time = time.time() - start_time
 
             logger.info(f"[📥 响应] 状态码: {response.status_code}, 耗时: {elapsed_time:.2f}s")
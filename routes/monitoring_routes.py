@@ -25,6 +25,7 @@ def init_monitoring_bp(perf_monitor=None, cache_manager=None):
     """
     from core.performance_monitor import get_performance_monitor
     from core.multi_level_cache import get_cache
+    from core.executor_registry import get_all_executor_stats
 
     # 使用单例模式
     perf_monitor = perf_monitor or get_performance_monitor()
@@ -87,7 +88,8 @@ def init_monitoring_bp(perf_monitor=None, cache_manager=None):
         """获取慢查询列表"""
         try:
             limit = request.args.get('limit', 20, type=int)
-            queries = perf_monitor.get_slow_queries(limit)
+            threshold = request.args.get('threshold', 5.0, type=float)
+            queries = perf_monitor.get_slow_queries(threshold=threshold, limit=limit)
             return jsonify({
                 "success": True,
                 "queries": queries,
@@ -187,12 +189,14 @@ def init_monitoring_bp(perf_monitor=None, cache_manager=None):
             # 合并多个统计源
             perf_stats = perf_monitor.get_all_stats()
             cache_stats = cache_manager.get_stats()
+            executor_stats = get_all_executor_stats()
 
             return jsonify({
                 "success": True,
                 "stats": {
                     "performance": perf_stats,
-                    "cache": cache_stats
+                    "cache": cache_stats,
+                    "executors": executor_stats
                 }
             })
         except Exception as e:
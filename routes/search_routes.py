@@ -4,7 +4,7 @@
 """
 
 import uuid
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from utils.logger_utils import get_logger
 
 logger = get_logger('search_routes')
@@ -54,15 +54,57 @@ def init_search_bp(concurrency_limiter=None):
                 "results": []
             }), 500
 
+    @search_bp.route('/api/search/stream', methods=['POST'])
+    def search_stream():
+        """流式搜索API（Server-Sent Events）：逐个引擎推送原始结果，逐批推送评分"""
+        try:
+            data = request.get_json()
+            if not data:
+                return jsonify({
+                    "success": False,
+                    "message": "请求数据为空",
+                    "results": []
+                }), 400
+
+            stream, status_code = search_handler.handle_search_stream(request_data=data)
+            if status_code != 200:
+                return jsonify(stream), status_code
+
+            return Response(
+                stream_with_context(stream),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
+
+        except Exception as e:
+            logger.error(f"[流式搜索] 处理失败: {str(e)}")
+            return jsonify({
+                "success": False,
+                "message": f"搜索失败: {str(e)}",
+                "results": []
+            }), 500
+
     @search_bp.route('/api/history', methods=['GET'])
     def get_search_history():
-        """获取搜索历史"""
+        """获取搜索历史（分页，按时间倒序）"""
         try:
-            # TODO: 实现搜索历史功能
+            from core.search_history_store import get_search_history_store
+            limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+            offset = max(request.args.get('offset', 0, type=int), 0)
+            history, total = get_search_history_store().query(
+                limit=limit,
+                offset=offset,
+                country=request.args.get('country') or None,
+                grade=request.args.get('grade') or None,
+                subject=request.args.get('subject') or None,
+                include_results=request.args.get('include_results', '').lower() in ('1', 'true', 'yes')
+            )
             return jsonify({
                 "success": True,
-                "history": [],
-                "total": 0
+                "history": history,
+                "total": total,
+                "limit": limit,
+                "offset": offset
             })
         except Exception as e:
             logger.error(f"[搜索历史] 获取失败: {str(e)}")
@@ -77,11 +119,13 @@ def init_search_bp(concurrency_limiter=None):
         try:
             query = request.args.get('q', '').strip()
             country = request.args.get('country', '').strip()
+            limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
 
-            # TODO: 实现搜索建议功能
+            from core.search_suggestions import get_search_suggestions
+            suggestions = get_search_suggestions().get_suggestions(query, country=country or None, limit=limit)
             return jsonify({
                 "success": True,
-                "suggestions": []
+                "suggestions": suggestions
             })
         except Exception as e:
             logger.error(f"[搜索建议] 获取失败: {str(e)}")
@@ -101,7 +101,7 @@ def test_performance():
     print(f"  缓存命中: {cache_stats['hits']}")
     print(f"  缓存未命中: {cache_stats['misses']}")
     print(f"  命中率: {cache_stats['hit_rate']:.1%}")
-    print(f"  缓存文件数: {cache_stats['cache_files_count']}")
+    print(f"  缓存条目数: {cache_stats['cache_entries']}")
 
     # 结果对比
     print(f"\n{'='*80}")
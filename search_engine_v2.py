@@ -27,7 +27,15 @@ from utils.json_utils import extract_json_array
 from search_strategy_agent import SearchStrategyAgent
 from core.search_cache import get_search_cache
 from core.multi_level_cache import get_cache as get_multi_level_cache
+from core.async_search_fanout import get_async_search_fanout, FanoutTask
+from core.executor_registry import get_executor, ExecutorSaturatedError
+from core.search_quota_ledger import get_search_quota_ledger, QuotaExceededError
+from core.single_flight import get_single_flight, get_async_single_flight
 from core.config_loader import get_config
+from core.http_transport import get_http_transport
+from core.playlist_metadata import get_playlist_metadata_service, PlaylistMetadataService
+from core.result_dedup import get_result_deduplicator
+from core.resource_classifier import get_resource_classifier
 from core.performance_monitor import get_performance_monitor
 from core.result_scorer import get_result_scorer
 from core.recommendation_generator import get_recommendation_generator
@@ -482,7 +490,7 @@ class AIBuildersClient:
             import time
             from llm_client import get_proxy_config
             start_time = time.time()
-            response = requests.post(
+            response = get_http_transport('llm').post(
                 endpoint,
                 headers=self.headers,
                 json=payload,
@@ -569,23 +577,7 @@ class AIBuildersClient:
                     include_domains=include_domains,
                     country_code=country_code or "CN"  # 默认使用中国，可以传入其他代码
                 )
-                # Convert dicts to SearchResult objects
-                results = []
-                for item in results_dicts:
-                    url = item.get('url', '')
-                    # 🔒 P1 SSRF防护: 验证URL安全性
-                    if not is_safe_url(url):
-                        logger.warning(f"Blocked unsafe URL from search results: {url}")
-                        continue  # 跳过不安全的URL
-
-                    results.append(SearchResult(
-                        title=item.get('title', ''),
-                        url=url,
-                        snippet=item.get('snippet', item.get('content', '')),
-                        source=item.get('search_engine', 'Unknown'),
-                        search_engine=item.get('search_engine', 'Unknown')
-                    ))
-                return results
+                return self._to_search_results(results_dicts)
             except Exception as e:
                 # 🔒 P1 安全修复: 不暴露详细的异常信息和堆栈跟踪
                 logger.error(f"UnifiedClient search failed: {type(e).__name__}")
@@ -594,6 +586,50 @@ class AIBuildersClient:
         print(f"[❌ 搜索失败] 无可用的搜索引擎")
         return []
 
+    async def search_async(self, query: str, max_results: int = 10, include_domains: list = None,
+                           country_code: str = None) -> list:
+        """
+        执行搜索（异步版本，供 _parallel_search 的异步扇出引擎使用）
+        """
+        if self.use_unified_client and hasattr(self.unified_client, 'search_async'):
+            try:
+                results_dicts = await self.unified_client.search_async(
+                    query=query,
+                    max_results=max_results,
+                    include_domains=include_domains,
+                    country_code=country_code or "CN"
+                )
+                return self._to_search_results(results_dicts)
+            except Exception as e:
+                logger.error(f"UnifiedClient async search failed: {type(e).__name__}")
+                return []
+
+        # 没有异步实现时，在扇出引擎的共享线程池中执行同步搜索
+        from core.async_search_fanout import get_async_search_fanout
+        return await get_async_search_fanout().run_blocking(
+            self.search, query, max_results, include_domains, country_code
+        )
+
+    @staticmethod
+    def _to_search_results(results_dicts: list) -> List['SearchResult']:
+        """将搜索引擎返回的字典列表转换为SearchResult对象（过滤不安全URL）"""
+        results = []
+        for item in results_dicts:
+            url = item.get('url', '')
+            # 🔒 P1 SSRF防护: 验证URL安全性
+            if not is_safe_url(url):
+                logger.warning(f"Blocked unsafe URL from search results: {url}")
+                continue  # 跳过不安全的URL
+
+            results.append(SearchResult(
+                title=item.get('title', ''),
+                url=url,
+                snippet=item.get('snippet', item.get('content', '')),
+                source=item.get('search_engine', 'Unknown'),
+                search_engine=item.get('search_engine', 'Unknown')
+            ))
+        return results
+
 
 # ============================================================================
 # 搜索词生成器
@@ -612,102 +648,10 @@ class ResultEvaluator:
     
     def _classify_resource_type(self, title: str, url: str, snippet: str) -> str:
         """
-        基于规则和LLM分类资源类型
+        基于规则分类资源类型（规则见 core/resource_classifier.py）
         返回：播放列表、视频、教材、教辅、练习题、其他
         """
-        title_lower = title.lower()
-        url_lower = url.lower()
-        snippet_lower = snippet.lower() if snippet else ""
-        combined_text = f"{title_lower} {url_lower} {snippet_lower}"
-
-        # 0. 播放列表检查（优先级最高）
-        # ⚠️ 排除博主的全部播放列表页面（不是单个视频合集）
-        if any(exclude in url_lower for exclude in ['/playlists$', '/channel/', '/c/', '/user/']):
-            # 这些是博主的全部播放列表页面，不是单个视频合集
-            # 仍然标记为播放列表类型，但会在后续过滤中处理
-            return "其他"
-
-        # 检查URL中的播放列表特征（单个具体的播放列表）
-        if any(indicator in url_lower for indicator in ['playlist?', 'list=', '/videos']):
-            return "播放列表"
-
-        # 检查标题中的播放列表关键词
-        playlist_keywords = [
-            'playlist', 'play list',
-            'complete course', 'full course', 'all lessons',
-            'series', 'collection',
-            'قائمة التشغيل', 'سلسلة',  # 阿拉伯语
-            '播放列表', '系列', '全套', '完整课程'
-        ]
-        if any(kw in combined_text for kw in playlist_keywords):
-            # 如果标题包含播放列表关键词，但URL是/playlists页面，则排除
-            if '/playlists' in url_lower and not any(ind in url_lower for ind in ['list=', 'playlist?']):
-                return "其他"
-            return "播放列表"
-
-        # 1. 视频相关关键词
-        video_keywords = [
-            'video', 'youtube.com', 'youtu.be', 'watch',
-            '播放', '视频', 'video pembelajaran',
-            'video lesson', 'tutorial', '课程视频', 'lecture', 'lesson',
-            'vimeo.com', 'bilibili.com/video', 'dailymotion.com'
-        ]
-        if any(keyword in combined_text for keyword in video_keywords):
-            return "视频"
-
-        # 2. 练习题相关关键词
-        exercise_keywords = [
-            'exercise', 'practice', 'quiz', 'test', 'exam', 'worksheet',
-            '练习题', '练习', 'latihan', 'soal', 'ujian', 'kuis',
-            'lembar kerja', 'lkpd', 'assess', 'assessment'
-        ]
-        if any(keyword in combined_text for keyword in exercise_keywords):
-            return "练习题"
-
-        # 3. 教材相关关键词（优先级高于教辅）
-        textbook_keywords = [
-            'textbook', 'book', '教材', '教科书', 'buku', 'buku pelajaran',
-            'modul', 'module', 'coursebook', 'student book',
-            'buku siswa', 'buku guru', 'kurikulum'
-        ]
-        if any(keyword in combined_text for keyword in textbook_keywords):
-            return "教材"
-
-        # 4. 教辅相关关键词
-        supplement_keywords = [
-            'guide', 'handbook', 'manual', '教辅', '参考书', 'panduan',
-            '参考', 'supplement', '辅助材料', 'supplementary material',
-            'bahan ajar', 'teaching material'
-        ]
-        if any(keyword in combined_text for keyword in supplement_keywords):
-            return "教辅"
-
-        # 5. PDF文件通常属于教材或教辅
-        if '.pdf' in url_lower:
-            # 进一步判断
-            if any(kw in title_lower for kw in ['modul', 'buku', 'textbook', 'kurikulum']):
-                return "教材"
-            elif any(kw in title_lower for kw in ['panduan', 'guide', 'handbook']):
-                return "教辅"
-            else:
-                return "教材"
-
-        # 6. 学习资料相关
-        learning_keywords = [
-            'material', 'resource', 'content', '学习资料', '学习资源',
-            'materi', 'bahan ajar', 'learning material', 'study material'
-        ]
-        if any(keyword in combined_text for keyword in learning_keywords):
-            return "其他"
-
-        # 7. 根据URL推断
-        if 'slideshare.net' in url_lower or 'scribd.com' in url_lower:
-            return "教辅"
-        if 'kemdikbud.go.id' in url_lower:
-            return "教材"
-
-        # 默认返回"其他"
-        return "其他"
+        return get_resource_classifier().classify(title, url, snippet).resource_type
     
     def evaluate_results(self, search_results: List[SearchResult],
                          country: str = "", grade: str = "", subject: str = "") -> List[SearchResult]:
@@ -723,10 +667,10 @@ class ResultEvaluator:
 
         print(f"    [ℹ️ 评估] 开始评估和分类 {len(search_results)} 个结果...")
 
-        for result in search_results:
+        classifications = get_resource_classifier().classify_batch(search_results)
+        for result, classification in zip(search_results, classifications):
             # 分类资源类型
-            resource_type = self._classify_resource_type(result.title, result.url, result.snippet)
-            result.resource_type = resource_type
+            result.resource_type = classification.resource_type
 
             # 设置默认评分 (修复: 移除虚假的默认评分)
             # if not result.score or result.score == 0:
@@ -809,16 +753,20 @@ class SearchEngineV2:
 
         self.search_cache = get_search_cache()  # 旧版单级缓存（兼容保留）
         self.multi_cache = get_multi_level_cache()  # 新版三级缓存（L1内存+L2Redis+L3磁盘）
+        # 搜索结果缓存的软/硬TTL（软TTL后返回旧结果并后台刷新，硬TTL后重新搜索）
+        cache_config = get_config().get_search_config().get('cache', {}) or {}
+        self.cache_result_ttl = cache_config.get('result_ttl', 3600)
+        self.cache_result_soft_ttl = cache_config.get('result_soft_ttl', 900)
         # 评分器将在search方法中根据country_code动态初始化（带知识库）
         self.result_scorer = None  # 将在search时初始化为带知识库的评分器
         self.result_scorer_without_kb = get_result_scorer()  # 无知识库的备用评分器
         self._scorer_cache = {}  # 缓存各国的评分器 {country_code: scorer}
         self._scorer_cache_lock = threading.Lock()  # 🔒 P1线程安全: 评分器缓存的线程锁
-        self._playlist_cache = {}  # 🚀 P1性能优化: 缓存播放列表信息 {playlist_url: {video_count, duration}}
+        self._event_sink = None  # 流式搜索的进度事件回调 (event, payload)，由 search(on_event=...) 设置
         self.recommendation_generator = get_recommendation_generator()  # LLM推荐理由生成器
         print(f"    [✅] 智能评分器已初始化（将在搜索时加载知识库）")
         print(f"    [✅] LLM推荐理由生成器已初始化")
-        print(f"    [✅] 三级缓存系统已启用 (L1:内存100条/5分钟 + L2:Redis/1小时 + L3:磁盘/24小时)")
+        print(f"    [✅] 三级缓存系统已启用 (L1:内存LRU/5分钟 + L2:Redis/1小时 + L3:磁盘/24小时)")
 
         # 🔍 初始化搜索透明度收集器
         from core.search_transparency_collector import get_transparency_collector
@@ -873,6 +821,27 @@ class SearchEngineV2:
             print(f"    [⚠️] Google 搜索初始化失败: {str(e)}")
             self.google_search_enabled = False
 
+    def _search_with_quota(self, engine: str, hunter, query: str, **kwargs) -> List:
+        """
+        直接调用 Google/Baidu Hunter 前扣减共享额度账本
+
+        与 SearchOrchestrator._acquire_quota 共用同一个账本；额度用尽或触发速率限制时
+        抛出 QuotaExceededError，由调用方走原有的降级路径
+        """
+        ledger = get_search_quota_ledger()
+        if ledger is not None and not ledger.try_acquire(engine):
+            raise QuotaExceededError(f"{engine} 共享额度用尽或触发速率限制")
+        return hunter.search(query, **kwargs)
+
+    def _search_baidu(self, query: str, max_results: int = 30) -> List:
+        """百度搜索（受共享额度约束）"""
+        return self._search_with_quota('baidu', self.baidu_hunter, query, max_results=max_results)
+
+    def _search_google(self, query: str, max_results: int = 30, country_code: str = None) -> List:
+        """Google搜索（受共享额度约束）"""
+        return self._search_with_quota('google', self.google_hunter, query,
+                                       max_results=max_results, country_code=country_code)
+
     def _get_memory_usage(self) -> str:
         """获取当前内存使用情况"""
         try:
@@ -1128,6 +1097,99 @@ class SearchEngineV2:
         Returns:
             搜索结果列表
         """
+        cached_results = self._get_cached_results(
+            query, engine_name, max_results, include_domains,
+            refresh_func=lambda: search_func(query, max_results, include_domains)
+        )
+        if cached_results is not None:
+            return cached_results
+
+        def fetch_and_store() -> List[SearchResult]:
+            results = search_func(query, max_results, include_domains)
+            self._store_cached_results(query, engine_name, results, max_results, include_domains)
+            return results
+
+        # 相同引擎+相同查询的调用正在进行时，等待并共享其结果
+        flight_key = self._engine_flight_key(query, engine_name, max_results, include_domains)
+        results, shared = get_single_flight('engine_search').do(flight_key, fetch_and_store)
+        if shared:
+            logger.info(f"🔗 [请求合并] 复用进行中的引擎调用 [{engine_name}]: {query[:50]}...")
+            return [result.model_copy(deep=True) for result in results]
+        return results
+
+    async def _cached_search_async(self, query: str, search_coro_func, engine_name: str, max_results: int = 15,
+                                   include_domains: Optional[List[str]] = None) -> List[SearchResult]:
+        """
+        带多级缓存的搜索包装器（异步版本）
+
+        缓存读写（可能涉及Redis/磁盘I/O）在扇出引擎的共享线程池中执行，不阻塞事件循环
+
+        Args:
+            query: 搜索查询
+            search_coro_func: 实际的搜索函数，调用后返回协程
+            engine_name: 搜索引擎名称（用于缓存键）
+            max_results: 最大结果数
+            include_domains: 包含的域名列表
+
+        Returns:
+            搜索结果列表
+        """
+        fanout = get_async_search_fanout()
+
+        # 软TTL过期时的后台刷新在缓存刷新线程中执行，通过扇出事件循环运行协程
+        def refresh_func() -> List[SearchResult]:
+            return fanout.run_coroutine(
+                lambda: search_coro_func(query, max_results, include_domains),
+                timeout=fanout.deadline_for(engine_name)
+            )
+
+        cached_results = await fanout.run_blocking(
+            self._get_cached_results, query, engine_name, max_results, include_domains, refresh_func
+        )
+        if cached_results is not None:
+            return cached_results
+
+        async def fetch_and_store() -> List[SearchResult]:
+            results = await search_coro_func(query, max_results, include_domains)
+            await fanout.run_blocking(
+                self._store_cached_results, query, engine_name, results, max_results, include_domains
+            )
+            return results
+
+        # 相同引擎+相同查询的调用正在进行时，等待并共享其结果
+        flight_key = self._engine_flight_key(query, engine_name, max_results, include_domains)
+        results, shared = await get_async_single_flight('engine_search').do(flight_key, fetch_and_store)
+        if shared:
+            logger.info(f"🔗 [请求合并] 复用进行中的引擎调用 [{engine_name}]: {query[:50]}...")
+            return [result.model_copy(deep=True) for result in results]
+        return results
+
+    def _engine_flight_key(self, query: str, engine_name: str, max_results: int,
+                           include_domains: Optional[List[str]]) -> str:
+        """
+        生成引擎调用的合并键（与多级缓存键一致，规范化后相同的查询会被合并）
+        """
+        return self.multi_cache.generate_cache_key(
+            query=query,
+            engine=engine_name,
+            max_results=max_results,
+            include_domains=include_domains
+        )
+
+    def _get_cached_results(self, query: str, engine_name: str, max_results: int,
+                            include_domains: Optional[List[str]],
+                            refresh_func: Optional[Callable[[], List[SearchResult]]] = None) -> Optional[List[SearchResult]]:
+        """
+        从多级缓存读取搜索结果
+
+        超过软TTL的结果仍然返回（stale-while-revalidate），并在后台调用 refresh_func 刷新
+
+        Args:
+            refresh_func: 无参函数，重新执行搜索并返回SearchResult列表；None表示不后台刷新
+
+        Returns:
+            缓存命中时返回SearchResult列表，未命中或缓存禁用时返回None
+        """
         # 🔒 P1 环境变量验证: 检查是否启用多级缓存
         enable_multi_cache = validate_env_bool(
             os.getenv("ENABLE_MULTI_CACHE"),
@@ -1135,55 +1197,78 @@ class SearchEngineV2:
             default=False
         )
 
-        if enable_multi_cache:
-            # 使用多级缓存系统（带查询规范化）
-            cached_result = self.multi_cache.get(
+        if not enable_multi_cache:
+            # 禁用缓存，直接执行搜索
+            logger.info(f"⚠️ 多级缓存已禁用 [{engine_name}]: {query[:50]}...")
+            return None
+
+        # 使用多级缓存系统（带查询规范化）
+        if refresh_func is not None:
+            cached_result, is_stale = self.multi_cache.get_or_revalidate(
                 query=query,
                 engine=engine_name,
+                refresh_func=lambda: [result.model_dump() for result in refresh_func()],
+                ttl=self.cache_result_ttl,
+                soft_ttl=self.cache_result_soft_ttl,
                 max_results=max_results,
                 include_domains=include_domains
             )
         else:
-            # 禁用缓存，直接执行搜索
-            cached_result = None
-
-        if cached_result is not None:
-            cache_stats = self.multi_cache.get_stats()
-            logger.info(
-                f"✅ 多级缓存命中 [{engine_name}]: {query[:50]}... "
-                f"(命中率: {cache_stats['hit_rate']:.1f}%, "
-                f"L1:{cache_stats['l1_hit_rate']:.1f}% "
-                f"L2:{cache_stats['l2_hit_rate']:.1f}% "
-                f"L3:{cache_stats['l3_hit_rate']:.1f}%)"
-            )
-            # 从缓存数据重建SearchResult对象
-            return [SearchResult(**item) for item in cached_result]
-
-        # 缓存未命中，执行实际搜索
-        if not enable_multi_cache:
-            logger.info(f"⚠️ 多级缓存已禁用 [{engine_name}]: {query[:50]}...")
-        else:
-            logger.info(f"❌ 多级缓存未命中 [{engine_name}]: {query[:50]}...")
-        results = search_func(query, max_results, include_domains)
-
-        # 将结果存入多级缓存（仅在启用时）
-        if enable_multi_cache:
-            results_dict = [result.model_dump() for result in results]
-            self.multi_cache.set(
+            cached_result = self.multi_cache.get(
                 query=query,
                 engine=engine_name,
-                data=results_dict,
-                ttl=3600,  # 1小时TTL
                 max_results=max_results,
                 include_domains=include_domains
             )
-        return results
+            is_stale = False
+
+        if cached_result is None:
+            logger.info(f"❌ 多级缓存未命中 [{engine_name}]: {query[:50]}...")
+            return None
+
+        # 只读内存计数器：get_stats() 会扫描L3存储目录，不适合每次命中调用
+        cache_stats = self.multi_cache.get_hit_rates()
+        logger.info(
+            f"✅ 多级缓存命中{'（旧数据，后台刷新中）' if is_stale else ''} [{engine_name}]: {query[:50]}... "
+            f"(命中率: {cache_stats['hit_rate']:.1f}%, "
+            f"L1:{cache_stats['l1_hit_rate']:.1f}% "
+            f"L2:{cache_stats['l2_hit_rate']:.1f}% "
+            f"L3:{cache_stats['l3_hit_rate']:.1f}%)"
+        )
+        # 从缓存数据重建SearchResult对象
+        return [SearchResult(**item) for item in cached_result]
+
+    def _store_cached_results(self, query: str, engine_name: str, results: List[SearchResult],
+                              max_results: int, include_domains: Optional[List[str]]) -> None:
+        """将搜索结果存入多级缓存（仅在启用时）"""
+        enable_multi_cache = validate_env_bool(
+            os.getenv("ENABLE_MULTI_CACHE"),
+            "ENABLE_MULTI_CACHE",
+            default=False
+        )
+        if not enable_multi_cache:
+            return
+
+        results_dict = [result.model_dump() for result in results]
+        self.multi_cache.set(
+            query=query,
+            engine=engine_name,
+            data=results_dict,
+            ttl=self.cache_result_ttl,
+            soft_ttl=self.cache_result_soft_ttl,
+            max_results=max_results,
+            include_domains=include_domains
+        )
 
     def _parallel_search(self, query: str, search_tasks: List[Dict[str, Any]],
-                        timeout: int = 30, country_code: str = "CN") -> Dict[str, List[SearchResult]]:
+                        timeout: int = 30, country_code: str = "CN",
+                        on_result: Optional[Callable[[str, List[SearchResult]], None]] = None) -> Dict[str, List[SearchResult]]:
         """
         并行执行多个搜索任务
 
+        默认使用异步扇出引擎（core/async_search_fanout.py）：所有引擎在同一事件循环上并发执行，
+        共享连接池，按引擎设置截止时间。设置 ENABLE_ASYNC_SEARCH=false 可回退到线程池实现。
+
         Args:
             query: 默认搜索查询（如果任务没有指定查询，则使用此查询）
             search_tasks: 搜索任务列表，每个任务包含:
@@ -1195,10 +1280,20 @@ class SearchEngineV2:
                 - include_domains: 包含的域名（可选）
             timeout: 超时时间（秒）
             country_code: 国家代码（用于免费额度优先策略）
+            on_result: 每个任务完成时的回调 (task_name, results)，按完成顺序调用
 
         Returns:
             字典，键为任务名称，值为搜索结果列表
         """
+        # 🔒 P1 环境变量验证: 检查是否启用异步扇出
+        enable_async_search = validate_env_bool(
+            os.getenv("ENABLE_ASYNC_SEARCH"),
+            "ENABLE_ASYNC_SEARCH",
+            default=True
+        )
+        if enable_async_search:
+            return self._parallel_search_fanout(query, search_tasks, timeout, country_code, on_result)
+
         results = {}
         start_time = time.time()
 
@@ -1280,39 +1375,80 @@ class SearchEngineV2:
                 logger.error(f"并行搜索任务失败 [{task_name}]: {str(e)}")
                 return (task_name, [])
 
-        # 使用线程池并行执行搜索（TODO：未来迁移到aiohttp以实现真正的异步I/O）
-        # 当前使用ThreadPoolExecutor包装同步requests调用，已可并发执行但仍有改进空间
-        # 优化建议：使用aiohttp + asyncio实现异步HTTP请求，性能可提升30%+
-        with ThreadPoolExecutor(max_workers=min(len(search_tasks), 10)) as executor:  # 增加并发度（P1修复）
-            # 提交所有任务
-            future_to_task = {
-                executor.submit(execute_search_task, task): task
-                for task in search_tasks
-            }
-
-            # 收集完成的任务结果（添加超时保护）
+        # 在共享的 io 执行器中并行执行搜索（ENABLE_ASYNC_SEARCH=false 时的回退实现）
+        # 截止时间 = 整体超时：排队到超时之后才轮到的任务不再执行
+        executor = get_executor('io')
+        deadline = time.monotonic() + timeout
+        future_to_task = {}
+        for task in search_tasks:
             try:
-                for future in as_completed(future_to_task, timeout=timeout):
+                future_to_task[executor.submit(execute_search_task, task, deadline=deadline)] = task
+            except ExecutorSaturatedError as e:
+                logger.warning(f"任务 {task.get('name', 'unknown')} 未提交: {str(e)}")
+                results[task.get('name', 'unknown')] = []
+
+        # 收集完成的任务结果（添加超时保护）
+        try:
+            for future in as_completed(future_to_task, timeout=timeout):
+                try:
+                    task_name, task_results = future.result(timeout=1.0)  # 单个future结果获取超时
+                    results[task_name] = task_results
+                    if on_result:
+                        on_result(task_name, task_results)
+                except concurrent.futures.TimeoutError:
+                    logger.warning(f"任务 {future_to_task[future].get('name', 'unknown')} 结果获取超时")
+                    results[future_to_task[future].get('name', 'unknown')] = []
+                except Exception as e:
+                    logger.error(f"任务结果处理失败: {str(e)}")
+                    results[future_to_task[future].get('name', 'unknown')] = []
+        except concurrent.futures.TimeoutError:
+            logger.warning(f"并行搜索整体超时 ({timeout}秒)，已收集部分结果")
+            # 尝试获取已完成的任务结果，取消仍在排队的任务
+            for future in future_to_task:
+                if future.done():
                     try:
-                        task_name, task_results = future.result(timeout=1.0)  # 单个future结果获取超时
-                        results[task_name] = task_results
-                    except concurrent.futures.TimeoutError:
-                        logger.warning(f"任务 {future_to_task[future].get('name', 'unknown')} 结果获取超时")
-                        results[future_to_task[future].get('name', 'unknown')] = []
-                    except Exception as e:
-                        logger.error(f"任务结果处理失败: {str(e)}")
-                        results[future_to_task[future].get('name', 'unknown')] = []
-            except concurrent.futures.TimeoutError:
-                logger.warning(f"并行搜索整体超时 ({timeout}秒)，已收集部分结果")
-                # 尝试获取已完成的任务结果
-                for future in future_to_task:
-                    if future.done():
-                        try:
-                            task_name, task_results = future.result(timeout=0.5)
-                            if task_name not in results:
-                                results[task_name] = task_results
-                        except:
-                            pass
+                        task_name, task_results = future.result(timeout=0.5)
+                        if task_name not in results:
+                            results[task_name] = task_results
+                    except:
+                        pass
+                else:
+                    future.cancel()
+
+        elapsed_time = time.time() - start_time
+        total_results = sum(len(r) for r in results.values())
+        print(f"    [⚡ 并行搜索] 完成，耗时 {elapsed_time:.2f}秒，共 {total_results} 个结果")
+
+        return results
+
+    def _parallel_search_fanout(self, query: str, search_tasks: List[Dict[str, Any]],
+                                timeout: int, country_code: str,
+                                on_result: Optional[Callable[[str, List[SearchResult]], None]] = None) -> Dict[str, List[SearchResult]]:
+        """
+        使用异步扇出引擎并行执行搜索任务
+
+        - 提供原生 search_async 的引擎（Tavily）直接在事件循环上执行，复用共享连接池
+        - 其他同步引擎（Google/Baidu 等）在扇出引擎的共享线程池中执行
+        - 超过引擎截止时间或整体超时的任务会被取消，返回空列表
+
+        Args/Returns: 同 _parallel_search
+        """
+        start_time = time.time()
+        fanout = get_async_search_fanout()
+
+        print(f"    [⚡ 并行搜索] 启动 {len(search_tasks)} 个异步搜索任务")
+        print(f"    [⚙️ 参数] 超时时间: {timeout}秒, 国家代码: {country_code}")
+
+        fanout_tasks = [
+            FanoutTask(
+                name=task['name'],
+                engine_name=task['engine_name'],
+                coro_factory=lambda task=task: self._execute_search_task_async(task, query, country_code)
+            )
+            for task in search_tasks
+        ]
+
+        results = fanout.run(fanout_tasks, timeout=timeout, on_result=on_result)
 
         elapsed_time = time.time() - start_time
         total_results = sum(len(r) for r in results.values())
@@ -1320,6 +1456,78 @@ class SearchEngineV2:
 
         return results
 
+    async def _execute_search_task_async(self, task: Dict[str, Any], default_query: str,
+                                         country_code: str) -> List[SearchResult]:
+        """
+        在扇出事件循环上执行单个搜索任务（参数选择与线程池实现保持一致）
+
+        Args:
+            task: 搜索任务（结构同 _parallel_search 的 search_tasks 元素）
+            default_query: 任务未指定查询时使用的默认查询
+            country_code: 国家代码
+
+        Returns:
+            搜索结果列表，失败时返回空列表
+        """
+        task_name = task['name']
+        search_func = task['func']
+        engine_name = task['engine_name']
+        max_results = task.get('max_results', 15)
+        include_domains = task.get('include_domains', None)
+        task_query = task.get('query', default_query)
+        fanout = get_async_search_fanout()
+
+        search_owner = getattr(search_func, '__self__', None)
+
+        # 与线程池实现一致：只有 llm_client.search 支持 include_domains/country_code，
+        # Google Hunter 只支持 country_code，其他引擎只传 max_results
+        if isinstance(search_owner, UnifiedLLMClient) and search_func.__name__ == 'search':
+            extra_kwargs = {'include_domains': include_domains, 'country_code': country_code}
+        elif search_owner is not None and 'google_hunter' in str(type(search_owner)):
+            extra_kwargs = {'country_code': country_code}
+        else:
+            extra_kwargs = {}
+
+        # 优先使用原生异步实现（同一对象上的 search_async）
+        native_async = None
+        if getattr(search_func, '__name__', '') == 'search':
+            native_async = getattr(search_owner, 'search_async', None)
+
+        if native_async is not None:
+            fetch = lambda q, mr, id: native_async(q, max_results=mr, **extra_kwargs)
+        else:
+            fetch = lambda q, mr, id: fanout.run_blocking(search_func, q, max_results=mr, **extra_kwargs)
+
+        try:
+            task_start = time.time()
+            task_results = await self._cached_search_async(
+                query=task_query,
+                search_coro_func=fetch,
+                engine_name=engine_name,
+                max_results=max_results,
+                include_domains=include_domains
+            )
+
+            task_elapsed = time.time() - task_start
+            print(f"    [✅ {task_name}] 完成 ({task_elapsed:.2f}秒, {len(task_results)}个结果)")
+
+            # ========== 🔍 记录搜索执行到透明度收集器（P0-1） ==========
+            self.transparency_collector.record_search_execution(
+                query=task_query,
+                engine=engine_name,
+                result_count=len(task_results),
+                duration_ms=task_elapsed * 1000,  # 转换为毫秒
+                reasoning=f"任务{task_name}，搜索{task_query}"
+            )
+            logger.debug(f"[🔍 透明度] 已记录搜索执行: {engine_name} - {len(task_results)}个结果")
+            # ========== 搜索执行记录结束 ==========
+
+            return task_results
+        except Exception as e:
+            print(f"    [❌ {task_name}] 失败: {str(e)}")
+            logger.error(f"并行搜索任务失败 [{task_name}]: {str(e)}")
+            return []
+
     def _is_edtech_domain(self, url: str) -> bool:
         """
         检查URL是否来自EdTech平台（知名教育平台）
@@ -1559,10 +1767,7 @@ class SearchEngineV2:
             return []
 
         try:
-            results = self.google_hunter.search(
-                query=query,
-                max_results=20
-            )
+            results = self._search_google(query, max_results=20)
 
             # 转换为SearchResult格式
             search_results = []
@@ -1591,14 +1796,8 @@ class SearchEngineV2:
     def _merge_and_deduplicate(self, initial_results: List[Dict],
                              supplementary_results: List[Dict],
                              query: str, request: SearchRequest) -> List[Dict]:
-        """合并结果并去重"""
-        seen_urls = {r['url'] for r in initial_results}
-        merged = list(initial_results)
-
-        for result in supplementary_results:
-            if result['url'] not in seen_urls:
-                merged.append(result)
-                seen_urls.add(result['url'])
+        """合并结果并去重（初始结果优先保留）"""
+        merged = get_result_deduplicator().deduplicate(list(initial_results) + list(supplementary_results)).kept
 
         # 重新评分合并后的结果
         scored = self.result_scorer.score_results(
@@ -1791,7 +1990,7 @@ class SearchEngineV2:
 
     def get_playlist_info_fast(self, url: str) -> Optional[Dict[str, Any]]:
         """
-        快速获取播放列表信息（带缓存）- P1性能优化
+        快速获取播放列表信息（共享持久缓存）- P1性能优化
 
         Args:
             url: 播放列表URL
@@ -1807,67 +2006,107 @@ class SearchEngineV2:
             logger.warning(f"Blocked unsafe URL in playlist info extraction: {url}")
             return None
 
-        # 🚀 P1性能优化: 检查缓存
-        if url in self._playlist_cache:
-            logger.debug(f"Playlist info cache hit for: {url[:50]}...")
-            return self._playlist_cache[url]
-
+        # 🚀 P1性能优化: 共享播放列表元数据服务（持久缓存 + 单飞，导出时直接命中）
         try:
-            import yt_dlp
-
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': True,  # 快速提取
-                'http_headers': {
-                    'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X)',
-                },
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': ['ios'],
-                    }
-                },
-            }
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-
-            if not info:
-                return None
+            return get_playlist_metadata_service().get_summary(url)
+        except Exception as e:
+            logger.warning(f"获取播放列表信息失败: {str(e)[:100]}")
+            return None
 
-            entries = info.get('entries', [])
-            if not entries:
-                return None
+    def search(self, request: SearchRequest,
+               on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> SearchResponse:
+        """
+        执行搜索
 
-            video_count = len(entries)
+        相同的搜索请求（规范化后）同时到达时只执行一次完整搜索流程，
+        其余请求等待并共享结果（设置 ENABLE_SEARCH_COALESCING=false 可关闭）
 
-            # 计算总时长（分钟）
-            total_duration_seconds = 0
-            for entry in entries:
-                duration = entry.get('duration', 0)
-                if duration:
-                    total_duration_seconds += duration
+        Args:
+            request: 搜索请求
+            on_event: 进度事件回调 (event, payload)，用于流式搜索：
+                - 'results': 某个搜索引擎完成，payload = {'engine', 'results'}
+                - 'scores': 某个LLM评分批次完成，payload = {'results'}
+                合并到其他进行中的相同搜索时不会收到进度事件，只返回最终响应
 
-            total_duration_minutes = total_duration_seconds / 60 if total_duration_seconds > 0 else 0
+        Returns:
+            搜索响应
+        """
+        self._event_sink = on_event
 
-            result = {
-                'video_count': video_count,
-                'total_duration_minutes': total_duration_minutes
-            }
+        # 🔒 P1 环境变量验证: 检查是否启用请求合并
+        enable_coalescing = validate_env_bool(
+            os.getenv("ENABLE_SEARCH_COALESCING"),
+            "ENABLE_SEARCH_COALESCING",
+            default=True
+        )
+        if not enable_coalescing:
+            return self._execute_search(request)
+
+        flight_key = self._request_flight_key(request)
+        response, shared = get_single_flight('search_request').do(flight_key, self._execute_search, request)
+        if shared:
+            logger.info(f"🔗 [请求合并] 复用进行中的相同搜索: {request.country} - {request.grade} - {request.subject}")
+            # 深拷贝，避免不同请求修改同一个响应对象
+            return response.model_copy(deep=True)
+        return response
+
+    def _emit_event(self, event: str, payload: Dict[str, Any]):
+        """向流式搜索的调用方推送进度事件（回调异常不影响搜索流程）"""
+        sink = self._event_sink
+        if sink is None:
+            return
+        try:
+            sink(event, payload)
+        except Exception as e:
+            logger.warning(f"推送搜索进度事件失败 ({event}): {str(e)[:100]}")
+
+    def _on_engine_results(self, task_name: str, results: List[SearchResult]):
+        """并行搜索中单个引擎完成时推送原始结果"""
+        self._emit_event('results', {
+            'engine': task_name,
+            'results': [r.model_dump() if hasattr(r, 'model_dump') else dict(r) for r in results]
+        })
+
+    def _on_batch_scored(self, batch: List[Dict[str, Any]]):
+        """LLM评分批次完成时推送评分更新（按URL关联已推送的原始结果）"""
+        self._emit_event('scores', {
+            'results': [
+                {
+                    'url': r.get('url', ''),
+                    'score': r.get('score', 0.0),
+                    'recommendation_reason': r.get('recommendation_reason', ''),
+                    'evaluation_method': r.get('evaluation_method', ''),
+                    'filtered': r.get('filtered', False)
+                }
+                for r in batch
+            ]
+        })
 
-            # 🚀 P1性能优化: 存入缓存
-            self._playlist_cache[url] = result
-            logger.info(f"Cached playlist info: {video_count} videos, {total_duration_minutes:.1f} minutes")
+    @staticmethod
+    def _request_flight_key(request: SearchRequest) -> tuple:
+        """
+        生成搜索请求的合并键（忽略大小写和多余空白）
 
-            return result
+        Args:
+            request: 搜索请求
 
-        except Exception as e:
-            logger.warning(f"获取播放列表信息失败: {str(e)[:100]}")
-            return None
+        Returns:
+            合并键元组
+        """
+        def _norm(value: Optional[str]) -> str:
+            return ' '.join(str(value).lower().split()) if value else ''
+
+        return (
+            _norm(request.country),
+            _norm(request.grade),
+            _norm(request.semester),
+            _norm(request.subject),
+            _norm(request.language)
+        )
 
-    def search(self, request: SearchRequest) -> SearchResponse:
+    def _execute_search(self, request: SearchRequest) -> SearchResponse:
         """
-        执行搜索
+        执行完整搜索流程（由 search() 通过请求合并调用）
 
         Args:
             request: 搜索请求
@@ -2060,7 +2299,7 @@ class SearchEngineV2:
                     search_tasks.append({
                         'name': '百度搜索',
                         'query': queries_to_use[0],  # 使用第一个查询
-                        'func': self.baidu_hunter.search,
+                        'func': self._search_baidu,
                         'engine_name': 'Baidu',
                         'max_results': 30,  # 增加到30
                         'include_domains': None
@@ -2074,7 +2313,10 @@ class SearchEngineV2:
                 # 注意：本地定向搜索已移至主搜索之后，根据结果数量动态决定是否执行
 
                 # 执行并行搜索（传递 country_code 用于免费额度优先策略）
-                parallel_results = self._parallel_search(query, search_tasks, timeout=30, country_code=request.country)
+                parallel_results = self._parallel_search(
+                    query, search_tasks, timeout=30, country_code=request.country,
+                    on_result=self._on_engine_results if self._event_sink else None
+                )
 
                 # 合并所有结果
                 search_results_a = []
@@ -2108,7 +2350,7 @@ class SearchEngineV2:
                 print(f"    [🔍 搜索A-百度搜索] 查询: \"{query}\"")
                 print(f"    [⚙️ 参数] max_results=30")
                 try:
-                    baidu_results = self.baidu_hunter.search(query, max_results=30)
+                    baidu_results = self._search_baidu(query, max_results=30)
                     # 转换为SearchResult对象
                     search_results_a = []
                     for item in baidu_results:
@@ -2126,7 +2368,7 @@ class SearchEngineV2:
                     if self.google_search_enabled:
                         print(f"    [🔄 降级] 切换到 Google 搜索...")
                         try:
-                            google_results = self.google_hunter.search(query, max_results=30, country_code=country_code_upper)
+                            google_results = self._search_google(query, max_results=30, country_code=country_code_upper)
                             search_results_a = []
                             for item in google_results:
                                 search_results_a.append(SearchResult(
@@ -2194,7 +2436,7 @@ class SearchEngineV2:
                     if self.google_search_enabled:
                         print(f"    [🔄 降级] 切换到 Google 搜索...")
                         try:
-                            google_results = self.google_hunter.search(query, max_results=30, country_code=country_code_upper)
+                            google_results = self._search_google(query, max_results=30, country_code=country_code_upper)
                             search_results_a = []
                             for item in google_results:
                                 search_results_a.append(SearchResult(
@@ -2321,47 +2563,36 @@ class SearchEngineV2:
                 else:
                     print(f"    [⚠️ 配置] 域名列表为空，跳过本地搜索")
             
-            # 合并结果并去重（基于 URL）
+            # 合并结果并去重（规范化URL + 近似重复内容聚类，在LLM评分之前）
             print(f"\n    [🔧 合并] 开始合并和去重...")
             all_results = search_results_a + search_results_b
             print(f"    [📊 合并前] 通用: {len(search_results_a)} 个, 本地: {len(search_results_b)} 个, 总计: {len(all_results)} 个")
             
-            seen_urls = set()
-            unique_results = []
-            duplicate_count = 0
+            dedup_outcome = get_result_deduplicator().deduplicate(all_results)
+            for duplicate, _, reason in dedup_outcome.duplicates:
+                print(f"        [-] 去重({'URL' if reason == 'url' else '内容'}): {duplicate.url[:80]}...")
+            duplicate_count = len(dedup_outcome.duplicates)
             
-            for result in all_results:
-                if result.url not in seen_urls:
-                    seen_urls.add(result.url)
-                    unique_results.append(result)
-                else:
-                    duplicate_count += 1
-                    print(f"        [-] 去重: {result.url[:80]}...")
-            
-            search_results = unique_results
-            print(f"    [📊 合并后] 去重: {duplicate_count} 个, 保留: {len(search_results)} 个")
+            search_results = dedup_outcome.kept
+            print(f"    [📊 合并后] 去重: {duplicate_count} 个 (URL {dedup_outcome.url_duplicates}, 内容 {dedup_outcome.content_duplicates}), 保留: {len(search_results)} 个")
             print(f"    [📊 统计] 通用: {len(search_results_a)}, 本地: {len(search_results_b)}, 最终: {len(search_results)}")
 
             # ========== 🔍 记录去重过滤阶段到透明度收集器（P0-1） ==========
-            # 收集被过滤的样本（重复URL）
-            duplicate_samples = []
-            seen_urls_set = set()
-            for result in all_results:
-                if result.url in seen_urls_set:
-                    duplicate_samples.append({
-                        "title": result.title[:80],
-                        "url": result.url[:100],
-                        "reason": "URL重复"
-                    })
-                    if len(duplicate_samples) >= 3:  # 最多3个样本
-                        break
-                seen_urls_set.add(result.url)
+            # 收集被过滤的样本（最多3个）
+            duplicate_samples = [
+                {
+                    "title": duplicate.title[:80],
+                    "url": duplicate.url[:100],
+                    "reason": "URL重复" if reason == 'url' else f"内容近似重复: {kept.url[:100]}"
+                }
+                for duplicate, kept, reason in dedup_outcome.duplicates[:3]
+            ]
 
             self.transparency_collector.record_filtering_stage(
                 stage_name="去重",
                 input_count=len(all_results),
                 output_count=len(search_results),
-                filter_reason=f"移除 {duplicate_count} 个重复URL",
+                filter_reason=f"移除 {dedup_outcome.url_duplicates} 个重复URL、{dedup_outcome.content_duplicates} 个近似重复内容",
                 filtered_samples=duplicate_samples
             )
             logger.debug(f"[🔍 透明度] 已记录去重过滤: {len(all_results)} → {len(search_results)}")
@@ -2410,50 +2641,31 @@ class SearchEngineV2:
 
             # 第二步：并发获取所有播放列表信息
             if playlist_results:
-                import concurrent.futures
-
-                print(f"    [⚡ 并发] 发现 {len(playlist_results)} 个播放列表，开始并发获取信息...")
+                print(f"    [⚡ 并发] 发现 {len(playlist_results)} 个播放列表，开始批量获取信息...")
 
-                # 设置并发参数
-                MAX_PLAYLIST_WORKERS = 20  # 最多20个并发（修复：P1 - N+1查询优化）
-                SINGLE_TIMEOUT = 3  # 单个播放列表3秒超时（优化：从8秒降低到3秒，2.6倍提速）
+                # 共享元数据服务：缓存命中直接返回，其余在有界线程池中并发获取（同一播放列表只获取一次）
+                safe_urls = [r['url'] for r in playlist_results if is_safe_url(r['url'])]
+                try:
+                    playlist_infos = get_playlist_metadata_service().get_many(safe_urls)
+                except Exception as e:
+                    logger.warning(f"批量获取播放列表信息失败: {str(e)[:100]}")
+                    playlist_infos = {}
 
                 success_count = 0
                 fail_count = 0
 
-                with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_PLAYLIST_WORKERS) as executor:
-                    # 提交所有任务（使用类方法带缓存）
-                    future_to_result = {
-                        executor.submit(self.get_playlist_info_fast, r['url']): r
-                        for r in playlist_results
-                    }
-
-                    # 🔧 修复：移除整体超时，避免部分超时导致整个搜索失败
-                    # 收集结果（等待所有future完成）
-                    for future in concurrent.futures.as_completed(future_to_result):
-                        result_dict = future_to_result[future]
-
-                        try:
-                            # 单个超时控制
-                            playlist_info = future.result(timeout=SINGLE_TIMEOUT)
-
-                            if playlist_info:
-                                result_dict['playlist_info'] = playlist_info
-                                print(f"    [✅ 成功] {result_dict['title'][:40]}... - {playlist_info['video_count']}个视频, {playlist_info['total_duration_minutes']:.0f}分钟")
-                                success_count += 1
-                            else:
-                                print(f"    [⚠️ 失败] {result_dict['title'][:40]}... - 无法获取信息")
-                                fail_count += 1
-
-                        except concurrent.futures.TimeoutError:
-                            print(f"    [⏱️ 超时] {result_dict['title'][:40]}... - 获取超时({SINGLE_TIMEOUT}秒)")
-                            fail_count += 1
-                        except Exception as e:
-                            print(f"    [❌ 异常] {result_dict['title'][:40]}... - {str(e)[:50]}")
-                            fail_count += 1
+                for result_dict in playlist_results:
+                    playlist_info = PlaylistMetadataService.summarize(playlist_infos.get(result_dict['url']))
+                    if playlist_info:
+                        result_dict['playlist_info'] = playlist_info
+                        print(f"    [✅ 成功] {result_dict['title'][:40]}... - {playlist_info['video_count']}个视频, {playlist_info['total_duration_minutes']:.0f}分钟")
+                        success_count += 1
+                    else:
+                        print(f"    [⚠️ 失败] {result_dict['title'][:40]}... - 无法获取信息")
+                        fail_count += 1
 
-                        # 无论如何都添加到结果列表
-                        results_dicts.append(result_dict)
+                    # 无论如何都添加到结果列表
+                    results_dicts.append(result_dict)
 
                 print(f"    [📊 统计] 成功: {success_count}, 失败: {fail_count}, 总计: {len(playlist_results)}")
             else:
@@ -2661,7 +2873,8 @@ class SearchEngineV2:
                         'grade': request.grade,
                         'subject': request.subject,
                         'language_code': language_code
-                    }
+                    },
+                    on_batch_scored=self._on_batch_scored if self._event_sink else None
                 )
 
                 # 合并结果
@@ -2746,7 +2959,7 @@ class SearchEngineV2:
             print(f"    [📊 统计] 总计: {len(evaluated_results)} 个")
 
             # 显示多级缓存统计
-            cache_stats = self.multi_cache.get_stats()
+            cache_stats = self.multi_cache.get_hit_rates()
             print(f"\n[💾 多级缓存统计]")
             print(f"    [📊 L1内存] 命中: {cache_stats['l1_hits']}次 ({cache_stats['l1_hit_rate']:.1f}%)")
             print(f"    [📊 L2 Redis] 命中: {cache_stats['l2_hits']}次 ({cache_stats['l2_hit_rate']:.1f}%)")
@@ -13,6 +13,8 @@ from typing import Dict, List, Optional, Any, Set
 from pydantic import BaseModel, Field
 import requests
 
+from core.http_transport import get_http_transport  # 共享HTTP连接池
+
 # 支持从 .env 文件读取环境变量
 try:
     from dotenv import load_dotenv
@@ -202,7 +204,7 @@ class AIBuildersClient:
             # 根据 OpenAPI 文档，添加 debug=true 参数以获取 orchestrator 执行跟踪
             # 这可以帮助我们诊断为什么返回空内容
             params = {"debug": True}
-            response = requests.post(
+            response = get_http_transport('llm').post(
                 endpoint,
                 headers=self.headers,
                 json=payload,
@@ -340,7 +342,7 @@ class AIBuildersClient:
             
             try:
                 from llm_client import get_proxy_config
-                response = requests.post(
+                response = get_http_transport('llm').post(
                     endpoint,
                     headers=self.headers,
                     json=payload,
@@ -433,7 +435,7 @@ class AIBuildersClient:
                 "http": None,
                 "https": None
             }
-            response = requests.post(
+            response = get_http_transport('search').post(
                 endpoint,
                 headers=self.headers,
                 json=payload,
@@ -732,7 +734,7 @@ class SearchHunter:
                 "num": max_results
             }
             
-            response = requests.get("https://serpapi.com/search", params=params, timeout=30)
+            response = get_http_transport('search').get("https://serpapi.com/search", params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
             
@@ -935,7 +937,7 @@ class SearchHunter:
             print(f"    [🔍 Google] 准备调用 API，查询: \"{query}\"")
             print(f"    [🔍 Google] 请求参数: num={num_results}, cx={cx}, gl={google_params['gl']}, hl={google_params['hl']}, lr={google_params['lr']}")
             
-            response = requests.get(endpoint, params=params, timeout=30)
+            response = get_http_transport('search').get(endpoint, params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
             
@@ -7,10 +7,11 @@ import os
 import json
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 from flask import jsonify
 from utils.logger_utils import get_logger
 from utils.error_handling import ValidationError, ServiceUnavailableError
+from core.stage_pipeline import PipelineItem, PipelineStage, StagedPipeline
 
 logger = get_logger('batch_video_service')
 
@@ -246,48 +247,75 @@ class BatchVideoService:
         self,
         video_urls: List[dict],
         knowledge_points: Optional[List[dict]],
-        params: dict
+        params: dict,
+        on_progress: Optional[Callable[[dict], None]] = None
     ) -> dict:
         """
         批量评估视频
 
+        多个视频时使用分阶段流水线：下载（网络）→ 字幕/转录（CPU）→ 知识点匹配和评估（LLM/视觉），
+        各阶段独立限流，第 N+1 个视频下载时第 N 个视频可以同时评估
+
         Args:
             video_urls: 视频URL列表
             knowledge_points: 知识点列表
             params: 参数字典
+            on_progress: 进度回调（可选），参数为流水线进度快照
 
         Returns:
             评估结果字典
         """
+        settings = self._get_pipeline_settings()
+
+        if len(video_urls) <= 1 or not settings['enable_parallel']:
+            outcomes = []
+            for video_info in video_urls:
+                try:
+                    outcomes.append(self._evaluate_single_video(video_info, knowledge_points, params))
+                except Exception as e:
+                    outcomes.append(e)
+        else:
+            pipeline = StagedPipeline(
+                [
+                    PipelineStage('download', lambda item: self._stage_prepare(item, params),
+                                  workers=settings['download_workers']),
+                    PipelineStage('transcribe', lambda item: self._stage_transcribe(item, params),
+                                  workers=settings['transcribe_workers']),
+                    PipelineStage('evaluate', lambda item: self._stage_evaluate(item, knowledge_points, params),
+                                  workers=settings['evaluate_workers']),
+                ],
+                queue_size=settings['queue_size'],
+                name='batch_video',
+                on_progress=on_progress
+            )
+            outcomes = [
+                item.error if item.error is not None else item.result
+                for item in pipeline.run(video_urls)
+            ]
+
         evaluations = []
         successful_count = 0
         failed_count = 0
         total_tokens = 0
 
-        for video_info in video_urls:
-            try:
-                result = self._evaluate_single_video(
-                    video_info,
-                    knowledge_points,
-                    params
-                )
-
-                if result['success']:
-                    successful_count += 1
-                    total_tokens += result.get('token_usage', 0)
-                else:
-                    failed_count += 1
-
-                evaluations.append(result['data'])
-
-            except Exception as e:
+        for video_info, result in zip(video_urls, outcomes):
+            if isinstance(result, Exception):
                 failed_count += 1
-                logger.error(f"评估视频失败 {video_info.get('url', '')}: {str(e)}")
+                logger.error(f"评估视频失败 {video_info.get('url', '')}: {str(result)}")
                 evaluations.append({
                     "success": False,
                     "video_url": video_info.get('url', ''),
-                    "error": str(e)
+                    "error": str(result)
                 })
+                continue
+
+            if result['success']:
+                successful_count += 1
+                total_tokens += result.get('token_usage', 0)
+            else:
+                failed_count += 1
+
+            evaluations.append(result['data'])
 
         # 计算平均分
         scores = [
@@ -306,6 +334,94 @@ class BatchVideoService:
             'total_tokens': total_tokens
         }
 
+    def _get_pipeline_settings(self) -> dict:
+        """
+        读取批量评估流水线配置（config/video_processing.yaml 中的 video.performance）
+
+        Returns:
+            {enable_parallel, download_workers, transcribe_workers, evaluate_workers, queue_size}
+        """
+        performance = {}
+        try:
+            from core.config_loader import get_config
+            performance = get_config().get_video_config().get('performance', {}) or {}
+        except Exception as e:
+            logger.warning(f"读取批量评估流水线配置失败，使用默认值: {str(e)}")
+
+        return {
+            'enable_parallel': performance.get('enable_parallel', True),
+            'download_workers': performance.get('max_parallel_downloads', 3),
+            'transcribe_workers': performance.get('max_parallel_transcriptions', 1),
+            'evaluate_workers': performance.get('max_parallel_evaluations', 2),
+            'queue_size': performance.get('pipeline_queue_size', 2)
+        }
+
+    def _stage_prepare(self, item: PipelineItem, params: dict) -> None:
+        """流水线下载阶段：元数据、关键帧、音频（字幕/转录留给转录阶段）"""
+        item.data = {
+            'video_info': item.data,
+            'process_result': self._process_video(item.data, params, extract_transcript=False)
+        }
+        if not item.data['process_result'].get('success'):
+            item.result = self._process_failure(item.data['video_info'], item.data['process_result'])
+
+    def _stage_transcribe(self, item: PipelineItem, params: dict) -> None:
+        """流水线转录阶段：字幕优先，其次Whisper（缓存中已有转录时跳过）"""
+        process_result = item.data['process_result']
+        if process_result.get('transcript') is not None or process_result.get('transcript_extracted'):
+            return
+        try:
+            self.video_crawler.attach_transcript(
+                process_result,
+                item.data['video_info']['url'],
+                params['preferred_languages']
+            )
+        except Exception:
+            self.video_crawler.release(process_result)
+            raise
+
+    def _stage_evaluate(self, item: PipelineItem, knowledge_points: Optional[List[dict]], params: dict) -> None:
+        """流水线评估阶段：知识点匹配、多维度LLM/视觉评估、保存结果"""
+        item.result = self._score_video(
+            item.data['video_info'],
+            item.data['process_result'],
+            knowledge_points,
+            params
+        )
+
+    def _process_video(self, video_info: dict, params: dict, extract_transcript: bool = True) -> dict:
+        """
+        下载并提取视频的多模态数据
+
+        Args:
+            video_info: 视频信息
+            params: 参数字典
+            extract_transcript: 是否同时提取字幕/转录
+
+        Returns:
+            VideoCrawler.process_video 的结果
+        """
+        return self.video_crawler.process_video(
+            video_url=video_info['url'],
+            output_dir='./data/videos/analyzed',
+            video_quality="480p",
+            num_frames=6,
+            extract_transcript=extract_transcript,
+            preferred_languages=params['preferred_languages']
+        )
+
+    def _process_failure(self, video_info: dict, process_result: dict) -> dict:
+        """视频处理失败时的评估结果"""
+        return {
+            'success': False,
+            'data': {
+                "success": False,
+                "video_url": video_info['url'],
+                "error": process_result.get('error', '视频处理失败')
+            },
+            'token_usage': 0
+        }
+
     def _evaluate_single_video(
         self,
         video_info: dict,
@@ -323,74 +439,83 @@ class BatchVideoService:
         Returns:
             {success: bool, data: dict, token_usage: int}
         """
-        video_url = video_info['url']
-        output_dir = './data/videos/analyzed'
-
         # 处理视频
-        process_result = self.video_crawler.process_video(
-            video_url=video_url,
-            output_dir=output_dir,
-            video_quality="480p",
-            num_frames=6,
-            extract_transcript=True,
-            preferred_languages=params['preferred_languages']
-        )
+        process_result = self._process_video(video_info, params)
 
         if not process_result.get('success'):
-            return {
-                'success': False,
-                'data': {
-                    "success": False,
-                    "video_url": video_url,
-                    "error": process_result.get('error', '视频处理失败')
-                },
-                'token_usage': 0
-            }
+            return self._process_failure(video_info, process_result)
+
+        return self._score_video(video_info, process_result, knowledge_points, params)
+
+    def _score_video(
+        self,
+        video_info: dict,
+        process_result: dict,
+        knowledge_points: Optional[List[dict]],
+        params: dict
+    ) -> dict:
+        """
+        匹配知识点、评估视频并保存结果（完成后释放视频产物缓存引用）
+
+        Args:
+            video_info: 视频信息
+            process_result: 视频处理结果
+            knowledge_points: 知识点列表
+            params: 参数字典
+
+        Returns:
+            {success: bool, data: dict, token_usage: int}
+        """
+        video_url = video_info['url']
+
+        try:
+            # 匹配知识点
+            matched_knowledge_point = None
+            if knowledge_points:
+                matched_knowledge_point = self.video_evaluator.match_knowledge_point(
+                    video_title=process_result['metadata'].get('title', ''),
+                    video_description=process_result['metadata'].get('description', ''),
+                    transcript=process_result.get('transcript'),
+                    knowledge_points=knowledge_points
+                )
 
-        # 匹配知识点
-        matched_knowledge_point = None
-        if knowledge_points:
-            matched_knowledge_point = self.video_evaluator.match_knowledge_point(
-                video_title=process_result['metadata'].get('title', ''),
-                video_description=process_result['metadata'].get('description', ''),
+            # 评估视频
+            evaluation = self.video_evaluator.evaluate_video_content(
+                video_metadata=process_result['metadata'],
+                video_path=process_result.get('video_path'),
+                frames_paths=process_result.get('frames_paths', []),
+                audio_path=process_result.get('audio_path'),
                 transcript=process_result.get('transcript'),
+                knowledge_point=matched_knowledge_point,
                 knowledge_points=knowledge_points
             )
 
-        # 评估视频
-        evaluation = self.video_evaluator.evaluate_video_content(
-            video_metadata=process_result['metadata'],
-            video_path=process_result.get('video_path'),
-            frames_paths=process_result.get('frames_paths', []),
-            audio_path=process_result.get('audio_path'),
-            transcript=process_result.get('transcript'),
-            knowledge_point=matched_knowledge_point,
-            knowledge_points=knowledge_points
-        )
-
-        # 收集Token使用情况
-        token_usage = evaluation.get('token_usage', {}).get('total_tokens', 0)
+            # 收集Token使用情况
+            token_usage = evaluation.get('token_usage', {}).get('total_tokens', 0)
 
-        # 保存评估结果
-        self._save_evaluation_result(
-            video_url,
-            process_result,
-            evaluation,
-            matched_knowledge_point,
-            params
-        )
+            # 保存评估结果
+            self._save_evaluation_result(
+                video_url,
+                process_result,
+                evaluation,
+                matched_knowledge_point,
+                params
+            )
 
-        return {
-            'success': True,
-            'data': {
-                "success": True,
-                "video_url": video_url,
-                "video_title": process_result['metadata'].get('title', ''),
-                "evaluation": evaluation,
-                "matched_knowledge_point": matched_knowledge_point
-            },
-            'token_usage': token_usage
-        }
+            return {
+                'success': True,
+                'data': {
+                    "success": True,
+                    "video_url": video_url,
+                    "video_title": process_result['metadata'].get('title', ''),
+                    "evaluation": evaluation,
+                    "matched_knowledge_point": matched_knowledge_point
+                },
+                'token_usage': token_usage
+            }
+        finally:
+            # 释放视频产物缓存引用（关键帧/音频已使用完）
+            self.video_crawler.release(process_result)
 
     def _save_evaluation_result(
         self,
@@ -431,6 +556,13 @@ class BatchVideoService:
         with open(eval_file, 'w', encoding='utf-8') as f:
             json.dump(eval_data, f, ensure_ascii=False, indent=2)
 
+        # 登记到评估目录索引（知识点概览/报告页面立即可见）
+        try:
+            from core.evaluation_catalog import get_evaluation_catalog
+            get_evaluation_catalog(self.evaluations_dir).register(eval_file, eval_data)
+        except Exception as e:
+            logger.warning(f"登记评估索引失败: {str(e)}")
+
     def _format_response(self, evaluation_results: dict) -> Tuple[dict, int]:
         """
         格式化响应
@@ -70,15 +70,29 @@ class ExportHandler:
         # 获取中文显示名称
         country_zh, grade_zh, subject_zh = self._get_chinese_display_names(search_params)
 
+        # 批量获取播放列表信息（搜索阶段已获取过的直接命中共享缓存，其余并发获取）
+        playlist_infos = self._get_playlist_infos([r.get('url', '') for r in results])
+
+        # 未分类的结果（如旧版本导出的数据）批量补充资源类型
+        unclassified = [r for r in results if not (r.get('resource_type') or r.get('resourceType'))]
+        if unclassified:
+            from core.resource_classifier import get_resource_classifier
+            inferred_types = {
+                id(r): c.resource_type
+                for r, c in zip(unclassified, get_resource_classifier().classify_batch(unclassified))
+            }
+        else:
+            inferred_types = {}
+
         excel_data = []
         for idx, r in enumerate(results, 1):
             score = r.get('score', 0)
             recommendation_reason = r.get('recommendation_reason', r.get('recommendationReason', ''))
-            resource_type = r.get('resource_type', r.get('resourceType', '未知'))
+            resource_type = r.get('resource_type') or r.get('resourceType') or inferred_types.get(id(r), '未知')
             url = r.get('url', '')
 
             # 获取播放列表信息
-            video_count, total_duration = self._get_playlist_info(url)
+            video_count, total_duration = self._get_playlist_info(url, playlist_infos)
 
             excel_data.append({
                 '序号': idx,
@@ -111,66 +125,52 @@ class ExportHandler:
         from utils.helpers import get_chinese_display_names
         return get_chinese_display_names(self.config_manager, search_params)
 
-    def _get_playlist_info(self, url: str) -> Tuple[Optional[int], Optional[float]]:
+    def _get_playlist_infos(self, urls: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
         """
-        快速获取播放列表的视频数量和总时长
+        批量获取播放列表元数据
 
         Args:
-            url: 播放列表URL
+            urls: 结果URL列表（非播放列表URL会被忽略）
 
         Returns:
-            (video_count, total_duration_minutes) - 如果失败返回 (None, None)
+            {url: 元数据 或 None}
         """
-        if not url or 'list=' not in url:
-            return None, None
-
+        playlist_urls = [url for url in urls if url and 'list=' in url]
+        if not playlist_urls:
+            return {}
         try:
-            import yt_dlp
-
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': True,
-                'playlistend': None,
-                'http_headers': {
-                    'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1',
-                },
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': ['ios'],
-                    }
-                },
-                'skip_download': True,
-            }
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-
-            if not info:
-                return None, None
-
-            entries = info.get('entries', [])
-            if not entries:
-                return None, None
-
-            video_count = len(entries)
+            from core.playlist_metadata import get_playlist_metadata_service
+            return get_playlist_metadata_service().get_many(playlist_urls)
+        except Exception as e:
+            logger.warning(f"[播放列表] 批量获取信息失败: {str(e)[:100]}")
+            return {}
 
-            # 计算总时长（分钟）
-            total_duration_seconds = 0
-            for entry in entries:
-                duration = entry.get('duration', 0)
-                if duration:
-                    total_duration_seconds += duration
+    def _get_playlist_info(
+        self,
+        url: str,
+        playlist_infos: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+    ) -> Tuple[Optional[int], Optional[float]]:
+        """
+        获取播放列表的视频数量和总时长
 
-            total_duration_minutes = total_duration_seconds / 60 if total_duration_seconds > 0 else 0
+        Args:
+            url: 播放列表URL
+            playlist_infos: 批量获取的元数据（不包含该URL时单独获取）
 
-            logger.info(f"[播放列表] URL: {url[:50]}..., 视频数: {video_count}, 总时长: {total_duration_minutes:.1f}分钟")
+        Returns:
+            (video_count, total_duration_minutes) - 如果失败返回 (None, None)
+        """
+        if not url or 'list=' not in url:
+            return None, None
 
-            return video_count, total_duration_minutes
+        if playlist_infos is not None and url in playlist_infos:
+            info = playlist_infos[url]
+        else:
+            info = self._get_playlist_infos([url]).get(url)
 
-        except Exception as e:
-            logger.warning(f"[播放列表] 获取信息失败: {str(e)[:100]}")
+        if not info:
             return None, None
+        return info['video_count'], info['total_duration_minutes']
 
     def _generate_excel(self, excel_data: List[Dict[str, Any]]) -> io.BytesIO:
         """
@@ -174,6 +174,8 @@ class KnowledgeOverviewService:
         """
         加载评估记录，每个视频URL只保留最新的一条（全局去重）
 
+        通过评估目录索引查询（只解析新增/修改过的评估文件），不再逐个读取所有JSON
+
         Args:
             country: 国家代码
             grade: 年级
@@ -182,81 +184,44 @@ class KnowledgeOverviewService:
         Returns:
             {video_url: video_info} 字典
         """
-        video_url_latest = {}
-
-        if os.path.exists(self.evaluations_dir):
-            for filename in os.listdir(self.evaluations_dir):
-                if filename.startswith('evaluation_') and filename.endswith('.json'):
-                    filepath = os.path.join(self.evaluations_dir, filename)
-                    try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            eval_data = json.load(f)
-
-                        # 检查是否匹配当前筛选条件
-                        search_params = eval_data.get('search_params', {})
-                        if (search_params.get('country') == country and
-                            search_params.get('grade') == grade and
-                            search_params.get('subject') == subject):
-
-                            # 提取匹配的知识点
-                            matched_kp = eval_data.get('matched_knowledge_point')
-                            if not matched_kp:
-                                evaluation = eval_data.get('evaluation', {})
-                                matched_kp = evaluation.get('matched_knowledge_point')
-
-                            if matched_kp:
-                                kp_id = matched_kp.get('id')
-                                video_url = eval_data.get('video_url', '')
-
-                                if kp_id and video_url:
-                                    video_info = self._extract_video_info(
-                                        eval_data,
-                                        kp_id
-                                    )
-
-                                    # 全局去重：每个视频URL只保留最新的一条评价记录
-                                    if video_url in video_url_latest:
-                                        existing_timestamp = video_url_latest[video_url].get('evaluation_date', '')
-                                        if video_info['evaluation_date'] > existing_timestamp:
-                                            video_url_latest[video_url] = video_info
-                                    else:
-                                        video_url_latest[video_url] = video_info
-                    except Exception as e:
-                        logger.warning(f"读取评估文件失败 {filename}: {str(e)}")
-                        continue
-
-        return video_url_latest
-
-    def _extract_video_info(self, eval_data: dict, kp_id: str) -> dict:
+        from core.evaluation_catalog import get_evaluation_catalog
+
+        records, _ = get_evaluation_catalog(self.evaluations_dir).query(
+            country=country,
+            grade=grade,
+            subject=subject,
+            include_batch=True,
+            require_knowledge_point=True,
+            latest_per_url=True
+        )
+
+        return {record['video_url']: self._extract_video_info(record) for record in records}
+
+    def _extract_video_info(self, record: dict) -> dict:
         """
-        从评估数据中提取视频信息
+        从评估目录记录中提取视频信息
 
         Args:
-            eval_data: 评估数据
-            kp_id: 知识点ID
+            record: EvaluationCatalog.query() 返回的记录（评分详情已展开）
 
         Returns:
             视频信息字典
         """
-        video_metadata = eval_data.get('video_metadata', {})
-        evaluation = eval_data.get('evaluation', {})
-        timestamp = eval_data.get('timestamp', '')
-
         return {
-            "video_url": eval_data.get('video_url', ''),
-            "video_title": video_metadata.get('title', '未知标题'),
-            "overall_score": evaluation.get('overall_score', 0.0),
-            "evaluation_date": timestamp,
-            "request_id": eval_data.get('request_id', ''),
-            "visual_quality": evaluation.get('visual_quality', {}).get('combined_score', 0.0),
-            "relevance": evaluation.get('relevance', {}).get('score', 0.0),
-            "pedagogy": evaluation.get('pedagogy', {}).get('score', 0.0),
-            "metadata": evaluation.get('metadata', {}).get('score', 0.0),
-            "visual_quality_details": evaluation.get('visual_quality', {}).get('details', ''),
-            "relevance_details": evaluation.get('relevance', {}).get('details', ''),
-            "pedagogy_details": evaluation.get('pedagogy', {}).get('details', ''),
-            "metadata_details": evaluation.get('metadata', {}).get('details', ''),
-            "kp_id": kp_id
+            "video_url": record['video_url'],
+            "video_title": record.get('video_title') or '未知标题',
+            "overall_score": record.get('overall_score', 0.0),
+            "evaluation_date": record.get('timestamp', ''),
+            "request_id": record.get('request_id', ''),
+            "visual_quality": record.get('visual_quality', 0.0),
+            "relevance": record.get('relevance', 0.0),
+            "pedagogy": record.get('pedagogy', 0.0),
+            "metadata": record.get('metadata', 0.0),
+            "visual_quality_details": record.get('visual_quality_details', ''),
+            "relevance_details": record.get('relevance_details', ''),
+            "pedagogy_details": record.get('pedagogy_details', ''),
+            "metadata_details": record.get('metadata_details', ''),
+            "kp_id": record['kp_id']
         }
 
     def _match_videos_to_knowledge_points(self, video_url_latest: Dict[str, dict]) -> Dict[str, List[dict]]:
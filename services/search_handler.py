@@ -5,9 +5,12 @@
 
 import time
 import gc
+import json
 import uuid
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-from typing import Dict, Any, List, Optional, Tuple
+import queue
+import threading
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from utils.logger_utils import get_logger
 from utils.constants import (
     SEARCH_TIMEOUT_SECONDS,
@@ -17,9 +20,13 @@ from utils.constants import (
     HTTP_SERVER_ERROR,
     HTTP_SERVICE_UNAVAILABLE
 )
+from core.executor_registry import get_executor, ExecutorSaturatedError, DeadlineExceededError
 
 logger = get_logger('search_handler')
 
+# 流式搜索无事件时发送SSE注释心跳的间隔（秒），防止代理/前端因空闲断开连接
+STREAM_HEARTBEAT_SECONDS = 15
+
 
 class SearchHandler:
     """搜索处理器 - 封装搜索的完整流程"""
@@ -94,13 +101,25 @@ class SearchHandler:
                 self._record_search_results(
                     log_collector,
                     response,
-                    search_elapsed
+                    search_elapsed,
+                    search_id=search_id
+                )
+            else:
+                log_collector.finish_search(
+                    total_time=search_elapsed,
+                    search_id=search_id,
+                    status='failed',
+                    message=getattr(response, 'message', '') if response else ''
                 )
 
-            # 8. 格式化响应
+            # 8. 保存搜索历史（后台写入）
+            if response:
+                self._save_search_history(params, response)
+
+            # 9. 格式化响应
             result_data = self._format_search_response(response, search_id)
 
-            # 9. 应用资源类型过滤
+            # 10. 应用资源类型过滤
             if params.get('resource_type') and params['resource_type'] != 'all':
                 result_data = self._filter_by_resource_type(
                     result_data,
@@ -113,6 +132,158 @@ class SearchHandler:
             logger.error(f"[搜索请求] 处理失败: {str(e)}")
             return self._create_error_response(f"搜索失败: {str(e)}", HTTP_SERVER_ERROR)
 
+    def handle_search_stream(
+        self,
+        request_data: Dict[str, Any],
+        log_collector=None
+    ) -> Tuple[Any, int]:
+        """
+        处理流式搜索请求（Server-Sent Events）
+
+        参数校验和并发限制在返回前同步完成；通过后返回SSE帧生成器，事件依次为：
+        - results: 某个搜索引擎完成，推送其原始结果 {'engine', 'results'}
+        - scores: 某个LLM评分批次完成，推送评分更新 {'results': [{'url', 'score', ...}]}
+        - done: 搜索完成，数据与 /api/search 的响应一致
+        - error: 搜索失败或超时 {'message'}
+
+        Args:
+            request_data: 请求数据
+            log_collector: 搜索日志收集器（可选，默认使用全局收集器）
+
+        Returns:
+            (SSE帧生成器, 200) 或 (错误响应字典, 错误状态码)
+        """
+        request_id = str(uuid.uuid4())[:8]
+        logger.info(f"[流式搜索] 开始处理搜索请求 [ID: {request_id}]")
+
+        is_valid, error_message, params = self._validate_and_parse_params(request_data)
+        if not is_valid:
+            logger.warning(f"[流式搜索] 参数不完整: {error_message}")
+            return self._create_error_response(error_message, HTTP_BAD_REQUEST)
+
+        if not self._initialize_search_engine():
+            return self._create_error_response("搜索引擎模块不可用", HTTP_SERVER_ERROR)
+
+        if not self._acquire_concurrency_slot():
+            logger.warning(f"流式搜索请求被限流: 超过最大并发数")
+            return self._create_error_response("服务器繁忙，请稍后重试", HTTP_SERVICE_UNAVAILABLE)
+
+        try:
+            search_request = self._create_search_request(params)
+            if log_collector is None:
+                from core.search_log_collector import get_log_collector
+                log_collector = get_log_collector()
+            search_id = log_collector.start_search(
+                params['country'],
+                params['grade'],
+                params['subject'],
+                params.get('semester')
+            )
+        except Exception as e:
+            self._release_concurrency_slot()
+            logger.error(f"[流式搜索] 初始化失败: {str(e)}")
+            return self._create_error_response(f"搜索失败: {str(e)}", HTTP_SERVER_ERROR)
+
+        events: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        closed = threading.Event()
+
+        def on_event(event: str, payload: Dict[str, Any]):
+            if not closed.is_set():
+                events.put((event, payload))
+
+        def run_search():
+            """在后台线程中执行搜索，进度和最终结果都写入事件队列"""
+            search_start_time = time.time()
+            try:
+                engine = self.SearchEngineV2(log_collector=log_collector)
+                response = engine.search(search_request, on_event=on_event)
+                search_elapsed = time.time() - search_start_time
+                logger.info(f"[流式搜索] 搜索完成，耗时: {search_elapsed:.2f}秒，结果数: {len(response.results)} [ID: {request_id}]")
+                if response.success:
+                    self._record_search_results(log_collector, response, search_elapsed, search_id=search_id)
+                else:
+                    log_collector.finish_search(total_time=search_elapsed, search_id=search_id,
+                                                status='failed', message=response.message)
+                self._save_search_history(params, response)
+                final_event = ('done', response)
+            except Exception as e:
+                logger.error(f"[流式搜索] 搜索异常: {str(e)} [ID: {request_id}]")
+                log_collector.finish_search(total_time=time.time() - search_start_time, search_id=search_id,
+                                            status='failed', message=str(e))
+                final_event = ('error', {'message': f"搜索失败: {str(e)}"})
+            finally:
+                # 先释放槽位再推送最终事件，客户端收到结果时槽位已可复用
+                self._release_concurrency_slot()
+                gc.collect()
+            events.put(final_event)
+
+        def on_search_done(future):
+            """搜索任务未执行（排队超过截止时间或被取消）时，由这里释放槽位并结束日志"""
+            if not future.cancelled() and not isinstance(future.exception(), DeadlineExceededError):
+                return
+            self._release_concurrency_slot()
+            log_collector.finish_search(total_time=0, search_id=search_id, status='failed',
+                                        message='搜索任务排队超时或已取消')
+            events.put(('error', {'message': "服务繁忙，搜索排队超时，请稍后重试"}))
+
+        # 在共享的 request 执行器中运行（任务继承当前上下文，search_id 随任务传递给日志收集器）
+        try:
+            search_future = get_executor('request').submit(
+                run_search, deadline=time.monotonic() + self.SEARCH_TIMEOUT
+            )
+        except ExecutorSaturatedError as e:
+            logger.warning(f"[流式搜索] 搜索执行器已饱和，拒绝请求 [ID: {request_id}]: {str(e)}")
+            self._release_concurrency_slot()
+            log_collector.finish_search(total_time=0, search_id=search_id, status='failed',
+                                        message='搜索执行器已饱和')
+            return self._create_error_response("服务繁忙，当前排队的搜索请求过多，请稍后重试",
+                                               HTTP_SERVICE_UNAVAILABLE)
+        search_future.add_done_callback(on_search_done)
+
+        def generate() -> Iterator[str]:
+            deadline = time.time() + self.SEARCH_TIMEOUT
+            try:
+                yield self._format_sse('start', {'search_id': search_id, 'request_id': request_id})
+                while True:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        logger.error(f"[流式搜索] 搜索超时（超过{self.SEARCH_TIMEOUT}秒）[ID: {request_id}]")
+                        yield self._format_sse('error', {
+                            'message': f"搜索超时（超过{self.SEARCH_TIMEOUT}秒），请稍后重试或减少搜索条件"
+                        })
+                        return
+                    try:
+                        event, payload = events.get(timeout=min(remaining, STREAM_HEARTBEAT_SECONDS))
+                    except queue.Empty:
+                        yield ": keep-alive\n\n"
+                        continue
+
+                    if event == 'done':
+                        result_data = self._format_search_response(payload, search_id)
+                        if params.get('resource_type') and params['resource_type'] != 'all':
+                            result_data = self._filter_by_resource_type(result_data, params['resource_type'])
+                        yield self._format_sse('done', result_data)
+                        return
+                    yield self._format_sse(event, payload)
+                    if event == 'error':
+                        return
+            finally:
+                # 客户端断开或流结束后不再缓存后续事件；尚未开始执行的搜索不再执行
+                closed.set()
+                search_future.cancel()
+
+        return generate(), HTTP_SUCCESS
+
+    @staticmethod
+    def _format_sse(event: str, data: Dict[str, Any]) -> str:
+        """格式化为一个SSE帧"""
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+    def _release_concurrency_slot(self):
+        """释放并发槽位"""
+        if self.concurrency_limiter is not None:
+            self.concurrency_limiter.release()
+
     def _validate_and_parse_params(self, data: Dict[str, Any]) -> Tuple[bool, str, Dict[str, Any]]:
         """
         验证并解析请求参数
@@ -223,28 +394,43 @@ class SearchHandler:
                 except:
                     pass
 
+        # 在共享的 request 执行器中执行搜索，超时后可以立即返回
+        # （按请求创建线程池时 with 退出会等待线程结束，超时无法提前返回）
         try:
-            with ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(execute_search)
-                try:
-                    response = future.result(timeout=self.SEARCH_TIMEOUT)
-                    search_elapsed = time.time() - search_start_time
-                    logger.info(f"[搜索执行] 搜索完成，耗时: {search_elapsed:.2f}秒，结果数: {len(response.results)}")
-                    return response, search_elapsed
-                except FuturesTimeoutError:
-                    logger.error(f"[搜索执行] 搜索超时（超过{self.SEARCH_TIMEOUT}秒）")
-                    future.cancel()
-                    from search_engine_v2 import SearchResponse
-                    response = SearchResponse(
-                        success=False,
-                        query="",
-                        results=[],
-                        message=f"搜索超时（超过{self.SEARCH_TIMEOUT}秒），请稍后重试或减少搜索条件",
-                        total_count=0,
-                        playlist_count=0,
-                        video_count=0
-                    )
-                    return response, self.SEARCH_TIMEOUT
+            future = get_executor('request').submit(
+                execute_search, deadline=time.monotonic() + self.SEARCH_TIMEOUT
+            )
+            try:
+                response = future.result(timeout=self.SEARCH_TIMEOUT)
+                search_elapsed = time.time() - search_start_time
+                logger.info(f"[搜索执行] 搜索完成，耗时: {search_elapsed:.2f}秒，结果数: {len(response.results)}")
+                return response, search_elapsed
+            except FuturesTimeoutError:
+                logger.error(f"[搜索执行] 搜索超时（超过{self.SEARCH_TIMEOUT}秒）")
+                future.cancel()
+                from search_engine_v2 import SearchResponse
+                response = SearchResponse(
+                    success=False,
+                    query="",
+                    results=[],
+                    message=f"搜索超时（超过{self.SEARCH_TIMEOUT}秒），请稍后重试或减少搜索条件",
+                    total_count=0,
+                    playlist_count=0,
+                    video_count=0
+                )
+                return response, self.SEARCH_TIMEOUT
+        except ExecutorSaturatedError as e:
+            logger.warning(f"[搜索执行] 搜索执行器已饱和，拒绝请求 [ID: {request_id}]: {str(e)}")
+            from search_engine_v2 import SearchResponse
+            return SearchResponse(
+                success=False,
+                query="",
+                results=[],
+                message="服务繁忙，当前排队的搜索请求过多，请稍后重试",
+                total_count=0,
+                playlist_count=0,
+                video_count=0
+            ), 0
         except Exception as e:
             logger.error(f"[搜索执行] 搜索异常: {str(e)}")
             from search_engine_v2 import SearchResponse
@@ -258,8 +444,9 @@ class SearchHandler:
                 video_count=0
             ), 0
 
-    def _record_search_results(self, log_collector, response, search_elapsed: float):
-        """记录搜索结果到日志"""
+    def _record_search_results(self, log_collector, response, search_elapsed: float,
+                               search_id: Optional[str] = None):
+        """记录搜索结果到日志（search_id 默认取当前上下文）"""
         try:
             for result in response.results:
                 search_engine_name = getattr(result, 'search_engine', None) or (
@@ -275,12 +462,15 @@ class SearchHandler:
                     score=result.score or 0,
                     recommendation_reason=result.recommendation_reason or "",
                     resource_type=result.resource_type or "未知",
+                    search_id=search_id
                 )
 
             # 完成日志收集
             log_collector.finish_search(
                 total_time=search_elapsed,
                 search_time=search_elapsed * 0.7,
+                scoring_time=search_elapsed * 0.3,
+                search_id=search_id,
                 result_count=len(response.results),
                 playlist_count=response.playlist_count if hasattr(response, 'playlist_count') else 0,
                 video_count=response.video_count if hasattr(response, 'video_count') else 0
@@ -289,6 +479,25 @@ class SearchHandler:
         except Exception as e:
             logger.warning(f"[日志收集] 记录失败: {str(e)}")
 
+    def _save_search_history(self, params: Dict[str, Any], response):
+        """保存搜索历史（后台线程追加写入，不阻塞请求）"""
+        try:
+            from core.search_history_store import get_search_history_store
+            get_search_history_store().record_async(
+                {key: params.get(key) for key in ('country', 'grade', 'semester', 'subject', 'language')},
+                {
+                    "success": response.success,
+                    "query": response.query,
+                    "total_count": response.total_count,
+                    "playlist_count": response.playlist_count,
+                    "video_count": response.video_count,
+                    "results": [r.model_dump() if hasattr(r, 'model_dump') else self._format_result(r)
+                                for r in response.results]
+                }
+            )
+        except Exception as e:
+            logger.warning(f"[搜索历史] 保存失败: {str(e)}")
+
     def _format_search_response(self, response, search_id: str) -> Dict[str, Any]:
         """格式化搜索响应"""
         if not response:
@@ -7,9 +7,10 @@ import time
 import gc
 import uuid
 import importlib
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from typing import Optional, Dict, Any
 from utils.logger_utils import get_logger
+from core.executor_registry import get_executor, ExecutorSaturatedError
 
 logger = get_logger('search_service')
 
@@ -107,9 +108,26 @@ class SearchService:
                         pass
 
             try:
-                # 使用ThreadPoolExecutor执行搜索，支持真正的超时中断
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    future = executor.submit(execute_search_in_thread)
+                # 在共享的 request 执行器中执行搜索（任务继承当前上下文，search_id 随任务传递给日志收集器），
+                # 超时后可以立即返回（按请求创建线程池时 with 退出会等待线程结束，超时无法提前返回）
+                try:
+                    future = get_executor('request').submit(
+                        execute_search_in_thread, deadline=time.monotonic() + self.SEARCH_TIMEOUT
+                    )
+                except ExecutorSaturatedError as e:
+                    logger.warning(f"[搜索执行] 搜索执行器已饱和，拒绝请求 [ID: {request_id}]: {str(e)}")
+                    future = None
+                    response = SearchResponse(
+                        success=False,
+                        query="",
+                        results=[],
+                        message="服务繁忙，当前排队的搜索请求过多，请稍后重试",
+                        total_count=0,
+                        playlist_count=0,
+                        video_count=0
+                    )
+
+                if future is not None:
                     try:
                         response = future.result(timeout=self.SEARCH_TIMEOUT)
                         search_elapsed = time.time() - search_start_time
@@ -145,17 +163,27 @@ class SearchService:
                             score=result.score or 0,
                             recommendation_reason=result.recommendation_reason or "",
                             resource_type=result.resource_type or "未知",
+                            search_id=search_id
                         )
 
                     # 完成日志收集
                     log_collector.finish_search(
                         total_time=search_elapsed,
                         search_time=search_elapsed * 0.7,  # 估算搜索时间
+                        scoring_time=search_elapsed * 0.3,  # 估算评分时间
+                        search_id=search_id,
                         result_count=len(response.results),
                         playlist_count=response.playlist_count if hasattr(response, 'playlist_count') else 0,
                         video_count=response.video_count if hasattr(response, 'video_count') else 0
                     )
                     logger.info(f"[日志收集] 搜索日志已记录: {search_id}")
+                else:
+                    log_collector.finish_search(
+                        total_time=search_elapsed,
+                        search_id=search_id,
+                        status='failed',
+                        message=response.message if response else ''
+                    )
 
                 # 构建响应
                 return {
@@ -590,3 +590,35 @@ class TestBatchVideoService:
         assert len(result['evaluations']) == 1
         assert result['evaluations'][0]['success'] is False
         assert 'error' in result['evaluations'][0]
+
+    def test_batch_evaluate_videos_pipeline_transcribes_separately(self, mock_video_crawler, mock_video_evaluator):
+        """Test the pipeline downloads without transcripts, transcribes in its own stage and releases artifacts"""
+        service = BatchVideoService(
+            video_crawler=mock_video_crawler,
+            video_evaluator=mock_video_evaluator
+        )
+        mock_video_crawler.process_video.side_effect = lambda **kwargs: {
+            'success': True, 'metadata': {'title': kwargs['video_url']}, 'frames_paths': [],
+            'audio_path': '/tmp/a.mp3', 'transcript': None, 'transcript_extracted': False
+        }
+
+        def attach(result, video_url, languages):
+            result['transcript'] = f'transcript of {video_url}'
+            return result
+        mock_video_crawler.attach_transcript.side_effect = attach
+
+        video_urls = [{'url': f'https://youtube.com/watch?v=test{i}', 'title': f'Video {i}'} for i in range(3)]
+        params = {'country': 'ID', 'grade': 'Kelas 1', 'subject': 'Matematika', 'preferred_languages': ['en']}
+        progress = []
+
+        with patch.object(service, '_save_evaluation_result'):
+            result = service._batch_evaluate_videos(video_urls, None, params, on_progress=progress.append)
+
+        assert result['successful_count'] == 3
+        assert [e['video_url'] for e in result['evaluations']] == [v['url'] for v in video_urls]
+        assert all(c.kwargs['extract_transcript'] is False for c in mock_video_crawler.process_video.call_args_list)
+        assert mock_video_crawler.attach_transcript.call_count == 3
+        assert mock_video_crawler.release.call_count == 3
+        transcripts = {c.kwargs['transcript'] for c in mock_video_evaluator.evaluate_video_content.call_args_list}
+        assert transcripts == {f'transcript of {v["url"]}' for v in video_urls}
+        assert progress[-1]['completed'] == 3
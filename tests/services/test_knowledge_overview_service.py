@@ -9,6 +9,7 @@ import tempfile
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
 
+from core.evaluation_catalog import EvaluationCatalog
 from services.knowledge_overview_service import KnowledgeOverviewService
 from utils.error_handling import ValidationError, NotFoundError
 
@@ -226,7 +227,7 @@ class TestKnowledgeOverviewService:
         assert round(score, 2) == 6.6
 
     def test_extract_video_info(self):
-        """Test extracting video info from evaluation data"""
+        """Test extracting video info from an evaluation catalog record"""
         service = KnowledgeOverviewService()
 
         eval_data = {
@@ -253,17 +254,22 @@ class TestKnowledgeOverviewService:
                     'details': 'Good metadata'
                 }
             },
+            'matched_knowledge_point': {'id': 'kp_1'},
             'timestamp': '2025-01-10T12:00:00Z',
             'request_id': 'test_123'
         }
+        record = EvaluationCatalog.extract_fields(eval_data)
+        record.update(json.loads(record.pop('details_json')))
 
-        result = service._extract_video_info(eval_data, 'kp_1')
+        result = service._extract_video_info(record)
 
         assert result['video_url'] == 'https://youtube.com/watch?v=test'
         assert result['video_title'] == 'Test Video'
         assert result['overall_score'] == 8.5
         assert result['kp_id'] == 'kp_1'
         assert result['evaluation_date'] == '2025-01-10T12:00:00Z'
+        assert result['visual_quality'] == 8.0
+        assert result['relevance_details'] == 'Highly relevant'
 
     def test_match_videos_to_knowledge_points(self):
         """Test matching videos to knowledge points"""
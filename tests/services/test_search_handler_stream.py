@@ -0,0 +1,154 @@
+"""
+Unit tests for SearchHandler streaming search
+"""
+
+import json
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+import services.search_handler as search_handler
+from core.executor_registry import ExecutorSaturatedError
+from services.search_handler import SearchHandler
+
+
+def _parse_sse(frames):
+    """把SSE帧解析为 (event, data) 列表（忽略心跳注释）"""
+    events = []
+    for frame in frames:
+        if frame.startswith(':'):
+            continue
+        lines = frame.strip().split('\n')
+        event = lines[0][len('event: '):]
+        data = json.loads(lines[1][len('data: '):])
+        events.append((event, data))
+    return events
+
+
+class _FakeResponse:
+    success = True
+    query = "math grade 5"
+    message = ""
+    total_count = 1
+    playlist_count = 0
+    video_count = 1
+
+    def __init__(self):
+        result = Mock(title="Fractions", url="https://example.com/a", snippet="",
+                      score=8.5, recommendation_reason="good", resource_type="视频",
+                      search_engine="Tavily")
+        self.results = [result]
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    """创建使用假搜索引擎的处理器"""
+    handler = SearchHandler()
+
+    class FakeEngine:
+        def __init__(self, log_collector=None):
+            pass
+
+        def search(self, request, on_event=None):
+            on_event('results', {'engine': 'Tavily', 'results': [{'url': 'https://example.com/a'}]})
+            on_event('scores', {'results': [{'url': 'https://example.com/a', 'score': 8.5}]})
+            return _FakeResponse()
+
+    def fake_init():
+        handler.SearchEngineV2 = FakeEngine
+        return True
+
+    monkeypatch.setattr(handler, '_initialize_search_engine', fake_init)
+    monkeypatch.setattr(handler, '_create_search_request', lambda params: params)
+    monkeypatch.setattr(handler, '_save_search_history', Mock())
+    return handler
+
+
+class TestSearchStream:
+    """Test suite for SearchHandler.handle_search_stream"""
+
+    def test_streams_progress_then_done(self, handler):
+        """Test engine results and score updates are streamed before the final response"""
+        stream, status = handler.handle_search_stream(
+            {'country': 'CN', 'grade': '5', 'subject': 'math'},
+            log_collector=Mock(start_search=Mock(return_value='sid-1'))
+        )
+
+        assert status == 200
+        events = _parse_sse(list(stream))
+        assert [event for event, _ in events] == ['start', 'results', 'scores', 'done']
+        assert events[1][1]['engine'] == 'Tavily'
+        assert events[-1][1]['search_id'] == 'sid-1'
+        assert events[-1][1]['results'][0]['score'] == 8.5
+
+    def test_invalid_params_return_error_response(self, handler):
+        """Test validation errors are returned before any stream starts"""
+        result, status = handler.handle_search_stream({'country': 'CN'}, log_collector=Mock())
+
+        assert status == 400
+        assert result['success'] is False
+
+    def test_concurrency_slot_released_after_search(self, handler):
+        """Test the concurrency slot is released once the background search ends"""
+        limiter = Mock(acquire=Mock(return_value=True))
+        handler.concurrency_limiter = limiter
+
+        stream, status = handler.handle_search_stream(
+            {'country': 'CN', 'grade': '5', 'subject': 'math'},
+            log_collector=Mock(start_search=Mock(return_value='sid-1'))
+        )
+        list(stream)
+
+        limiter.release.assert_called_once()
+
+    def test_saturated_executor_rejects_stream(self, handler, monkeypatch):
+        """Test the stream is rejected and the slot released when the request executor is saturated"""
+        class _SaturatedExecutor:
+            def submit(self, *args, **kwargs):
+                raise ExecutorSaturatedError("request pool saturated")
+
+        monkeypatch.setattr(search_handler, 'get_executor', lambda name: _SaturatedExecutor())
+        limiter = Mock(acquire=Mock(return_value=True))
+        handler.concurrency_limiter = limiter
+        log_collector = Mock(start_search=Mock(return_value='sid-1'))
+
+        result, status = handler.handle_search_stream(
+            {'country': 'CN', 'grade': '5', 'subject': 'math'}, log_collector=log_collector
+        )
+
+        assert status == 503
+        assert result['success'] is False
+        limiter.release.assert_called_once()
+        assert log_collector.finish_search.call_args.kwargs['status'] == 'failed'
+
+
+class TestSearchTimeout:
+    """Test suite for SearchHandler._execute_search_with_timeout"""
+
+    def test_timeout_returns_without_waiting_for_search(self, handler, monkeypatch):
+        """Test a timed-out search returns immediately instead of waiting for the worker thread"""
+        release = threading.Event()
+
+        class SlowEngine:
+            def search(self, request):
+                release.wait(5)
+                return _FakeResponse()
+
+        monkeypatch.setitem(sys.modules, 'search_engine_v2',
+                            SimpleNamespace(SearchResponse=lambda **kwargs: SimpleNamespace(**kwargs)))
+        handler.SearchEngineV2 = SlowEngine
+        handler.SEARCH_TIMEOUT = 0.2
+
+        start = time.monotonic()
+        try:
+            response, elapsed = handler._execute_search_with_timeout({}, 'req-1')
+        finally:
+            release.set()
+
+        assert time.monotonic() - start < 1.0
+        assert response.success is False
+        assert elapsed == 0.2
@@ -0,0 +1,117 @@
+"""
+Unit tests for AsyncSearchFanout
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from core.async_search_fanout import AsyncSearchFanout, FanoutTask
+from core.search_strategies import DefaultTavilyStrategy, FallbackTavilyStrategy, SearchContext
+
+
+@pytest.fixture
+def fanout():
+    """独立的扇出引擎实例（测试结束后关闭）"""
+    instance = AsyncSearchFanout(max_blocking_workers=4, engine_deadlines={'Slow': 0.2})
+    yield instance
+    instance.shutdown()
+
+
+def _delayed(value, delay):
+    """返回一个在 delay 秒后产出 value 的协程工厂"""
+    async def _coro():
+        await asyncio.sleep(delay)
+        return value
+    return _coro
+
+
+class TestAsyncSearchFanout:
+    """Test suite for AsyncSearchFanout"""
+
+    def test_results_keyed_by_task_name(self, fanout):
+        """Test all task results are collected by name"""
+        results = fanout.run([
+            FanoutTask('a', 'Tavily', _delayed(['a1'], 0.01)),
+            FanoutTask('b', 'Google', _delayed(['b1', 'b2'], 0.02)),
+        ], timeout=5)
+
+        assert results == {'a': ['a1'], 'b': ['b1', 'b2']}
+        assert fanout.get_stats()['completed'] == 2
+
+    def test_on_result_called_in_completion_order(self, fanout):
+        """Test on_result callback fires as each task completes"""
+        order = []
+        fanout.run([
+            FanoutTask('slow', 'Tavily', _delayed([1], 0.2)),
+            FanoutTask('fast', 'Tavily', _delayed([2], 0.01)),
+        ], timeout=5, on_result=lambda name, value: order.append(name))
+
+        assert order == ['fast', 'slow']
+
+    def test_engine_deadline_cancels_slow_task(self, fanout):
+        """Test a task exceeding its engine deadline yields an empty list"""
+        start = time.time()
+        results = fanout.run([
+            FanoutTask('slow', 'Slow', _delayed(['late'], 2)),
+            FanoutTask('fast', 'Tavily', _delayed(['ok'], 0.01)),
+        ], timeout=5)
+
+        assert results == {'slow': [], 'fast': ['ok']}
+        assert time.time() - start < 1.5
+        assert fanout.get_stats()['deadline_exceeded'] == 1
+
+    def test_overall_timeout_cancels_pending(self, fanout):
+        """Test pending tasks are cancelled when the overall timeout expires"""
+        results = fanout.run([
+            FanoutTask('hang', 'Tavily', _delayed(['never'], 10)),
+        ], timeout=0.2)
+
+        assert results == {'hang': []}
+        stats = fanout.get_stats()
+        assert stats['cancelled'] + stats['deadline_exceeded'] == 1
+
+    def test_failed_task_returns_empty_list(self, fanout):
+        """Test exceptions inside a task are isolated"""
+        async def _boom():
+            raise ValueError("engine down")
+
+        results = fanout.run([
+            FanoutTask('bad', 'Tavily', _boom),
+            FanoutTask('good', 'Tavily', _delayed(['ok'], 0.01)),
+        ], timeout=5)
+
+        assert results == {'bad': [], 'good': ['ok']}
+        assert fanout.get_stats()['failed'] == 1
+
+    def test_run_blocking_uses_shared_executor(self, fanout):
+        """Test sync functions run off the event loop thread"""
+        def _sync_search(query, max_results=10):
+            return [threading.current_thread().name, query, max_results]
+
+        results = fanout.run([
+            FanoutTask('sync', 'Baidu', lambda: fanout.run_blocking(_sync_search, 'q', max_results=3)),
+        ], timeout=5)
+
+        thread_name, query, max_results = results['sync']
+        assert thread_name.startswith('search-blocking')
+        assert (query, max_results) == ('q', 3)
+
+
+class TestTavilyStrategyAsync:
+    """Test suite for the native async Tavily strategies"""
+
+    @pytest.mark.parametrize('strategy_cls', [DefaultTavilyStrategy, FallbackTavilyStrategy])
+    def test_search_async_uses_native_async_path(self, strategy_cls):
+        """Test both Tavily strategies await the async client instead of running the sync search in a thread"""
+        client = Mock(_search_with_tavily_async=AsyncMock(return_value=[{'url': 'https://a'}]))
+        context = SearchContext(google_remaining=0, metaso_remaining=0, tavily_remaining=5, baidu_remaining=0)
+
+        results = asyncio.run(strategy_cls().search_async(client, 'fractions', 10, context=context))
+
+        assert results == [{'url': 'https://a'}]
+        client._search_with_tavily_async.assert_awaited_once()
+        client._search_with_tavily.assert_not_called()
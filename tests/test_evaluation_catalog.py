@@ -0,0 +1,82 @@
+"""
+Unit tests for EvaluationCatalog
+"""
+
+import json
+import os
+
+from core.evaluation_catalog import EvaluationCatalog
+
+
+def _write(eval_dir, name, data):
+    path = eval_dir / name
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    return path
+
+
+def _evaluation(url, timestamp, score=8.0, country='ID', grade='Kelas 1', kp_id='kp_1'):
+    return {
+        "request_id": f"req-{timestamp}",
+        "timestamp": timestamp,
+        "video_url": url,
+        "video_metadata": {"title": f"Video {url}"},
+        "evaluation": {"overall_score": score, "relevance": {"score": 9.0, "details": "ok"}},
+        "matched_knowledge_point": {"id": kp_id} if kp_id else None,
+        "search_params": {"country": country, "grade": grade, "subject": "Matematika"}
+    }
+
+
+class TestEvaluationCatalog:
+    """Test suite for EvaluationCatalog"""
+
+    def test_filters_and_latest_per_url(self, tmp_path):
+        """Test filtering by params and keeping only the latest record per URL"""
+        _write(tmp_path, 'evaluation_a.json', _evaluation('u1', '2026-01-01T00:00:00Z', score=5.0))
+        _write(tmp_path, 'evaluation_b.json', _evaluation('u1', '2026-01-02T00:00:00Z', score=9.0))
+        _write(tmp_path, 'evaluation_c.json', _evaluation('u2', '2026-01-03T00:00:00Z', country='MY'))
+        _write(tmp_path, 'evaluation_d.json', _evaluation('u3', '2026-01-04T00:00:00Z', kp_id=None))
+        catalog = EvaluationCatalog(str(tmp_path))
+
+        records, total = catalog.query(country='ID', grade='Kelas 1', subject='Matematika',
+                                       require_knowledge_point=True, latest_per_url=True)
+
+        assert total == 1
+        assert records[0]['video_url'] == 'u1'
+        assert records[0]['overall_score'] == 9.0
+        assert records[0]['relevance'] == 9.0
+
+    def test_incremental_sync_only_parses_changes(self, tmp_path):
+        """Test unchanged files are not re-parsed and deleted files are removed"""
+        _write(tmp_path, 'evaluation_a.json', _evaluation('u1', '2026-01-01T00:00:00Z'))
+        path_b = _write(tmp_path, 'evaluation_b.json', _evaluation('u2', '2026-01-02T00:00:00Z'))
+        catalog = EvaluationCatalog(str(tmp_path), sync_interval=0)
+
+        catalog.query()
+        assert catalog.stats['files_parsed'] == 2
+        catalog.query()
+        assert catalog.stats['files_parsed'] == 2
+
+        os.remove(path_b)
+        records, total = catalog.query()
+        assert total == 1
+        assert catalog.stats['files_removed'] == 1
+
+    def test_register_visible_without_rescan(self, tmp_path):
+        """Test a registered write is queryable before the next directory scan"""
+        catalog = EvaluationCatalog(str(tmp_path), sync_interval=3600)
+        catalog.query()
+
+        data = _evaluation('u1', '2026-01-01T00:00:00Z')
+        catalog.register(str(_write(tmp_path, 'evaluation_new.json', data)), data)
+
+        records, total = catalog.query(limit=10)
+        assert total == 1
+        assert catalog.summary()['average_score'] == 8.0
+
+    def test_invalid_file_skipped(self, tmp_path):
+        """Test unreadable JSON is indexed as invalid and excluded from results"""
+        (tmp_path / 'evaluation_bad.json').write_text('{not json', encoding='utf-8')
+        catalog = EvaluationCatalog(str(tmp_path))
+
+        assert catalog.query() == ([], 0)
+        assert catalog.stats['parse_errors'] == 1
@@ -0,0 +1,100 @@
+"""
+Unit tests for the named executor registry
+"""
+
+import threading
+import time
+
+import pytest
+
+from core.executor_registry import DeadlineExceededError, ExecutorSaturatedError, ManagedExecutor
+
+
+@pytest.fixture
+def executor():
+    """创建单线程、最多排队2个任务的执行器"""
+    pool = ManagedExecutor('test', max_workers=1, queue_size=2)
+    yield pool
+    pool.shutdown(wait=True, cancel_futures=True)
+
+
+class TestManagedExecutor:
+    """Test suite for the shared, bounded executor pools"""
+
+    def test_queue_depth_and_saturation(self, executor):
+        """Test queued tasks are reported and submissions beyond queue_size are rejected"""
+        gate = threading.Event()
+        running = executor.submit(gate.wait, 5)
+        time.sleep(0.1)
+        queued = [executor.submit(lambda: 'ok') for _ in range(2)]
+
+        stats = executor.get_stats()
+        assert stats["active"] == 1
+        assert stats["saturation"] == 1.0
+        assert stats["queue_depth"] == 2
+
+        with pytest.raises(ExecutorSaturatedError):
+            executor.submit(lambda: 'overflow')
+
+        gate.set()
+        assert running.result(timeout=2) is True
+        assert [f.result(timeout=2) for f in queued] == ['ok', 'ok']
+        stats = executor.get_stats()
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 3
+        assert stats["queue_depth"] == 0
+        assert stats["peak_queue_depth"] == 2
+
+    def test_expired_tasks_are_not_run(self, executor):
+        """Test a task whose deadline passes while queued fails without executing"""
+        gate = threading.Event()
+        calls = []
+        executor.submit(gate.wait, 5)
+        late = executor.submit(calls.append, 'ran', deadline=time.monotonic() + 0.05)
+        time.sleep(0.2)
+        gate.set()
+
+        with pytest.raises(DeadlineExceededError):
+            late.result(timeout=2)
+        assert calls == []
+        assert executor.get_stats()["deadline_exceeded"] == 1
+
+    def test_nested_submission_runs_inline(self, executor):
+        """Test a task submitting to its own (single-thread) pool does not deadlock"""
+        def outer():
+            return executor.submit(lambda: threading.current_thread().name).result(timeout=1)
+
+        inner_thread = executor.submit(outer).result(timeout=2)
+
+        assert inner_thread.startswith('pool-test')
+        assert executor.get_stats()["inline"] == 1
+
+    def test_nested_submission_deadline_checked_only_before_start(self, executor):
+        """Test inline tasks are refused once expired but otherwise run to completion without a timeout"""
+        def outer():
+            late = executor.submit(lambda: 'late', deadline=time.monotonic() - 1)
+            started = time.monotonic()
+            slow = executor.submit(time.sleep, 0.2, deadline=time.monotonic() + 0.05)
+            blocked = time.monotonic() - started
+            return late, slow, blocked
+
+        late, slow, blocked = executor.submit(outer).result(timeout=2)
+
+        with pytest.raises(DeadlineExceededError):
+            late.result()
+        # 内联执行：submit() 阻塞到任务结束，超过截止时间也不会中断
+        assert slow.done() and slow.exception() is None
+        assert blocked >= 0.2
+
+    def test_cancelled_tasks_leave_queue(self, executor):
+        """Test cancelling a queued task frees its queue slot"""
+        gate = threading.Event()
+        executor.submit(gate.wait, 5)
+        time.sleep(0.1)
+        queued = executor.submit(lambda: 'never')
+
+        assert queued.cancel()
+        stats = executor.get_stats()
+        assert stats["queue_depth"] == 0
+        assert stats["cancelled"] == 1
+        gate.set()
@@ -0,0 +1,110 @@
+"""
+Unit tests for the shared HTTP transport
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import core.http_transport as http_transport
+from core.http_transport import HttpTransport, get_http_transport
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """记录客户端端口；按 server.statuses 依次返回状态码（或 (状态码, 响应头) 元组）"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        self.server.client_ports.add(self.client_address[1])
+        self.server.hits += 1
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        status, headers = status if isinstance(status, tuple) else (status, {})
+        body = b'{"ok": true}'
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """启动本地HTTP服务器"""
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    httpd.client_ports = set()
+    httpd.hits = 0
+    httpd.statuses = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestHttpTransport:
+    """Test suite for the pooled, retrying HTTP transport"""
+
+    def test_connections_are_reused(self, server):
+        """Test consecutive requests to one host share a keep-alive connection"""
+        transport = HttpTransport('test', trust_env=False)
+        url = f"http://127.0.0.1:{server.server_address[1]}/search"
+
+        for _ in range(3):
+            assert transport.post(url, json={"q": "fractions"}).status_code == 200
+
+        assert len(server.client_ports) == 1
+        assert transport.get_stats()["requests"] == 3
+        transport.close()
+
+    def test_retryable_status_is_retried(self, server):
+        """Test POST is retried on 429 and on 503 carrying Retry-After"""
+        transport = HttpTransport('test', retries=2, backoff_factor=0, trust_env=False)
+        server.statuses = [429, (503, {'Retry-After': '0'})]
+        url = f"http://127.0.0.1:{server.server_address[1]}/search"
+
+        response = transport.post(url, json={})
+
+        assert response.status_code == 200
+        assert server.hits == 3
+        transport.close()
+
+    @pytest.mark.parametrize('status', [502, 503, 504])
+    def test_post_not_retried_when_upstream_may_have_run(self, server, status):
+        """Test POST is returned as-is on gateway errors and on 503 without Retry-After"""
+        transport = HttpTransport('test', retries=2, backoff_factor=0, trust_env=False)
+        server.statuses = [status]
+        url = f"http://127.0.0.1:{server.server_address[1]}/search"
+
+        response = transport.post(url, json={})
+
+        assert response.status_code == status
+        assert server.hits == 1
+        transport.close()
+
+    def test_profiles_are_singletons_with_merged_settings(self, monkeypatch):
+        """Test each profile is created once, profile values overriding defaults"""
+        class FakeConfig:
+            def get_http_config(self):
+                return {
+                    'defaults': {'read_timeout': 30, 'pool_maxsize': 20},
+                    'profiles': {'llm': {'read_timeout': 300}},
+                }
+
+        import core.config_loader as config_loader
+        monkeypatch.setattr(config_loader, 'get_config', lambda: FakeConfig())
+        monkeypatch.setattr(http_transport, '_transports', {})
+
+        llm = get_http_transport('llm')
+
+        assert get_http_transport('llm') is llm
+        assert llm.timeout == (10.0, 300.0)
+        assert llm.settings['pool_maxsize'] == 20
+        assert get_http_transport('search').timeout == (10.0, 30.0)
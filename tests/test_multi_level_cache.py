@@ -0,0 +1,196 @@
+"""
+Unit tests for MultiLevelCache
+"""
+
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+import core.multi_level_cache as multi_level_cache
+from core.multi_level_cache import MultiLevelCache
+
+
+@pytest.fixture
+def make_cache(tmp_path, monkeypatch):
+    """创建不连接Redis的缓存实例（L1 + L3）"""
+    monkeypatch.setattr(multi_level_cache, 'REDIS_AVAILABLE', False)
+
+    def _make(**kwargs):
+        return MultiLevelCache(l3_dir=str(tmp_path / 'cache'), **kwargs)
+    return _make
+
+
+class TestL1Cache:
+    """Test suite for the L1 LRU tier"""
+
+    def test_evicts_least_recently_used_by_count(self, make_cache):
+        """Test the least recently used entry is evicted when over l1_max_size"""
+        cache = make_cache(l1_max_size=2)
+        cache.set("q1", "google", ["a"])
+        cache.set("q2", "google", ["b"])
+        assert cache.get("q1", "google") == ["a"]  # q1 变为最近使用
+        cache.set("q3", "google", ["c"])
+
+        keys = list(cache.l1_cache.keys())
+        assert cache.generate_cache_key("q2", "google") not in keys
+        assert len(keys) == 2
+        assert cache.get_stats()['l1_evictions'] == 1
+
+    def test_byte_budget_bounds_memory(self, make_cache):
+        """Test total L1 bytes never exceed l1_max_bytes"""
+        cache = make_cache(l1_max_size=1000, l1_max_bytes=100)
+        for i in range(20):
+            cache.set(f"query {i}", "google", {"title": "x" * 20})
+
+        stats = cache.get_stats()
+        assert stats['l1_bytes'] <= 100
+        assert stats['l1_entries'] < 20
+        assert stats['l1_evictions'] > 0
+
+    def test_oversized_entry_rejected_from_l1(self, make_cache):
+        """Test an entry larger than the whole budget skips L1 but is still stored on disk"""
+        cache = make_cache(l1_max_bytes=50)
+        cache.set("big", "google", {"title": "x" * 200})
+
+        assert cache.get_stats()['l1_rejected'] == 1
+        assert len(cache.l1_cache) == 0
+        assert cache.get("big", "google") == {"title": "x" * 200}
+        assert cache.get_stats()['l3_hits'] == 1
+
+    def test_clear_resets_byte_accounting(self, make_cache):
+        """Test clear() resets L1 bytes"""
+        cache = make_cache()
+        cache.set("q1", "google", ["a"])
+        cache.clear()
+
+        assert cache.get_stats()['l1_bytes'] == 0
+        assert cache.get_stats()['l1_entries'] == 0
+
+
+class TestL3Store:
+    """Test suite for the L3 segment store"""
+
+    def test_l3_round_trip_after_l1_cleared(self, make_cache):
+        """Test values are served from L3 once L1 is empty"""
+        cache = make_cache()
+        cache.set("q1", "google", [{"title": "数学视频"}])
+        cache.l1_cache.clear()
+        cache.l1_bytes = 0
+
+        assert cache.get("q1", "google") == [{"title": "数学视频"}]
+        assert cache.get_stats()['l3_hits'] == 1
+        assert cache.get_stats()['l3_entries'] == 1
+
+    def test_hit_rates_do_not_touch_l3(self, make_cache, monkeypatch):
+        """Test hit rates come from in-memory counters without reading the L3 store"""
+        cache = make_cache()
+        cache.set("q1", "google", ["a"])
+        cache.get("q1", "google")
+        cache.get("q2", "google")
+        monkeypatch.setattr(cache.l3_store, 'get_stats', lambda: pytest.fail("L3 stats read on hit path"))
+
+        rates = cache.get_hit_rates()
+        assert rates['l1_hits'] == 1
+        assert rates['hit_rate'] == 50.0
+
+    def test_legacy_json_file_migrated(self, make_cache):
+        """Test an old per-key JSON file is read once and moved into the store"""
+        cache = make_cache()
+        key = cache.generate_cache_key("q1", "google")
+        legacy_file = cache.l3_dir / f"{key}.json"
+        legacy_file.write_text('[{"title": "old"}]', encoding='utf-8')
+
+        assert cache.get("q1", "google") == [{"title": "old"}]
+        assert not legacy_file.exists()
+        assert cache.l3_store.get(key) is not None
+
+
+class TestStaleWhileRevalidate:
+    """Test suite for soft/hard TTL and background refresh"""
+
+    def _wait_for_refresh(self, cache, timeout=2.0):
+        deadline = time.time() + timeout
+        while cache.get_stats()['refreshes_in_flight'] and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_fresh_hit_does_not_refresh(self, make_cache):
+        """Test entries within the soft TTL are returned without refreshing"""
+        cache = make_cache()
+        cache.set("q1", "google", ["old"], ttl=3600, soft_ttl=1800)
+
+        data, is_stale = cache.get_or_revalidate("q1", "google", refresh_func=lambda: ["new"])
+
+        assert (data, is_stale) == (["old"], False)
+        assert cache.get_stats()['refreshes_scheduled'] == 0
+
+    def test_stale_hit_served_and_refreshed_once(self, make_cache):
+        """Test stale data is served immediately and refreshed once per key"""
+        cache = make_cache()
+        cache.set("q1", "google", ["old"], ttl=3600, soft_ttl=0.01)
+        time.sleep(0.02)
+
+        release = threading.Event()
+        calls = []
+
+        def refresh():
+            calls.append(1)
+            release.wait(2)
+            return ["new"]
+
+        first = cache.get_or_revalidate("q1", "google", refresh_func=refresh, ttl=3600, soft_ttl=1800)
+        second = cache.get_or_revalidate("q1", "google", refresh_func=refresh, ttl=3600, soft_ttl=1800)
+        release.set()
+        self._wait_for_refresh(cache)
+
+        assert first == (["old"], True)
+        assert second == (["old"], True)
+        assert len(calls) == 1
+        stats = cache.get_stats()
+        assert stats['refreshes_deduplicated'] == 1
+        assert stats['refreshes_succeeded'] == 1
+        assert cache.get_or_revalidate("q1", "google", refresh_func=refresh) == (["new"], False)
+
+    def test_soft_ttl_survives_l3_round_trip(self, make_cache):
+        """Test the soft expiry is kept when the entry is promoted from L3"""
+        cache = make_cache()
+        cache.set("q1", "google", ["old"], ttl=3600, soft_ttl=0.01)
+        cache.l1_cache.clear()
+        cache.l1_bytes = 0
+        time.sleep(0.02)
+
+        data, is_stale = cache.get_or_revalidate("q1", "google", refresh_func=lambda: None)
+        self._wait_for_refresh(cache)
+
+        assert (data, is_stale) == (["old"], True)
+        assert cache.get_stats()['refreshes_failed'] == 1
+
+    def test_empty_refresh_keeps_stale_entry(self, make_cache):
+        """Test an empty refresh result counts as a failure and keeps the stale data"""
+        cache = make_cache()
+        cache.set("q1", "google", ["old"], ttl=3600, soft_ttl=0.01)
+        time.sleep(0.02)
+
+        cache.get_or_revalidate("q1", "google", refresh_func=lambda: [])
+        self._wait_for_refresh(cache)
+
+        stats = cache.get_stats()
+        assert stats['refreshes_failed'] == 1
+        assert stats['refreshes_succeeded'] == 0
+        assert cache.get("q1", "google") == ["old"]
+
+    def test_l3_promotion_uses_remaining_ttl(self, make_cache):
+        """Test an entry promoted from L3 to L2 keeps its remaining hard TTL"""
+        cache = make_cache(l2_ttl=3600)
+        cache.l2_client = Mock()
+        cache.l2_client.get.return_value = None
+        cache.set("q1", "google", ["old"], ttl=100)
+        cache.l1_cache.clear()
+        cache.l1_bytes = 0
+        cache.l2_client.setex.reset_mock()
+
+        assert cache.get("q1", "google") == ["old"]
+        key, ttl, _ = cache.l2_client.setex.call_args[0]
+        assert key == cache.generate_cache_key("q1", "google")
+        assert 90 <= ttl <= 100
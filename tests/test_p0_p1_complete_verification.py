@@ -325,7 +325,7 @@ def test_code_patterns():
             ('def validate_api_key', 'API密钥验证函数'),
             ('def agent_search', 'Agent接口函数'),
             ('class AgentSearchClient', 'Agent客户端类'),
-            ('_playlist_cache = {}', '播放列表缓存'),
+            ('get_playlist_metadata_service()', '播放列表缓存'),
             ('_scorer_cache_lock = threading.Lock()', '评分器线程锁'),
             ('def get_playlist_info_fast', '快速播放列表获取'),
         ]
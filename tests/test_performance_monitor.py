@@ -0,0 +1,108 @@
+"""
+Unit tests for PerformanceMonitor's bounded latency statistics
+"""
+
+import json
+import os
+import random
+import threading
+
+import pytest
+
+from core.performance_monitor import LatencySketch, PerformanceMonitor
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    return PerformanceMonitor(data_dir=str(tmp_path), recent_samples=5, slow_queries_kept=3)
+
+
+class TestLatencySketch:
+    """Test suite for the log-bucketed latency sketch"""
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Test p50/p95/p99 stay within 1% of the exact values"""
+        random.seed(7)
+        values = sorted(random.lognormvariate(0, 1.2) for _ in range(20000))
+        sketch = LatencySketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        for q in (0.5, 0.95, 0.99):
+            exact = values[int(q * len(values))]
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.0101)
+        assert sketch.min == values[0] and sketch.max == values[-1]
+
+    def test_merge_and_roundtrip(self):
+        """Test merged sketches equal one sketch over all values and survive serialization"""
+        left, right, combined = LatencySketch(), LatencySketch(), LatencySketch()
+        for i in range(1, 1001):
+            (left if i % 2 else right).add(i / 100)
+            combined.add(i / 100)
+
+        left.merge(right)
+        restored = LatencySketch.from_dict(json.loads(json.dumps(left.to_dict())))
+
+        assert restored.count == combined.count
+        assert restored.quantile(0.95) == combined.quantile(0.95)
+
+
+class TestPerformanceMonitor:
+    """Test suite for bounded, lock-striped metric recording"""
+
+    def test_memory_bounded_by_ring_buffer(self, monitor):
+        """Test only the most recent raw samples are kept while counts cover every call"""
+        for i in range(1000):
+            monitor.record_metric("search_id", i / 1000, success=i % 10 != 0)
+
+        stats = monitor.get_stats("search_id")
+        assert stats["count"] == 1000
+        assert stats["success_rate"] == pytest.approx(0.9)
+        assert stats["p50_duration"] == pytest.approx(0.5, rel=0.02)
+        assert [r["duration"] for r in monitor.get_recent("search_id")] == [0.999, 0.998, 0.997, 0.996, 0.995]
+
+    def test_grouped_stats_and_slow_queries(self, monitor):
+        """Test country/engine breakdowns and the top-K slow query list"""
+        for duration, country, engine in [(1.0, "ID", "google"), (9.0, "ID", "tavily"), (6.0, "CN", "baidu"),
+                                          (7.0, "CN", "baidu"), (8.0, "RU", "google")]:
+            monitor.record_metric(f"search_{country.lower()}", duration, metadata={"country": country, "engine": engine})
+
+        assert monitor.get_stats_by_country()["CN"]["count"] == 2
+        assert list(monitor.get_stats_by_engine("google")) == ["google"]
+        slow = monitor.get_slow_queries(threshold=5.0, limit=10)
+        assert [q["duration"] for q in slow] == [9.0, 8.0, 7.0]
+        assert monitor.get_stats()["total_calls"] == 5
+
+    def test_slow_query_tracking_disabled(self, tmp_path):
+        """Test slow_queries_kept=0 records metrics without keeping slow queries"""
+        monitor = PerformanceMonitor(data_dir=str(tmp_path), slow_queries_kept=0)
+        monitor.record_metric("search_id", 3.0)
+
+        assert monitor.get_slow_queries(threshold=0) == []
+        assert monitor.get_stats()["total_calls"] == 1
+
+    def test_concurrent_recording(self, monitor):
+        """Test concurrent recorders on different operations lose no calls"""
+        def work(name):
+            for _ in range(2000):
+                monitor.record_metric(name, 0.01)
+
+        threads = [threading.Thread(target=work, args=(f"op{i % 4}",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert monitor.get_stats()["total_calls"] == 16000
+
+    def test_snapshot_is_compact(self, monitor):
+        """Test save_metrics writes summaries and sketches instead of every raw record"""
+        for i in range(500):
+            monitor.record_metric("cache_get", 0.001 * (i % 7 + 1))
+
+        data = json.loads(monitor.save_metrics().read_text(encoding='utf-8'))
+
+        assert data["operations"]["cache_get"]["summary"]["count"] == 500
+        assert len(data["operations"]["cache_get"]["sketch"]["buckets"]) <= 7
+        assert "metrics" not in data
+        assert monitor.save_metrics().stem.endswith(f"_{os.getpid()}")
@@ -0,0 +1,144 @@
+"""
+Unit tests for PlaylistMetadataService
+"""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+import core.playlist_metadata as playlist_metadata
+from core.executor_registry import ExecutorSaturatedError
+from core.playlist_metadata import PlaylistMetadataService, playlist_key
+
+PLAYLIST = "https://www.youtube.com/playlist?list=PLfractions"
+
+
+def _raw_playlist():
+    return {
+        'title': 'Fractions',
+        'entries': [
+            {'id': 'a1', 'title': 'Intro', 'duration': 120},
+            {'id': 'b2', 'title': 'Adding', 'duration': 180},
+            None,
+        ],
+    }
+
+
+@pytest.fixture
+def ydl(monkeypatch):
+    """替换 yt-dlp，记录 extract_info 调用次数"""
+    calls = []
+    gate = threading.Event()
+    gate.set()
+
+    def extract_info(url, download=False):
+        calls.append(url)
+        gate.wait(2)
+        return _raw_playlist()
+
+    instance = MagicMock()
+    instance.__enter__.return_value.extract_info.side_effect = extract_info
+    fake = MagicMock()
+    fake.YoutubeDL.return_value = instance
+    monkeypatch.setattr(playlist_metadata, 'yt_dlp', fake)
+    return calls, gate
+
+
+@pytest.fixture
+def service(tmp_path):
+    """创建临时数据库中的服务"""
+    return PlaylistMetadataService(db_path=str(tmp_path / 'playlists.db'), ttl_seconds=3600, max_workers=4)
+
+
+class TestPlaylistMetadataService:
+    """Test suite for the shared playlist metadata service"""
+
+    def test_key_shared_across_url_forms(self):
+        """Test watch URLs inside a playlist share the playlist's cache entry"""
+        assert playlist_key(PLAYLIST) == "youtube:PLfractions"
+        assert playlist_key("https://www.youtube.com/watch?v=a1&list=PLfractions&index=2") == "youtube:PLfractions"
+
+    def test_fetch_once_then_persistent_cache(self, service, ydl, tmp_path):
+        """Test a playlist is extracted once and later lookups (even from a new process) hit the cache"""
+        calls, _ = ydl
+
+        info = service.get(PLAYLIST)
+        assert info['video_count'] == 2
+        assert info['total_duration_minutes'] == 5.0
+        assert info['entries'][0]['url'] == "https://www.youtube.com/watch?v=a1"
+
+        other_worker = PlaylistMetadataService(db_path=str(tmp_path / 'playlists.db'), ttl_seconds=3600)
+        assert other_worker.get_summary(PLAYLIST) == {'video_count': 2, 'total_duration_minutes': 5.0}
+        assert len(calls) == 1
+
+    def test_expired_entries_are_refetched(self, service, ydl, monkeypatch):
+        """Test entries older than the TTL are fetched again"""
+        calls, _ = ydl
+        service.get(PLAYLIST)
+
+        real_time = time.time
+        monkeypatch.setattr(playlist_metadata.time, 'time', lambda: real_time() + 7200)
+        assert service.get(PLAYLIST)['cache_hit'] is False
+        assert len(calls) == 2
+
+    def test_bulk_lookup_single_flights_duplicates(self, service, ydl):
+        """Test concurrent bulk lookups of the same playlist share one extraction"""
+        calls, gate = ydl
+        gate.clear()
+        urls = [PLAYLIST, "https://www.youtube.com/watch?v=a1&list=PLfractions"]
+
+        results = {}
+        thread = threading.Thread(target=lambda: results.update(service.get_many(urls)))
+        thread.start()
+        time.sleep(0.2)
+        gate.set()
+        thread.join()
+
+        assert len(calls) == 1
+        assert all(info['video_count'] == 2 for info in results.values())
+
+    def test_failures_are_cached_briefly(self, service, monkeypatch):
+        """Test a failed extraction is not retried within the negative TTL"""
+        fake = MagicMock()
+        fake.YoutubeDL.return_value.__enter__.return_value.extract_info.side_effect = RuntimeError("HTTP 403")
+        monkeypatch.setattr(playlist_metadata, 'yt_dlp', fake)
+
+        assert service.get(PLAYLIST) is None
+        assert service.get(PLAYLIST) is None
+        assert service.get_stats()["fetches"] == 1
+
+    def test_timeout_returns_none_and_fetch_completes_in_background(self, service, ydl):
+        """Test a slow fetch is abandoned after the timeout but still fills the cache"""
+        calls, gate = ydl
+        gate.clear()
+
+        start = time.monotonic()
+        results = service.get_many([PLAYLIST], timeout=0.2)
+
+        assert time.monotonic() - start < 1.0
+        assert results == {PLAYLIST: None}
+        assert service.get_stats()["timeouts"] == 1
+        gate.set()
+        deadline = time.monotonic() + 2
+        while service._lookup(playlist_key(PLAYLIST))[1] is None and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert service.get(PLAYLIST)['cache_hit'] is True
+
+    def test_saturated_executor_degrades_to_cached_results(self, service, ydl, monkeypatch):
+        """Test cached playlists are returned and uncached ones are None when the io executor is saturated"""
+        service.get(PLAYLIST)
+
+        class _SaturatedExecutor:
+            def submit(self, *args, **kwargs):
+                raise ExecutorSaturatedError("io pool saturated")
+
+        monkeypatch.setattr(playlist_metadata, 'get_executor', lambda name: _SaturatedExecutor())
+        other = "https://www.youtube.com/playlist?list=PLdecimals"
+        results = service.get_many([PLAYLIST, other, "https://www.youtube.com/playlist?list=PLgeometry"])
+
+        assert results[PLAYLIST]['video_count'] == 2
+        assert results[other] is None
+        assert len(results) == 3
+        assert service.get_stats()["saturated"] == 1
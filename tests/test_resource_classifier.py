@@ -0,0 +1,60 @@
+"""
+Unit tests for the compiled resource type classifier
+"""
+
+import pytest
+
+from core.resource_classifier import ResourceClassifier
+
+
+@pytest.fixture
+def classifier():
+    return ResourceClassifier()
+
+
+class TestResourceClassifier:
+    """Test suite for rule-ordered resource classification"""
+
+    @pytest.mark.parametrize("title,url,snippet,expected,rule", [
+        ("Math channel", "https://www.youtube.com/channel/UC123", "", "其他", "creator_page"),
+        ("Fractions", "https://www.youtube.com/playlist?list=PL1", "", "播放列表", "playlist_url"),
+        ("All playlists", "https://www.youtube.com/@guru/playlists", "", "其他", "creator_playlists"),
+        ("Matematika Kelas 5 Full Course", "https://sekolah.id/a", "", "播放列表", "playlist"),
+        ("Pecahan", "https://www.youtube.com/watch?v=abc", "", "视频", "video"),
+        ("Soal Latihan Pecahan", "https://sekolah.id/b", "", "练习题", "exercise"),
+        ("Buku Siswa Matematika", "https://sekolah.id/c", "", "教材", "textbook"),
+        ("Panduan Guru", "https://sekolah.id/d", "", "教辅", "supplement"),
+        ("Pecahan Kelas 5", "https://sekolah.id/e.pdf", "", "教材", "pdf"),
+        ("Pecahan", "https://www.slideshare.net/x", "", "教辅", "document_host"),
+        ("Pecahan", "https://sekolah.id/f", "", "其他", None),
+    ])
+    def test_rule_priority(self, classifier, title, url, snippet, expected, rule):
+        """Test each rule is reached in priority order and reports the matching rule"""
+        result = classifier.classify(title, url, snippet)
+
+        assert result.resource_type == expected
+        assert result.rule == rule
+
+    def test_evidence_is_longest_keyword(self, classifier):
+        """Test evidence returns the matched keyword, preferring the longer alternative"""
+        result = classifier.classify("Video Pembelajaran Pecahan", "https://sekolah.id", "")
+
+        assert result.evidence == "video pembelajaran"
+
+    def test_batch_accepts_dicts_and_objects(self, classifier):
+        """Test batch classification keeps input order for dicts and attribute objects"""
+        class Item:
+            title, url, snippet = "Kuis Pecahan", "https://sekolah.id/q", ""
+
+        results = classifier.classify_batch([{'title': 'Lecture 1', 'url': 'https://sekolah.id'}, Item()])
+
+        assert [r.resource_type for r in results] == ["视频", "练习题"]
+
+    def test_custom_rules_and_validation(self):
+        """Test rules loaded from config replace the defaults and invalid rules are rejected"""
+        custom = ResourceClassifier(rules=[{'name': 'lab', 'type': '实验', 'target': 'title', 'keywords': ['Lab']}])
+
+        assert custom.classify("Virtual LAB", "https://sekolah.id/lab", "").resource_type == "实验"
+        assert custom.classify("Notes", "https://sekolah.id/lab", "").resource_type == "其他"
+        with pytest.raises(ValueError):
+            ResourceClassifier(rules=[{'name': 'empty', 'type': '视频', 'keywords': []}])
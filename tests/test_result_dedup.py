@@ -0,0 +1,111 @@
+"""
+Unit tests for URL canonicalization and near-duplicate result clustering
+"""
+
+import pytest
+
+from core.result_dedup import ResultDeduplicator, canonical_url, simhash, youtube_ids
+
+SNIPPET = ("Belajar pecahan campuran untuk siswa kelas 5 SD dengan contoh soal "
+           "dan pembahasan langkah demi langkah yang mudah dipahami")
+
+
+@pytest.fixture
+def dedup():
+    return ResultDeduplicator()
+
+
+class TestCanonicalUrl:
+    """Test suite for URL canonicalization"""
+
+    @pytest.mark.parametrize("url", [
+        "https://youtu.be/dQw4w9WgXcQ?t=30",
+        "https://m.youtube.com/watch?v=dQw4w9WgXcQ&feature=share",
+        "http://www.youtube.com/watch?t=45&v=dQw4w9WgXcQ&si=abc",
+        "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+        "https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ",
+    ])
+    def test_youtube_video_forms(self, url):
+        """Test every YouTube video URL form maps to the same watch URL"""
+        assert canonical_url(url) == "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+    def test_youtube_playlist_ids(self):
+        """Test playlist IDs are kept and videos inside a playlist stay distinct from the playlist"""
+        assert youtube_ids("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PLx&index=3") == ("dQw4w9WgXcQ", "PLx")
+        assert canonical_url("https://youtube.com/playlist?list=PLx&si=abc") == \
+            "https://www.youtube.com/playlist?list=PLx"
+
+    def test_tracking_params_and_hosts(self):
+        """Test tracking params, fragments, default ports and www./m. prefixes are dropped"""
+        assert canonical_url("HTTP://WWW.Example.com:443/a/b/?utm_source=x&b=2&fbclid=1&a=1#top") == \
+            "https://example.com/a/b?a=1&b=2"
+        assert canonical_url("https://m.ruangguru.com/math/") == canonical_url("https://ruangguru.com/math")
+        assert canonical_url("https://example.com/2?foo=bar") != canonical_url("https://example.com/2")
+
+    def test_generic_params_stripped_only_on_known_hosts(self):
+        """Test from/source/ref/hl are content params elsewhere and only dropped on hosts that use them for tracking"""
+        assert canonical_url("https://www.bilibili.com/video/BV1xx?from=search&spm_id_from=333") == \
+            "https://bilibili.com/video/BV1xx"
+        assert canonical_url("https://medium.com/@a/post?source=rss") == "https://medium.com/@a/post"
+        assert canonical_url("https://example.com/convert?from=cm&to=m") == "https://example.com/convert?from=cm&to=m"
+        assert canonical_url("https://github.com/o/r/tree?ref=v2") == "https://github.com/o/r/tree?ref=v2"
+        assert canonical_url("https://docs.example.com/page?hl=id&source=x") == \
+            "https://docs.example.com/page?hl=id&source=x"
+        assert canonical_url("https://www.youtube.com/@channel/videos?si=abc&hl=id") == \
+            "https://youtube.com/@channel/videos"
+
+
+class TestResultDeduplicator:
+    """Test suite for merge-stage deduplication"""
+
+    def test_url_variants_collapse(self, dedup):
+        """Test results pointing at the same resource keep only the first occurrence"""
+        results = [
+            {'url': "https://www.youtube.com/watch?v=dQw4w9WgXcQ", 'title': 'A'},
+            {'url': "https://youtu.be/dQw4w9WgXcQ", 'title': 'B'},
+            {'url': "https://example.com/page?utm_campaign=x", 'title': 'C'},
+            {'url': "https://www.example.com/page", 'title': 'D'},
+        ]
+
+        outcome = dedup.deduplicate(results)
+
+        assert [r['title'] for r in outcome.kept] == ['A', 'C']
+        assert outcome.url_duplicates == 2
+
+    def test_mirrored_content_clustered(self, dedup):
+        """Test near-identical title+snippet on different sites collapses into one result"""
+        results = [
+            {'url': "https://site-a.com/pecahan", 'title': "Pecahan Campuran Kelas 5", 'snippet': SNIPPET},
+            {'url': "https://mirror-b.net/post/991", 'title': "Pecahan Campuran Kelas 5", 'snippet': SNIPPET + "."},
+            {'url': "https://site-c.org/geometri", 'title': "Bangun Ruang Kelas 5",
+             'snippet': "Mengenal kubus, balok dan volume bangun ruang untuk siswa sekolah dasar"},
+        ]
+
+        outcome = dedup.deduplicate(results)
+
+        assert [r['url'] for r in outcome.kept] == ["https://site-a.com/pecahan", "https://site-c.org/geometri"]
+        assert outcome.content_duplicates == 1
+
+    def test_distinct_lessons_and_kinds_not_merged(self, dedup):
+        """Test results with different numbers in the title, or different resource kinds, are kept"""
+        results = [
+            {'url': "https://site-a.com/1", 'title': "Pecahan Campuran Kelas 5 Bagian 1", 'snippet': SNIPPET},
+            {'url': "https://site-a.com/2", 'title': "Pecahan Campuran Kelas 5 Bagian 2", 'snippet': SNIPPET},
+            {'url': "https://www.youtube.com/watch?v=dQw4w9WgXcQ", 'title': "Pecahan Campuran Kelas 5",
+             'snippet': SNIPPET},
+            {'url': "https://www.youtube.com/playlist?list=PLx", 'title': "Pecahan Campuran Kelas 5",
+             'snippet': SNIPPET},
+        ]
+
+        assert len(dedup.deduplicate(results).kept) == 4
+
+    def test_simhash_similarity(self):
+        """Test SimHash is close for near-identical text and far for unrelated text"""
+        base, features = simhash(SNIPPET)
+        near, _ = simhash(SNIPPET + " ya")
+        far, _ = simhash("Photosynthesis explained for grade 8 biology students with diagrams")
+
+        assert features > 8
+        assert simhash(SNIPPET.upper() + "!")[0] == base
+        assert bin(base ^ near).count('1') <= 8
+        assert bin(base ^ far).count('1') > 16
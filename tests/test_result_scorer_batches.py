@@ -0,0 +1,115 @@
+"""
+Unit tests for IntelligentResultScorer batch scoring concurrency
+"""
+
+import threading
+import time
+
+import pytest
+
+import core.result_scorer as result_scorer
+from core.executor_registry import ExecutorSaturatedError, ManagedExecutor
+from core.result_scorer import IntelligentResultScorer
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """独立的LLM执行器（替换全局 llm 池，测试结束后关闭）"""
+    executor = ManagedExecutor('llm-test', max_workers=8, queue_size=16)
+    monkeypatch.setattr(result_scorer, 'get_executor', lambda name: executor)
+    yield executor
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _make_scorer(score_batch, batch_size=2, batch_concurrency=2, scoring_timeout=5.0):
+    """创建不初始化LLM客户端的评分器，批次评分由 score_batch 替代"""
+    scorer = IntelligentResultScorer.__new__(IntelligentResultScorer)
+    scorer.batch_size = batch_size
+    scorer.batch_concurrency = batch_concurrency
+    scorer.scoring_timeout = scoring_timeout
+    scorer.rate_limit_timeout = 30
+    scorer._score_batch = score_batch
+    return scorer
+
+
+def _scored(batch):
+    return [dict(result, score=9.0, evaluation_method='LLM (Batch)') for result in batch]
+
+
+class TestScoreInBatches:
+    """Test suite for _score_in_batches"""
+
+    def test_concurrency_bounded_by_batch_concurrency(self, pool):
+        """Test no more than batch_concurrency batches run at the same time"""
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def score_batch(batch, query, metadata=None, deadline=None):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return _scored(batch)
+
+        scorer = _make_scorer(score_batch, batch_concurrency=2)
+        results = scorer._score_in_batches([{'i': i} for i in range(12)], 'q')
+
+        assert [r['i'] for r in results] == list(range(12))
+        assert all(r['evaluation_method'] == 'LLM (Batch)' for r in results)
+        assert peak[0] == 2
+
+    def test_deadline_cuts_off_slow_batches(self, pool):
+        """Test batches still running at the deadline are marked failed without waiting for them"""
+        release = threading.Event()
+
+        def score_batch(batch, query, metadata=None, deadline=None):
+            if batch[0]['i'] == 0:
+                release.wait(5)
+            return _scored(batch)
+
+        scorer = _make_scorer(score_batch, batch_concurrency=3, scoring_timeout=0.3)
+        start = time.monotonic()
+        try:
+            results = scorer._score_in_batches([{'i': i} for i in range(6)], 'q')
+        finally:
+            release.set()
+
+        assert time.monotonic() - start < 2
+        assert [r['evaluation_method'] for r in results[:2]] == ['Failed', 'Failed']
+        assert all(r['evaluation_method'] == 'LLM (Batch)' for r in results[2:])
+
+    def test_failed_batch_falls_back_without_affecting_others(self, pool):
+        """Test an exception in one batch marks only that batch failed"""
+        def score_batch(batch, query, metadata=None, deadline=None):
+            if batch[0]['i'] == 2:
+                raise ValueError("provider error")
+            return _scored(batch)
+
+        scorer = _make_scorer(score_batch)
+        results = scorer._score_in_batches([{'i': i} for i in range(6)], 'q')
+
+        assert [r['evaluation_method'] for r in results] == [
+            'LLM (Batch)', 'LLM (Batch)', 'Failed', 'Failed', 'LLM (Batch)', 'LLM (Batch)'
+        ]
+
+    def test_saturated_executor_scores_inline(self, monkeypatch):
+        """Test batches are scored on the calling thread when the llm executor is saturated"""
+        class _SaturatedExecutor:
+            def submit(self, *args, **kwargs):
+                raise ExecutorSaturatedError("llm pool saturated")
+
+        monkeypatch.setattr(result_scorer, 'get_executor', lambda name: _SaturatedExecutor())
+        threads = set()
+
+        def score_batch(batch, query, metadata=None, deadline=None):
+            threads.add(threading.current_thread().name)
+            return _scored(batch)
+
+        scorer = _make_scorer(score_batch)
+        results = scorer._score_in_batches([{'i': i} for i in range(6)], 'q')
+
+        assert threads == {threading.current_thread().name}
+        assert all(r['evaluation_method'] == 'LLM (Batch)' for r in results)
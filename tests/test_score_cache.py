@@ -0,0 +1,56 @@
+"""
+Unit tests for ScoreCache
+"""
+
+from core.score_cache import ScoreCache
+
+
+def _scored(url, score=8.0, method='LLM (Batch)'):
+    return {'url': url, 'score': score, 'recommendation_reason': 'clear explanation', 'evaluation_method': method}
+
+
+class TestScoreCache:
+    """Test suite for the persistent per-result score cache"""
+
+    def test_key_composed_of_url_query_version_and_model(self, tmp_path):
+        """Test the key ignores URL/query form but changes with prompt version and model"""
+        cache = ScoreCache(str(tmp_path))
+        base = cache.make_key('https://www.youtube.com/watch?v=abcdefghijk', 'fractions', 'Grade 5', 'Math', 'v1', 'm1')
+
+        assert cache.make_key('https://youtu.be/abcdefghijk', 'fractions', 'grade 5', 'math', 'v1', 'm1') == base
+        assert cache.make_key('https://www.youtube.com/watch?v=xyzxyzxyzxy', 'fractions', 'Grade 5', 'Math', 'v1', 'm1') != base
+        assert cache.make_key('https://www.youtube.com/watch?v=abcdefghijk', 'decimals', 'Grade 5', 'Math', 'v1', 'm1') != base
+        assert cache.make_key('https://www.youtube.com/watch?v=abcdefghijk', 'fractions', 'Grade 5', 'Math', 'v2', 'm1') != base
+        assert cache.make_key('https://www.youtube.com/watch?v=abcdefghijk', 'fractions', 'Grade 5', 'Math', 'v1', 'm2') != base
+
+    def test_hit_and_miss(self, tmp_path):
+        """Test only successful LLM scores are written and returned by result index"""
+        cache = ScoreCache(str(tmp_path))
+        written = cache.set_many([
+            _scored('https://a.com/1'),
+            _scored('https://a.com/2', score=5.0, method='Failed'),
+        ], 'fractions', 'Grade 5', 'Math', 'v1')
+
+        hits = cache.get_many([{'url': 'https://a.com/2'}, {'url': 'https://a.com/1'}, {}],
+                              'Fractions', 'Grade 5', 'Math', 'v1')
+
+        assert written == 1
+        assert list(hits) == [1]
+        assert hits[1]['score'] == 8.0
+        stats = cache.get_stats()
+        assert (stats['hits'], stats['misses']) == (1, 1)
+
+    def test_prompt_version_change_keeps_old_entries(self, tmp_path):
+        """Test a new prompt version misses old scores without clearing the store"""
+        cache = ScoreCache(str(tmp_path))
+        cache.sync_prompt_version('v1')
+        cache.set_many([_scored('https://a.com/1')], 'fractions', 'Grade 5', 'Math', 'v1')
+
+        # 滚动发布：新旧版本进程交替同步版本
+        other = ScoreCache(str(tmp_path))
+        other.sync_prompt_version('v2')
+        cache.sync_prompt_version('v1')
+
+        assert other.get_many([{'url': 'https://a.com/1'}], 'fractions', 'Grade 5', 'Math', 'v2') == {}
+        assert 0 in cache.get_many([{'url': 'https://a.com/1'}], 'fractions', 'Grade 5', 'Math', 'v1')
+        assert other.get_stats()['prompt_version_changes'] == 1
@@ -0,0 +1,75 @@
+"""
+Unit tests for SearchHistoryStore
+"""
+
+import json
+import time
+
+from core.search_history_store import SearchHistoryStore
+
+
+def _request(country='CN', grade='五年级', subject='数学'):
+    return {'country': country, 'grade': grade, 'semester': None, 'subject': subject, 'language': 'zh'}
+
+
+def _response(query='五年级 数学', results=None):
+    return {'success': True, 'query': query, 'total_count': len(results or []),
+            'playlist_count': 0, 'video_count': 0, 'results': results or []}
+
+
+class TestSearchHistoryStore:
+    """Test suite for SearchHistoryStore"""
+
+    def test_query_paginates_newest_first(self, tmp_path):
+        """Test entries are returned newest first with a total count"""
+        store = SearchHistoryStore(str(tmp_path / 'history.db'))
+        for i in range(5):
+            store.record(_request(), _response(query=f"q{i}"))
+
+        page, total = store.query(limit=2, offset=1)
+
+        assert total == 5
+        assert [entry['query'] for entry in page] == ['q3', 'q2']
+        assert 'results' not in page[0]['response']
+
+    def test_filters_and_full_results(self, tmp_path):
+        """Test country/subject filters and include_results"""
+        store = SearchHistoryStore(str(tmp_path / 'history.db'))
+        store.record(_request(country='CN'), _response(results=[{'url': 'https://a'}]))
+        store.record(_request(country='ID', subject='Matematika'), _response())
+
+        entries, total = store.query(country='CN', include_results=True)
+
+        assert total == 1
+        assert entries[0]['request']['country'] == 'CN'
+        assert entries[0]['response']['results'] == [{'url': 'https://a'}]
+        assert store.count(subject='Matematika') == 1
+
+    def test_async_writes_and_retention(self, tmp_path):
+        """Test background writes land in the store and prune keeps max_entries"""
+        store = SearchHistoryStore(str(tmp_path / 'history.db'), max_entries=3)
+        for i in range(5):
+            store.record_async(_request(), _response(query=f"q{i}"))
+
+        assert store.flush()
+        assert store.count() == 5
+        assert store.prune() == 2
+        entries, _ = store.query()
+        assert [entry['query'] for entry in entries] == ['q4', 'q3', 'q2']
+
+    def test_legacy_json_migrated_once(self, tmp_path):
+        """Test the old search_history.json is imported into an empty store and renamed"""
+        legacy_file = tmp_path / 'search_history.json'
+        legacy_file.write_text(json.dumps([
+            {'timestamp': '2026-01-02T00:00:00+00:00', 'request': _request(), 'response': _response(query='new')},
+            {'timestamp': '2026-01-01T00:00:00+00:00', 'request': _request(), 'response': _response(query='old')}
+        ], ensure_ascii=False), encoding='utf-8')
+
+        store = SearchHistoryStore(str(tmp_path / 'history.db'), retention_days=0,
+                                   legacy_files=[str(legacy_file)])
+
+        entries, total = store.query()
+        assert total == 2
+        assert [entry['query'] for entry in entries] == ['new', 'old']
+        assert not legacy_file.exists()
+        assert (tmp_path / 'search_history.json.migrated').exists()
@@ -0,0 +1,110 @@
+"""
+Unit tests for the request-scoped SearchLogCollector
+"""
+
+import contextvars
+import threading
+
+import pytest
+
+from core.search_log_collector import SearchLogCollector
+from utils.request_context import get_search_id
+
+
+@pytest.fixture
+def collector(tmp_path):
+    return SearchLogCollector(recent_size=2, spool_dir=str(tmp_path / 'search_logs'))
+
+
+def _run_search(collector, subject, barrier, finished):
+    search_id = collector.start_search('ID', 'Kelas 5', subject)
+    barrier.wait()
+    for i in range(20):
+        collector.record_llm_call('model', subject, 'test', 'prompt', 'input', 'output', 0.01)
+        collector.record_search_result('google', subject, f'https://a.id/{subject}/{i}', subject, '', 8.0, '', '视频')
+    finished[subject] = collector.finish_search(total_time=1.0, search_time=0.7, scoring_time=0.3)
+    assert finished[subject].search_id == search_id
+
+
+class TestSearchLogCollector:
+    """Test suite for per-request log isolation, the ring buffer and the disk spool"""
+
+    def test_concurrent_searches_are_isolated(self, tmp_path):
+        """Test concurrent searches record into their own logs through the context search_id"""
+        collector = SearchLogCollector(recent_size=10, spool_dir=str(tmp_path))
+        subjects = [f'subject{i}' for i in range(6)]
+        barrier, finished = threading.Barrier(len(subjects)), {}
+        threads = [
+            threading.Thread(target=contextvars.copy_context().run, args=(_run_search, collector, s, barrier, finished))
+            for s in subjects
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len({log.search_id for log in finished.values()}) == len(subjects)
+        for subject, log in finished.items():
+            assert log.subject == subject
+            assert {call.function for call in log.llm_calls} == {subject}
+            assert log.total_results == 20 and log.video_count == 20
+        assert collector.get_stats()["active"] == 0
+
+    def test_explicit_search_id_and_context_cleanup(self, collector):
+        """Test explicit IDs route records, extra finish kwargs land in metadata and the context is cleared"""
+        first = collector.start_search('ID', '5', 'Matematika')
+        second = collector.start_search('CN', '3', '数学')
+
+        collector.record_search_engine_call('google', 'q', 3, 0.5, search_id=first)
+        log = collector.finish_search(total_time=2.0, search_id=first, result_count=3)
+
+        assert log.search_id == first and len(log.search_engine_calls) == 1
+        assert log.metadata == {'result_count': 3}
+        assert get_search_id() == second
+        collector.finish_search(total_time=1.0)
+        assert get_search_id() == ''
+
+    def test_ring_buffer_bounded_and_spool_readback(self, collector):
+        """Test only recent logs stay in memory while evicted logs are read back from the spool by ID"""
+        ids = []
+        for subject in ('a', 'b', 'c'):
+            ids.append(collector.start_search('ID', '5', subject))
+            collector.record_search_result('google', 'q', 'https://a.id', 'Judul', '', 7.5, 'alasan', '播放列表')
+            collector.finish_search(total_time=1.0)
+        assert collector.flush()
+
+        assert [log.search_id for log in collector.get_recent_logs(10)] == ids[1:]
+        restored = collector.get_log_by_id(ids[0])
+        assert restored.subject == 'a'
+        assert restored.search_results[0].score == 7.5 and restored.playlist_count == 1
+        assert (collector.spool_dir / f"{ids[0]}.json.gz").exists()
+
+    def test_invalid_or_unknown_ids(self, collector):
+        """Test path-like or unknown IDs are rejected and records without a search are dropped"""
+        assert collector.get_log_by_id('../../etc/passwd') is None
+        assert collector.get_log_by_id('search_19990101_000000_deadbeef') is None
+
+        collector.record_llm_call('model', 'f', 'p', 'prompt', 'in', 'out', 0.1)
+        assert collector.current_log is None
+        assert collector.get_stats()["dropped_records"] == 1
+
+    def test_unbound_thread_records_are_not_guessed(self, collector):
+        """Test a thread without a bound search_id does not write into the only active search"""
+        search_id = collector.start_search('ID', '5', 'Matematika')
+        thread = threading.Thread(target=lambda: collector.record_llm_call('model', 'f', 'p', 'prompt', 'in', 'out', 0.1))
+        thread.start()
+        thread.join()
+
+        log = collector.finish_search(total_time=1.0, search_id=search_id)
+        assert log.llm_calls == []
+        assert collector.get_stats()["dropped_records"] == 1
+
+    def test_stale_searches_are_abandoned(self, tmp_path):
+        """Test searches that never finish are reclaimed and marked abandoned"""
+        collector = SearchLogCollector(spool_dir=str(tmp_path), max_active_seconds=0.01)
+        stale = collector.start_search('ID', '5', 'a')
+        threading.Event().wait(0.05)
+        collector.start_search('ID', '5', 'b')
+
+        assert collector.get_log_by_id(stale).metadata['status'] == 'abandoned'
+        assert collector.get_stats()["abandoned"] == 1
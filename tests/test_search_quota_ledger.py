@@ -0,0 +1,108 @@
+"""
+Unit tests for SearchQuotaLedger and quota-aware engine selection
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import core.search_quota_ledger as search_quota_ledger
+from core.search_quota_ledger import SearchQuotaLedger
+from core.search_strategies import SearchOrchestrator
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'quota.db')
+
+
+def _client(calls):
+    """只配置 Google 和 Metaso 的最小客户端"""
+    def engine(name):
+        def search(query, max_results, *args, **kwargs):
+            calls.append((name, kwargs.get('reason')))
+            return [{'title': name}]
+        return search
+
+    return SimpleNamespace(
+        google_hunter=object(), metaso_client=SimpleNamespace(usage_count=0), baidu_hunter=None,
+        google_usage=0, tavily_usage=0, baidu_usage=0,
+        _search_with_google=engine('google'),
+        _search_with_metaso=engine('metaso'),
+        _search_with_tavily=engine('tavily'),
+    )
+
+
+class TestSearchQuotaLedger:
+    """Test suite for the cross-process search quota ledger"""
+
+    def test_limit_shared_across_instances(self, db_path):
+        """Test ledgers on one database (separate workers) share one daily quota"""
+        engines = {'baidu': {'daily_limit': 3, 'rate_per_second': None}}
+        worker_a = SearchQuotaLedger(db_path, engines=engines)
+        worker_b = SearchQuotaLedger(db_path, engines=engines)
+
+        outcomes = [worker_a.try_acquire('baidu'), worker_b.try_acquire('baidu'),
+                    worker_a.try_acquire('baidu'), worker_b.try_acquire('baidu')]
+
+        assert outcomes == [True, True, True, False]
+        assert worker_a.remaining('baidu') == 0
+        assert worker_b.get_usage('baidu')['day'] == 3
+
+    def test_concurrent_acquires_never_overspend(self, db_path):
+        """Test concurrent acquisitions grant exactly the remaining quota"""
+        engines = {'tavily': {'monthly_limit': 10}}
+        granted = []
+
+        def worker():
+            ledger = SearchQuotaLedger(db_path, engines=engines)
+            for _ in range(5):
+                granted.append(ledger.try_acquire('tavily'))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert granted.count(True) == 10
+        assert SearchQuotaLedger(db_path, engines=engines).get_usage('tavily')['month'] == 10
+
+    def test_rate_tokens_refill(self, db_path, monkeypatch):
+        """Test the token bucket denies bursts beyond capacity and refills over time"""
+        now = [1000.0]
+        monkeypatch.setattr(search_quota_ledger.time, 'time', lambda: now[0])
+        ledger = SearchQuotaLedger(db_path, engines={'google': {'rate_per_second': 1.0, 'burst': 2}})
+
+        assert [ledger.try_acquire('google') for _ in range(3)] == [True, True, False]
+        assert ledger.get_stats()['rate_limited'] == 1
+
+        now[0] += 1.0
+        assert ledger.try_acquire('google') is True
+
+    def test_orchestrator_skips_exhausted_engine(self, db_path):
+        """Test an engine exhausted by other workers is skipped in favour of the next strategy"""
+        engines = {'google': {'daily_limit': 1, 'rate_per_second': None}}
+        SearchQuotaLedger(db_path, engines=engines).try_acquire('google')
+        ledger = SearchQuotaLedger(db_path, engines=engines)
+        calls = []
+
+        results = SearchOrchestrator(quota_ledger=ledger).search(_client(calls), "fractions for grade 4")
+
+        assert results == [{'title': 'metaso'}]
+        assert calls[0][0] == 'metaso'
+        assert '5,000' in calls[0][1]
+        assert ledger.get_usage('metaso')['month'] == 1
+
+    def test_paid_fallback_is_recorded_not_blocked(self, db_path):
+        """Test the Tavily fallback still runs after its free tier is spent"""
+        ledger = SearchQuotaLedger(db_path, engines={'tavily': {'monthly_limit': 0}})
+        client = _client([])
+        client.google_hunter = None
+        client.metaso_client = None
+
+        results = SearchOrchestrator(quota_ledger=ledger).search(client, "pecahan kelas 4")
+
+        assert results == [{'title': 'tavily'}]
+        assert ledger.get_usage('tavily')['month'] == 1
@@ -0,0 +1,127 @@
+"""
+Unit tests for the prefix-indexed search suggestions
+"""
+
+import time
+
+import pytest
+
+from core.search_history_store import SearchHistoryStore
+from core.search_suggestions import SearchSuggestions, SuggestionIndex, normalize_suggestion_text
+
+
+def _record(store, country, grade, subject, timestamp=None):
+    request = {'country': country, 'grade': grade, 'semester': None, 'subject': subject, 'language': None}
+    response = {'success': True, 'query': f"{grade} {subject}", 'total_count': 0,
+                'playlist_count': 0, 'video_count': 0}
+    store.record(request, response, timestamp)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SearchHistoryStore(str(tmp_path / 'history.db'))
+
+
+class TestSuggestionIndex:
+    """Test suite for the top-k prefix trie"""
+
+    def test_word_prefix_matching_ranked_by_frequency_then_recency(self):
+        """Test any word start matches and ties on count are broken by the most recent search"""
+        index = SuggestionIndex(top_k=5)
+        index.add('Indonesia', 'Kelas 10 Matematika', count=3, timestamp=1.0)
+        index.add('Indonesia', 'Kelas 11 Matematika', count=1, timestamp=5.0)
+        index.add('Indonesia', 'Kelas 12 Matematika', count=1, timestamp=9.0)
+        index.add('Indonesia', 'Kelas 10 Fisika', count=2, timestamp=2.0)
+
+        assert [m['text'] for m in index.search('mat', 'Indonesia')] == [
+            'Kelas 10 Matematika', 'Kelas 12 Matematika', 'Kelas 11 Matematika']
+        assert [m['text'] for m in index.search('KELAS 10', limit=2)] == ['Kelas 10 Matematika', 'Kelas 10 Fisika']
+        assert index.search('atematika') == []
+        assert index.search('mat', 'China') == []
+
+    def test_incremental_updates_keep_exact_top_k(self):
+        """Test a key outside a node's top-k is promoted once its count overtakes the minimum"""
+        index = SuggestionIndex(top_k=2)
+        for text, count in (('Grade 1 Math', 5), ('Grade 2 Math', 4), ('Grade 3 Math', 1)):
+            index.add('Philippines', text, count=count, timestamp=0.0)
+        for _ in range(4):
+            index.add('Philippines', 'Grade 3 Math', timestamp=0.0)
+
+        assert [(m['text'], m['count']) for m in index.search('grade')] == [('Grade 1 Math', 5), ('Grade 3 Math', 5)]
+
+    def test_multiple_scripts(self):
+        """Test CJK matches from any character and Arabic matches after normalization and the article"""
+        index = SuggestionIndex()
+        index.add('China', '高中一 数学')
+        index.add('Iraq', 'الصف الأول رياضيات')
+        index.add('Iraq', 'الصف الثاني الرياضيات')
+
+        assert [m['text'] for m in index.search('数')] == ['高中一 数学']
+        assert [m['text'] for m in index.search('中一')] == ['高中一 数学']
+        assert {m['text'] for m in index.search('رياضيات')} == {'الصف الأول رياضيات', 'الصف الثاني الرياضيات'}
+        assert [m['text'] for m in index.search('الصف الاول')] == ['الصف الأول رياضيات']
+        assert normalize_suggestion_text('  ＭＡＴ\tｈ ') == 'mat h'
+
+
+class TestSearchSuggestions:
+    """Test suite for SearchSuggestions backed by SearchHistoryStore"""
+
+    def test_history_before_predefined_and_incremental_refresh(self, store):
+        """Test history matches rank first and new history rows are indexed without a rebuild"""
+        _record(store, 'Indonesia', 'Kelas 9', 'Matematika')
+        suggestions = SearchSuggestions(history_store=store, refresh_interval=0)
+
+        results = suggestions.get_suggestions('mat', country='Indonesia', limit=3)
+        assert [(r['text'], r['type']) for r in results] == [
+            ('Kelas 9 Matematika', 'history'), ('Kelas 10 Matematika', 'popular')]
+
+        _record(store, 'Indonesia', 'Kelas 7', 'Matematika')
+        _record(store, 'Indonesia', 'Kelas 7', 'Matematika')
+        suggestions._load_history()
+        suggestions._load_history()
+
+        assert suggestions.get_suggestions('kelas 7', country='Indonesia')[0]['count'] == 2
+        assert len(suggestions.search_history) == 3
+
+    def test_incremental_refresh_pages_past_history_limit(self, store):
+        """Test more new rows than history_limit in one interval are all indexed"""
+        suggestions = SearchSuggestions(history_store=store, history_limit=2, refresh_interval=0)
+        for grade in range(1, 6):
+            _record(store, 'Indonesia', f'Kelas {grade}', 'Fisika')
+        _record(store, 'Indonesia', 'Kelas 6', 'Kimia')
+
+        suggestions._load_history()
+        for grade in range(1, 6):
+            _record(store, 'Indonesia', f'Kelas {grade}', 'Biologi')
+        suggestions._load_history()
+
+        history = [r for r in suggestions.get_suggestions('kelas', country='Indonesia', limit=20) if r['type'] == 'history']
+        assert len(history) == 11
+
+    def test_background_refresh_and_trending(self, store):
+        """Test new history is picked up by the background thread without a request triggering it"""
+        suggestions = SearchSuggestions(history_store=store, refresh_interval=0.05)
+        try:
+            _record(store, 'Philippines', 'Grade 7', 'Science')
+            deadline = time.monotonic() + 2.0
+            while not suggestions.search_history and time.monotonic() < deadline:
+                time.sleep(0.02)
+
+            assert suggestions.get_suggestions('science', country='Philippines')[0]['type'] == 'history'
+            assert suggestions.get_trending_searches(country='Philippines')[0]['text'] == 'Grade 7 Science'
+        finally:
+            suggestions.stop_refresh()
+
+    def test_lookup_independent_of_history_size(self, store):
+        """Test lookups stay well under a millisecond with a large history"""
+        suggestions = SearchSuggestions(history_store=store, refresh_interval=0)
+        for i in range(5000):
+            suggestions.history_index.add('Indonesia', f"Kelas {i % 12 + 1} Pelajaran {i}", timestamp=float(i))
+
+        start = time.perf_counter()
+        for _ in range(200):
+            results = suggestions.get_suggestions('kelas 1', country='Indonesia', limit=10)
+        elapsed = (time.perf_counter() - start) / 200
+
+        assert len(results) == 10
+        assert elapsed < 0.001
@@ -0,0 +1,110 @@
+"""
+Unit tests for SegmentStore
+"""
+
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import core.segment_store as segment_store
+from core.segment_store import SegmentStore
+
+
+class TestSegmentStore:
+    """Test suite for SegmentStore"""
+
+    def test_put_get_and_overwrite(self, tmp_path):
+        """Test the latest record for a key wins"""
+        store = SegmentStore(str(tmp_path))
+        store.put("k", b"v1")
+        store.put("k", b"v2")
+
+        assert store.get("k") == b"v2"
+        assert store.get("missing") is None
+        assert len(store) == 1
+
+    def test_expired_entries_hidden_and_cleaned(self, tmp_path):
+        """Test expired entries are not returned and cleanup removes them"""
+        store = SegmentStore(str(tmp_path))
+        store.put("short", b"x", ttl=0.01)
+        store.put("long", b"y", ttl=3600)
+        time.sleep(0.05)
+
+        assert store.get("short") is None
+        assert store.expired_count() == 1
+        assert store.cleanup_expired() == 1
+        assert len(store) == 1
+        assert store.get("long") == b"y"
+
+    def test_segments_roll_over_and_compact(self, tmp_path):
+        """Test writes roll to new segments and compaction keeps only live records"""
+        store = SegmentStore(str(tmp_path), segment_max_bytes=256,
+                             compact_min_dead_bytes=10 ** 9)
+        for i in range(20):
+            store.put(f"k{i % 5}", f"value-{i}".encode() * 4)
+
+        assert store.get_stats()['segments'] > 1
+        assert store.get_stats()['dead_bytes'] > 0
+
+        store.compact()
+
+        stats = store.get_stats()
+        assert stats['dead_bytes'] == 0
+        assert stats['entries'] == 5
+        assert store.get("k4") == b"value-19" * 4
+
+    def test_auto_compaction_runs_off_the_write_path(self, tmp_path, monkeypatch):
+        """Test crossing the dead-bytes threshold schedules one background compaction instead of compacting in put()"""
+        scheduled = []
+        monkeypatch.setattr(segment_store, 'get_executor',
+                            lambda name: SimpleNamespace(submit=lambda fn: scheduled.append(fn)))
+        store = SegmentStore(str(tmp_path), compact_min_dead_bytes=1, compact_dead_ratio=0.1)
+        for i in range(10):
+            store.put("k", f"value-{i}".encode())
+
+        assert len(scheduled) == 1
+        assert store.get_stats()['compactions'] == 0
+
+        scheduled[0]()
+
+        stats = store.get_stats()
+        assert stats['compactions'] == 1
+        assert stats['dead_bytes'] == 0
+        assert store.get("k") == b"value-9"
+        store.put("k", b"again")
+        assert len(scheduled) == 2
+
+    def test_delete_writes_tombstone(self, tmp_path):
+        """Test deleted keys stay deleted after reopening"""
+        store = SegmentStore(str(tmp_path))
+        store.put("k", b"v")
+        assert store.delete("k") is True
+        assert store.delete("k") is False
+
+        reopened = SegmentStore(str(tmp_path))
+        assert reopened.get("k") is None
+
+    def test_other_instance_sees_writes(self, tmp_path):
+        """Test a second instance (e.g. another worker) picks up appends and compaction"""
+        writer = SegmentStore(str(tmp_path))
+        reader = SegmentStore(str(tmp_path))
+
+        writer.put("k", b"v1")
+        assert reader.get("k") == b"v1"
+
+        writer.put("k", b"v2")
+        writer.compact()
+        assert reader.get("k") == b"v2"
+
+    def test_index_rebuilt_from_segments(self, tmp_path):
+        """Test a missing index is rebuilt by scanning record headers"""
+        store = SegmentStore(str(tmp_path))
+        store.put("a", json.dumps({"title": "数学"}).encode('utf-8'))
+        store.put("b", b"2")
+        store.close()
+        os.remove(tmp_path / 'index.idx')
+
+        rebuilt = SegmentStore(str(tmp_path))
+        assert json.loads(rebuilt.get("a")) == {"title": "数学"}
+        assert rebuilt.get("b") == b"2"
@@ -0,0 +1,109 @@
+"""
+Unit tests for SingleFlight / AsyncSingleFlight
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.single_flight import SingleFlight, AsyncSingleFlight
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight"""
+
+    def test_concurrent_identical_calls_execute_once(self):
+        """Test concurrent callers with the same key share one execution"""
+        flight = SingleFlight('test')
+        executions = []
+        release = threading.Event()
+
+        def slow_search():
+            executions.append(1)
+            release.wait(2)
+            return ['result']
+
+        outcomes = []
+
+        def caller():
+            outcomes.append(flight.do('same-key', slow_search))
+
+        threads = [threading.Thread(target=caller) for _ in range(5)]
+        for t in threads:
+            t.start()
+        # 等待所有跟随者进入等待状态
+        deadline = time.time() + 2
+        while flight.get_stats()['calls'] < 5 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for t in threads:
+            t.join()
+
+        assert len(executions) == 1
+        assert [result for result, _ in outcomes] == [['result']] * 5
+        assert sum(1 for _, shared in outcomes if shared) == 4
+        assert flight.get_stats()['in_flight'] == 0
+
+    def test_different_keys_execute_separately(self):
+        """Test calls with different keys are not merged"""
+        flight = SingleFlight('test')
+
+        assert flight.do('a', lambda: 1) == (1, False)
+        assert flight.do('b', lambda: 2) == (2, False)
+        assert flight.get_stats()['executions'] == 2
+
+    def test_error_propagates_and_key_is_released(self):
+        """Test leader errors are raised and the key can be retried"""
+        flight = SingleFlight('test')
+
+        def boom():
+            raise ValueError("upstream failed")
+
+        with pytest.raises(ValueError):
+            flight.do('key', boom)
+
+        assert flight.do('key', lambda: 'ok') == ('ok', False)
+
+
+class TestAsyncSingleFlight:
+    """Test suite for AsyncSingleFlight"""
+
+    def test_concurrent_identical_coroutines_execute_once(self):
+        """Test concurrent coroutines with the same key share one execution"""
+        flight = AsyncSingleFlight('test')
+        executions = []
+
+        async def slow_search():
+            executions.append(1)
+            await asyncio.sleep(0.05)
+            return ['result']
+
+        async def main():
+            return await asyncio.gather(*[flight.do('key', slow_search) for _ in range(3)])
+
+        outcomes = asyncio.run(main())
+
+        assert len(executions) == 1
+        assert [result for result, _ in outcomes] == [['result']] * 3
+        assert [shared for _, shared in outcomes].count(True) == 2
+
+    def test_leader_cancellation_fails_followers(self):
+        """Test followers get an error instead of hanging when the leader is cancelled"""
+        flight = AsyncSingleFlight('test')
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        async def main():
+            leader = asyncio.ensure_future(flight.do('key', hang))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do('key', hang))
+            await asyncio.sleep(0)
+            leader.cancel()
+            with pytest.raises(RuntimeError):
+                await follower
+
+        asyncio.run(main())
+        assert flight.get_stats()['in_flight'] == 0
@@ -0,0 +1,100 @@
+"""
+Unit tests for StagedPipeline
+"""
+
+import threading
+import time
+
+from core.stage_pipeline import PipelineStage, StagedPipeline
+
+
+class TestStagedPipeline:
+    """Test suite for the bounded multi-stage pipeline"""
+
+    def test_results_keep_input_order(self):
+        """Test items come back in input order with every stage applied"""
+        def double(item):
+            time.sleep(0.01 * (5 - item.data))
+            item.data *= 2
+
+        def finish(item):
+            item.result = item.data + 1
+
+        pipeline = StagedPipeline([PipelineStage('double', double, workers=3), PipelineStage('finish', finish)])
+        items = pipeline.run([1, 2, 3, 4])
+
+        assert [item.result for item in items] == [3, 5, 7, 9]
+        assert pipeline.get_progress()["stages"] == {'double': 4, 'finish': 4}
+
+    def test_stages_overlap(self):
+        """Test the next item is downloaded while the previous one is being evaluated"""
+        events = []
+        lock = threading.Lock()
+
+        def download(item):
+            with lock:
+                events.append(('download', item.data, time.monotonic()))
+            time.sleep(0.02)
+
+        def evaluate(item):
+            with lock:
+                events.append(('evaluate-start', item.data, time.monotonic()))
+            time.sleep(0.1)
+            item.result = item.data
+
+        pipeline = StagedPipeline([PipelineStage('download', download), PipelineStage('evaluate', evaluate)])
+        pipeline.run([0, 1, 2])
+
+        evaluate_0 = next(t for name, i, t in events if name == 'evaluate-start' and i == 0)
+        download_1 = next(t for name, i, t in events if name == 'download' and i == 1)
+        # 视频1的下载不等待视频0的评估完成
+        assert download_1 < evaluate_0 + 0.1
+
+    def test_stage_concurrency_is_bounded(self):
+        """Test no stage runs more items at once than its worker count"""
+        active = {'value': 0, 'max': 0}
+        lock = threading.Lock()
+
+        def cpu(item):
+            with lock:
+                active['value'] += 1
+                active['max'] = max(active['max'], active['value'])
+            time.sleep(0.01)
+            with lock:
+                active['value'] -= 1
+
+        pipeline = StagedPipeline([
+            PipelineStage('download', lambda item: None, workers=4),
+            PipelineStage('cpu', cpu, workers=2),
+        ])
+        pipeline.run(list(range(10)))
+
+        assert active['max'] <= 2
+
+    def test_errors_and_early_results_skip_later_stages(self):
+        """Test a failing or finished item stops there while the others continue"""
+        seen = []
+
+        def prepare(item):
+            if item.data == 'bad':
+                raise RuntimeError('download failed')
+            if item.data == 'skip':
+                item.result = 'skipped'
+
+        def evaluate(item):
+            seen.append(item.data)
+            item.result = 'ok'
+
+        progress = []
+        pipeline = StagedPipeline(
+            [PipelineStage('prepare', prepare, workers=2), PipelineStage('evaluate', evaluate)],
+            on_progress=progress.append
+        )
+        items = pipeline.run(['good', 'bad', 'skip'])
+
+        assert [item.result for item in items] == ['ok', None, 'skipped']
+        assert isinstance(items[1].error, RuntimeError)
+        assert items[1].stage == 'prepare'
+        assert seen == ['good']
+        assert progress[-1]["completed"] == 3
+        assert progress[-1]["failed"] == 1
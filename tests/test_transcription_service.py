@@ -0,0 +1,157 @@
+"""
+Unit tests for TranscriptionService
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import core.transcription_service as transcription_service
+from core.transcription_service import TranscriptionService, WhisperModelPool
+
+
+class _FakeModel:
+    """假Whisper模型：记录并发转录数"""
+
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def transcribe(self, audio_path, **options):
+        if isinstance(audio_path, SimpleNamespace):
+            # 分段转录：每个窗口返回固定长度文本（静音窗口没有文本）
+            if getattr(audio_path, 'silent', False):
+                return {"text": "", "language": "en"}
+            return {"text": f"[{int(audio_path.start)}]" + "x" * 100, "language": "en"}
+        with _FakeModel.lock:
+            _FakeModel.active += 1
+            _FakeModel.max_active = max(_FakeModel.max_active, _FakeModel.active)
+        time.sleep(0.02)
+        with _FakeModel.lock:
+            _FakeModel.active -= 1
+        return {"text": f"text of {audio_path}", "language": options.get("language") or "en"}
+
+
+@pytest.fixture
+def fake_whisper(monkeypatch):
+    """替换whisper模块，统计模型加载次数"""
+    loads = []
+    _FakeModel.active = _FakeModel.max_active = 0
+
+    def load_model(size):
+        loads.append(size)
+        return _FakeModel()
+
+    monkeypatch.setattr(transcription_service, 'whisper', SimpleNamespace(load_model=load_model))
+    monkeypatch.setattr(transcription_service, 'HAS_WHISPER', True)
+    return loads
+
+
+class TestTranscriptionService:
+    """Test suite for the resident Whisper model pool"""
+
+    def test_model_loaded_once_across_calls(self, fake_whisper):
+        """Test repeated transcriptions reuse the resident model"""
+        service = TranscriptionService(model_size="tiny", pool_size=1)
+
+        for i in range(3):
+            assert service.transcribe(f"a{i}.mp3")["text"] == f"text of a{i}.mp3"
+
+        assert fake_whisper == ["tiny"]
+        assert service.get_stats()["completed"] == 3
+        service.shutdown()
+
+    def test_concurrency_bounded_by_pool_size(self, fake_whisper):
+        """Test concurrent submissions never run more than pool_size transcriptions"""
+        service = TranscriptionService(model_size="base", pool_size=2)
+
+        futures = [service.submit(f"a{i}.mp3") for i in range(6)]
+        [future.result(timeout=5) for future in futures]
+
+        assert _FakeModel.max_active <= 2
+        assert len(fake_whisper) <= 2
+        service.shutdown()
+
+    def test_options_override_defaults(self, fake_whisper):
+        """Test per-call options are merged over the configured defaults"""
+        service = TranscriptionService(default_options={"language": "id"})
+
+        assert service.transcribe("a.mp3")["language"] == "id"
+        assert service.transcribe("a.mp3", language="zh")["language"] == "zh"
+        service.shutdown()
+
+    def test_acquire_times_out_when_pool_busy(self, fake_whisper):
+        """Test waiting for a model respects the timeout"""
+        pool = WhisperModelPool(pool_size=1)
+
+        with pool.acquire():
+            with pytest.raises(TimeoutError):
+                with pool.acquire(timeout=0.01):
+                    pass
+        assert pool.get_stats()["waits"] == 1
+
+
+class TestChunkedTranscription:
+    """Test suite for windowed transcription"""
+
+    @pytest.fixture
+    def windows(self, fake_whisper, monkeypatch):
+        """10分钟音频，按窗口解码时记录起始时间"""
+        decoded = []
+
+        def load_clip(audio_path, start, duration):
+            decoded.append(start)
+            return SimpleNamespace(size=1, start=start)
+
+        monkeypatch.setattr(transcription_service, 'probe_audio_duration', lambda path: 600.0)
+        monkeypatch.setattr(transcription_service, 'load_audio_clip', load_clip)
+        return decoded
+
+    def test_prefix_stops_once_enough_text(self, windows):
+        """Test prefix mode stops transcribing after max_chars and keeps window order"""
+        service = TranscriptionService(pool_size=2)
+
+        result = service.transcribe_chunked("a.mp3", window_seconds=60, max_chars=250)
+
+        assert result["truncated"] is True
+        assert result["windows"] == 4
+        assert result["total_windows"] == 10
+        assert sorted(windows) == [0, 60, 120, 180]
+        assert result["text"].startswith("[0]")
+        assert result["text"].index("[60]") < result["text"].index("[120]")
+        service.shutdown()
+
+    def test_sample_spreads_windows_over_timeline(self, windows):
+        """Test sample mode transcribes windows spread across the whole audio"""
+        service = TranscriptionService(pool_size=2)
+
+        result = service.transcribe_chunked("a.mp3", window_seconds=60, strategy="sample", sample_windows=5)
+
+        assert sorted(windows) == [0, 120, 240, 360, 480]
+        assert result["windows"] == 5
+        assert result["truncated"] is True
+        service.shutdown()
+
+    def test_unknown_duration_continues_past_silent_windows(self, fake_whisper, monkeypatch):
+        """Test an empty full-length window does not end the audio; only a short (EOF) window does"""
+        decoded = []
+
+        def load_clip(audio_path, start, duration):
+            decoded.append(start)
+            # 共 4.5 个窗口；第2个窗口是静音（如音乐间奏）
+            seconds = max(0.0, min(duration, 270 - start))
+            return SimpleNamespace(size=int(seconds * transcription_service.SAMPLE_RATE), start=start,
+                                   silent=start == 60)
+
+        monkeypatch.setattr(transcription_service, 'probe_audio_duration', lambda path: None)
+        monkeypatch.setattr(transcription_service, 'load_audio_clip', load_clip)
+        service = TranscriptionService(pool_size=1, window_concurrency=2)
+
+        result = service.transcribe_chunked("a.mp3", window_seconds=60, max_chars=0)
+
+        assert sorted(decoded) == [0, 60, 120, 180, 240, 300]
+        assert "[240]" in result["text"]
+        assert result["total_windows"] is None and result["truncated"] is False
+        service.shutdown()
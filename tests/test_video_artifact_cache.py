@@ -0,0 +1,113 @@
+"""
+Unit tests for VideoArtifactCache
+"""
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from core.video_artifact_cache import VideoArtifactCache, extract_video_id
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """创建临时目录中的产物缓存"""
+    return VideoArtifactCache(cache_dir=str(tmp_path / 'artifacts'), max_bytes=10 * 1024)
+
+
+def _process(cache, key, size=100, video_size=0):
+    """模拟一次视频处理：在工作目录中生成音频、关键帧（和完整视频）"""
+    work_dir = cache.create_work_dir(key)
+    audio = work_dir / 'lesson.mp3'
+    audio.write_bytes(b'a' * size)
+    frames = []
+    for i in range(2):
+        frame = work_dir / f'lesson_frame_{i + 1:02d}.jpg'
+        frame.write_bytes(b'f' * size)
+        frames.append(str(frame))
+    if video_size:
+        (work_dir / 'lesson.mp4').write_bytes(b'v' * video_size)
+    return {
+        "success": True,
+        "metadata": {"title": "Lesson"},
+        "audio_path": str(audio),
+        "frames_paths": frames,
+        "video_path": str(work_dir / 'lesson.mp4'),
+        "transcript": "hello class",
+        "transcript_source": "subtitle",
+        "transcript_language": "en",
+        "artifact_dir": str(work_dir),
+    }
+
+
+class TestVideoArtifactCache:
+    """Test suite for the processed-video artifact cache"""
+
+    def test_video_id_shared_across_url_forms(self):
+        """Test different URL forms of the same video map to one ID"""
+        expected = "youtube:dQw4w9WgXcQ"
+        assert extract_video_id("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42s") == expected
+        assert extract_video_id("https://youtu.be/dQw4w9WgXcQ?si=abc") == expected
+        assert extract_video_id("https://www.youtube.com/shorts/dQw4w9WgXcQ") == expected
+
+    def test_store_then_lookup_skips_processing(self, cache):
+        """Test stored artifacts are returned on the next lookup and the work dir is cleaned up"""
+        key = cache.make_key("https://youtu.be/dQw4w9WgXcQ", "480p", 6, ['en'])
+        assert cache.lookup(key) is None
+
+        processed = _process(cache, key, video_size=500)
+        stored = cache.store(key, processed)
+        cache.release(stored)
+
+        assert not os.path.exists(processed["artifact_dir"])
+
+        hit = cache.lookup(key)
+        assert hit["cache_hit"] is True
+        assert hit["transcript"] == "hello class"
+        assert hit["video_path"] is None
+        assert len(hit["frames_paths"]) == 2
+        assert all(os.path.exists(p) for p in hit["frames_paths"] + [hit["audio_path"]])
+        cache.release(hit)
+
+    def test_keys_include_processing_params(self, cache):
+        """Test different processing parameters do not share entries"""
+        url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+        assert cache.make_key(url, "480p", 6, ['en']) != cache.make_key(url, "480p", 4, ['en'])
+        assert cache.make_key(url, "480p", 6, ['en']) != cache.make_key(url, "480p", 6, ['id'])
+        assert cache.make_key(url, "480p", 6, ['en']) != cache.make_key(url, "480p", 6, ['en'], extract_transcript=False)
+        assert cache.make_key(url, "480p", 6, ['en'], audio_seconds=600) != cache.make_key(url, "480p", 6, ['en'])
+        assert cache.make_key(url, "480p", 6, ['en'], chunk_strategy='sample') != cache.make_key(url, "480p", 6, ['en'])
+
+    def test_lru_eviction_respects_references(self, cache):
+        """Test the least recently used entry is evicted, deferred until its last reference is released"""
+        keys = [f"k{i}" for i in range(3)]
+        results = {}
+        for i, key in enumerate(keys):
+            results[key] = cache.store(key, _process(cache, key, size=1000))
+            cache.release(results[key])
+            entry_manifest = Path(results[key]["artifact_dir"]) / 'manifest.json'
+            os.utime(entry_manifest, (time.time() - 100 + i, time.time() - 100 + i))
+
+        # k0 最久未访问，但正在使用
+        in_use = cache.lookup("k0")
+        os.utime(Path(in_use["artifact_dir"]) / 'manifest.json', (time.time() - 200, time.time() - 200))
+
+        cache.release(cache.store("k3", _process(cache, "k3", size=1000)))
+
+        assert os.path.exists(in_use["audio_path"])
+        assert cache.stats["evictions"] == 1
+
+        cache.release(in_use)
+        assert not os.path.exists(in_use["artifact_dir"])
+        assert cache.lookup("k1") is not None
+
+    def test_failed_release_removes_work_dir(self, cache):
+        """Test releasing an unpublished work dir deletes it"""
+        work_dir = cache.create_work_dir("k")
+        (work_dir / 'partial.mp4').write_bytes(b'v')
+
+        cache.release({"artifact_dir": str(work_dir)})
+
+        assert not work_dir.exists()
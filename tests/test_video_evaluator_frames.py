@@ -0,0 +1,71 @@
+"""
+Unit tests for VideoEvaluator key frame selection
+"""
+
+from unittest.mock import Mock
+
+import pytest
+from PIL import Image, ImageDraw
+
+import core.video_evaluator as video_evaluator
+from core.video_evaluator import VideoEvaluator
+from core.vision_image_prep import VisionImagePreparer
+
+
+def _slide(path, text_offset=0, noise=False):
+    """生成一张模拟PPT的关键帧"""
+    image = Image.new('RGB', (1280, 720), 'white')
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([100 + text_offset, 100, 600 + text_offset, 250], fill=(20, 60, 160))
+    draw.ellipse([800, 350, 1100, 650], fill=(200, 40, 40))
+    if noise:
+        image.putpixel((5, 5), (0, 0, 0))
+    image.save(path, format='PNG')
+    return str(path)
+
+
+@pytest.fixture
+def evaluator(monkeypatch):
+    """不初始化API客户端的评估器，视觉API返回固定评分"""
+    monkeypatch.setattr(video_evaluator, 'get_vision_image_preparer', lambda: VisionImagePreparer())
+    instance = VideoEvaluator.__new__(VideoEvaluator)
+    instance.log_collector = None
+    instance.vision_client = Mock(analyze_images=Mock(
+        return_value={'success': True, 'response': '{"score": 8, "details": "clear slides"}'}
+    ))
+    return instance
+
+
+def _set_dedup(evaluator, enabled):
+    evaluator.config = Mock(get_video_config=Mock(
+        return_value={'vision': {'image_prep': {'dedup_frames': enabled}}}
+    ))
+
+
+class TestAnalyzeFrameDesign:
+    """Test suite for VideoEvaluator._analyze_frame_design"""
+
+    def test_near_identical_frames_dropped_before_prompt(self, evaluator, tmp_path):
+        """Test near-identical frames are not sent and the prompt counts only the kept frames"""
+        _set_dedup(evaluator, True)
+        first = _slide(tmp_path / 'a.png')
+        same = _slide(tmp_path / 'b.png', noise=True)
+        other = _slide(tmp_path / 'c.png', text_offset=500)
+
+        result = evaluator._analyze_frame_design([first, same, other])
+
+        kwargs = evaluator.vision_client.analyze_images.call_args.kwargs
+        assert kwargs['image_paths'] == [first, other]
+        assert '共2张' in kwargs['prompt']
+        assert result['score'] == 8.0
+
+    def test_dedup_can_be_disabled(self, evaluator, tmp_path):
+        """Test all frames are sent when dedup_frames is turned off"""
+        _set_dedup(evaluator, False)
+        frames = [_slide(tmp_path / 'a.png'), _slide(tmp_path / 'b.png', noise=True)]
+
+        evaluator._analyze_frame_design(frames)
+
+        kwargs = evaluator.vision_client.analyze_images.call_args.kwargs
+        assert kwargs['image_paths'] == frames
+        assert '共2张' in kwargs['prompt']
@@ -0,0 +1,134 @@
+"""
+Unit tests for VideoCrawler metadata-first processing
+"""
+
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+import core.video_processor as video_processor
+from core.video_processor import VideoCrawler, compute_keyframe_timestamps
+
+
+def _info():
+    """构造 yt-dlp info：包含渐进式流、DASH分片流和纯音频流"""
+    return {
+        'id': 'abc',
+        'title': 'Fractions: Lesson 1',
+        'duration': 300,
+        'tags': ['math'],
+        'http_headers': {'User-Agent': 'UA'},
+        'formats': [
+            {'format_id': '160', 'height': 144, 'vcodec': 'avc1', 'acodec': 'none', 'protocol': 'https', 'url': 'https://v/144'},
+            {'format_id': '135', 'height': 480, 'vcodec': 'avc1', 'acodec': 'none', 'protocol': 'https', 'url': 'https://v/480'},
+            {'format_id': '137', 'height': 1080, 'vcodec': 'avc1', 'acodec': 'none', 'protocol': 'https', 'url': 'https://v/1080'},
+            {'format_id': '136', 'height': 720, 'vcodec': 'avc1', 'acodec': 'none', 'protocol': 'http_dash_segments', 'url': 'https://v/dash'},
+            {'format_id': '140', 'vcodec': 'none', 'acodec': 'mp4a', 'abr': 128, 'protocol': 'https', 'url': 'https://a/128'},
+            {'format_id': '139', 'vcodec': 'none', 'acodec': 'mp4a', 'abr': 48, 'protocol': 'https', 'url': 'https://a/48'},
+            {'format_id': '251', 'vcodec': 'none', 'acodec': 'opus', 'abr': 70, 'protocol': 'https', 'url': 'https://a/70'},
+        ],
+    }
+
+
+@pytest.fixture
+def crawler(monkeypatch):
+    """创建 VideoCrawler，假定 yt-dlp 已安装"""
+    monkeypatch.setattr(video_processor, 'yt_dlp', Mock())
+    crawler = VideoCrawler()
+    crawler.full_audio = False
+    crawler.audio_seconds = 600
+    crawler.artifact_cache_enabled = False
+    return crawler
+
+
+class TestVideoCrawler:
+    """Test suite for metadata-first, range-limited video processing"""
+
+    def test_keyframe_timestamps_evenly_spread(self):
+        """Test timestamps cover the video and stay clear of the final frame"""
+        assert compute_keyframe_timestamps(100, 5) == [0.0, 25.0, 50.0, 75.0, 99.5]
+        assert compute_keyframe_timestamps(100, 1) == [50.0]
+        assert compute_keyframe_timestamps(0, 6) == []
+
+    def test_select_stream_formats(self, crawler):
+        """Test the smallest sufficient seekable video and a lean audio stream are chosen"""
+        video_fmt, audio_fmt = crawler._select_stream_formats(_info(), '480p')
+
+        assert video_fmt['format_id'] == '135'
+        assert audio_fmt['format_id'] == '251'
+
+        # 目标分辨率不可用时取最大可直接读取的分辨率（DASH分片流被排除）
+        video_fmt, _ = crawler._select_stream_formats(_info(), '1080p')
+        assert video_fmt['format_id'] == '137'
+
+    def test_streams_extract_frames_and_audio_segment_with_seeks(self, crawler, monkeypatch, tmp_path):
+        """Test each frame is an input seek on the remote stream and audio is capped"""
+        commands = []
+
+        def fake_run(stream):
+            args = video_processor.ffmpeg.compile(stream, overwrite_output=True)
+            commands.append(args)
+            Path(args[-2] if args[-1] == '-y' else args[-1]).write_bytes(b'x')
+
+        monkeypatch.setattr(crawler, '_ffmpeg_available', lambda: True)
+        monkeypatch.setattr(crawler, '_run_ffmpeg', fake_run)
+
+        result = crawler._extract_from_streams(_info(), tmp_path, '480p', num_frames=6)
+
+        assert result['success'] is True
+        assert len(result['frames_paths']) == 6
+        assert result['audio_path'] == tmp_path / 'Fractions Lesson 1.mp3'
+
+        frame_commands = [args for args in commands if 'https://v/480' in args]
+        assert len(frame_commands) == 6
+        for args in frame_commands:
+            assert args.index('-ss') < args.index('-i')
+            assert 'UA' in args[args.index('-headers') + 1]
+
+        audio_args = next(args for args in commands if 'https://a/70' in args)
+        assert audio_args[audio_args.index('-t') + 1] == '600.0'
+
+    def test_process_video_skips_download_when_streamed(self, crawler, monkeypatch, tmp_path):
+        """Test metadata is probed once and no full download happens on the stream path"""
+        probe = Mock(return_value=_info())
+        download = Mock()
+        monkeypatch.setattr(crawler, '_probe_video_info', probe)
+        monkeypatch.setattr(crawler, '_download_video', download)
+        monkeypatch.setattr(crawler, '_extract_from_streams', Mock(return_value={
+            'success': True, 'audio_path': tmp_path / 'a.mp3', 'frames_paths': [tmp_path / 'f1.jpg'], 'error': None
+        }))
+
+        result = crawler.process_video('https://www.youtube.com/watch?v=abc', str(tmp_path), extract_transcript=False)
+
+        assert result['success'] is True
+        assert result['video_path'] is None
+        assert result['metadata']['max_resolution_height'] == 1080
+        assert result['metadata']['tags'] == ['math']
+        probe.assert_called_once()
+        download.assert_not_called()
+
+    def test_process_video_falls_back_to_download_reusing_info(self, crawler, monkeypatch, tmp_path):
+        """Test the full-download fallback reuses the first info dict"""
+        info = _info()
+        video_path = tmp_path / 'video.mp4'
+        probe = Mock(return_value=info)
+        download = Mock(return_value={'success': True, 'video_path': video_path, 'metadata': {'title': 't'}, 'error': None})
+        monkeypatch.setattr(crawler, '_probe_video_info', probe)
+        monkeypatch.setattr(crawler, '_download_video', download)
+        monkeypatch.setattr(crawler, '_extract_from_streams', Mock(return_value={
+            'success': False, 'audio_path': None, 'frames_paths': [], 'error': '没有可直接读取的视频流'
+        }))
+        extract_audio = Mock(return_value={'success': True, 'audio_path': tmp_path / 'video.mp3', 'error': None})
+        extract_keyframes = Mock(return_value={'success': True, 'frames_paths': [], 'error': None})
+        monkeypatch.setattr(crawler, '_extract_audio', extract_audio)
+        monkeypatch.setattr(crawler, '_extract_keyframes', extract_keyframes)
+
+        result = crawler.process_video('https://www.youtube.com/watch?v=abc', str(tmp_path), extract_transcript=False)
+
+        assert result['success'] is True
+        assert result['video_path'] == str(video_path)
+        probe.assert_called_once()
+        assert download.call_args.kwargs['info'] is info
+        assert extract_audio.call_args.kwargs['max_seconds'] == 600.0
+        assert extract_keyframes.call_args.kwargs['duration'] == 300
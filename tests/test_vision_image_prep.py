@@ -0,0 +1,92 @@
+"""
+Unit tests for VisionImagePreparer
+"""
+
+import base64
+import io
+
+import pytest
+
+PIL = pytest.importorskip("PIL")
+from PIL import Image, ImageDraw
+
+from core.vision_image_prep import VisionImagePreparer, dhash, hamming_distance
+
+
+def _slide(path, size=(1920, 1080), text_offset=0, color=(20, 60, 160), noise=False):
+    """生成一张模拟PPT的关键帧"""
+    image = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([100 + text_offset, 100, 900 + text_offset, 300], fill=color)
+    draw.ellipse([1100, 500, 1600, 1000], fill=(200, 40, 40))
+    if noise:
+        image.putpixel((5, 5), (0, 0, 0))
+    image.save(path, format='PNG')
+    return path
+
+
+def _decode(data_uri):
+    return Image.open(io.BytesIO(base64.b64decode(data_uri.split(',', 1)[1])))
+
+
+class TestVisionImagePreparer:
+    """Test suite for vision request image preparation"""
+
+    def test_downscales_to_effective_resolution(self, tmp_path):
+        """Test a 1080p frame is resized to the short-side limit and re-encoded as JPEG"""
+        preparer = VisionImagePreparer(max_long_side=1536, max_short_side=768)
+        frame = tmp_path / 'frame.jpg'
+        Image.effect_noise((1920, 1080), 40).convert('RGB').save(frame, format='JPEG', quality=95)
+
+        image = preparer.prepare_one(frame)
+
+        assert (image.width, image.height) == (1365, 768)
+        assert image.data_uri.startswith('data:image/jpeg;base64,')
+        assert _decode(image.data_uri).size == (1365, 768)
+        assert image.encoded_bytes < image.original_bytes
+
+    def test_near_duplicate_frames_dropped_only_on_request(self, tmp_path):
+        """Test noise-only differences are deduplicated when asked, and every frame is kept otherwise"""
+        preparer = VisionImagePreparer()
+        first = _slide(tmp_path / 'f1.png')
+        same = _slide(tmp_path / 'f2.png', noise=True)
+        other = _slide(tmp_path / 'f3.png', size=(1920, 1080), text_offset=700, color=(10, 140, 30))
+
+        assert len(preparer.prepare([first, same, other])) == 3
+        assert preparer.deduplicate([first, same, other]) == [str(first), str(other)]
+        assert preparer.get_stats()["duplicates_dropped"] == 1
+
+    def test_cache_bounded_by_bytes(self, tmp_path):
+        """Test the encoded-image cache evicts the oldest entries once the byte budget is exceeded"""
+        frames = [_slide(tmp_path / f'f{i}.png', text_offset=i * 100) for i in range(4)]
+        single = len(VisionImagePreparer().prepare_one(frames[0]).data_uri)
+        preparer = VisionImagePreparer(cache_max_bytes=int(single * 2.5))
+
+        for frame in frames:
+            preparer.prepare_one(frame)
+
+        stats = preparer.get_stats()
+        assert stats["cache_entries"] == 2
+        assert stats["cache_bytes"] <= single * 2.5
+
+    def test_prepared_payload_cached_by_content(self, tmp_path):
+        """Test identical frame contents reuse the cached encoding"""
+        preparer = VisionImagePreparer()
+        first = _slide(tmp_path / 'a.png')
+        copy = tmp_path / 'b.png'
+        copy.write_bytes(first.read_bytes())
+
+        preparer.prepare_one(first)
+        again = preparer.prepare_one(copy)
+
+        assert preparer.get_stats()["cache_hits"] == 1
+        assert again.path == str(copy)
+
+    def test_dhash_distance(self):
+        """Test dHash is stable for identical images and far apart for different ones"""
+        base = Image.new('RGB', (64, 64), 'white')
+        ImageDraw.Draw(base).rectangle([0, 0, 31, 63], fill='black')
+        flipped = base.transpose(Image.FLIP_LEFT_RIGHT)
+
+        assert hamming_distance(dhash(base), dhash(base.copy())) == 0
+        assert hamming_distance(dhash(base), dhash(flipped)) > 5
@@ -16,3 +16,14 @@ def get_request_id() -> str:
 def set_request_id(request_id: str):
     """设置当前请求的 request_id"""
     request_id_var.set(request_id)
+
+# Search ID 上下文变量（关联同一次搜索的日志记录，见 core/search_log_collector.py）
+search_id_var: contextvars.ContextVar[str] = contextvars.ContextVar('search_id', default='')
+
+def get_search_id() -> str:
+    """获取当前上下文中的 search_id"""
+    return search_id_var.get('')
+
+def set_search_id(search_id: str):
+    """设置当前上下文中的 search_id"""
+    search_id_var.set(search_id)
@@ -47,7 +47,7 @@ def print(*args, **kwargs):
 # ============================================================================
 # Flask 应用初始化
 # ============================================================================
-from flask import Flask, render_template, request, jsonify, send_file, send_from_directory
+from flask import Flask, Response, render_template, request, jsonify, send_file, send_from_directory, stream_with_context
 from flask_cors import CORS
 
 app = Flask(__name__)
@@ -293,33 +293,48 @@ def get_countries():
             "countries": []
         }), 500
 
+def _query_search_history(include_results: bool):
+    """
+    按请求参数分页查询搜索历史
+
+    查询参数: limit（默认100，最大1000）、offset、country、grade、subject、
+    since/until（ISO时间）、include_results（是否包含完整结果）
+    """
+    from core.search_history_store import get_search_history_store
+    store = get_search_history_store()
+
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    since = request.args.get('since')
+    until = request.args.get('until')
+    include_results = request.args.get('include_results', str(include_results)).lower() in ('1', 'true', 'yes')
+
+    return store.query(
+        limit=limit,
+        offset=offset,
+        country=request.args.get('country') or None,
+        grade=request.args.get('grade') or None,
+        subject=request.args.get('subject') or None,
+        since=store.parse_timestamp(since) if since else None,
+        until=store.parse_timestamp(until) if until else None,
+        include_results=include_results
+    ), limit, offset
+
 @app.route('/api/search_history', methods=['GET'])
 def get_search_history():
-    """获取搜索历史"""
+    """获取搜索历史（分页，按时间倒序）"""
     request_id = str(uuid.uuid4())[:8]
     set_request_id(request_id)
 
     try:
-        history_file = os.path.join(os.path.dirname(__file__), 'search_history.json')
-
-        if not os.path.exists(history_file):
-            # 如果文件不存在，返回空列表
-            return jsonify({
-                "success": True,
-                "history": [],
-                "total": 0
-            })
-
-        with open(history_file, 'r', encoding='utf-8') as f:
-            history = json.load(f)
-
-        # 按时间倒序排列
-        history = sorted(history, key=lambda x: x.get('timestamp', ''), reverse=True)
+        (history, total), limit, offset = _query_search_history(include_results=False)
 
         return jsonify({
             "success": True,
             "history": history,
-            "total": len(history)
+            "total": total,
+            "limit": limit,
+            "offset": offset
         })
 
     except Exception as e:
@@ -517,10 +532,11 @@ def search():
 
         import time
         import gc
-        from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+        from concurrent.futures import TimeoutError as FuturesTimeoutError
+        from core.executor_registry import get_executor, ExecutorSaturatedError
         search_start_time = time.time()
         
-        # 添加整体超时保护（200秒）- 使用ThreadPoolExecutor实现真正的超时中断
+        # 添加整体超时保护（200秒）- 在共享的 request 执行器中执行，超时后立即返回
         SEARCH_TIMEOUT = 200  # 🔧 增加到200秒以支持LLM评估
         response = None
         search_engine_instance = None  # 用于内存清理
@@ -543,16 +559,19 @@ def search():
                     pass
         
         try:
-            # 使用ThreadPoolExecutor执行搜索，支持真正的超时中断
-            with ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(execute_search)
+            # 在共享的 request 执行器中执行搜索，支持真正的超时中断
+            # （不再按请求创建线程池：with 退出时会等待线程结束，超时无法提前返回）
+            try:
+                future = get_executor('request').submit(
+                    execute_search, deadline=time.monotonic() + SEARCH_TIMEOUT
+                )
                 try:
                     response = future.result(timeout=SEARCH_TIMEOUT)
                     search_elapsed = time.time() - search_start_time
                     logger.info(f"[搜索执行] 搜索完成，耗时: {search_elapsed:.2f}秒，结果数: {len(response.results)}")
                 except FuturesTimeoutError:
                     logger.error(f"[搜索执行] 搜索超时（超过{SEARCH_TIMEOUT}秒）[ID: {request_id}]")
-                    # 尝试取消任务（虽然可能已经无法取消）
+                    # 尝试取消任务（仍在排队时可以取消）
                     future.cancel()
                     # 返回超时响应
                     from search_engine_v2 import SearchResponse
@@ -565,6 +584,18 @@ def search():
                         playlist_count=0,
                         video_count=0
                     )
+            except ExecutorSaturatedError as e:
+                logger.warning(f"[搜索执行] 搜索执行器已饱和，拒绝请求 [ID: {request_id}]: {str(e)}")
+                from search_engine_v2 import SearchResponse
+                response = SearchResponse(
+                    success=False,
+                    query="",
+                    results=[],
+                    message="服务繁忙，当前排队的搜索请求过多，请稍后重试",
+                    total_count=0,
+                    playlist_count=0,
+                    video_count=0
+                )
 
             # 📊 记录搜索结果到日志
             search_elapsed = time.time() - search_start_time
@@ -584,16 +615,25 @@ def search():
                         score=result.score or 0,
                         recommendation_reason=result.recommendation_reason or "",
                         resource_type=result.resource_type or "未知",
+                        search_id=search_id
                     )
                 # 完成日志收集
                 log_collector.finish_search(
                     total_time=search_elapsed,
                     search_time=search_elapsed * 0.7,  # 估算搜索时间
-                    scoring_time=search_elapsed * 0.3  # 估算评分时间
+                    scoring_time=search_elapsed * 0.3,  # 估算评分时间
+                    search_id=search_id
                 )
                 logger.info(f"[日志收集] 搜索日志已完成: {search_id}, 结果数: {len(response.results)}")
             else:
-                logger.warning(f"[日志收集] 搜索失败，跳过日志记录: {search_id}")
+                # 失败的搜索也结束日志，避免一直占用进行中的日志
+                log_collector.finish_search(
+                    total_time=search_elapsed,
+                    search_id=search_id,
+                    status='failed',
+                    message=getattr(response, 'message', '') if response else ''
+                )
+                logger.warning(f"[日志收集] 搜索失败，日志已标记为失败: {search_id}")
 
         except Exception as e:
             search_error = str(e)
@@ -609,41 +649,29 @@ def search():
             except Exception as e:
                 logger.debug(f"内存清理: {str(e)}")
 
-        # 保存搜索历史
-        history_file = os.path.join(os.path.dirname(__file__), 'search_history.json')
-        history = []
-        if os.path.exists(history_file):
-            try:
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-            except:
-                history = []
-        
-        history.insert(0, {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "request": {
-                "country": country,
-                "grade": grade,
-                "semester": semester,
-                "subject": subject,
-                "language": language
-            },
-            "response": {
-                "success": response.success,
-                "query": response.query,
-                "total_count": response.total_count,
-                "playlist_count": response.playlist_count,
-                "video_count": response.video_count,
-                "results": [r.model_dump() if hasattr(r, 'model_dump') else r.dict() for r in response.results]
-            }
-        })
-        
-        # 只保留最近100条
-        history = history[:100]
-        
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump(history, f, ensure_ascii=False, indent=2)
-        
+        # 保存搜索历史（后台线程追加写入，不阻塞请求）
+        try:
+            from core.search_history_store import get_search_history_store
+            get_search_history_store().record_async(
+                {
+                    "country": country,
+                    "grade": grade,
+                    "semester": semester,
+                    "subject": subject,
+                    "language": language
+                },
+                {
+                    "success": response.success,
+                    "query": response.query,
+                    "total_count": response.total_count,
+                    "playlist_count": response.playlist_count,
+                    "video_count": response.video_count,
+                    "results": [r.model_dump() if hasattr(r, 'model_dump') else r.dict() for r in response.results]
+                }
+            )
+        except Exception as e:
+            logger.warning(f"保存搜索历史失败: {str(e)}")
+
         # 获取最近的日志（用于前端Debug弹窗）
         debug_logs = []
         try:
@@ -694,17 +722,9 @@ def search():
         # 只按评分倒序排列（高分在前）
 
         # 统计信息
-        def is_playlist(result):
-            """判断是否是YouTube播放列表"""
-            url = result.url or ''
-            return bool(
-                'playlist' in url.lower() or
-                'list=' in url.lower() or
-                '/videos' in url.lower() or
-                result.resource_type == '播放列表'
-            )
-
-        playlist_count = sum(1 for r in filtered_results if is_playlist(r))
+        from core.resource_classifier import get_resource_classifier
+        classifier = get_resource_classifier()
+        playlist_count = sum(1 for r in filtered_results if classifier.is_playlist(r))
         logger.info(f"[结果统计] 总结果: {len(filtered_results)}, 播放列表: {playlist_count}, 单个视频: {len(filtered_results) - playlist_count}")
 
         # 按评分倒序排列（高分在前）
@@ -805,26 +825,82 @@ def search():
             except Exception as e:
                 logger.error(f"释放并发限制器失败: {str(e)}")
 
+@app.route('/api/search/stream', methods=['POST'])
+@require_api_key  # ✅ 安全修复：需要API密钥认证
+def search_stream():
+    """
+    流式搜索API（Server-Sent Events）
+
+    与 /api/search 参数相同；每个搜索引擎完成时推送 results 事件，
+    每个LLM评分批次完成时推送 scores 事件，最后推送与 /api/search 相同结构的 done 事件
+    """
+    request_id = str(uuid.uuid4())[:8]
+    set_request_id(request_id)
+
+    try:
+        data = request.get_json()
+
+        from core.input_validators import validate_search_request
+
+        is_valid, error_msg, validated_data = validate_search_request(data)
+        if not is_valid:
+            logger.warning(f"[流式搜索] 输入验证失败: {error_msg}")
+            return jsonify({
+                "success": False,
+                "message": f"输入验证失败: {error_msg}",
+                "results": []
+            }), 400
+
+        if not HAS_SEARCH_ENGINE:
+            logger.error("[流式搜索] 搜索引擎模块不可用")
+            return jsonify({
+                "success": False,
+                "message": "搜索引擎模块不可用",
+                "results": []
+            }), 500
+
+        # 并发槽位由搜索处理器在后台搜索结束时释放（客户端提前断开也不会泄漏）
+        from services.search_handler import SearchHandler
+        stream, status_code = SearchHandler(concurrency_limiter=concurrency_limiter).handle_search_stream({
+            "country": validated_data.country,
+            "grade": validated_data.grade,
+            "subject": validated_data.subject,
+            "semester": validated_data.semester,
+            "language": validated_data.language,
+            "resourceType": validated_data.resource_type or 'all'
+        })
+        if status_code != 200:
+            return jsonify(stream), status_code
+
+        return Response(
+            stream_with_context(stream),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    except Exception as e:
+        logger.error(f"[流式搜索] 处理失败: {str(e)} [ID: {request_id}]")
+        return jsonify({
+            "success": False,
+            "message": f"搜索失败: {str(e)}",
+            "results": []
+        }), 500
+
 @app.route('/api/history', methods=['GET'])
 def get_history():
-    """获取搜索历史"""
+    """获取搜索历史（分页，默认包含完整结果）"""
     request_id = str(uuid.uuid4())[:8]
     set_request_id(request_id)
     
     try:
-        history_file = os.path.join(os.path.dirname(__file__), 'search_history.json')
-        if os.path.exists(history_file):
-            with open(history_file, 'r', encoding='utf-8') as f:
-                history = json.load(f)
-            return jsonify({
-                "success": True,
-                "history": history
-            })
-        else:
-            return jsonify({
-                "success": True,
-                "history": []
-            })
+        (history, total), limit, offset = _query_search_history(include_results=True)
+        return jsonify({
+            "success": True,
+            "history": history,
+            "total": total,
+            "limit": limit,
+            "offset": offset
+        })
     except Exception as e:
         logger.error(f"获取历史记录失败: {str(e)}")
         return jsonify({
@@ -840,42 +916,35 @@ def get_evaluation_history():
     set_request_id(request_id)
     
     try:
-        evaluations_dir = os.path.join(os.path.dirname(__file__), 'data', 'evaluations')
-        if not os.path.exists(evaluations_dir):
-            return jsonify({
-                "success": True,
-                "evaluations": []
-            })
-        
-        evaluations = []
-        for filename in os.listdir(evaluations_dir):
-            if filename.startswith('evaluation_') and filename.endswith('.json'):
-                filepath = os.path.join(evaluations_dir, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        eval_data = json.load(f)
-                    # 检查是否是批量评估
-                    is_batch = eval_data.get('is_batch', False)
-                    total_videos = eval_data.get('total_videos', 0) if is_batch else None
-                    
-                    evaluations.append({
-                        "request_id": eval_data.get('request_id', ''),
-                        "timestamp": eval_data.get('timestamp', ''),
-                        "video_url": eval_data.get('video_url', ''),
-                        "video_title": eval_data.get('video_metadata', {}).get('title', '') or eval_data.get('title', ''),
-                        "overall_score": eval_data.get('evaluation', {}).get('overall_score', 0.0),
-                        "is_batch": is_batch,
-                        "total_videos": total_videos
-                    })
-                except:
-                    continue
-        
-        # 按时间戳倒序排序
-        evaluations.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+        from core.evaluation_catalog import get_evaluation_catalog
+
+        limit = request.args.get('limit', type=int)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        records, total = get_evaluation_catalog().query(
+            country=request.args.get('country') or None,
+            grade=request.args.get('grade') or None,
+            subject=request.args.get('subject') or None,
+            include_batch=True,
+            limit=limit,
+            offset=offset
+        )
+        evaluations = [
+            {
+                "request_id": record['request_id'],
+                "timestamp": record['timestamp'],
+                "video_url": record['video_url'],
+                "video_title": record['video_title'],
+                "overall_score": record['overall_score'],
+                "is_batch": record['is_batch'],
+                "total_videos": record['total_videos']
+            }
+            for record in records
+        ]
         
         return jsonify({
             "success": True,
-            "evaluations": evaluations
+            "evaluations": evaluations,
+            "total": total
         })
     except Exception as e:
         logger.error(f"获取评估历史失败: {str(e)}")
@@ -892,67 +961,42 @@ def get_evaluation_reports():
     set_request_id(request_id)
 
     try:
-        evaluations_dir = os.path.join(os.path.dirname(__file__), 'data', 'evaluations')
-        if not os.path.exists(evaluations_dir):
-            return jsonify({
-                "success": True,
-                "reports": [],
-                "total_count": 0,
-                "average_score": 0,
-                "high_score_count": 0,
-                "pending_count": 0
-            })
-
-        reports = []
-        total_score = 0
-        high_score_count = 0
-
-        for filename in os.listdir(evaluations_dir):
-            if filename.startswith('evaluation_') and filename.endswith('.json'):
-                filepath = os.path.join(evaluations_dir, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        eval_data = json.load(f)
-
-                    # 跳过批量评估的主记录
-                    if eval_data.get('is_batch', False):
-                        continue
-
-                    evaluation = eval_data.get('evaluation', {})
-                    overall_score = evaluation.get('overall_score', 0)
-                    metadata = eval_data.get('video_metadata', {})
-
-                    # 获取搜索参数
-                    search_params = eval_data.get('search_params', {})
-
-                    reports.append({
-                        "video_url": eval_data.get('video_url', ''),
-                        "video_title": metadata.get('title', '') or eval_data.get('title', ''),
-                        "total_score": overall_score,
-                        "country": search_params.get('country', ''),
-                        "grade": search_params.get('grade', ''),
-                        "subject": search_params.get('subject', ''),
-                        "evaluation_time": eval_data.get('timestamp', ''),
-                        "ai_analysis": eval_data.get('analysis', '')
-                    })
-
-                    total_score += overall_score
-                    if overall_score >= 8:
-                        high_score_count += 1
-                except:
-                    continue
-
-        # 按评估时间倒序排序
-        reports.sort(key=lambda x: x.get('evaluation_time', ''), reverse=True)
-
-        avg_score = total_score / len(reports) if reports else 0
+        from core.evaluation_catalog import get_evaluation_catalog
+        catalog = get_evaluation_catalog()
+
+        # 支持按国家/年级/学科过滤和分页（limit 缺省时返回全部）
+        filters = {
+            "country": request.args.get('country') or None,
+            "grade": request.args.get('grade') or None,
+            "subject": request.args.get('subject') or None
+        }
+        records, total = catalog.query(
+            **filters,
+            limit=request.args.get('limit', type=int),
+            offset=max(request.args.get('offset', 0, type=int), 0)
+        )
+        summary = catalog.summary(**filters)
+
+        reports = [
+            {
+                "video_url": record['video_url'],
+                "video_title": record['video_title'],
+                "total_score": record['overall_score'],
+                "country": record['country'],
+                "grade": record['grade'],
+                "subject": record['subject'],
+                "evaluation_time": record['timestamp'],
+                "ai_analysis": record.get('ai_analysis', '')
+            }
+            for record in records
+        ]
 
         return jsonify({
             "success": True,
             "reports": reports,
-            "total_count": len(reports),
-            "average_score": avg_score,
-            "high_score_count": high_score_count,
+            "total_count": total,
+            "average_score": summary['average_score'],
+            "high_score_count": summary['high_score_count'],
             "pending_count": 0  # 可以从搜索历史中计算未评估的视频数
         })
     except Exception as e: